@@ -0,0 +1,68 @@
+"""
+Benchmark do custo por linha de GET /tasks/.
+Compara o caminho padrão do FastAPI (revalidação contra o response_model + json)
+com o caminho rápido (projeção nos campos do schema + orjson). O repositório é
+substituído por dados em memória, então o resultado mede apenas a serialização.
+
+Uso:
+    python benchmark_responses.py [linhas ...]   (padrão: 100 1000 10000)
+"""
+import sys
+import time
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from src.main import app
+from src.core import serialization
+from src.dependencies import get_task_service
+from tests.helpers import override_auth_dependency, clear_overrides
+
+
+def make_tasks(count):
+    return [
+        {
+            'id': i,
+            'titulo': f'Tarefa {i}',
+            'descricao': 'Descrição da tarefa com acentuação',
+            'status': 'em_andamento',
+            'owner_id': i % 50 + 1,
+            'owner_username': f'usuario{i % 50 + 1}',
+            'created_at': '2025-01-01T10:00:00.123456',
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def measure(client, rows, repeat):
+    """Melhor tempo (s) de uma requisição, em `repeat` execuções."""
+    response = client.get('/tasks/', headers={'Authorization': 'Bearer benchmark'})
+    assert response.status_code == 200 and len(response.json()) == rows
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get('/tasks/', headers={'Authorization': 'Bearer benchmark'})
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(sizes):
+    service = MagicMock()
+    override_auth_dependency(app, user_role='admin')
+    app.dependency_overrides[get_task_service] = lambda: service
+    client = TestClient(app)
+    print(f"{'linhas':>8} | {'padrão (µs/linha)':>18} | {'rápido (µs/linha)':>18} | {'ganho':>6}")
+    try:
+        for rows in sizes:
+            service.get_all_tasks.return_value = make_tasks(rows)
+            repeat = max(3, 20000 // rows)
+            serialization.settings['fast_responses'] = False
+            standard = measure(client, rows, repeat)
+            serialization.settings['fast_responses'] = True
+            fast = measure(client, rows, repeat)
+            print(f"{rows:>8} | {standard / rows * 1e6:>18.2f} | {fast / rows * 1e6:>18.2f} | {standard / fast:>5.1f}x")
+    finally:
+        serialization.settings['fast_responses'] = True
+        clear_overrides(app)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
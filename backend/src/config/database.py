@@ -1,5 +1,6 @@
 import psycopg2
 from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path  # Usado para criar caminhos de arquivo robustos
 import yaml # Você precisará de PyYAML: pip install PyYAML
 
@@ -53,9 +54,38 @@ def get_db_connection():
             conn.close()
             print("Conexão com o banco de dados fechada.")
 
+# Cursor da transação aberta por shared_transaction() no contexto atual (None: cada
+# get_db_cursor abre a sua conexão). As threads de run_in_threadpool herdam o contexto
+_shared_cursor: ContextVar = ContextVar('shared_cursor', default=None)
+
+@contextmanager
+def shared_transaction():
+    """
+    Uma conexão e uma transação para todas as chamadas a get_db_cursor feitas no
+    contexto atual (POST /batch com "transaction": true). Commit na saída normal;
+    rollback se uma exceção sair do bloco.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        token = _shared_cursor.set(cursor)
+        try:
+            yield cursor
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Transação compartilhada desfeita (rollback). Motivo: {e!r}")
+            raise
+        finally:
+            _shared_cursor.reset(token)
+
 @contextmanager
 def get_db_cursor(commit=False):
     """Gerencia o cursor do banco, com opção de commit."""
+    shared = _shared_cursor.get()
+    if shared is not None:
+        # Dentro de shared_transaction(): commit e rollback ficam com quem a abriu
+        yield shared
+        return
     with get_db_connection() as conn:
         cursor = conn.cursor()
         try:
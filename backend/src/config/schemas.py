@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
+from typing import Any, Dict, Literal, Optional, List
 
 # --- Esquemas de Tarefa ---
 class TaskBase(BaseModel):
@@ -10,6 +10,13 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     owner_id: Optional[int] = None  # Opcional: admin/gerencial pode atribuir a outros usuários
 
+class TaskUpdate(BaseModel):
+    # PATCH: apenas os campos informados são alterados
+    titulo: Optional[str] = None
+    descricao: Optional[str] = None
+    status: Optional[Literal["pendente", "em_andamento", "em_revisao", "concluida"]] = None
+    owner_id: Optional[int] = None
+
 class Task(TaskBase):
     id: int
     owner_id: int
@@ -19,6 +26,36 @@ class Task(TaskBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class TaskStatusUpdate(BaseModel):
+    status: Literal["pendente", "em_andamento", "em_revisao", "concluida"]
+
+class TaskStatusResult(BaseModel):
+    id: int
+    status: str
+    changed: bool  # False quando a tarefa já estava no status pedido
+
+class TaskMove(BaseModel):
+    # Coluna de destino e lugar dentro dela (cartão vizinho); sem vizinho: fim da coluna
+    status: Literal["pendente", "em_andamento", "em_revisao", "concluida"]
+    after_id: Optional[int] = None   # Cartão logo acima do destino
+    before_id: Optional[int] = None  # Cartão logo abaixo (quando after_id não é informado)
+
+class TaskMoveResult(BaseModel):
+    id: int
+    status: str
+    position: str
+    changed: bool  # True quando o status mudou
+    rebalanced: bool  # True quando a coluna teve as chaves regravadas
+
+class TaskBoardColumn(BaseModel):
+    status: str
+    total: int  # Total de tarefas no status (não apenas as retornadas)
+    tasks: List[Task]
+    next_cursor: Optional[str] = None  # Valor de "after" para carregar mais; None no fim da coluna
+
+class TaskBoard(BaseModel):
+    columns: List[TaskBoardColumn]
+
 # --- Esquemas de Usuário ---
 class UserBase(BaseModel):
     username: str
@@ -41,6 +78,70 @@ class User(UserBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+# --- Esquemas de Importação em massa (POST /admin/import/...) ---
+class TaskImportRow(BaseModel):
+    titulo: str = Field(min_length=1)
+    descricao: Optional[str] = None
+    status: Literal["pendente", "em_andamento", "em_revisao", "concluida"] = "pendente"
+    owner_username: Optional[str] = None  # Responsável; sem ele, o admin que importa
+
+class UserImportRow(UserBase):
+    password: str = Field(min_length=1)
+    role: Literal["admin", "gerencial", "visualizacao"] = "visualizacao"
+
+class ImportRowError(BaseModel):
+    row: int  # Registro no arquivo (1 = primeiro após o cabeçalho do CSV; linha no NDJSON)
+    errors: List[str]
+
+class ImportReport(BaseModel):
+    total: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool  # True quando há mais erros do que os listados
+
+# --- Esquemas de Notificação ---
+class NotificationIds(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=500)
+
+# --- Esquemas de Lote (POST /batch) ---
+class BatchOperation(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str = Field(pattern=r"^/")  # Caminho da API, com query string opcional
+    body: Optional[Any] = None  # Corpo JSON da sub-requisição
+
+class BatchRequest(BaseModel):
+    requests: List[BatchOperation] = Field(min_length=1, max_length=100)
+    transaction: bool = False  # True: todas na mesma transação (a primeira falha desfaz tudo)
+
+# --- Esquemas de Jobs (operações em segundo plano) ---
+class JobSubmit(BaseModel):
+    type: str  # Ex.: 'tasks.reassign', 'notifications.compact'
+    params: Dict[str, Any] = {}
+
+class TaskReassignParams(BaseModel):
+    from_owner_id: int
+    to_owner_id: int
+    status: Optional[Literal["pendente", "em_andamento", "em_revisao", "concluida"]] = None  # Padrão: todas
+
+class NotificationCompactParams(BaseModel):
+    pass
+
+class Job(BaseModel):
+    id: int
+    type: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    params: Dict[str, Any]
+    progress_done: int
+    progress_total: Optional[int] = None  # None quando o total não é conhecido (ex.: importação)
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_by: Optional[int] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
 # --- Esquemas de Token ---
 class Token(BaseModel):
     access_token: str
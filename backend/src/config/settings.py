@@ -0,0 +1,30 @@
+"""
+Configurações da aplicação.
+Lê as seções do config.yaml que não são parâmetros de conexão com o banco
+(ex.: 'notifications'), aplicando valores padrão para as chaves ausentes.
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+import yaml
+
+
+@lru_cache(maxsize=1)
+def get_app_config() -> Dict[str, Any]:
+    """Lê (uma única vez por processo) o config.yaml completo."""
+    config_path = Path(__file__).parent / 'config.yaml'
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+
+def get_section(name: str, defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Retorna uma seção do config.yaml mesclada sobre os valores padrão.
+
+    Args:
+        name: Nome da seção (chave de primeiro nível no YAML)
+        defaults: Valores usados quando a chave não está configurada
+    """
+    section = dict(defaults or {})
+    section.update(get_app_config().get(name) or {})
+    return section
@@ -0,0 +1,121 @@
+"""
+Índices fracionários - ordem manual dos cartões no quadro Kanban
+Cada tarefa guarda em tarefas.position uma chave em base 62 (0-9, A-Z, a-z),
+lida como a parte fracionária de um número: "V" = 0.V, "V8" = 0.V8. Com
+COLLATE "C" a ordem das strings é a ordem numérica, então mover um cartão é gravar
+uma chave entre as dos vizinhos, sem renumerar a coluna.
+
+- Chaves nunca terminam em "0": sempre existe uma chave menor (não há 0.0).
+- Inserções repetidas no mesmo ponto aumentam a chave (cerca de um caractere a
+  cada 6 inserções); quando ela passa do limite, a coluna é rebalanceada com
+  keys_for().
+- key_after() é a regra usada no SQL (APPEND_POSITION_SQL) para colocar um
+  cartão no fim da coluna: incrementa o último dígito, ou acrescenta "V" após "z".
+"""
+from typing import List, Optional
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+# Chave do primeiro cartão de uma coluna vazia (meio do intervalo)
+MIDDLE = DIGITS[BASE // 2]
+
+
+def _digit(key: str, index: int) -> int:
+    return DIGITS.index(key[index]) if index < len(key) else 0
+
+
+def _validate(key: str) -> None:
+    if not key or key.endswith('0') or any(char not in DIGITS for char in key):
+        raise ValueError(f"Chave de posição inválida: {key!r}")
+
+
+def _midpoint(lower: str, upper: Optional[str]) -> str:
+    """Chave entre lower ('' = 0) e upper (None = 1), sem zeros à direita."""
+    if upper is not None:
+        # Prefixo comum (lower completado com zeros)
+        prefix = 0
+        while prefix < len(upper) and _digit(lower, prefix) == DIGITS.index(upper[prefix]):
+            prefix += 1
+        if prefix:
+            return upper[:prefix] + _midpoint(lower[prefix:], upper[prefix:])
+    low = _digit(lower, 0)
+    high = DIGITS.index(upper[0]) if upper is not None else BASE
+    if high - low > 1:
+        return DIGITS[(low + high) // 2]
+    # Dígitos consecutivos: continua no próximo dígito
+    if upper is not None and len(upper) > 1:
+        return upper[0]
+    return DIGITS[low] + _midpoint(lower[1:], None)
+
+
+def key_after(key: Optional[str]) -> str:
+    """Chave maior que key (fim da coluna); MIDDLE quando a coluna está vazia."""
+    if key is None:
+        return MIDDLE
+    _validate(key)
+    last = DIGITS.index(key[-1])
+    if last == BASE - 1:
+        return key + MIDDLE
+    return key[:-1] + DIGITS[last + 1]
+
+
+def key_between(lower: Optional[str], upper: Optional[str]) -> str:
+    """
+    Chave estritamente entre lower e upper.
+
+    Args:
+        lower: Chave do cartão anterior (None = início da coluna)
+        upper: Chave do cartão seguinte (None = fim da coluna)
+
+    Raises:
+        ValueError: Chave inválida ou lower >= upper (chaves repetidas: rebalancear)
+    """
+    if upper is None:
+        return key_after(lower)
+    _validate(upper)
+    if lower is not None:
+        _validate(lower)
+        if lower >= upper:
+            raise ValueError(f"Chaves fora de ordem: {lower!r} >= {upper!r}")
+    return _midpoint(lower or '', upper)
+
+
+def keys_for(count: int) -> List[str]:
+    """Chaves igualmente espaçadas (e curtas) para `count` cartões, em ordem."""
+    if count <= 0:
+        return []
+    length = 1
+    while BASE ** length <= count:
+        length += 1
+    keys = []
+    for index in range(1, count + 1):
+        value = index * BASE ** length // (count + 1)
+        digits = ''
+        for _ in range(length):
+            value, remainder = divmod(value, BASE)
+            digits = DIGITS[remainder] + digits
+        keys.append(digits.rstrip('0'))
+    return keys
+
+
+def keys_after(key: Optional[str], count: int) -> List[str]:
+    """
+    Chaves crescentes (e curtas) para `count` cartões no fim da coluna, depois de
+    key (None: coluna vazia). Usada na importação em massa: key_after(key) seguido
+    dos sufixos de keys_for(count), em vez de encadear key_after() `count` vezes
+    (que aumentaria a chave a cada "z").
+    """
+    prefix = key_after(key)
+    return [prefix + suffix for suffix in keys_for(count)]
+
+
+# Expressão SQL equivalente a key_after() para a maior chave da coluna do status
+# %(status)s: usada ao criar tarefas e quando o status muda fora da API de mover
+APPEND_POSITION_SQL = """(
+    SELECT CASE
+        WHEN MAX(position) IS NULL THEN '{middle}'
+        WHEN RIGHT(MAX(position), 1) = 'z' THEN MAX(position) || '{middle}'
+        ELSE LEFT(MAX(position), -1) || TRANSLATE(RIGHT(MAX(position), 1), '{digits}', '{next_digits}')
+    END
+    FROM tarefas WHERE status = %(status)s::task_status
+)""".format(middle=MIDDLE, digits=DIGITS[:-1], next_digits=DIGITS[1:])
@@ -0,0 +1,284 @@
+"""
+Serialização das respostas - caminho rápido para dados dos repositórios
+Os endpoints de tarefas e usuários devolvem dicionários montados pelos
+repositórios (tipos simples, created_at já em ISO 8601). Pelo caminho padrão o
+FastAPI valida cada linha de novo contra o response_model (incluindo EmailStr) e
+codifica com o módulo json; aqui a validação é substituída por uma projeção nos
+campos do schema e a codificação é feita com orjson.
+
+- O contrato não muda: mesmas chaves, na ordem do schema, com os mesmos valores
+  padrão e sem campos extras (ex.: hashed_password). O response_model continua
+  no decorador e documenta a resposta no OpenAPI.
+- api.validate_responses: true valida com um TypeAdapter compilado (uma vez por
+  schema) antes de serializar - útil em desenvolvimento.
+- api.fast_responses: false devolve os dados ao FastAPI (caminho padrão).
+- Sem orjson instalado, a codificação volta para o módulo json.
+
+Negociação de conteúdo (MessagePack): com "Accept: application/msgpack" as
+mesmas estruturas são codificadas em MessagePack, pelo mesmo caminho (projeção
+no schema); os endpoints em lote também aceitam corpo MessagePack
+("Content-Type: application/msgpack") via negotiated_body().
+
+Sparse fieldsets: sparse_fields() lê ?fields=id,titulo,... e a resposta traz
+apenas esses campos (na ordem do schema); os repositórios estreitam o SELECT.
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from fastapi import Header, HTTPException, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from src.config.settings import get_section
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+# Variantes aceitas no Accept/Content-Type
+_MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, 'application/x-msgpack')
+_JSON_MEDIA_TYPES = (JSON_MEDIA_TYPE, 'application/*', '*/*')
+
+settings = get_section('api', {'fast_responses': True, 'validate_responses': False})
+
+
+def dumps(content: Any) -> bytes:
+    """Codifica em JSON compacto (UTF-8), como o JSONResponse do Starlette."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse codificado com orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def loads(body: bytes) -> Any:
+    """Decodifica um corpo JSON."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class MsgPackResponse(Response):
+    """Resposta codificada em MessagePack."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def negotiate(accept: Optional[str]) -> Type[Response]:
+    """
+    Escolhe o formato da resposta pelo cabeçalho Accept.
+
+    Returns:
+        MsgPackResponse quando application/msgpack tem qualidade maior que JSON
+        (ou igual e aparece antes); FastJSONResponse nos demais casos
+    """
+    if not accept or msgpack is None:
+        return FastJSONResponse
+    msgpack_q = json_q = 0.0
+    msgpack_first = False
+    for part in accept.split(','):
+        media, *params = [item.strip() for item in part.split(';')]
+        media = media.lower()
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media in _MSGPACK_MEDIA_TYPES:
+            msgpack_first = msgpack_first or (msgpack_q == 0 and json_q == 0)
+            msgpack_q = max(msgpack_q, q)
+        elif media in _JSON_MEDIA_TYPES:
+            json_q = max(json_q, q)
+    if msgpack_q > json_q or (msgpack_q > 0 and msgpack_q == json_q and msgpack_first):
+        return MsgPackResponse
+    return FastJSONResponse
+
+
+def response_format(accept: Optional[str] = Header(None)) -> Type[Response]:
+    """Dependência: classe de resposta negociada pelo cabeçalho Accept."""
+    return negotiate(accept)
+
+
+def negotiated_response(
+    content: Any,
+    response_class: Type[Response] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Codifica o conteúdo no formato negociado (JSON por padrão)."""
+    response = (response_class or FastJSONResponse)(content, status_code=status_code, headers=headers)
+    response.headers['Vary'] = 'Accept'
+    return response
+
+
+async def decode_body(request: Request) -> Any:
+    """
+    Lê o corpo da requisição em JSON ou MessagePack, conforme o Content-Type.
+
+    Raises:
+        HTTPException 415: MessagePack enviado sem o pacote msgpack instalado
+        ValueError: Corpo vazio ou malformado
+    """
+    body = await request.body()
+    if not body:
+        raise ValueError("corpo da requisição vazio")
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    if content_type in _MSGPACK_MEDIA_TYPES:
+        if msgpack is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="MessagePack não suportado neste servidor"
+            )
+        return msgpack.unpackb(body, raw=False)
+    return loads(body)
+
+
+def negotiated_body(model: Type[BaseModel]) -> Callable:
+    """
+    Dependência que lê o corpo (JSON ou MessagePack) e o valida com o schema.
+    Os erros seguem o formato do FastAPI (422, loc iniciando em "body").
+    """
+    async def dependency(request: Request) -> BaseModel:
+        try:
+            data = await decode_body(request)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise RequestValidationError([{
+                'type': 'body_invalid', 'loc': ('body',), 'msg': f"Corpo inválido: {e}", 'input': None
+            }])
+        try:
+            return model.model_validate(data)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)],
+                body=data
+            )
+    return dependency
+
+
+def request_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """openapi_extra documentando o corpo aceito por negotiated_body() nos dois formatos."""
+    schema = model.model_json_schema()
+    return {'requestBody': {'required': True, 'content': {
+        JSON_MEDIA_TYPE: {'schema': schema},
+        MSGPACK_MEDIA_TYPE: {'schema': schema},
+    }}}
+
+
+class ResponseShape:
+    """Campos (na ordem do schema) e valores padrão de um schema de resposta."""
+
+    __slots__ = ('model', 'fields', 'defaults', '_adapter')
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.fields: Tuple[str, ...] = tuple(model.model_fields)
+        self.defaults: Dict[str, Any] = {
+            name: None if field.is_required() else field.get_default(call_default_factory=True)
+            for name, field in model.model_fields.items()
+        }
+        self._adapter: Optional[TypeAdapter] = None
+
+    def project(self, row: Dict[str, Any], fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        """Mantém apenas os campos do schema (ou os pedidos), preenchendo os ausentes com o padrão."""
+        defaults = self.defaults
+        return {name: row.get(name, defaults[name]) for name in fields or self.fields}
+
+    def validate(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Valida as linhas com um TypeAdapter compilado na primeira chamada."""
+        if self._adapter is None:
+            self._adapter = TypeAdapter(List[self.model])
+        return self._adapter.dump_python(self._adapter.validate_python(rows), mode='json')
+
+
+_shapes: Dict[Type[BaseModel], ResponseShape] = {}
+
+
+def sparse_fields(model: Type[BaseModel]) -> Callable:
+    """
+    Dependência do parâmetro ?fields= (sparse fieldsets) para o schema informado.
+    Retorna os campos pedidos na ordem do schema, ou None quando ausente.
+
+    Raises:
+        HTTPException 400: Campo desconhecido ou lista vazia
+    """
+    allowed = tuple(model.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description=f"Campos retornados, separados por vírgula ({', '.join(allowed)})"
+        )
+    ) -> Optional[Tuple[str, ...]]:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = requested.difference(allowed)
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Campos inválidos em 'fields': {', '.join(sorted(unknown)) or '(vazio)'}. "
+                       f"Permitidos: {', '.join(allowed)}"
+            )
+        return tuple(name for name in allowed if name in requested)
+    return dependency
+
+
+def shape_for(model: Type[BaseModel]) -> ResponseShape:
+    """Retorna (criando uma única vez) o ResponseShape do schema."""
+    shape = _shapes.get(model)
+    if shape is None:
+        shape = _shapes[model] = ResponseShape(model)
+    return shape
+
+
+def trusted_response(
+    data: Any,
+    model: Type[BaseModel],
+    status_code: int = 200,
+    response_class: Optional[Type[Response]] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> Any:
+    """
+    Serializa dados confiáveis (vindos dos repositórios) no formato do schema.
+
+    Args:
+        data: Um dicionário (ou instância do schema) ou uma lista deles
+        model: Schema da resposta (o mesmo do response_model)
+        status_code: Status HTTP (o status_code do decorador não se aplica a um Response)
+        response_class: Formato negociado (response_format); padrão JSON
+        fields: Campos pedidos em ?fields= (sparse_fields); padrão: todos.
+            Respostas parciais não passam pela validação (os campos obrigatórios faltam).
+
+    Returns:
+        Response no formato negociado, ou os próprios dados quando
+        api.fast_responses está desativado e a resposta é JSON completa
+    """
+    response_class = response_class or FastJSONResponse
+    if not settings['fast_responses'] and response_class is FastJSONResponse and fields is None:
+        return data
+    shape = shape_for(model)
+    many = isinstance(data, list)
+    rows = [row.model_dump() if isinstance(row, BaseModel) else row for row in (data if many else [data])]
+    if settings['validate_responses'] and fields is None:
+        content = shape.validate(rows)
+    else:
+        content = [shape.project(row, fields) for row in rows]
+    return negotiated_response(content if many else content[0], response_class, status_code)
@@ -0,0 +1,156 @@
+"""
+Streaming entre o event loop e código bloqueante
+stream_from_thread() (GET /tasks/export): saída produzida em uma thread, lida
+pela resposta. iterate_from_thread() (importação em massa): corpo da requisição
+lido, aos pedaços, por código síncrono em uma thread do threadpool.
+
+O COPY ... TO STDOUT do psycopg2 empurra a saída do servidor para um arquivo
+(write()) dentro de uma thread. stream_from_thread() junta esses pedaços em blocos
+de chunk_size bytes e os entrega a um iterador assíncrono (StreamingResponse)
+por uma fila limitada:
+- Cliente lento: a thread espera por espaço na fila, então o banco não é lido
+  mais rápido do que a rede consegue enviar (memória limitada a max_chunks blocos).
+- A produção só começa na primeira leitura do iterador: uma resposta abandonada
+  antes de começar a enviar não chega a abrir a conexão com o banco.
+- Cliente desconectado: o fechamento do iterador (aclose/cancelamento) sinaliza a
+  thread, que interrompe a produção na próxima escrita ou em até
+  _CANCEL_CHECK_SECONDS, se estiver esperando por espaço (StreamCancelled).
+  Um consumidor que não lê nada por stall_timeout_seconds também é tratado como
+  desconectado (a thread e a conexão com o banco não ficam presas).
+"""
+import asyncio
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, Callable, Iterator, TypeVar, Union
+from anyio import from_thread
+
+# Tamanho dos blocos enviados ao cliente e blocos que podem aguardar na fila
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_CHUNKS = 8
+# Espera máxima do produtor por espaço na fila antes de desistir
+DEFAULT_STALL_TIMEOUT_SECONDS = 300
+# Intervalo em que o produtor bloqueado verifica se o consumidor desistiu
+_CANCEL_CHECK_SECONDS = 0.5
+# Fim da produção
+_DONE = object()
+
+T = TypeVar('T')
+
+
+class StreamCancelled(Exception):
+    """O consumidor parou de ler: interrompe o produtor."""
+
+
+class _ChunkWriter:
+    """Arquivo (write()) que agrupa os dados em blocos e os coloca na fila do event loop."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        stopped: threading.Event,
+        chunk_size: int,
+        stall_timeout_seconds: float
+    ):
+        self._loop = loop
+        self._queue = queue
+        self._stopped = stopped
+        self._chunk_size = chunk_size
+        self._stall_timeout_seconds = stall_timeout_seconds
+        self._buffer = bytearray()
+
+    def write(self, data: Union[bytes, str]) -> int:
+        if self._stopped.is_set():
+            raise StreamCancelled("leitura interrompida pelo consumidor")
+        self._buffer += data.encode() if isinstance(data, str) else data
+        if len(self._buffer) >= self._chunk_size:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            chunk = bytes(self._buffer)
+            self._buffer.clear()
+            self.put(chunk)
+
+    def put(self, item) -> None:
+        """Coloca um item na fila, esperando por espaço (ou pela desistência do consumidor)."""
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop)
+        waited = 0.0
+        while True:
+            try:
+                future.result(_CANCEL_CHECK_SECONDS)
+                return
+            except FutureTimeoutError:
+                waited += _CANCEL_CHECK_SECONDS
+                if self._stopped.is_set() or waited >= self._stall_timeout_seconds:
+                    future.cancel()
+                    raise StreamCancelled("leitura interrompida pelo consumidor")
+
+
+def stream_from_thread(
+    produce: Callable[[_ChunkWriter], None],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_chunks: int = DEFAULT_MAX_CHUNKS,
+    stall_timeout_seconds: float = DEFAULT_STALL_TIMEOUT_SECONDS
+) -> AsyncIterator[bytes]:
+    """
+    Retorna um iterador assíncrono dos blocos que produce(file) escreve em file.
+    produce roda em uma thread iniciada na primeira leitura do iterador; erros da
+    produção (inclusive ao iniciar: conexão, consulta inválida) são lançados por ele.
+    """
+    async def chunks() -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(max_chunks)
+        stopped = threading.Event()
+        writer = _ChunkWriter(loop, queue, stopped, chunk_size, stall_timeout_seconds)
+
+        def run() -> None:
+            try:
+                produce(writer)
+                writer.flush()
+                writer.put(_DONE)
+            except StreamCancelled:
+                pass
+            except Exception as e:
+                try:
+                    writer.put(e)
+                except StreamCancelled:
+                    pass
+
+        loop.run_in_executor(None, run)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+            # Libera um put() pendente do produtor
+            while not queue.empty():
+                queue.get_nowait()
+
+    return chunks()
+
+
+def iterate_from_thread(items: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Percorre um iterador assíncrono do event loop a partir de uma thread do
+    threadpool (run_in_threadpool): cada item é pedido ao event loop apenas quando
+    o código síncrono precisa dele, então o corpo de uma requisição é consumido
+    à medida que é processado.
+    """
+    async def next_item():
+        try:
+            return await items.__anext__()
+        except StopAsyncIteration:
+            return _DONE
+
+    while True:
+        item = from_thread.run(next_item)
+        if item is _DONE:
+            return
+        yield item
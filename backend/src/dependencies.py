@@ -4,10 +4,62 @@ Fornece funções de dependência para injeção no FastAPI.
 """
 from src.services import UserService, TaskService, AuthService
 from src.services.notification_service import NotificationService
-from src.repositories import UserRepository, TaskRepository
+from src.services.notification_hub import NotificationHub, notification_hub
+from src.services.notification_dispatcher import NotificationDispatcher
+from src.services.notification_retention import NotificationRetention
+from src.services.notification_digest import NotificationDigest
+from src.services.pg_event_bus import PgEventBus
+from src.services.outbox_relay import OutboxRelay
+from src.services.bootstrap_service import BootstrapService
+from src.services.batch_service import BatchService
+from src.services.import_service import ImportService
+from src.services.job_runner import JobRunner
+from src.services.job_service import JobService
+from src.services.maintenance_scheduler import MaintenanceScheduler
+from src.patterns import DomainEventBus, TaskStatusChanged
+from src.repositories import UserRepository, TaskRepository, NotificationRepository, InMemoryNotificationRepository
+from src.repositories.job_repository import JobRepository
+from src.repositories.role_directory import RoleDirectory, role_directory
+from src.config.settings import get_section
 
-# Instância compartilhada do NotificationService (singleton)
+# Instância compartilhada do NotificationService (as notificações ficam no PostgreSQL
+# ou, com notifications.storage = memory, no armazenamento em memória do processo)
 _shared_notification_service = None
+# Dispatcher de notificações do processo (iniciado/parado no lifespan)
+_notification_dispatcher = None
+# Compactação periódica das notificações (iniciada/parada no lifespan)
+_notification_retention = None
+# Envio periódico dos resumos (modo digest, iniciado/parado no lifespan)
+_notification_digest = None
+# Barramento de eventos entre workers (LISTEN/NOTIFY, iniciado no lifespan)
+_event_bus = None
+# Barramento de eventos de domínio do processo (handlers registrados uma vez)
+_domain_event_bus = None
+# Relay do outbox de tarefas (iniciado/parado no lifespan)
+_outbox_relay = None
+# Execução dos jobs em segundo plano (iniciada/parada no lifespan)
+_job_runner = None
+# Tarefas periódicas de manutenção (iniciadas/paradas no lifespan)
+_maintenance_scheduler = None
+
+
+def _outbox_config() -> dict:
+    return get_section('events', {'outbox': {}})['outbox']
+
+
+def _create_notification_service() -> NotificationService:
+    """Cria o NotificationService com o armazenamento configurado no config.yaml."""
+    config = get_section('notifications', {'storage': 'postgres', 'coalesce_window_seconds': 300, 'digest': {}})
+    repository = InMemoryNotificationRepository() if config['storage'] == 'memory' else NotificationRepository()
+    return NotificationService(
+        repository=repository,
+        hub=notification_hub,
+        event_bus=get_event_bus(),
+        role_directory=get_role_directory(),
+        coalesce_seconds=config['coalesce_window_seconds'],
+        digest=bool(config['digest'].get('enabled', False))
+    )
+
 
 def get_user_service() -> UserService:
     """Retorna uma instância do UserService."""
@@ -16,10 +68,41 @@ def get_user_service() -> UserService:
 
 def get_task_service() -> TaskService:
     """Retorna uma instância do TaskService com NotificationService compartilhado."""
-    global _shared_notification_service
-    if _shared_notification_service is None:
-        _shared_notification_service = NotificationService()
-    return TaskService(notification_service=_shared_notification_service)
+    return TaskService(
+        notification_service=get_notification_service(),
+        domain_events=get_domain_event_bus(),
+        outbox_relay=get_outbox_relay() if _outbox_config().get('enabled', True) else None
+    )
+
+
+def get_bootstrap_service() -> BootstrapService:
+    """Retorna uma instância do BootstrapService com os serviços de cada parte."""
+    return BootstrapService(
+        task_service=get_task_service(),
+        user_service=get_user_service(),
+        notification_service=get_notification_service(),
+        hub=notification_hub
+    )
+
+
+def get_batch_service() -> BatchService:
+    """Retorna uma instância do BatchService (acorda o relay do outbox após o commit de um lote)."""
+    return BatchService(outbox_relay=get_outbox_relay() if _outbox_config().get('enabled', True) else None)
+
+
+def get_import_service() -> ImportService:
+    """Retorna uma instância do ImportService, configurada pelo config.yaml."""
+    config = get_section('import', {'chunk_size': 1000, 'hash_workers': 4, 'max_reported_errors': 1000})
+    return ImportService(
+        chunk_size=config['chunk_size'],
+        hash_workers=config['hash_workers'],
+        max_reported_errors=config['max_reported_errors']
+    )
+
+
+def get_job_service() -> JobService:
+    """Retorna uma instância do JobService (acorda o JobRunner do processo a cada envio)."""
+    return JobService(runner=get_job_runner())
 
 
 def get_auth_service() -> AuthService:
@@ -28,9 +111,214 @@ def get_auth_service() -> AuthService:
 
 
 def get_notification_service() -> NotificationService:
-    """Retorna a instância compartilhada do NotificationService (singleton)."""
+    """Retorna a instância compartilhada do NotificationService."""
     global _shared_notification_service
     if _shared_notification_service is None:
-        _shared_notification_service = NotificationService()
+        _shared_notification_service = _create_notification_service()
     return _shared_notification_service
 
+
+def get_notification_hub() -> NotificationHub:
+    """Retorna o hub de notificações em tempo real do processo."""
+    return notification_hub
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Retorna o dispatcher de notificações do processo, configurado pelo config.yaml."""
+    global _notification_dispatcher
+    if _notification_dispatcher is None:
+        config = get_section('notifications', {'dispatch': {}})['dispatch']
+        _notification_dispatcher = NotificationDispatcher(
+            get_notification_service(),
+            queue_size=config.get('queue_size', 1000),
+            workers=config.get('workers', 2),
+            batch_size=config.get('batch_size', 50),
+            enqueue_timeout_seconds=config.get('enqueue_timeout_seconds', 0.5)
+        )
+    return _notification_dispatcher
+
+
+def get_notification_retention() -> NotificationRetention:
+    """Retorna a compactação de notificações do processo, configurada pelo config.yaml."""
+    global _notification_retention
+    if _notification_retention is None:
+        config = get_section('notifications', {'retention': {}})['retention']
+        _notification_retention = NotificationRetention(
+            get_notification_service(),
+            max_age_days=config.get('max_age_days', 90),
+            max_per_user=config.get('max_per_user', 200),
+            read_expiry_days=config.get('read_expiry_days', 30)
+        )
+    return _notification_retention
+
+
+def get_notification_digest() -> NotificationDigest:
+    """Retorna o envio periódico de resumos do processo (usado com notifications.digest.enabled)."""
+    global _notification_digest
+    if _notification_digest is None:
+        config = get_section('notifications', {'digest': {}})['digest']
+        _notification_digest = NotificationDigest(
+            get_notification_service(),
+            interval_seconds=config.get('interval_seconds', 600)
+        )
+    return _notification_digest
+
+
+def get_event_bus() -> PgEventBus:
+    """
+    Retorna o barramento de eventos entre workers do processo.
+    Mudanças de status de tarefa viram o evento SSE 'task_status' para todos os
+    conectados; após uma reconexão do LISTEN os clientes recebem 'resync'.
+    """
+    global _event_bus
+    if _event_bus is None:
+        config = get_section('events', {'channel': 'app_events', 'reconnect_seconds': 2})
+        _event_bus = PgEventBus(channel=config['channel'], reconnect_seconds=config['reconnect_seconds'])
+        _event_bus.subscribe('task.status_changed', lambda data: notification_hub.broadcast('task_status', data))
+        _event_bus.subscribe(PgEventBus.RECONNECTED, lambda data: notification_hub.broadcast('resync', {}))
+        role_directory.attach_event_bus(_event_bus)
+    return _event_bus
+
+
+def get_role_directory() -> RoleDirectory:
+    """Retorna o diretório de papéis do processo (invalidado pelo UserRepository e pelo barramento)."""
+    return role_directory
+
+
+def get_domain_event_bus() -> DomainEventBus:
+    """
+    Retorna o barramento de eventos de domínio do processo, com os handlers
+    registrados uma única vez:
+    - NotificationDispatcher: com o outbox, grava as notificações de cada lote do
+      relay (deliver); sem ele, é um observer que enfileira os eventos
+    - task_status_broadcast: publica 'task.status_changed' no PgEventBus
+    """
+    global _domain_event_bus
+    if _domain_event_bus is None:
+        config = get_section('events', {'domain': {}})['domain']
+        event_bus = get_event_bus()
+        dispatcher = get_notification_dispatcher()
+        _domain_event_bus = DomainEventBus()
+        if _outbox_config().get('enabled', True):
+            _domain_event_bus.subscribe(
+                TaskStatusChanged, dispatcher.deliver, batch=True, name='NotificationDispatcher'
+            )
+        else:
+            _domain_event_bus.attach(
+                dispatcher, TaskStatusChanged, concurrency=config.get('notification_concurrency', 4)
+            )
+        _domain_event_bus.subscribe(
+            TaskStatusChanged,
+            lambda event: event_bus.publish('task.status_changed', {
+                'task_id': event.task.get('id'),
+                'old_status': event.old_status,
+                'new_status': event.new_status,
+                'updated_by': (event.updated_by or {}).get('username')
+            }, deliver_locally=True),
+            concurrency=config.get('broadcast_concurrency', 1),
+            name='task_status_broadcast'
+        )
+    return _domain_event_bus
+
+
+def get_outbox_relay() -> OutboxRelay:
+    """Retorna o relay do outbox de tarefas do processo, configurado pelo config.yaml."""
+    global _outbox_relay
+    if _outbox_relay is None:
+        config = _outbox_config()
+        _outbox_relay = OutboxRelay(
+            get_domain_event_bus(),
+            batch_size=config.get('batch_size', 100),
+            poll_interval_seconds=config.get('poll_interval_seconds', 0.5),
+            max_attempts=config.get('max_attempts', 10),
+            retention_hours=config.get('retention_hours', 24)
+        )
+    return _outbox_relay
+
+
+def get_job_runner() -> JobRunner:
+    """
+    Retorna o runner de jobs do processo, configurado pelo config.yaml, com os
+    handlers de cada tipo registrados uma única vez:
+    - import.tasks / import.users: importação do arquivo gravado no envio
+    - tasks.reassign: transferência das tarefas de um usuário, em lotes
+    - notifications.compact: compactação das notificações fora da retenção
+    """
+    global _job_runner
+    if _job_runner is None:
+        config = get_section('jobs', {'concurrency': {}})
+        concurrency = config.get('concurrency', {})
+        repository = JobRepository()
+        _job_runner = JobRunner(
+            repository,
+            workers=config.get('workers', 4),
+            poll_interval_seconds=config.get('poll_interval_seconds', 2),
+            progress_interval_seconds=config.get('progress_interval_seconds', 1),
+            heartbeat_timeout_seconds=config.get('heartbeat_timeout_seconds', 300),
+            retention_days=config.get('retention_days', 7)
+        )
+        import_service = get_import_service()
+        task_service = get_task_service()
+        retention = get_notification_retention()
+        _job_runner.register(
+            'import.tasks',
+            lambda params, context: import_service.import_tasks(
+                repository.read_file(params['file_oid']), params['format'], params['user_id'],
+                progress=context.progress
+            ),
+            concurrency=concurrency.get('import.tasks', 1)
+        )
+        _job_runner.register(
+            'import.users',
+            lambda params, context: import_service.import_users(
+                repository.read_file(params['file_oid']), params['format'], progress=context.progress
+            ),
+            concurrency=concurrency.get('import.users', 1)
+        )
+        _job_runner.register(
+            'tasks.reassign',
+            lambda params, context: task_service.reassign_tasks(
+                params['from_owner_id'], params['to_owner_id'], params.get('status'),
+                batch_size=config.get('reassign_batch_size', 500), progress=context.progress
+            ),
+            concurrency=concurrency.get('tasks.reassign', 2)
+        )
+        _job_runner.register(
+            'notifications.compact',
+            lambda params, context: {'removed': retention.run_once()},
+            concurrency=concurrency.get('notifications.compact', 1)
+        )
+    return _job_runner
+
+
+def get_maintenance_scheduler() -> MaintenanceScheduler:
+    """
+    Retorna o agendador de manutenção do processo, configurado pelo config.yaml,
+    com as tarefas registradas uma única vez:
+    - notifications.compact: compactação das notificações pela política de
+      retenção (com notifications.storage = memory, roda em todos os workers)
+    - tasks.rebalance_board: regrava as colunas do quadro com chaves acima da
+      metade de tasks.position_max_length (o limite em que TaskRepository.move
+      rebalanceia durante a requisição), antes que um movimento chegue a ele
+    """
+    global _maintenance_scheduler
+    if _maintenance_scheduler is None:
+        config = get_section('maintenance', {'jitter_seconds': 60, 'board_rebalance': {}})
+        notifications = get_section('notifications', {'storage': 'postgres', 'retention': {}})
+        board = config['board_rebalance']
+        max_key_length = get_section('tasks', {'position_max_length': 32})['position_max_length'] // 2
+        _maintenance_scheduler = MaintenanceScheduler(jitter_seconds=config['jitter_seconds'])
+        retention = get_notification_retention()
+        task_service = get_task_service()
+        _maintenance_scheduler.register(
+            'notifications.compact',
+            lambda: {'removed': retention.run_once()},
+            interval_seconds=notifications['retention'].get('compaction_interval_seconds', 3600),
+            exclusive=notifications['storage'] != 'memory'
+        )
+        _maintenance_scheduler.register(
+            'tasks.rebalance_board',
+            lambda: task_service.rebalance_board(max_key_length),
+            interval_seconds=board.get('interval_seconds', 3600)
+        )
+    return _maintenance_scheduler
@@ -5,11 +5,14 @@ Aplicação refatorada usando Design Patterns:
 - Service Layer Pattern: lógica de negócio separada
 - Dependency Injection: injeção de dependências via FastAPI Depends
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Literal, Optional, Union
 from contextlib import asynccontextmanager
+import asyncio
 
 # Imports de inicialização
 from src.models.init_db import init_database
@@ -17,11 +20,37 @@ from src.models.init_db import init_database
 # Imports de autenticação
 from src.models import auth
 from src.config import schemas
+from src.core.streaming import iterate_from_thread
+from src.core.serialization import (
+    trusted_response, negotiated_response, response_format, negotiated_body, request_body_openapi,
+    sparse_fields
+)
 
 # Imports de serviços (Service Layer)
 from src.services import UserService, TaskService, AuthService
 from src.services.notification_service import NotificationService
-from src.dependencies import get_user_service, get_task_service, get_auth_service, get_notification_service
+from src.services.notification_hub import NotificationHub, notification_hub, stream_events
+from src.services.notification_dispatcher import NotificationDispatcher
+from src.services.notification_retention import NotificationRetention
+from src.services.notification_digest import NotificationDigest
+from src.services.pg_event_bus import PgEventBus
+from src.patterns import DomainEventBus
+from src.services.outbox_relay import OutboxRelay
+from src.services.bootstrap_service import BootstrapService
+from src.services.batch_service import BatchService
+from src.services.import_service import ImportService, import_format, import_body_openapi
+from src.services.job_runner import JobRunner
+from src.services.job_service import JobService
+from src.services.maintenance_scheduler import MaintenanceScheduler
+from src.repositories.role_directory import RoleDirectory
+from src.dependencies import (
+    get_user_service, get_task_service, get_auth_service,
+    get_notification_service, get_notification_hub, get_notification_dispatcher,
+    get_event_bus, get_role_directory, get_notification_retention, get_notification_digest,
+    get_domain_event_bus, get_outbox_relay, get_bootstrap_service, get_batch_service, get_import_service,
+    get_job_runner, get_job_service, get_maintenance_scheduler
+)
+from src.config.settings import get_section
 
 
 @asynccontextmanager
@@ -38,8 +67,51 @@ async def lifespan(app: FastAPI):
         print(f"   Erro: {e}")
         print(f"   Certifique-se de que o PostgreSQL esta rodando e as credenciais estao corretas.")
         print(f"   Voce ainda pode executar manualmente: python -m src.models.init_db\n")
+    # Hub de notificações em tempo real (SSE) entrega eventos neste event loop
+    notification_hub.bind(asyncio.get_running_loop())
+    # Barramento entre workers: replica notificações e mudanças de tarefa via LISTEN/NOTIFY
+    event_bus = get_event_bus()
+    if get_section('events', {'enabled': True})['enabled']:
+        await event_bus.start()
+    # Fila de despacho: notificações criadas fora do caminho da requisição
+    dispatcher = get_notification_dispatcher()
+    await dispatcher.start()
+    # Eventos de domínio: handlers (observers) rodam no event loop, fora da requisição
+    domain_events = get_domain_event_bus()
+    await domain_events.start()
+    # Outbox: entrega em ordem os eventos gravados junto com as atualizações de tarefas
+    outbox_relay = get_outbox_relay()
+    if get_section('events', {'outbox': {}})['outbox'].get('enabled', True):
+        await outbox_relay.start()
+    # Modo digest: resumos periódicos por destinatário
+    digest = get_notification_digest()
+    if get_notification_service().digest:
+        await digest.start()
+    # Jobs em segundo plano: operações longas executadas fora das requisições
+    job_runner = get_job_runner()
+    jobs_config = get_section('jobs', {'enabled': True, 'drain_timeout_seconds': 10})
+    if jobs_config['enabled']:
+        await job_runner.start()
+    # Manutenção periódica (compactação das notificações, quadro): um worker por vez
+    maintenance = get_maintenance_scheduler()
+    if get_section('maintenance', {'enabled': True})['enabled']:
+        await maintenance.start()
     yield
-    # Shutdown (se necessário adicionar lógica de limpeza aqui)
+    # Shutdown: parar a manutenção; jobs em execução são interrompidos (terminam como 'failed')
+    await maintenance.stop()
+    await job_runner.stop(jobs_config['drain_timeout_seconds'])
+    # Drenar a fila de notificações antes de encerrar
+    # Eventos não entregues continuam no outbox para a próxima execução
+    await outbox_relay.stop()
+    # Primeiro os handlers em andamento, que ainda podem enfileirar notificações
+    domain_drain = get_section('events', {'domain': {}})['domain'].get('drain_timeout_seconds', 10)
+    await domain_events.stop(domain_drain)
+    drain_timeout = get_section('notifications', {'dispatch': {}})['dispatch'].get('drain_timeout_seconds', 10)
+    await dispatcher.stop(drain_timeout)
+    # Depois da fila: os últimos eventos também entram no resumo final
+    await digest.stop()
+    await event_bus.stop()
+    notification_hub.unbind()
 
 
 app = FastAPI(
@@ -56,6 +128,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permite todos os métodos (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],  # Permite todos os headers
+    expose_headers=["X-Next-Before"],  # Cursor da próxima página de notificações
 )
 
 # ============================================================================
@@ -73,6 +146,29 @@ async def login_for_access_token(
     """
     return auth_service.authenticate(form_data.username, form_data.password)
 
+@app.get("/bootstrap", tags=["Autenticação"])
+async def bootstrap(
+    board_limit: int = Query(20, ge=1, le=200, description="Tarefas por coluna do quadro"),
+    notifications_limit: Optional[int] = Query(None, ge=1, le=200, description="Primeira página de notificações"),
+    current_user: schemas.User = Depends(auth.get_current_user),
+    bootstrap_service: BootstrapService = Depends(get_bootstrap_service),
+    fmt = Depends(response_format)
+):
+    """
+    Dados iniciais do cliente em uma única requisição (o token é validado uma vez
+    e as consultas rodam em paralelo). **Acesso permitido para todos os níveis.**
+    - `me`: usuário atual (como em `/users/me/`)
+    - `board`: quadro de tarefas (como em `/tasks/board?limit=board_limit`)
+    - `users`: id, username e role dos usuários visíveis (como em
+      `/users/?fields=id,username,role`); `null` para visualização
+    - `notifications` e `notifications_next_before`: primeira página (como em
+      `/notifications/`, com o cursor do cabeçalho `X-Next-Before`)
+    - `unread_count` e `version`: como em `/notifications/unread-count`
+    """
+    page_size = notifications_limit or get_section('notifications', {'page_size': 50})['page_size']
+    data = await bootstrap_service.load(current_user, board_limit, page_size)
+    return negotiated_response(data, fmt)
+
 # ============================================================================
 # ENDPOINTS DE USUÁRIOS
 # ============================================================================
@@ -80,39 +176,48 @@ async def login_for_access_token(
 @app.get("/users/", response_model=List[schemas.User], tags=["Usuários"])
 def read_all_users(
     current_user: schemas.User = Depends(auth.require_role(["admin", "gerencial"])),
-    user_service: UserService = Depends(get_user_service)
+    user_service: UserService = Depends(get_user_service),
+    fields = Depends(sparse_fields(schemas.User)),
+    fmt = Depends(response_format)
 ):
     """
     Lista todos os usuários. **Acesso restrito a administradores e gerenciais.**
     - Admin: vê todos os usuários
     - Gerencial: vê apenas usuários até o nível gerencial (não vê admin)
+    - `fields`: retorna apenas os campos informados (ex.: `?fields=id,username,role`)
     """
-    return user_service.get_all_users(current_user.role)
+    return trusted_response(
+        user_service.get_all_users(current_user.role, fields), schemas.User, response_class=fmt, fields=fields
+    )
 
 @app.post("/users/", response_model=schemas.User, tags=["Usuários"], status_code=status.HTTP_201_CREATED)
 def create_new_user(
     user: schemas.UserCreate,
     _ = Depends(auth.require_role(["admin"])),
-    user_service: UserService = Depends(get_user_service)
+    user_service: UserService = Depends(get_user_service),
+    fmt = Depends(response_format)
 ):
     """
     Cria um novo usuário. **Acesso restrito a administradores.**
     """
-    return user_service.create_user(user)
+    return trusted_response(user_service.create_user(user), schemas.User, status.HTTP_201_CREATED, fmt)
 
 @app.put("/users/{user_id}", response_model=schemas.User, tags=["Usuários"])
+@app.patch("/users/{user_id}", response_model=schemas.User, tags=["Usuários"])
 def update_existing_user(
     user_id: int,
     user: schemas.UserUpdate,
     current_user: schemas.User = Depends(auth.require_role(["admin", "gerencial"])),
-    user_service: UserService = Depends(get_user_service)
+    user_service: UserService = Depends(get_user_service),
+    fmt = Depends(response_format)
 ):
     """
     Atualiza um usuário existente.
     - Admin: pode editar qualquer usuário
     - Gerencial: pode editar usuários (exceto admin) e não pode alterar role para admin
+    - PUT e PATCH: apenas os campos informados são alterados; valores iguais aos atuais não são gravados
     """
-    return user_service.update_user(user_id, user, current_user.role)
+    return trusted_response(user_service.update_user(user_id, user, current_user.role), schemas.User, response_class=fmt)
 
 @app.delete("/users/{user_id}", tags=["Usuários"])
 def delete_existing_user(
@@ -127,9 +232,12 @@ def delete_existing_user(
     return {"message": "Usuário deletado com sucesso"}
 
 @app.get("/users/me/", response_model=schemas.User, tags=["Usuários"])
-async def read_users_me(current_user: schemas.User = Depends(auth.get_current_user)):
+async def read_users_me(
+    current_user: schemas.User = Depends(auth.get_current_user),
+    fmt = Depends(response_format)
+):
     """Retorna os dados do usuário atualmente autenticado."""
-    return current_user
+    return trusted_response(current_user, schemas.User, response_class=fmt)
 
 # ============================================================================
 # ENDPOINTS DE NOTIFICAÇÕES
@@ -138,25 +246,88 @@ async def read_users_me(current_user: schemas.User = Depends(auth.get_current_us
 @app.get("/notifications/", tags=["Notificações"])
 def get_notifications(
     unread_only: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    before: Optional[int] = Query(None, ge=1),
     current_user: schemas.User = Depends(auth.get_current_user),
-    notification_service: NotificationService = Depends(get_notification_service)
+    notification_service: NotificationService = Depends(get_notification_service),
+    fmt = Depends(response_format)
 ):
     """
-    Retorna notificações do usuário atual.
+    Retorna notificações do usuário atual, mais recentes primeiro.
     - Admin e gerencial recebem notificações de tarefas em revisão
     - Todos os usuários recebem notificações quando suas tarefas são concluídas
+    - Paginação por cursor: `limit` (padrão `notifications.page_size`) e `before`
+      (id da última notificação recebida). Se houver mais páginas, o cabeçalho
+      `X-Next-Before` traz o valor de `before` para a próxima.
     """
-    notifications = notification_service.get_user_notifications(current_user.id, unread_only=unread_only)
-    return notifications
+    page_size = limit or get_section('notifications', {'page_size': 50})['page_size']
+    notifications = notification_service.get_user_notifications(
+        current_user.id, unread_only=unread_only, limit=page_size + 1, before=before
+    )
+    headers = None
+    if len(notifications) > page_size:
+        notifications = notifications[:page_size]
+        headers = {"X-Next-Before": str(notifications[-1]["id"])}
+    return negotiated_response(notifications, fmt, headers=headers)
 
 @app.get("/notifications/unread-count", tags=["Notificações"])
-def get_unread_count(
+async def get_unread_count(
+    since_version: Optional[int] = Query(None, ge=0),
+    timeout: Optional[float] = Query(None, ge=0),
     current_user: schemas.User = Depends(auth.get_current_user),
-    notification_service: NotificationService = Depends(get_notification_service)
+    notification_service: NotificationService = Depends(get_notification_service),
+    hub: NotificationHub = Depends(get_notification_hub)
 ):
-    """Retorna o número de notificações não lidas do usuário atual."""
-    count = notification_service.get_unread_count(current_user.id)
-    return {"unread_count": count}
+    """
+    Retorna o número de notificações não lidas do usuário atual.
+    - Sem `since_version`: responde imediatamente
+    - Com `since_version`: long-poll; aguarda até `timeout` segundos (limitado por
+      `notifications.long_poll.max_wait_seconds`) a versão do usuário mudar
+    - `version`: enviar como `since_version` na próxima chamada
+    - `poll_interval`: segundos sugeridos antes do próximo poll (cresce com a carga)
+    """
+    config = get_section('notifications', {'long_poll': {}})['long_poll']
+    max_wait = config.get('max_wait_seconds', 25)
+    if since_version is None:
+        version = hub.version(current_user.id)
+    else:
+        wait = max_wait if timeout is None else min(timeout, max_wait)
+        version = await hub.wait_for_change(current_user.id, since_version, wait)
+    count = await run_in_threadpool(notification_service.get_unread_count, current_user.id)
+    poll_interval = hub.suggested_poll_interval(
+        config.get('base_interval_seconds', 1),
+        config.get('max_interval_seconds', 30),
+        config.get('load_step', 200)
+    )
+    return {"unread_count": count, "version": version, "poll_interval": poll_interval}
+
+@app.get("/notifications/stream", tags=["Notificações"])
+async def stream_notifications(
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    current_user: schemas.User = Depends(auth.get_current_user_from_query),
+    notification_service: NotificationService = Depends(get_notification_service),
+    hub: NotificationHub = Depends(get_notification_hub)
+):
+    """
+    Stream Server-Sent Events com as notificações do usuário atual.
+    - Eventos: `notification` (nova notificação), `unread_count`, `task_status`
+      (status de uma tarefa mudou em qualquer worker) e `resync` (o histórico não
+      cobre o Last-Event-ID; o cliente deve recarregar a lista)
+    - Aceita o token em `?access_token=` (o EventSource não envia cabeçalhos)
+    - Retoma a partir do cabeçalho `Last-Event-ID` enviado na reconexão
+    """
+    subscription = hub.subscribe(current_user.id, last_event_id)
+    try:
+        unread_count = await run_in_threadpool(notification_service.get_unread_count, current_user.id)
+    except Exception:
+        hub.unsubscribe(subscription)
+        raise
+    heartbeat = get_section('notifications', {'stream_heartbeat_seconds': 15})['stream_heartbeat_seconds']
+    return StreamingResponse(
+        stream_events(hub, subscription, unread_count, heartbeat),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.put("/notifications/{notification_id}/read", tags=["Notificações"])
 def mark_notification_as_read(
@@ -173,6 +344,23 @@ def mark_notification_as_read(
         )
     return {"message": "Notificação marcada como lida"}
 
+@app.put(
+    "/notifications/read", tags=["Notificações"],
+    openapi_extra=request_body_openapi(schemas.NotificationIds)
+)
+def mark_notifications_as_read(
+    payload: schemas.NotificationIds = Depends(negotiated_body(schemas.NotificationIds)),
+    current_user: schemas.User = Depends(auth.get_current_user),
+    notification_service: NotificationService = Depends(get_notification_service)
+):
+    """
+    Marca várias notificações do usuário como lidas em uma única operação.
+    Ids inexistentes, de outros usuários ou já lidos são ignorados.
+    Aceita o corpo em JSON ou MessagePack (`Content-Type: application/msgpack`).
+    """
+    marked = notification_service.mark_many_as_read(payload.ids, current_user.id)
+    return {"message": f"{len(marked)} notificações marcadas como lidas", "ids": marked}
+
 @app.put("/notifications/read-all", tags=["Notificações"])
 def mark_all_notifications_as_read(
     current_user: schemas.User = Depends(auth.get_current_user),
@@ -189,31 +377,94 @@ def mark_all_notifications_as_read(
 @app.get("/tasks/", response_model=List[schemas.Task], tags=["Tarefas"])
 def read_all_tasks(
     _ = Depends(auth.require_role(["admin", "gerencial", "visualizacao"])),
-    task_service: TaskService = Depends(get_task_service)
+    task_service: TaskService = Depends(get_task_service),
+    fields = Depends(sparse_fields(schemas.Task)),
+    fmt = Depends(response_format)
 ):
     """
     Lista todas as tarefas. **Acesso permitido para todos os níveis.**
+    Responde em MessagePack com `Accept: application/msgpack`.
+    - `fields`: retorna apenas os campos informados (ex.: `?fields=id,titulo,status,owner_id`);
+      sem `owner_username` a consulta não faz o JOIN com usuários
+    """
+    return trusted_response(task_service.get_all_tasks(fields), schemas.Task, response_class=fmt, fields=fields)
+
+@app.get("/tasks/board", response_model=schemas.TaskBoard, tags=["Tarefas"])
+def read_task_board(
+    limit: int = Query(20, ge=1, le=200, description="Tarefas por coluna"),
+    task_status: Optional[Literal["pendente", "em_andamento", "em_revisao", "concluida"]] = Query(
+        None, alias="status", description="Apenas esta coluna (carregar mais)"
+    ),
+    after: Optional[str] = Query(None, description="next_cursor da coluna"),
+    _ = Depends(auth.require_role(["admin", "gerencial", "visualizacao"])),
+    task_service: TaskService = Depends(get_task_service),
+    fmt = Depends(response_format)
+):
     """
-    return task_service.get_all_tasks()
+    Quadro Kanban em uma única consulta. **Acesso permitido para todos os níveis.**
+    - Para cada status: as primeiras `limit` tarefas (na ordem do quadro), o total
+      da coluna e `next_cursor` (None quando não há mais tarefas)
+    - Carregar mais: `?status=<coluna>&after=<next_cursor>` retorna só a coluna pedida
+    """
+    return trusted_response(task_service.get_board(limit, task_status, after), schemas.TaskBoard, response_class=fmt)
+
+@app.get("/tasks/export", tags=["Tarefas"])
+async def export_tasks(
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    task_status: Optional[Literal["pendente", "em_andamento", "em_revisao", "concluida"]] = Query(
+        None, alias="status", description="Apenas as tarefas neste status"
+    ),
+    current_user: schemas.User = Depends(auth.require_role(["admin", "gerencial", "visualizacao"])),
+    task_service: TaskService = Depends(get_task_service)
+):
+    """
+    Exporta as tarefas para relatórios, em streaming. **Acesso permitido para todos
+    os níveis:** admin e gerencial exportam todas as tarefas; visualização, apenas
+    as suas.
+    - `format=csv` (padrão, com cabeçalho) ou `format=ndjson` (um JSON por linha)
+    - O arquivo é gerado pelo PostgreSQL (`COPY ... TO STDOUT`) e enviado à medida
+      que é lido, com memória constante para qualquer número de tarefas
+    """
+    stream = task_service.export_tasks(export_format, current_user.role, current_user.id, task_status)
+    media_type = "text/csv; charset=utf-8" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tarefas.{export_format}"'}
+    )
+
+@app.get("/tasks/{task_id}", response_model=schemas.Task, tags=["Tarefas"])
+def read_task(
+    task_id: int,
+    _ = Depends(auth.require_role(["admin", "gerencial", "visualizacao"])),
+    task_service: TaskService = Depends(get_task_service),
+    fmt = Depends(response_format)
+):
+    """
+    Retorna uma tarefa. Usado para abrir tarefas que ainda não foram carregadas no quadro.
+    """
+    return trusted_response(task_service.get_task_by_id(task_id), schemas.Task, response_class=fmt)
 
 @app.post("/tasks/", response_model=schemas.Task, tags=["Tarefas"], status_code=status.HTTP_201_CREATED)
 def create_new_task(
     task: schemas.TaskCreate,
     current_user: schemas.User = Depends(auth.require_role(["admin", "gerencial"])),
-    task_service: TaskService = Depends(get_task_service)
+    task_service: TaskService = Depends(get_task_service),
+    fmt = Depends(response_format)
 ):
     """
     Cria uma nova tarefa. **Acesso restrito a administradores e gerentes.**
     Admin e gerencial podem atribuir tarefas a outros usuários através do campo owner_id.
     """
-    return task_service.create_task(task, current_user.id)
+    return trusted_response(task_service.create_task(task, current_user.id), schemas.Task, status.HTTP_201_CREATED, fmt)
 
 @app.put("/tasks/{task_id}", response_model=schemas.Task, tags=["Tarefas"])
 def update_existing_task(
     task_id: int,
     task: schemas.TaskCreate,
     current_user: schemas.User = Depends(auth.require_role(["admin", "gerencial", "visualizacao"])),
-    task_service: TaskService = Depends(get_task_service)
+    task_service: TaskService = Depends(get_task_service),
+    fmt = Depends(response_format)
 ):
     """
     Atualiza uma tarefa existente. 
@@ -227,7 +478,76 @@ def update_existing_task(
         'username': current_user.username,
         'role': current_user.role
     }
-    return task_service.update_task(task_id, task, current_user.role, current_user_dict)
+    return trusted_response(
+        task_service.update_task(task_id, task, current_user.role, current_user_dict), schemas.Task, response_class=fmt
+    )
+
+@app.patch("/tasks/{task_id}", response_model=schemas.Task, tags=["Tarefas"])
+def patch_existing_task(
+    task_id: int,
+    task: schemas.TaskUpdate,
+    current_user: schemas.User = Depends(auth.require_role(["admin", "gerencial", "visualizacao"])),
+    task_service: TaskService = Depends(get_task_service),
+    fmt = Depends(response_format)
+):
+    """
+    Atualização parcial: apenas os campos informados são alterados, com as mesmas
+    regras do PUT. Campos iguais aos atuais não são gravados e as notificações
+    só são geradas se o status realmente mudou.
+    """
+    current_user_dict = {
+        'id': current_user.id,
+        'username': current_user.username,
+        'role': current_user.role
+    }
+    return trusted_response(
+        task_service.update_task(task_id, task, current_user.role, current_user_dict), schemas.Task, response_class=fmt
+    )
+
+@app.patch("/tasks/{task_id}/status", response_model=schemas.TaskStatusResult, tags=["Tarefas"])
+def change_task_status(
+    task_id: int,
+    payload: schemas.TaskStatusUpdate,
+    current_user: schemas.User = Depends(auth.require_role(["admin", "gerencial", "visualizacao"])),
+    task_service: TaskService = Depends(get_task_service),
+    fmt = Depends(response_format)
+):
+    """
+    Muda apenas o status de uma tarefa (arrastar no quadro Kanban).
+    - Um único UPDATE condicional; se a tarefa já está no status pedido, nada é
+      gravado, nenhuma notificação é gerada e `changed` é false
+    - Visualização não pode mudar para "concluida"
+    """
+    current_user_dict = {
+        'id': current_user.id,
+        'username': current_user.username,
+        'role': current_user.role
+    }
+    result = task_service.change_status(task_id, payload.status, current_user.role, current_user_dict)
+    return trusted_response(result, schemas.TaskStatusResult, response_class=fmt)
+
+@app.patch("/tasks/{task_id}/position", response_model=schemas.TaskMoveResult, tags=["Tarefas"])
+def move_task(
+    task_id: int,
+    payload: schemas.TaskMove,
+    current_user: schemas.User = Depends(auth.require_role(["admin", "gerencial", "visualizacao"])),
+    task_service: TaskService = Depends(get_task_service),
+    fmt = Depends(response_format)
+):
+    """
+    Move um cartão no quadro Kanban: coluna (`status`) e lugar dentro dela
+    (`after_id`: cartão acima, ou `before_id`: cartão abaixo; sem nenhum, fim da coluna).
+    - Apenas a tarefa movida é gravada (chave fracionária entre as dos vizinhos)
+    - 409 quando o cartão de referência não está mais na coluna de destino
+    - Visualização não pode mover para "concluida"
+    """
+    current_user_dict = {
+        'id': current_user.id,
+        'username': current_user.username,
+        'role': current_user.role
+    }
+    result = task_service.move_task(task_id, payload, current_user.role, current_user_dict)
+    return trusted_response(result, schemas.TaskMoveResult, response_class=fmt)
 
 @app.delete("/tasks/{task_id}", tags=["Tarefas"])
 def delete_existing_task(
@@ -240,3 +560,209 @@ def delete_existing_task(
     """
     task_service.delete_task(task_id)
     return {"message": "Tarefa deletada com sucesso"}
+
+# ============================================================================
+# ENDPOINT DE LOTE
+# ============================================================================
+
+@app.post("/batch", tags=["Lote"], openapi_extra=request_body_openapi(schemas.BatchRequest))
+async def run_batch(
+    request: Request,
+    batch: schemas.BatchRequest = Depends(negotiated_body(schemas.BatchRequest)),
+    current_user: schemas.User = Depends(auth.get_current_user),
+    batch_service: BatchService = Depends(get_batch_service),
+    fmt = Depends(response_format)
+):
+    """
+    Executa várias requisições da API em uma única chamada, com o token validado
+    uma vez. **Acesso permitido para todos os níveis** (cada sub-requisição aplica
+    as permissões da sua rota).
+    - `requests`: até 100 itens `{method, path, body}`, executados em ordem;
+      `path` pode ter query string (não aceita `/batch`, `/token` nem o stream SSE)
+    - `transaction`: true executa todas na mesma transação; a primeira com erro
+      desfaz as anteriores e as seguintes retornam 424
+    
+    Resposta: `results` com `status`, `headers` e `body` de cada item e
+    `committed` (null sem transação).
+    """
+    data = await batch_service.run(
+        request.app, request.scope, current_user, batch.requests, batch.transaction
+    )
+    return negotiated_response(data, fmt)
+
+# ============================================================================
+# ENDPOINTS DE JOBS (OPERAÇÕES EM SEGUNDO PLANO)
+# ============================================================================
+
+@app.post("/jobs", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED, tags=["Jobs"])
+def submit_job(
+    job: schemas.JobSubmit,
+    current_user: schemas.User = Depends(auth.get_current_user),
+    job_service: JobService = Depends(get_job_service)
+):
+    """
+    Envia uma operação longa para execução em segundo plano e retorna o job
+    (status `queued`); acompanhe o progresso em `GET /jobs/{job_id}`.
+    - `tasks.reassign` (admin, gerencial): `{from_owner_id, to_owner_id, status?}`
+      transfere as tarefas de um usuário para outro, em lotes
+    - `notifications.compact` (admin): compacta as notificações pela política de retenção
+    
+    Importações em segundo plano: `POST /admin/import/...?background=true`.
+    """
+    return job_service.submit(job, current_user)
+
+@app.get("/jobs", response_model=List[schemas.Job], tags=["Jobs"])
+def list_jobs(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: schemas.User = Depends(auth.get_current_user),
+    job_service: JobService = Depends(get_job_service)
+):
+    """
+    Jobs mais recentes primeiro. Admin vê todos; os demais, apenas os próprios.
+    """
+    return job_service.list_jobs(current_user, limit)
+
+@app.get("/jobs/{job_id}", response_model=schemas.Job, tags=["Jobs"])
+def read_job(
+    job_id: int,
+    current_user: schemas.User = Depends(auth.get_current_user),
+    job_service: JobService = Depends(get_job_service)
+):
+    """
+    Status e progresso de um job (`progress_done` / `progress_total`) e, ao
+    terminar, `result` ou `error`.
+    """
+    return job_service.get_job(job_id, current_user)
+
+@app.post("/jobs/{job_id}/cancel", response_model=schemas.Job, tags=["Jobs"])
+def cancel_job(
+    job_id: int,
+    current_user: schemas.User = Depends(auth.get_current_user),
+    job_service: JobService = Depends(get_job_service)
+):
+    """
+    Cancela um job. Na fila, é cancelado na hora; em execução, para no próximo
+    registro de progresso (`cancel_requested` fica true até lá) e o que já foi
+    gravado é mantido. Job já finalizado: 409.
+    """
+    return job_service.cancel_job(job_id, current_user)
+
+# ============================================================================
+# ENDPOINTS DE ADMINISTRAÇÃO
+# ============================================================================
+
+@app.get("/admin/metrics", tags=["Administração"])
+def read_metrics(
+    _ = Depends(auth.require_role(["admin"])),
+    hub: NotificationHub = Depends(get_notification_hub),
+    dispatcher: NotificationDispatcher = Depends(get_notification_dispatcher),
+    event_bus: PgEventBus = Depends(get_event_bus),
+    directory: RoleDirectory = Depends(get_role_directory),
+    retention: NotificationRetention = Depends(get_notification_retention),
+    digest: NotificationDigest = Depends(get_notification_digest),
+    domain_events: DomainEventBus = Depends(get_domain_event_bus),
+    outbox_relay: OutboxRelay = Depends(get_outbox_relay),
+    job_runner: JobRunner = Depends(get_job_runner),
+    maintenance: MaintenanceScheduler = Depends(get_maintenance_scheduler)
+):
+    """
+    Métricas internas deste processo. **Acesso restrito a administradores.**
+    - domain_events: eventos de domínio publicados e latência/erros por handler
+    - outbox_relay: eventos do outbox entregues, falhas e se este worker é o responsável
+    - job_runner: jobs em execução por tipo, limites de concorrência e jobs finalizados
+    - maintenance: execuções de cada tarefa de manutenção neste processo (ou puladas)
+    - notification_dispatcher: fila de notificações (tamanho, rejeições, lotes)
+    - notification_hub: conexões SSE e long-polls abertos
+    - event_bus: eventos publicados/recebidos entre workers e reconexões
+    - role_directory: cache de destinatários por role (acertos, cargas, invalidações)
+    - notification_retention: compactações, notificações removidas e tamanho do armazenamento
+    - notification_digest: resumos gravados e destinatários pendentes (modo digest)
+    """
+    return {
+        "domain_events": domain_events.metrics(),
+        "outbox_relay": outbox_relay.metrics(),
+        "job_runner": job_runner.metrics(),
+        "maintenance": maintenance.metrics(),
+        "notification_dispatcher": dispatcher.metrics(),
+        "event_bus": event_bus.metrics(),
+        "role_directory": directory.metrics(),
+        "notification_retention": retention.metrics(),
+        "notification_digest": digest.metrics(),
+        "notification_hub": {
+            "subscribers": hub.subscriber_count,
+            "long_poll_waiters": hub.waiter_count
+        }
+    }
+
+@app.get("/admin/maintenance", tags=["Administração"])
+def read_maintenance(
+    _ = Depends(auth.require_role(["admin"])),
+    maintenance: MaintenanceScheduler = Depends(get_maintenance_scheduler)
+):
+    """
+    Tarefas periódicas de manutenção. **Acesso restrito a administradores.**
+    Para cada tarefa: intervalo, próxima execução neste worker e a última execução
+    na frota (`last_status`, `last_finished_at`, `last_duration_seconds`,
+    `last_result`/`last_error` e o worker que a executou).
+    """
+    return maintenance.runs()
+
+@app.post(
+    "/admin/import/tasks", response_model=Union[schemas.ImportReport, schemas.Job], tags=["Administração"],
+    openapi_extra=import_body_openapi(schemas.TaskImportRow)
+)
+async def import_tasks(
+    request: Request,
+    response: Response,
+    file_format: str = Depends(import_format),
+    background: bool = Query(False, description="true: importa em segundo plano e retorna o job (202)"),
+    current_user: schemas.User = Depends(auth.require_role(["admin"])),
+    import_service: ImportService = Depends(get_import_service),
+    job_service: JobService = Depends(get_job_service)
+):
+    """
+    Importação em massa de tarefas. **Acesso restrito a administradores.**
+    - Corpo: arquivo CSV (`text/csv`, com cabeçalho) ou NDJSON (`application/x-ndjson`)
+      com `titulo`, `descricao`, `status` e `owner_username` (padrão: quem importa)
+    - O arquivo é lido à medida que chega e gravado em lotes (COPY + INSERT);
+      registros inválidos são listados em `errors` sem interromper a importação
+    - `background=true`: o arquivo é gravado e a importação vira o job `import.tasks`
+      (202); o relatório fica em `result` de `GET /jobs/{job_id}`
+    """
+    if background:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return await run_in_threadpool(
+            job_service.submit_import, 'tasks', iterate_from_thread(request.stream()), file_format, current_user
+        )
+    return await run_in_threadpool(
+        import_service.import_tasks, iterate_from_thread(request.stream()), file_format, current_user.id
+    )
+
+@app.post(
+    "/admin/import/users", response_model=Union[schemas.ImportReport, schemas.Job], tags=["Administração"],
+    openapi_extra=import_body_openapi(schemas.UserImportRow)
+)
+async def import_users(
+    request: Request,
+    response: Response,
+    file_format: str = Depends(import_format),
+    background: bool = Query(False, description="true: importa em segundo plano e retorna o job (202)"),
+    current_user: schemas.User = Depends(auth.require_role(["admin"])),
+    import_service: ImportService = Depends(get_import_service),
+    job_service: JobService = Depends(get_job_service)
+):
+    """
+    Importação em massa de usuários. **Acesso restrito a administradores.**
+    - Corpo: arquivo CSV (`text/csv`, com cabeçalho) ou NDJSON (`application/x-ndjson`)
+      com `username`, `email`, `password` e `role` (padrão: visualizacao)
+    - Senhas convertidas em hash em paralelo; usernames/emails já cadastrados ou
+      repetidos no arquivo são listados em `errors` sem interromper a importação
+    - `background=true`: o arquivo é gravado e a importação vira o job `import.users`
+      (202); o relatório fica em `result` de `GET /jobs/{job_id}`
+    """
+    if background:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return await run_in_threadpool(
+            job_service.submit_import, 'users', iterate_from_thread(request.stream()), file_format, current_user
+        )
+    return await run_in_threadpool(import_service.import_users, iterate_from_thread(request.stream()), file_format)
@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -20,6 +20,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Variante sem erro automático, para endpoints que também aceitam o token na query string
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 # --- Funções de Senha e Token ---
 def verify_password(plain_password, hashed_password):
@@ -39,12 +41,34 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 # --- Dependências de Autenticação e Autorização ---
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+# Chave do scope ASGI com o usuário já autenticado pela requisição externa: as
+# sub-requisições de POST /batch não decodificam o token nem consultam o usuário de novo
+AUTHENTICATED_USER_SCOPE_KEY = "auth.user"
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
+    user = request.scope.get(AUTHENTICATED_USER_SCOPE_KEY)
+    if user is not None:
+        return user
+    return _get_user_from_token(token)
+
+async def get_current_user_from_query(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    access_token: Optional[str] = Query(None)
+):
+    """
+    Autentica pelo cabeçalho Authorization ou pelo parâmetro ?access_token=.
+    Usado pelo stream SSE, pois o EventSource do navegador não envia cabeçalhos.
+    """
+    return _get_user_from_token(token or access_token)
+
+def _get_user_from_token(token: Optional[str]):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
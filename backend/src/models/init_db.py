@@ -4,6 +4,7 @@ Cria as tabelas, tipos ENUM, índices e usuário admin padrão se não existirem
 """
 from src.config.database import get_db_cursor
 from src.core.security import get_password_hash
+from src.core.fractional_index import keys_for
 
 
 def table_exists(cursor, table_name: str) -> bool:
@@ -50,7 +51,7 @@ def init_database():
     """
     Inicializa o banco de dados criando:
     - Tipos ENUM (user_role, task_status)
-    - Tabelas (usuarios, tarefas)
+    - Tabelas (usuarios, tarefas, notificacoes, task_outbox, jobs, maintenance_runs)
     - Índices
     - Usuário admin padrão (se não existir)
     """
@@ -61,7 +62,7 @@ def init_database():
     try:
         with get_db_cursor(commit=True) as cursor:
             # 1. Criar tipos ENUM
-            print("\n[1/4] Verificando tipos ENUM...")
+            print("\n[1/5] Verificando tipos ENUM...")
             
             if not type_exists(cursor, 'user_role'):
                 print("   → Criando tipo ENUM 'user_role'...")
@@ -116,7 +117,7 @@ def init_database():
                     print("   ✓ Valor 'em_revisao' adicionado!")
             
             # 2. Criar tabela de usuários
-            print("\n[2/4] Verificando tabela 'usuarios'...")
+            print("\n[2/5] Verificando tabela 'usuarios'...")
             if not table_exists(cursor, 'usuarios'):
                 print("   → Criando tabela 'usuarios'...")
                 cursor.execute("""
@@ -134,7 +135,7 @@ def init_database():
                 print("   ✓ Tabela 'usuarios' já existe.")
             
             # 3. Criar tabela de tarefas
-            print("\n[3/4] Verificando tabela 'tarefas'...")
+            print("\n[3/5] Verificando tabela 'tarefas'...")
             if not table_exists(cursor, 'tarefas'):
                 print("   → Criando tabela 'tarefas'...")
                 cursor.execute("""
@@ -145,6 +146,7 @@ def init_database():
                         status task_status NOT NULL DEFAULT 'pendente',
                         created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
                         owner_id INT NOT NULL,
+                        position TEXT COLLATE "C" NOT NULL,
                         CONSTRAINT fk_owner
                             FOREIGN KEY(owner_id) 
                             REFERENCES usuarios(id)
@@ -154,9 +156,25 @@ def init_database():
                 print("   ✓ Tabela 'tarefas' criada com sucesso!")
             else:
                 print("   ✓ Tabela 'tarefas' já existe.")
+                # Tabelas criadas antes da ordem manual no quadro (índices fracionários)
+                cursor.execute("""
+                    ALTER TABLE tarefas ADD COLUMN IF NOT EXISTS position TEXT COLLATE "C";
+                """)
+                cursor.execute("""
+                    SELECT status, array_agg(id ORDER BY position, id) FROM tarefas
+                    GROUP BY status HAVING bool_or(position IS NULL);
+                """)
+                for column_status, ids in cursor.fetchall():
+                    print(f"   → Definindo a ordem dos cartões da coluna '{column_status}'...")
+                    cursor.execute("""
+                        UPDATE tarefas t SET position = k.position
+                        FROM unnest(%s::int[], %s::text[]) AS k(id, position)
+                        WHERE t.id = k.id;
+                    """, (ids, keys_for(len(ids))))
+                cursor.execute("ALTER TABLE tarefas ALTER COLUMN position SET NOT NULL;")
             
             # 4. Criar índices
-            print("\n[4/4] Verificando índices...")
+            print("\n[4/5] Verificando índices...")
             if not index_exists(cursor, 'idx_tarefas_owner_id'):
                 print("   → Criando índice 'idx_tarefas_owner_id'...")
                 cursor.execute("""
@@ -166,6 +184,182 @@ def init_database():
             else:
                 print("   ✓ Índice 'idx_tarefas_owner_id' já existe.")
             
+            # Quadro Kanban (GET /tasks/board e vizinhos ao mover): cartões de cada
+            # status na ordem do quadro; substitui o antigo índice (status, id)
+            cursor.execute("DROP INDEX IF EXISTS idx_tarefas_status_id;")
+            if not index_exists(cursor, 'idx_tarefas_status_position'):
+                print("   → Criando índice 'idx_tarefas_status_position'...")
+                cursor.execute("""
+                    CREATE INDEX idx_tarefas_status_position ON tarefas(status, position, id);
+                """)
+                print("   ✓ Índice 'idx_tarefas_status_position' criado com sucesso!")
+            else:
+                print("   ✓ Índice 'idx_tarefas_status_position' já existe.")
+            
+            # Destinatários das notificações de revisão (RoleDirectory)
+            if not index_exists(cursor, 'idx_usuarios_role'):
+                print("   → Criando índice 'idx_usuarios_role'...")
+                cursor.execute("""
+                    CREATE INDEX idx_usuarios_role ON usuarios(role);
+                """)
+                print("   ✓ Índice 'idx_usuarios_role' criado com sucesso!")
+            else:
+                print("   ✓ Índice 'idx_usuarios_role' já existe.")
+            
+            # 5. Criar tabela de notificações
+            print("\n[5/5] Verificando tabela 'notificacoes'...")
+            if not table_exists(cursor, 'notificacoes'):
+                print("   → Criando tabela 'notificacoes'...")
+                cursor.execute("""
+                    CREATE TABLE notificacoes (
+                        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                        user_id INT NOT NULL,
+                        type TEXT NOT NULL,
+                        title TEXT NOT NULL,
+                        message TEXT NOT NULL,
+                        task_id INT,
+                        task_title TEXT,
+                        updated_by TEXT,
+                        read BOOLEAN NOT NULL DEFAULT FALSE,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        event_count INT NOT NULL DEFAULT 1,
+                        source_event_id BIGINT,
+                        CONSTRAINT fk_notificacao_user
+                            FOREIGN KEY(user_id)
+                            REFERENCES usuarios(id)
+                            ON DELETE CASCADE
+                    );
+                """)
+                print("   ✓ Tabela 'notificacoes' criada com sucesso!")
+            else:
+                print("   ✓ Tabela 'notificacoes' já existe.")
+                # Tabelas criadas antes do agrupamento de notificações repetidas
+                cursor.execute("""
+                    ALTER TABLE notificacoes ADD COLUMN IF NOT EXISTS event_count INT NOT NULL DEFAULT 1;
+                """)
+                # Tabelas criadas antes do outbox (id do evento que gerou a notificação)
+                cursor.execute("""
+                    ALTER TABLE notificacoes ADD COLUMN IF NOT EXISTS source_event_id BIGINT;
+                """)
+            
+            # Índice parcial: contagem de não lidas por usuário
+            if not index_exists(cursor, 'idx_notificacoes_user_unread'):
+                print("   → Criando índice 'idx_notificacoes_user_unread'...")
+                cursor.execute("""
+                    CREATE INDEX idx_notificacoes_user_unread ON notificacoes(user_id) WHERE NOT read;
+                """)
+                print("   ✓ Índice 'idx_notificacoes_user_unread' criado com sucesso!")
+            else:
+                print("   ✓ Índice 'idx_notificacoes_user_unread' já existe.")
+            
+            # Índice para listagem por usuário, mais recentes primeiro
+            if not index_exists(cursor, 'idx_notificacoes_user_created'):
+                print("   → Criando índice 'idx_notificacoes_user_created'...")
+                cursor.execute("""
+                    CREATE INDEX idx_notificacoes_user_created ON notificacoes(user_id, created_at DESC);
+                """)
+                print("   ✓ Índice 'idx_notificacoes_user_created' criado com sucesso!")
+            else:
+                print("   ✓ Índice 'idx_notificacoes_user_created' já existe.")
+            
+            # Índice para agrupar eventos repetidos da mesma tarefa (coalescing)
+            if not index_exists(cursor, 'idx_notificacoes_coalesce'):
+                print("   → Criando índice 'idx_notificacoes_coalesce'...")
+                cursor.execute("""
+                    CREATE INDEX idx_notificacoes_coalesce ON notificacoes(user_id, task_id, type, created_at DESC);
+                """)
+                print("   ✓ Índice 'idx_notificacoes_coalesce' criado com sucesso!")
+            else:
+                print("   ✓ Índice 'idx_notificacoes_coalesce' já existe.")
+            
+            # Outbox: eventos de tarefa gravados na mesma transação do UPDATE em 'tarefas'
+            print("\n[EXTRA] Verificando tabela 'task_outbox'...")
+            if not table_exists(cursor, 'task_outbox'):
+                print("   → Criando tabela 'task_outbox'...")
+                cursor.execute("""
+                    CREATE TABLE task_outbox (
+                        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                        event_type TEXT NOT NULL,
+                        task_id INT NOT NULL,
+                        payload JSONB NOT NULL,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        attempts INT NOT NULL DEFAULT 0,
+                        last_error TEXT,
+                        delivered_at TIMESTAMPTZ
+                    );
+                """)
+                print("   ✓ Tabela 'task_outbox' criada com sucesso!")
+            else:
+                print("   ✓ Tabela 'task_outbox' já existe.")
+            
+            # Índice parcial: o relay só percorre os eventos ainda não entregues, em ordem
+            if not index_exists(cursor, 'idx_task_outbox_pending'):
+                print("   → Criando índice 'idx_task_outbox_pending'...")
+                cursor.execute("""
+                    CREATE INDEX idx_task_outbox_pending ON task_outbox(id) WHERE delivered_at IS NULL;
+                """)
+                print("   ✓ Índice 'idx_task_outbox_pending' criado com sucesso!")
+            else:
+                print("   ✓ Índice 'idx_task_outbox_pending' já existe.")
+            
+            # Jobs em segundo plano: fila e progresso, compartilhados entre os workers
+            print("\n[EXTRA] Verificando tabela 'jobs'...")
+            if not table_exists(cursor, 'jobs'):
+                print("   → Criando tabela 'jobs'...")
+                cursor.execute("""
+                    CREATE TABLE jobs (
+                        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                        type TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'queued'
+                            CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+                        params JSONB NOT NULL DEFAULT '{}',
+                        progress_done BIGINT NOT NULL DEFAULT 0,
+                        progress_total BIGINT,
+                        result JSONB,
+                        error TEXT,
+                        cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+                        created_by INT REFERENCES usuarios(id) ON DELETE SET NULL,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        started_at TIMESTAMPTZ,
+                        heartbeat_at TIMESTAMPTZ,
+                        finished_at TIMESTAMPTZ
+                    );
+                """)
+                print("   ✓ Tabela 'jobs' criada com sucesso!")
+            else:
+                print("   ✓ Tabela 'jobs' já existe.")
+            
+            # Índice parcial: o runner só percorre os jobs na fila, em ordem
+            if not index_exists(cursor, 'idx_jobs_queued'):
+                print("   → Criando índice 'idx_jobs_queued'...")
+                cursor.execute("""
+                    CREATE INDEX idx_jobs_queued ON jobs(type, id) WHERE status = 'queued';
+                """)
+                print("   ✓ Índice 'idx_jobs_queued' criado com sucesso!")
+            else:
+                print("   ✓ Índice 'idx_jobs_queued' já existe.")
+            
+            # Manutenção periódica: última execução de cada tarefa, vista por todos os workers
+            print("\n[EXTRA] Verificando tabela 'maintenance_runs'...")
+            if not table_exists(cursor, 'maintenance_runs'):
+                print("   → Criando tabela 'maintenance_runs'...")
+                cursor.execute("""
+                    CREATE TABLE maintenance_runs (
+                        name TEXT PRIMARY KEY,
+                        last_status TEXT NOT NULL,
+                        last_finished_at TIMESTAMPTZ NOT NULL,
+                        last_duration_seconds DOUBLE PRECISION NOT NULL,
+                        last_result JSONB,
+                        last_error TEXT,
+                        last_worker TEXT,
+                        runs BIGINT NOT NULL DEFAULT 0,
+                        failures BIGINT NOT NULL DEFAULT 0
+                    );
+                """)
+                print("   ✓ Tabela 'maintenance_runs' criada com sucesso!")
+            else:
+                print("   ✓ Tabela 'maintenance_runs' já existe.")
+            
             # 5. Criar usuários padrão (se não existirem)
             print("\n[EXTRA] Verificando usuários padrão...")
             
@@ -1,4 +1,8 @@
 -- (Opcional) Apaga as tabelas e tipos se eles já existirem, para permitir executar o script novamente.
+DROP TABLE IF EXISTS maintenance_runs;
+DROP TABLE IF EXISTS jobs;
+DROP TABLE IF EXISTS task_outbox;
+DROP TABLE IF EXISTS notificacoes;
 DROP TABLE IF EXISTS tarefas;
 DROP TABLE IF EXISTS usuarios;
 DROP TYPE IF EXISTS user_role;
@@ -39,6 +43,9 @@ CREATE TABLE tarefas (
     descricao TEXT,                                      -- Descrição, pode ser nula
     status task_status NOT NULL DEFAULT 'pendente',       -- Status da tarefa, usando o tipo ENUM
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    -- Ordem do cartão na coluna do quadro: chave fracionária em base 62
+    -- (src/core/fractional_index.py); COLLATE "C" compara byte a byte
+    position TEXT COLLATE "C" NOT NULL,
     
     -- Chave Estrangeira: A ligação entre a tarefa e o usuário
     owner_id INT NOT NULL,
@@ -52,6 +59,89 @@ CREATE TABLE tarefas (
 -- É uma boa prática criar um índice na coluna da chave estrangeira para otimizar
 -- consultas que buscam todas as tarefas de um determinado usuário.
 CREATE INDEX idx_tarefas_owner_id ON tarefas(owner_id);
+-- Quadro Kanban (GET /tasks/board e vizinhos ao mover): cartões de cada status na ordem do quadro
+CREATE INDEX idx_tarefas_status_position ON tarefas(status, position, id);
+CREATE INDEX idx_usuarios_role ON usuarios(role);
+
+-- 5. CRIAÇÃO DA TABELA DE NOTIFICAÇÕES
+CREATE TABLE notificacoes (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id INT NOT NULL,                                -- Destinatário da notificação
+    type TEXT NOT NULL,                                  -- 'task_review', 'task_completed', ...
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    task_id INT,                                         -- Tarefa relacionada (se houver)
+    task_title TEXT,
+    updated_by TEXT,                                     -- Username de quem disparou o evento
+    read BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    event_count INT NOT NULL DEFAULT 1,                  -- Eventos agrupados nesta notificação
+    source_event_id BIGINT,                              -- Último evento do outbox aplicado (idempotência)
+    CONSTRAINT fk_notificacao_user
+        FOREIGN KEY(user_id)
+        REFERENCES usuarios(id)
+        ON DELETE CASCADE
+);
+
+-- Índice parcial: o contador de não lidas só percorre as notificações não lidas do usuário.
+CREATE INDEX idx_notificacoes_user_unread ON notificacoes(user_id) WHERE NOT read;
+-- Listagem por usuário já na ordem de exibição (mais recentes primeiro).
+CREATE INDEX idx_notificacoes_user_created ON notificacoes(user_id, created_at DESC);
+-- Busca da notificação recente da mesma tarefa para agrupar eventos repetidos.
+CREATE INDEX idx_notificacoes_coalesce ON notificacoes(user_id, task_id, type, created_at DESC);
+
+-- Outbox de eventos de tarefa: gravado na mesma transação do UPDATE em 'tarefas' e
+-- entregue em ordem (id) pelo OutboxRelay, com entrega "pelo menos uma vez".
+CREATE TABLE task_outbox (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    event_type TEXT NOT NULL,                            -- 'task.status_changed'
+    task_id INT NOT NULL,
+    payload JSONB NOT NULL,                              -- Tarefa, status anterior/novo e autor
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    attempts INT NOT NULL DEFAULT 0,                     -- Entregas que falharam
+    last_error TEXT,
+    delivered_at TIMESTAMPTZ                             -- NULL enquanto pendente
+);
+
+-- Índice parcial: o relay só percorre os eventos pendentes, em ordem.
+CREATE INDEX idx_task_outbox_pending ON task_outbox(id) WHERE delivered_at IS NULL;
+
+-- Jobs em segundo plano (importações, reatribuições, compactação): enviados pela
+-- API e executados pelo JobRunner de algum worker, fora das requisições.
+CREATE TABLE jobs (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    type TEXT NOT NULL,                                  -- 'import.tasks', 'tasks.reassign', ...
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    params JSONB NOT NULL DEFAULT '{}',                  -- Parâmetros do tipo (file_oid: arquivo enviado)
+    progress_done BIGINT NOT NULL DEFAULT 0,
+    progress_total BIGINT,                               -- NULL quando o total não é conhecido
+    result JSONB,
+    error TEXT,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,     -- Verificado pelo job a cada registro de progresso
+    created_by INT REFERENCES usuarios(id) ON DELETE SET NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    heartbeat_at TIMESTAMPTZ,                            -- Renovado pelo worker que executa o job
+    finished_at TIMESTAMPTZ
+);
+
+-- Índice parcial: o runner só percorre os jobs na fila, em ordem.
+CREATE INDEX idx_jobs_queued ON jobs(type, id) WHERE status = 'queued';
+
+-- Manutenção periódica: última execução de cada tarefa do MaintenanceScheduler.
+-- Consultada (sob o advisory lock da tarefa) para executar uma vez por intervalo na frota.
+CREATE TABLE maintenance_runs (
+    name TEXT PRIMARY KEY,                               -- 'notifications.compact', 'tasks.rebalance_board'
+    last_status TEXT NOT NULL,                           -- 'succeeded' | 'failed'
+    last_finished_at TIMESTAMPTZ NOT NULL,
+    last_duration_seconds DOUBLE PRECISION NOT NULL,
+    last_result JSONB,
+    last_error TEXT,
+    last_worker TEXT,                                    -- host:pid do worker que executou
+    runs BIGINT NOT NULL DEFAULT 0,
+    failures BIGINT NOT NULL DEFAULT 0
+);
 
 -- Exemplo de como inserir um usuário admin para começar
 -- A senha 'admin123' deve ser transformada em hash pela sua aplicação Python antes de inserir.
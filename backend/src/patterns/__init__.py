@@ -3,6 +3,9 @@ Módulo de Design Patterns
 Contém implementações de padrões de projeto utilizados no sistema.
 """
 from .observer import Observer, Subject, TaskNotificationObserver, TaskSubject
+from .domain_events import DomainEvent, DomainEventBus, TaskStatusChanged
 
-__all__ = ['Observer', 'Subject', 'TaskNotificationObserver', 'TaskSubject']
-
+__all__ = [
+    'Observer', 'Subject', 'TaskNotificationObserver', 'TaskSubject',
+    'DomainEvent', 'DomainEventBus', 'TaskStatusChanged'
+]
@@ -0,0 +1,322 @@
+"""
+Barramento de eventos de domínio - Observer/Subject em nível de aplicação
+Os handlers (observers) são registrados uma única vez na inicialização, e não a
+cada atualização de tarefa. Os serviços apenas publicam eventos tipados; os
+handlers rodam fora do caminho da requisição, no event loop da aplicação.
+
+- Eventos são classes com __slots__ (ex.: TaskStatusChanged); cada handler recebe
+  os eventos do tipo registrado e de suas subclasses.
+- Handlers podem ser coroutines (await no event loop) ou funções síncronas
+  (executadas em uma thread com asyncio.to_thread).
+- Cada handler tem o seu limite de concorrência (asyncio.Semaphore): um handler
+  lento acumula eventos só para ele, sem atrasar os demais.
+- Erro em um handler é contado e registrado, sem afetar os outros handlers.
+- Métricas por handler: execuções, erros, em andamento, aguardando e latência.
+- Observers (Observer.update) podem ser anexados com attach(); recebem o
+  dicionário event_data do evento, como no TaskSubject.
+- Handlers com batch=True recebem a lista de eventos de uma entrega de uma vez.
+- publish() não espera os handlers; deliver() (usado pelo OutboxRelay) espera
+  todos e informa se algum falhou, para que a entrega seja repetida.
+- Sem start() (scripts e testes), publish() executa os handlers de forma síncrona.
+"""
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Type, Union
+from src.patterns.observer import Observer, Subject
+
+
+class DomainEvent:
+    """Base dos eventos de domínio."""
+
+    __slots__ = ('occurred_at',)
+
+    # Nome do evento (usado em logs)
+    name = 'domain_event'
+
+    def __init__(self):
+        self.occurred_at = time.time()
+
+    def to_event_data(self) -> Dict[str, Any]:
+        """Dicionário entregue aos observers (Observer.update)."""
+        return {}
+
+
+class TaskStatusChanged(DomainEvent):
+    """O status de uma tarefa mudou."""
+
+    __slots__ = ('task', 'old_status', 'new_status', 'updated_by', 'event_id')
+
+    name = 'task.status_changed'
+
+    def __init__(
+        self,
+        task: Dict[str, Any],
+        old_status: Optional[str],
+        new_status: Optional[str],
+        updated_by: Optional[Dict[str, Any]] = None,
+        event_id: Optional[int] = None
+    ):
+        """
+        Args:
+            event_id: Id do evento no task_outbox (None quando publicado diretamente);
+                os consumidores usam para descartar entregas repetidas
+        """
+        super().__init__()
+        self.task = task
+        self.old_status = old_status
+        self.new_status = new_status
+        self.updated_by = updated_by
+        self.event_id = event_id
+
+    def to_event_data(self) -> Dict[str, Any]:
+        return {
+            'task': self.task,
+            'old_status': self.old_status,
+            'new_status': self.new_status,
+            'updated_by': self.updated_by,
+            'event_id': self.event_id
+        }
+
+
+EventHandler = Callable[[Any], Union[None, Awaitable[None]]]
+
+
+class _Subscription:
+    """Handler registrado, com o seu limite de concorrência e métricas."""
+
+    __slots__ = (
+        'name', 'event_type', 'handler', 'observer', 'is_async', 'batch', 'concurrency', 'semaphore',
+        'calls', 'errors', 'in_flight', 'waiting', 'total_seconds', 'max_seconds'
+    )
+
+    def __init__(self, name: str, event_type: Type[DomainEvent], handler: EventHandler, concurrency: int, batch: bool):
+        self.name = name
+        self.event_type = event_type
+        self.handler = handler
+        self.observer: Optional[Observer] = None
+        self.is_async = inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(
+            getattr(handler, '__call__', None)
+        )
+        self.batch = batch
+        self.concurrency = concurrency
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        self.calls += 1
+        if failed:
+            self.errors += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'event': self.event_type.name,
+            'concurrency': self.concurrency,
+            'calls': self.calls,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'avg_ms': round(self.total_seconds * 1000 / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_seconds * 1000, 3),
+        }
+
+
+class DomainEventBus(Subject):
+    """Subject da aplicação: entrega eventos de domínio aos handlers registrados."""
+
+    def __init__(self):
+        super().__init__()
+        self._subscriptions: List[_Subscription] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._metrics = {'published': 0, 'published_inline': 0}
+
+    @property
+    def running(self) -> bool:
+        """Indica se os handlers rodam no event loop (em segundo plano)."""
+        return self._loop is not None
+
+    def subscribe(
+        self,
+        event_type: Type[DomainEvent],
+        handler: EventHandler,
+        concurrency: int = 1,
+        name: Optional[str] = None,
+        batch: bool = False
+    ) -> _Subscription:
+        """
+        Registra um handler para um tipo de evento.
+
+        Args:
+            event_type: Classe do evento (subclasses também são entregues)
+            handler: Coroutine ou função síncrona que recebe o evento
+            concurrency: Máximo de execuções simultâneas deste handler
+            name: Nome do handler nas métricas (padrão: nome da função)
+            batch: O handler recebe a lista de eventos de cada entrega, em ordem
+        """
+        name = name or getattr(handler, '__qualname__', None) or type(handler).__name__
+        subscription = _Subscription(name, event_type, handler, max(1, concurrency), batch)
+        if self._loop is not None:
+            subscription.semaphore = asyncio.Semaphore(subscription.concurrency)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def attach(self, observer: Observer, event_type: Type[DomainEvent] = DomainEvent, concurrency: int = 1) -> None:
+        """Anexa um observer: Observer.update(bus, event.to_event_data()) a cada evento do tipo."""
+        if observer in self._observers:
+            return
+        super().attach(observer)
+        subscription = self.subscribe(
+            event_type,
+            lambda event: observer.update(self, event.to_event_data()),
+            concurrency=concurrency,
+            name=type(observer).__name__
+        )
+        subscription.observer = observer
+
+    def detach(self, observer: Observer) -> None:
+        """Remove o observer e o handler criado por attach()."""
+        if observer not in self._observers:
+            return
+        super().detach(observer)
+        self._subscriptions = [s for s in self._subscriptions if s.observer is not observer]
+
+    def notify(self, event_data: Any) -> None:
+        """Interface do Subject: publica o evento informado."""
+        self.publish(event_data)
+
+    async def start(self) -> None:
+        """Passa a executar os handlers no event loop atual (lifespan)."""
+        if self._loop is not None:
+            return
+        for subscription in self._subscriptions:
+            subscription.semaphore = asyncio.Semaphore(subscription.concurrency)
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Aguarda os handlers em andamento (até drain_timeout); novos eventos voltam a ser síncronos."""
+        if self._loop is None:
+            return
+        self._loop = None
+        pending = set(self._tasks)
+        if pending:
+            _, not_done = await asyncio.wait(pending, timeout=drain_timeout)
+            if not_done:
+                print(f"⚠️  Barramento de domínio encerrado com {len(not_done)} handlers pendentes")
+                for task in not_done:
+                    task.cancel()
+                await asyncio.gather(*not_done, return_exceptions=True)
+
+    def publish(self, event: DomainEvent) -> None:
+        """
+        Publica um evento. Seguro para chamar de qualquer thread; retorna sem
+        esperar os handlers quando o barramento está rodando.
+        """
+        subscriptions = [s for s in self._subscriptions if isinstance(event, s.event_type)]
+        if not subscriptions:
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._metrics['published_inline'] += 1
+            for subscription in subscriptions:
+                self._run_inline(subscription, [event])
+            return
+        self._metrics['published'] += 1
+        try:
+            in_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self._schedule(subscriptions, event)
+        else:
+            loop.call_soon_threadsafe(self._schedule, subscriptions, event)
+
+    async def deliver(self, events: List[DomainEvent]) -> bool:
+        """
+        Entrega os eventos e espera todos os handlers. Cada handler recebe os
+        eventos na ordem da lista; handlers diferentes rodam em paralelo.
+
+        Returns:
+            True se nenhum handler falhou
+        """
+        runs = []
+        for subscription in self._subscriptions:
+            matching = [event for event in events if isinstance(event, subscription.event_type)]
+            if matching:
+                runs.append(self._run(subscription, matching))
+        results = await asyncio.gather(*runs)
+        return all(results)
+
+    def _schedule(self, subscriptions: List[_Subscription], event: DomainEvent) -> None:
+        for subscription in subscriptions:
+            task = asyncio.get_running_loop().create_task(self._run(subscription, [event]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _call(subscription: _Subscription, events: List[DomainEvent]) -> None:
+        if subscription.batch:
+            subscription.handler(events)
+        else:
+            for event in events:
+                subscription.handler(event)
+
+    @staticmethod
+    async def _call_async(subscription: _Subscription, events: List[DomainEvent]) -> None:
+        if subscription.batch:
+            await subscription.handler(events)
+        else:
+            for event in events:
+                await subscription.handler(event)
+
+    async def _run(self, subscription: _Subscription, events: List[DomainEvent]) -> bool:
+        """Executa o handler respeitando o seu limite de concorrência."""
+        if subscription.semaphore is None:
+            subscription.semaphore = asyncio.Semaphore(subscription.concurrency)
+        subscription.waiting += 1
+        async with subscription.semaphore:
+            subscription.waiting -= 1
+            subscription.in_flight += 1
+            started = time.perf_counter()
+            failed = False
+            try:
+                if subscription.is_async:
+                    await self._call_async(subscription, events)
+                else:
+                    await asyncio.to_thread(self._call, subscription, events)
+            except Exception as e:
+                failed = True
+                print(f"❌ Erro no handler '{subscription.name}' do evento '{events[0].name}': {e}")
+            finally:
+                subscription.in_flight -= 1
+                subscription.record(time.perf_counter() - started, failed)
+        return not failed
+
+    def _run_inline(self, subscription: _Subscription, events: List[DomainEvent]) -> None:
+        started = time.perf_counter()
+        failed = False
+        try:
+            if subscription.is_async:
+                asyncio.run(self._call_async(subscription, events))
+            else:
+                self._call(subscription, events)
+        except Exception as e:
+            failed = True
+            print(f"❌ Erro no handler '{subscription.name}' do evento '{events[0].name}': {e}")
+        subscription.record(time.perf_counter() - started, failed)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Eventos publicados e métricas de cada handler."""
+        return {
+            'running': self.running,
+            'pending': len(self._tasks),
+            **self._metrics,
+            'handlers': {s.name: s.metrics() for s in self._subscriptions},
+        }
@@ -60,6 +60,12 @@ class TaskNotificationObserver(Observer):
         """
         self.notification_service = notification_service
     
+    @staticmethod
+    def is_relevant(event_data: Dict[str, Any]) -> bool:
+        """Indica se a mudança de status gera notificações (em_revisao ou concluida)."""
+        new_status = event_data.get('new_status')
+        return new_status in ('em_revisao', 'concluida') and event_data.get('old_status') != new_status
+    
     def update(self, subject: Subject, event_data: Dict[str, Any]) -> None:
         """
         Cria notificações quando uma tarefa muda de status.
@@ -71,6 +77,8 @@ class TaskNotificationObserver(Observer):
                 - old_status: status anterior (opcional)
                 - new_status: novo status
                 - updated_by: usuário que fez a atualização (opcional)
+                - event_id: id do evento no outbox (opcional; evita notificações
+                  duplicadas quando o evento é entregue novamente)
         """
         task = event_data.get('task')
         new_status = event_data.get('new_status')
@@ -79,13 +87,17 @@ class TaskNotificationObserver(Observer):
         # Notificar quando muda para "em_revisao" (admin e gerencial)
         if new_status == 'em_revisao' and old_status != 'em_revisao':
             print(f"🔔 Observer detectou mudança para 'em_revisao'. Criando notificações...")
-            self.notification_service.create_review_notification(task, event_data.get('updated_by'))
+            self.notification_service.create_review_notification(
+                task, event_data.get('updated_by'), event_id=event_data.get('event_id')
+            )
             print(f"✅ Observer concluiu criação de notificações de revisão")
         
         # Notificar quando muda para "concluida" (responsável pela tarefa)
         if new_status == 'concluida' and old_status != 'concluida':
             print(f"🔔 Observer detectou mudança para 'concluida'. Criando notificação para o responsável...")
-            self.notification_service.create_completion_notification(task, event_data.get('updated_by'))
+            self.notification_service.create_completion_notification(
+                task, event_data.get('updated_by'), event_id=event_data.get('event_id')
+            )
             print(f"✅ Observer concluiu criação de notificação de conclusão")
 
 
@@ -4,6 +4,14 @@ Abstrai o acesso ao banco de dados, separando a lógica de persistência.
 """
 from .user_repository import UserRepository
 from .task_repository import TaskRepository
+from .notification_repository import NotificationRepository
+from .in_memory_notification_repository import InMemoryNotificationRepository
+from .role_directory import RoleDirectory
+from .outbox_repository import OutboxRepository
+from .job_repository import JobRepository
 
-__all__ = ['UserRepository', 'TaskRepository']
+__all__ = [
+    'UserRepository', 'TaskRepository', 'NotificationRepository',
+    'InMemoryNotificationRepository', 'RoleDirectory', 'OutboxRepository', 'JobRepository'
+]
 
@@ -2,8 +2,10 @@
 Classe base abstrata para repositórios.
 Define a interface comum que todos os repositórios devem seguir.
 """
+import csv
+import io
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Iterable, Sequence
 from src.config.database import get_db_cursor
 
 
@@ -54,4 +56,27 @@ class BaseRepository(ABC):
                 cursor.execute(query, params or ())
                 return processor(cursor)
         return process_result
-
+    
+    @staticmethod
+    def _copy_to(query: str, file: Any, params: Any = None) -> None:
+        """
+        Executa um COPY ... TO STDOUT e escreve a saída em file (objeto com write()),
+        em pedaços, à medida que chega do servidor. O COPY não aceita parâmetros:
+        eles são incorporados à query com mogrify (mesma conversão do execute).
+        """
+        with get_db_cursor() as cursor:
+            cursor.copy_expert(cursor.mogrify(query, params).decode(), file)
+    
+    @staticmethod
+    def _copy_rows(cursor, target: str, rows: Iterable[Sequence[Any]]) -> None:
+        """
+        Carrega as linhas com COPY target FROM STDIN (CSV) no cursor informado: uma
+        única viagem ao banco para o lote inteiro. None é gravado como NULL.
+        
+        Args:
+            target: Tabela e colunas, ex.: "import_tarefas (titulo, status)"
+        """
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {target} FROM STDIN WITH (FORMAT csv)", buffer)
@@ -0,0 +1,340 @@
+"""
+Repositório de Notificações em memória - Repository Pattern
+Alternativa ao NotificationRepository para implantações que mantêm as
+notificações no próprio processo (config.yaml: notifications.storage = memory).
+
+Estrutura:
+- Um "bucket" por usuário, em ordem de criação (mais antigas primeiro).
+- Índice id -> registro, para mark_as_read em O(1).
+- Contador de não lidas mantido a cada escrita (get_unread_count não percorre nada).
+- Locks particionados por usuário (shards), para que requisições concorrentes do
+  threadpool não disputem um único lock nem gerem ids repetidos.
+- Com vários workers, cada processo mantém uma réplica: as notificações criadas em
+  um worker chegam aos demais pelo PgEventBus e entram com replicate(). Por isso os
+  ids combinam o relógio e o processo: (milissegundo lógico << 10) | tag do processo,
+  sorteado na inicialização (10 bits aleatórios; o PID não serve: PIDs iguais módulo
+  1024 são comuns). Dois workers só geram o mesmo id com o mesmo tag (1 em 1024 por
+  par de workers) e no mesmo milissegundo.
+- Agrupamento (coalesce_seconds): o bucket fica em ordem de (created_at, id), também
+  para as réplicas que chegam fora de ordem, então a busca por uma notificação
+  recente da mesma tarefa percorre apenas a janela, do fim para o início.
+- Notificações com source_event_id (eventos do outbox) já aplicadas são ignoradas,
+  como no NotificationRepository.
+"""
+import bisect
+import itertools
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+
+
+class _NotificationRecord:
+    """Registro compacto de notificação (sem __dict__ por instância)."""
+
+    __slots__ = (
+        'id', 'user_id', 'type', 'title', 'message',
+        'task_id', 'task_title', 'created_at', 'read', 'updated_by', 'event_count', 'source_event_id'
+    )
+    # Campos expostos (source_event_id é interno, como no NotificationRepository)
+    _FIELDS = __slots__[:-1]
+
+    def __init__(self, notification_id: int, data: Dict[str, Any]):
+        self.id = notification_id
+        self.user_id = data.get('user_id')
+        self.type = data.get('type')
+        self.title = data.get('title')
+        self.message = data.get('message')
+        self.task_id = data.get('task_id')
+        self.task_title = data.get('task_title')
+        self.updated_by = data.get('updated_by')
+        self.created_at = data.get('created_at') or datetime.now().isoformat()
+        self.read = bool(data.get('read', False))
+        self.event_count = data.get('event_count') or 1
+        self.source_event_id = data.get('source_event_id')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte o registro no mesmo formato retornado pelo NotificationRepository."""
+        return {field: getattr(self, field) for field in self._FIELDS}
+
+
+class _Shard:
+    """Partição do armazenamento: um lock protege os usuários que caem nela."""
+
+    __slots__ = ('lock', 'buckets', 'index', 'unread')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: Dict[int, List[_NotificationRecord]] = {}
+        self.index: Dict[int, _NotificationRecord] = {}
+        self.unread: Dict[int, int] = {}
+
+
+class InMemoryNotificationRepository:
+    """Repositório de notificações em memória, com a mesma interface do NotificationRepository."""
+
+    # Cada processo tem o seu armazenamento (replicado via PgEventBus)
+    is_shared = False
+
+    def __init__(self, shard_count: int = 16, worker_tag: Optional[int] = None):
+        """
+        Args:
+            shard_count: Número de partições (locks) do armazenamento
+            worker_tag: Identificador do processo nos ids (0-1023; padrão: sorteado)
+        """
+        self._shards = [_Shard() for _ in range(shard_count)]
+        self._worker_tag = (secrets.randbits(10) if worker_tag is None else worker_tag) & 0x3FF
+        self._last_tick = 0
+        self._id_lock = threading.Lock()
+
+    def _shard_for(self, user_id: int) -> _Shard:
+        return self._shards[hash(user_id) % len(self._shards)]
+
+    def _next_id(self) -> int:
+        # Relógio lógico: milissegundo atual, sempre maior que o último usado
+        with self._id_lock:
+            self._last_tick = max(time.time_ns() // 1_000_000, self._last_tick + 1)
+            return (self._last_tick << 10) | self._worker_tag
+
+    @staticmethod
+    def _order_key(record: _NotificationRecord) -> tuple:
+        return (record.created_at, record.id)
+
+    @classmethod
+    def _place(cls, bucket: List[_NotificationRecord], record: _NotificationRecord) -> None:
+        """
+        Insere o registro na posição de (created_at, id): réplicas de outros workers
+        podem chegar fora de ordem, e _find_recent depende do bucket ordenado.
+        No caso comum (registro mais recente), é um append.
+        """
+        if not bucket or cls._order_key(bucket[-1]) <= cls._order_key(record):
+            bucket.append(record)
+        else:
+            bisect.insort(bucket, record, key=cls._order_key)
+
+    @classmethod
+    def _append(cls, shard: _Shard, record: _NotificationRecord) -> None:
+        cls._place(shard.buckets.setdefault(record.user_id, []), record)
+        shard.index[record.id] = record
+        if not record.read:
+            shard.unread[record.user_id] = shard.unread.get(record.user_id, 0) + 1
+
+    @classmethod
+    def _update_in_place(
+        cls, shard: _Shard, record: _NotificationRecord, data: Dict[str, Any], event_count: int
+    ) -> None:
+        """Atualiza o registro com os dados do novo evento e o reposiciona pelo novo created_at."""
+        for field in ('title', 'message', 'task_title', 'updated_by'):
+            setattr(record, field, data.get(field))
+        record.event_count = event_count
+        if data.get('source_event_id') is not None:
+            record.source_event_id = data['source_event_id']
+        record.created_at = data.get('created_at') or datetime.now().isoformat()
+        if record.read and not data.get('read', False):
+            shard.unread[record.user_id] = shard.unread.get(record.user_id, 0) + 1
+        elif not record.read and data.get('read', False):
+            shard.unread[record.user_id] -= 1
+        record.read = bool(data.get('read', False))
+        bucket = shard.buckets[record.user_id]
+        bucket.remove(record)
+        cls._place(bucket, record)
+
+    def create_many(
+        self,
+        notifications: List[Dict[str, Any]],
+        coalesce_seconds: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Armazena várias notificações e retorna os registros criados.
+        Com coalesce_seconds, uma notificação do mesmo (user_id, task_id, type) criada
+        ou atualizada dentro da janela é atualizada no lugar (ver NotificationRepository).
+        """
+        cutoff = (datetime.now() - timedelta(seconds=coalesce_seconds)).isoformat() if coalesce_seconds else None
+        saved = []
+        for data in notifications:
+            shard = self._shard_for(data.get('user_id'))
+            with shard.lock:
+                if self._already_applied(shard, data):
+                    continue
+                record = self._find_recent(shard, data, cutoff) if cutoff else None
+                if record is not None:
+                    self._update_in_place(shard, record, data, record.event_count + (data.get('event_count') or 1))
+                else:
+                    record = _NotificationRecord(self._next_id(), data)
+                    self._append(shard, record)
+                saved.append(record.to_dict())
+        return saved
+
+    @staticmethod
+    def _already_applied(shard: _Shard, data: Dict[str, Any]) -> bool:
+        """Indica se uma notificação da mesma chave já reflete o evento (ou um posterior)."""
+        event_id = data.get('source_event_id')
+        if event_id is None:
+            return False
+        return any(
+            record.source_event_id is not None and record.source_event_id >= event_id
+            and record.task_id == data.get('task_id') and record.type == data.get('type')
+            for record in shard.buckets.get(data.get('user_id'), ())
+        )
+
+    @staticmethod
+    def _find_recent(shard: _Shard, data: Dict[str, Any], cutoff: str) -> Optional[_NotificationRecord]:
+        """Procura, do fim do bucket para o início, um registro da mesma chave dentro da janela."""
+        if data.get('task_id') is None:
+            return None
+        for record in reversed(shard.buckets.get(data.get('user_id'), ())):
+            if record.created_at < cutoff:
+                return None
+            if record.task_id == data.get('task_id') and record.type == data.get('type'):
+                return record
+        return None
+
+    def replicate(self, notifications: List[Dict[str, Any]]) -> int:
+        """
+        Armazena notificações criadas (ou agrupadas) por outro processo, preservando
+        id e created_at. Ids já presentes são atualizados no lugar.
+
+        Returns:
+            Número de notificações inseridas
+        """
+        inserted = 0
+        for data in notifications:
+            shard = self._shard_for(data.get('user_id'))
+            with shard.lock:
+                record = shard.index.get(data['id'])
+                if record is None:
+                    self._append(shard, _NotificationRecord(data['id'], data))
+                    inserted += 1
+                elif record.event_count != data.get('event_count', record.event_count):
+                    self._update_in_place(shard, record, data, data['event_count'])
+        return inserted
+
+    def find_by_user(
+        self,
+        user_id: int,
+        unread_only: bool = False,
+        limit: Optional[int] = None,
+        before: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retorna as notificações de um usuário, mais recentes primeiro.
+        before é o id da última notificação da página anterior (cursor).
+        """
+        shard = self._shard_for(user_id)
+        with shard.lock:
+            bucket = shard.buckets.get(user_id, [])
+            records = reversed(bucket)
+            if before is not None:
+                cursor = shard.index.get(before)
+                if cursor is None or cursor.user_id != user_id:
+                    return []
+                records = itertools.islice(records, len(bucket) - bucket.index(cursor), None)
+            result = []
+            for record in records:
+                if limit is not None and len(result) >= limit:
+                    break
+                if not (unread_only and record.read):
+                    result.append(record.to_dict())
+            return result
+
+    def count_unread(self, user_id: int) -> int:
+        """Retorna o contador de não lidas mantido para o usuário."""
+        shard = self._shard_for(user_id)
+        with shard.lock:
+            return shard.unread.get(user_id, 0)
+
+    def mark_as_read(self, notification_id: int, user_id: int) -> bool:
+        """Marca uma notificação do usuário como lida (busca pelo índice de ids)."""
+        shard = self._shard_for(user_id)
+        with shard.lock:
+            record = shard.index.get(notification_id)
+            if record is None or record.user_id != user_id:
+                return False
+            if not record.read:
+                record.read = True
+                shard.unread[user_id] -= 1
+            return True
+
+    def mark_many_as_read(self, notification_ids: List[int], user_id: int) -> List[int]:
+        """Marca várias notificações do usuário como lidas; retorna as que estavam não lidas."""
+        shard = self._shard_for(user_id)
+        marked = []
+        with shard.lock:
+            for notification_id in notification_ids:
+                record = shard.index.get(notification_id)
+                if record is not None and record.user_id == user_id and not record.read:
+                    record.read = True
+                    shard.unread[user_id] -= 1
+                    marked.append(notification_id)
+        return marked
+
+    def mark_all_as_read(self, user_id: int) -> int:
+        """Marca todas as notificações não lidas do usuário como lidas."""
+        shard = self._shard_for(user_id)
+        with shard.lock:
+            if not shard.unread.get(user_id):
+                return 0
+            count = 0
+            for record in shard.buckets.get(user_id, []):
+                if not record.read:
+                    record.read = True
+                    count += 1
+            shard.unread[user_id] = 0
+            return count
+
+    def compact(
+        self,
+        max_age_seconds: Optional[float] = None,
+        max_per_user: Optional[int] = None,
+        read_expiry_seconds: Optional[float] = None
+    ) -> int:
+        """
+        Remove as notificações fora da política de retenção, uma partição por vez
+        (as demais continuam atendendo requisições). Critérios None (ou 0) são ignorados.
+
+        Returns:
+            Número de notificações removidas
+        """
+        now = datetime.now()
+        # created_at é ISO 8601 local: a comparação de strings segue a ordem cronológica
+        age_cutoff = (now - timedelta(seconds=max_age_seconds)).isoformat() if max_age_seconds else None
+        read_cutoff = (now - timedelta(seconds=read_expiry_seconds)).isoformat() if read_expiry_seconds else None
+
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                for user_id in list(shard.buckets):
+                    bucket = shard.buckets[user_id]
+                    kept = [
+                        record for record in bucket
+                        if not (age_cutoff and record.created_at < age_cutoff)
+                        and not (read_cutoff and record.read and record.created_at < read_cutoff)
+                    ]
+                    if max_per_user and len(kept) > max_per_user:
+                        kept = kept[-max_per_user:]
+                    if len(kept) == len(bucket):
+                        continue
+                    kept_ids = {record.id for record in kept}
+                    for record in bucket:
+                        if record.id not in kept_ids:
+                            del shard.index[record.id]
+                    removed += len(bucket) - len(kept)
+                    unread = sum(1 for record in kept if not record.read)
+                    if kept:
+                        shard.buckets[user_id] = kept
+                        shard.unread[user_id] = unread
+                    else:
+                        del shard.buckets[user_id]
+                        shard.unread.pop(user_id, None)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Tamanho do armazenamento: total de notificações, usuários com notificações e não lidas."""
+        stats = {'notifications': 0, 'users': 0, 'unread': 0}
+        for shard in self._shards:
+            with shard.lock:
+                stats['notifications'] += len(shard.index)
+                stats['users'] += len(shard.buckets)
+                stats['unread'] += sum(shard.unread.values())
+        return stats
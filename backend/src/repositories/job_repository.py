@@ -0,0 +1,220 @@
+"""
+Repositório de Jobs - Repository Pattern
+Jobs em segundo plano (tabela jobs), executados pelo JobRunner de cada worker:
+- claim_next() usa FOR UPDATE SKIP LOCKED: com vários workers, cada job na fila
+  é pego por um único processo (índice parcial idx_jobs_queued).
+- heartbeat_at é renovado pelo processo que executa o job; jobs 'running' sem
+  heartbeat por mais que o limite (worker encerrado) são marcados como 'failed'.
+- Arquivos dos jobs (ex.: importação em segundo plano) ficam em large objects do
+  PostgreSQL, acessíveis por qualquer worker; o oid vai em params['file_oid'].
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from src.config.database import get_db_cursor
+from src.repositories.base_repository import BaseRepository
+
+_JOB_COLUMNS = """
+    id, type, status, params, progress_done, progress_total, result, error,
+    cancel_requested, created_by, created_at, started_at, finished_at
+"""
+
+
+class JobRepository(BaseRepository):
+    """Repositório dos jobs em segundo plano."""
+
+    def create(self, job_type: str, params: Dict[str, Any], created_by: Optional[int]) -> Dict[str, Any]:
+        """Coloca um job na fila."""
+        query = f"""
+            INSERT INTO jobs (type, params, created_by)
+            VALUES (%s, %s::jsonb, %s)
+            RETURNING {_JOB_COLUMNS};
+        """
+        return self._execute_with_cursor(query, (job_type, json.dumps(params), created_by), commit=True)(
+            self._fetch_job
+        )
+
+    def find_by_id(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Busca um job pelo ID."""
+        query = f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = %s;"
+        return self._execute_with_cursor(query, (job_id,))(self._fetch_job)
+
+    def find_recent(self, created_by: Optional[int] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Jobs mais recentes primeiro (apenas os de created_by, se informado)."""
+        query = f"""
+            SELECT {_JOB_COLUMNS}
+            FROM jobs
+            WHERE %s::int IS NULL OR created_by = %s
+            ORDER BY id DESC
+            LIMIT %s;
+        """
+        def process_result(cursor):
+            rows = cursor.fetchall()
+            return [self._serialize_job(job) for job in self._rows_to_dicts(cursor, rows)]
+        return self._execute_with_cursor(query, (created_by, created_by, limit))(process_result)
+
+    def claim_next(self, job_types: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """
+        Pega o job mais antigo na fila dentre os tipos informados e o marca como
+        'running' (jobs já pegos por outro worker são ignorados).
+        """
+        query = f"""
+            UPDATE jobs
+            SET status = 'running', started_at = NOW(), heartbeat_at = NOW()
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE status = 'queued' AND type = ANY(%s)
+                ORDER BY id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {_JOB_COLUMNS};
+        """
+        return self._execute_with_cursor(query, (list(job_types),), commit=True)(self._fetch_job)
+
+    def report_progress(self, job_id: int, done: int, total: Optional[int] = None) -> bool:
+        """
+        Grava o progresso (renovando o heartbeat).
+
+        Returns:
+            True se o cancelamento do job foi pedido
+        """
+        query = """
+            UPDATE jobs
+            SET progress_done = %s, progress_total = COALESCE(%s, progress_total), heartbeat_at = NOW()
+            WHERE id = %s
+            RETURNING cancel_requested;
+        """
+        def process_result(cursor):
+            row = cursor.fetchone()
+            return bool(row and row[0])
+        return self._execute_with_cursor(query, (done, total, job_id), commit=True)(process_result)
+
+    def heartbeat(self, job_ids: Iterable[int]) -> Set[int]:
+        """
+        Renova o heartbeat dos jobs em execução neste processo.
+
+        Returns:
+            Ids dos jobs cujo cancelamento foi pedido
+        """
+        query = """
+            UPDATE jobs
+            SET heartbeat_at = NOW()
+            WHERE id = ANY(%s) AND status = 'running'
+            RETURNING id, cancel_requested;
+        """
+        def process_result(cursor):
+            return {job_id for job_id, cancel_requested in cursor.fetchall() if cancel_requested}
+        return self._execute_with_cursor(query, (list(job_ids),), commit=True)(process_result)
+
+    def finish(
+        self,
+        job_id: int,
+        status: str,
+        progress_done: int,
+        result: Any = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Registra o fim de um job ('succeeded', 'failed' ou 'cancelled')."""
+        query = """
+            UPDATE jobs
+            SET status = %s, progress_done = %s, result = %s::jsonb, error = %s,
+                finished_at = NOW(), heartbeat_at = NOW()
+            WHERE id = %s AND status = 'running';
+        """
+        params = (status, progress_done, json.dumps(result) if result is not None else None, error, job_id)
+        self._execute_with_cursor(query, params, commit=True)(lambda cursor: None)
+
+    def request_cancel(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Pede o cancelamento: um job na fila é cancelado na hora; um em execução é
+        interrompido pelo worker na próxima verificação.
+
+        Returns:
+            O job atualizado, ou None se não existe ou já terminou
+        """
+        query = f"""
+            UPDATE jobs
+            SET cancel_requested = TRUE,
+                status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,
+                finished_at = CASE WHEN status = 'queued' THEN NOW() ELSE finished_at END
+            WHERE id = %s AND status IN ('queued', 'running')
+            RETURNING {_JOB_COLUMNS};
+        """
+        return self._execute_with_cursor(query, (job_id,), commit=True)(self._fetch_job)
+
+    def fail_stale(self, timeout_seconds: float) -> List[Dict[str, Any]]:
+        """
+        Marca como 'failed' os jobs 'running' sem heartbeat há mais de
+        timeout_seconds (o worker que os executava foi encerrado).
+
+        Returns:
+            Os jobs marcados
+        """
+        query = f"""
+            UPDATE jobs
+            SET status = 'failed', error = 'Interrompido: o worker que executava o job foi encerrado',
+                finished_at = NOW()
+            WHERE status = 'running' AND heartbeat_at < NOW() - make_interval(secs => %s)
+            RETURNING {_JOB_COLUMNS};
+        """
+        def process_result(cursor):
+            rows = cursor.fetchall()
+            return [self._serialize_job(job) for job in self._rows_to_dicts(cursor, rows)]
+        return self._execute_with_cursor(query, (timeout_seconds,), commit=True)(process_result)
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """Remove os jobs finalizados há mais de older_than_seconds."""
+        query = """
+            DELETE FROM jobs
+            WHERE status IN ('succeeded', 'failed', 'cancelled')
+              AND finished_at < NOW() - make_interval(secs => %s);
+        """
+        return self._execute_with_cursor(query, (older_than_seconds,), commit=True)(lambda cursor: cursor.rowcount)
+
+    # --- Arquivos dos jobs (large objects) ---
+
+    def store_file(self, pieces: Iterable[bytes]) -> int:
+        """
+        Grava o conteúdo (recebido em pedaços) em um large object, sem mantê-lo
+        inteiro em memória.
+
+        Returns:
+            oid do arquivo
+        """
+        with get_db_cursor(commit=True) as cursor:
+            large_object = cursor.connection.lobject(0, 'wb')
+            for piece in pieces:
+                large_object.write(piece)
+            large_object.close()
+            return large_object.oid
+
+    def read_file(self, oid: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Lê um arquivo gravado por store_file, em pedaços (a conexão fica aberta durante a leitura)."""
+        with get_db_cursor() as cursor:
+            large_object = cursor.connection.lobject(oid, 'rb')
+            while True:
+                chunk = large_object.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            large_object.close()
+
+    def delete_file(self, oid: int) -> None:
+        """Remove um arquivo gravado por store_file (ignora se já foi removido)."""
+        query = "SELECT lo_unlink(oid) FROM pg_largeobject_metadata WHERE oid = %s;"
+        self._execute_with_cursor(query, (oid,), commit=True)(lambda cursor: None)
+
+    def _fetch_job(self, cursor) -> Optional[Dict[str, Any]]:
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return self._serialize_job(self._row_to_dict(cursor, row))
+
+    @staticmethod
+    def _serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte as datas para ISO 8601."""
+        for key in ('created_at', 'started_at', 'finished_at'):
+            if isinstance(job.get(key), datetime):
+                job[key] = job[key].isoformat()
+        return job
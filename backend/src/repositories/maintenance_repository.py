@@ -0,0 +1,80 @@
+"""
+Repositório das execuções de manutenção - Repository Pattern
+Última execução de cada tarefa periódica do MaintenanceScheduler (tabela
+maintenance_runs, uma linha por tarefa), compartilhada entre os workers: o
+worker que obtém o advisory lock da tarefa consulta quando ela rodou pela última
+vez (em qualquer worker) antes de executá-la de novo.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from src.repositories.base_repository import BaseRepository
+
+
+class MaintenanceRepository(BaseRepository):
+    """Repositório das execuções das tarefas de manutenção."""
+
+    def ran_within(self, name: str, seconds: float) -> bool:
+        """Indica se a tarefa terminou (em qualquer worker) há menos de seconds segundos."""
+        query = """
+            SELECT last_finished_at > NOW() - make_interval(secs => %s)
+            FROM maintenance_runs
+            WHERE name = %s;
+        """
+        def process_result(cursor):
+            row = cursor.fetchone()
+            return bool(row and row[0])
+        return self._execute_with_cursor(query, (seconds, name))(process_result)
+
+    def record_run(
+        self,
+        name: str,
+        status: str,
+        duration_seconds: float,
+        worker: str,
+        result: Any = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Registra o fim de uma execução ('succeeded' ou 'failed')."""
+        query = """
+            INSERT INTO maintenance_runs (
+                name, last_status, last_finished_at, last_duration_seconds, last_result, last_error,
+                last_worker, runs, failures
+            )
+            VALUES (%(name)s, %(status)s, NOW(), %(duration)s, %(result)s::jsonb, %(error)s, %(worker)s,
+                    1, CASE WHEN %(status)s = 'failed' THEN 1 ELSE 0 END)
+            ON CONFLICT (name) DO UPDATE SET
+                last_status = EXCLUDED.last_status,
+                last_finished_at = EXCLUDED.last_finished_at,
+                last_duration_seconds = EXCLUDED.last_duration_seconds,
+                last_result = EXCLUDED.last_result,
+                last_error = EXCLUDED.last_error,
+                last_worker = EXCLUDED.last_worker,
+                runs = maintenance_runs.runs + 1,
+                failures = maintenance_runs.failures + EXCLUDED.failures;
+        """
+        params = {
+            'name': name,
+            'status': status,
+            'duration': duration_seconds,
+            'result': json.dumps(result, default=str) if result is not None else None,
+            'error': error,
+            'worker': worker,
+        }
+        self._execute_with_cursor(query, params, commit=True)(lambda cursor: None)
+
+    def find_all(self) -> List[Dict[str, Any]]:
+        """Última execução de cada tarefa."""
+        query = """
+            SELECT name, last_status, last_finished_at, last_duration_seconds, last_result, last_error,
+                   last_worker, runs, failures
+            FROM maintenance_runs
+            ORDER BY name;
+        """
+        def process_result(cursor):
+            runs = self._rows_to_dicts(cursor, cursor.fetchall())
+            for run in runs:
+                if isinstance(run['last_finished_at'], datetime):
+                    run['last_finished_at'] = run['last_finished_at'].isoformat()
+            return runs
+        return self._execute_with_cursor(query)(process_result)
@@ -0,0 +1,292 @@
+"""
+Repositório de Notificações - Repository Pattern
+Responsável por todas as operações de acesso a dados relacionadas a notificações.
+As consultas por usuário usam os índices idx_notificacoes_user_unread e
+idx_notificacoes_user_created criados em init_db.
+
+Notificações geradas por eventos do outbox trazem source_event_id: uma notificação
+da mesma (user_id, task_id, type) que já reflete esse evento (ou um posterior) faz
+a nova ser ignorada, de modo que entregas repetidas do relay não duplicam nada.
+Resumos do modo digest (sem task_id) guardam o maior evento resumido e são
+comparados com os resumos anteriores do usuário.
+"""
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from src.repositories.base_repository import BaseRepository
+
+
+class NotificationRepository(BaseRepository):
+    """Repositório para operações de notificações persistidas no PostgreSQL."""
+
+    _COLUMNS = "id, user_id, type, title, message, task_id, task_title, created_at, read, updated_by, event_count"
+    _INSERT_COLUMNS = (
+        'user_id', 'type', 'title', 'message', 'task_id', 'task_title', 'updated_by', 'event_count', 'source_event_id'
+    )
+    _INCOMING_ROW = "(%s::int, %s, %s, %s, %s::int, %s, %s, %s::int, %s::bigint)"
+    # Recebidas que ainda não foram aplicadas (entregas repetidas do outbox ficam de fora)
+    _FRESH = """
+        SELECT * FROM incoming i
+        WHERE i.source_event_id IS NULL OR NOT EXISTS (
+            SELECT 1 FROM notificacoes n
+            WHERE n.user_id = i.user_id AND n.type = i.type
+              AND (n.task_id = i.task_id OR (n.task_id IS NULL AND i.task_id IS NULL))
+              AND n.source_event_id >= i.source_event_id
+        )
+    """
+    # Todos os workers leem a mesma tabela (nada a replicar entre processos)
+    is_shared = True
+
+    def create_many(
+        self,
+        notifications: List[Dict[str, Any]],
+        coalesce_seconds: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Insere várias notificações em um único comando.
+
+        Args:
+            notifications: Lista de dicionários com as colunas de _INSERT_COLUMNS
+                (event_count é opcional, padrão 1; source_event_id é opcional)
+            coalesce_seconds: Se informado, uma notificação do mesmo (user_id, task_id, type)
+                criada/atualizada nessa janela é atualizada no lugar (event_count
+                acumulado, volta a não lida) em vez de gerar uma nova linha.
+                As notificações recebidas devem ser únicas por essa chave.
+
+        Returns:
+            Notificações criadas ou atualizadas (com id, created_at, read e event_count)
+        """
+        if not notifications:
+            return []
+        if coalesce_seconds:
+            return self._upsert_coalesced(notifications, coalesce_seconds)
+
+        values = []
+        for notification in notifications:
+            values.extend(self._insert_values(notification))
+
+        query = f"""
+            WITH incoming ({', '.join(self._INSERT_COLUMNS)}) AS (
+                VALUES {', '.join([self._INCOMING_ROW] * len(notifications))}
+            ),
+            fresh AS ({self._FRESH})
+            INSERT INTO notificacoes ({', '.join(self._INSERT_COLUMNS)})
+            SELECT {', '.join(self._INSERT_COLUMNS)} FROM fresh
+            RETURNING {self._COLUMNS};
+        """
+        def process_result(cursor):
+            rows = cursor.fetchall()
+            created = self._rows_to_dicts(cursor, rows)
+            return [self._serialize_notification(notification) for notification in created]
+        return self._execute_with_cursor(query, tuple(values), commit=True)(process_result)
+
+    def _upsert_coalesced(self, notifications: List[Dict[str, Any]], coalesce_seconds: float) -> List[Dict[str, Any]]:
+        """
+        Atualiza as notificações recentes de mesma chave e insere as demais, em um
+        único comando (CTEs com UPDATE ... FROM e INSERT ... SELECT).
+        Usa o índice idx_notificacoes_coalesce.
+        """
+        columns = self._INSERT_COLUMNS
+        values = []
+        for notification in notifications:
+            values.extend(self._insert_values(notification))
+        values.append(coalesce_seconds)
+
+        query = f"""
+            WITH incoming ({', '.join(columns)}) AS (
+                VALUES {', '.join([self._INCOMING_ROW] * len(notifications))}
+            ),
+            fresh AS ({self._FRESH}),
+            coalesced AS (
+                UPDATE notificacoes n
+                SET title = i.title,
+                    message = i.message,
+                    task_title = i.task_title,
+                    updated_by = i.updated_by,
+                    event_count = n.event_count + i.event_count,
+                    source_event_id = COALESCE(i.source_event_id, n.source_event_id),
+                    created_at = NOW(),
+                    read = FALSE
+                FROM fresh i
+                WHERE n.user_id = i.user_id
+                  AND n.task_id = i.task_id
+                  AND n.type = i.type
+                  AND n.created_at >= NOW() - make_interval(secs => %s)
+                RETURNING {', '.join('n.' + column for column in self._COLUMNS.split(', '))}
+            ),
+            inserted AS (
+                INSERT INTO notificacoes ({', '.join(columns)})
+                SELECT {', '.join('i.' + column for column in columns)}
+                FROM fresh i
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM coalesced c
+                    WHERE c.user_id = i.user_id AND c.task_id = i.task_id AND c.type = i.type
+                )
+                RETURNING {self._COLUMNS}
+            )
+            SELECT {self._COLUMNS} FROM coalesced
+            UNION ALL
+            SELECT {self._COLUMNS} FROM inserted;
+        """
+        def process_result(cursor):
+            rows = cursor.fetchall()
+            saved = self._rows_to_dicts(cursor, rows)
+            return [self._serialize_notification(notification) for notification in saved]
+        return self._execute_with_cursor(query, tuple(values), commit=True)(process_result)
+
+    def find_by_user(
+        self,
+        user_id: int,
+        unread_only: bool = False,
+        limit: Optional[int] = None,
+        before: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retorna as notificações de um usuário, mais recentes primeiro.
+
+        Args:
+            user_id: ID do usuário
+            unread_only: Apenas não lidas
+            limit: Tamanho máximo da página (None = todas)
+            before: Cursor - id da última notificação da página anterior; retorna as
+                que vêm depois dela na ordem (created_at DESC, id DESC)
+        """
+        filters = ["user_id = %s"]
+        values: List[Any] = [user_id]
+        if unread_only:
+            filters.append("NOT read")
+        if before is not None:
+            filters.append("""(created_at, id) < (
+                SELECT created_at, id FROM notificacoes WHERE id = %s AND user_id = %s
+            )""")
+            values.extend([before, user_id])
+        limit_clause = ""
+        if limit is not None:
+            limit_clause = "LIMIT %s"
+            values.append(limit)
+
+        query = f"""
+            SELECT {self._COLUMNS}
+            FROM notificacoes
+            WHERE {' AND '.join(filters)}
+            ORDER BY created_at DESC, id DESC
+            {limit_clause};
+        """
+        def process_result(cursor):
+            rows = cursor.fetchall()
+            notifications = self._rows_to_dicts(cursor, rows)
+            return [self._serialize_notification(notification) for notification in notifications]
+        return self._execute_with_cursor(query, tuple(values))(process_result)
+
+    def count_unread(self, user_id: int) -> int:
+        """Conta as notificações não lidas de um usuário (usa o índice parcial)."""
+        query = "SELECT COUNT(*) FROM notificacoes WHERE user_id = %s AND NOT read;"
+        return self._execute_with_cursor(query, (user_id,))(lambda cursor: cursor.fetchone()[0])
+
+    def mark_as_read(self, notification_id: int, user_id: int) -> bool:
+        """Marca uma notificação do usuário como lida."""
+        query = """
+            UPDATE notificacoes
+            SET read = TRUE
+            WHERE id = %s AND user_id = %s
+            RETURNING id;
+        """
+        def process_result(cursor):
+            return cursor.fetchone() is not None
+        return self._execute_with_cursor(query, (notification_id, user_id), commit=True)(process_result)
+
+    def mark_many_as_read(self, notification_ids: List[int], user_id: int) -> List[int]:
+        """
+        Marca várias notificações do usuário como lidas em um único UPDATE.
+
+        Returns:
+            Ids que estavam não lidas e foram marcadas
+        """
+        if not notification_ids:
+            return []
+        query = """
+            UPDATE notificacoes
+            SET read = TRUE
+            WHERE user_id = %s AND id = ANY(%s) AND NOT read
+            RETURNING id;
+        """
+        def process_result(cursor):
+            return [row[0] for row in cursor.fetchall()]
+        return self._execute_with_cursor(query, (user_id, list(notification_ids)), commit=True)(process_result)
+
+    def mark_all_as_read(self, user_id: int) -> int:
+        """Marca todas as notificações não lidas do usuário como lidas."""
+        query = """
+            UPDATE notificacoes
+            SET read = TRUE
+            WHERE user_id = %s AND NOT read;
+        """
+        return self._execute_with_cursor(query, (user_id,), commit=True)(lambda cursor: cursor.rowcount)
+
+    def compact(
+        self,
+        max_age_seconds: Optional[float] = None,
+        max_per_user: Optional[int] = None,
+        read_expiry_seconds: Optional[float] = None
+    ) -> int:
+        """
+        Remove, em um único DELETE, as notificações fora da política de retenção.
+        Critérios com valor None (ou 0) são ignorados.
+
+        Args:
+            max_age_seconds: Idade máxima de qualquer notificação
+            max_per_user: Quantidade máxima por usuário (mantém as mais recentes)
+            read_expiry_seconds: Idade máxima das notificações já lidas
+
+        Returns:
+            Número de notificações removidas
+        """
+        conditions = []
+        values: List[Any] = []
+        if max_age_seconds:
+            conditions.append("created_at < NOW() - make_interval(secs => %s)")
+            values.append(max_age_seconds)
+        if read_expiry_seconds:
+            conditions.append("(read AND created_at < NOW() - make_interval(secs => %s))")
+            values.append(read_expiry_seconds)
+        if max_per_user:
+            conditions.append("""id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id ORDER BY created_at DESC, id DESC
+                    ) AS position
+                    FROM notificacoes
+                ) ranked
+                WHERE position > %s
+            )""")
+            values.append(max_per_user)
+        if not conditions:
+            return 0
+
+        query = f"DELETE FROM notificacoes WHERE {' OR '.join(conditions)};"
+        return self._execute_with_cursor(query, tuple(values), commit=True)(lambda cursor: cursor.rowcount)
+
+    def stats(self) -> Dict[str, int]:
+        """Tamanho do armazenamento: total de notificações, usuários com notificações e não lidas."""
+        query = """
+            SELECT COUNT(*), COUNT(DISTINCT user_id), COUNT(*) FILTER (WHERE NOT read)
+            FROM notificacoes;
+        """
+        def process_result(cursor):
+            total, users, unread = cursor.fetchone()
+            return {'notifications': total, 'users': users, 'unread': unread}
+        return self._execute_with_cursor(query)(process_result)
+
+    @classmethod
+    def _insert_values(cls, notification: Dict[str, Any]) -> List[Any]:
+        return [
+            (notification.get(column) or 1) if column == 'event_count' else notification.get(column)
+            for column in cls._INSERT_COLUMNS
+        ]
+
+    @staticmethod
+    def _serialize_notification(notification: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte campos datetime para string ISO format."""
+        if notification and 'created_at' in notification and notification['created_at'] is not None:
+            if isinstance(notification['created_at'], datetime):
+                notification['created_at'] = notification['created_at'].isoformat()
+        return notification
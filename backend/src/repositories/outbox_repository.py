@@ -0,0 +1,79 @@
+"""
+Repositório do Outbox - Repository Pattern
+Leitura e confirmação dos eventos de tarefa gravados em task_outbox pelo
+TaskRepository (na mesma transação do UPDATE). Usado pelo OutboxRelay.
+As consultas de pendentes usam o índice parcial idx_task_outbox_pending.
+"""
+from typing import Any, Dict, List
+from src.repositories.base_repository import BaseRepository
+
+
+class OutboxRepository(BaseRepository):
+    """Repositório dos eventos de tarefa pendentes de entrega."""
+
+    def fetch_pending(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Retorna os eventos ainda não entregues, na ordem em que foram gravados."""
+        query = """
+            SELECT id, event_type, task_id, payload, created_at, attempts
+            FROM task_outbox
+            WHERE delivered_at IS NULL
+            ORDER BY id
+            LIMIT %s;
+        """
+        def process_result(cursor):
+            rows = cursor.fetchall()
+            return self._rows_to_dicts(cursor, rows)
+        return self._execute_with_cursor(query, (limit,))(process_result)
+
+    def mark_delivered(self, event_ids: List[int]) -> int:
+        """Confirma a entrega dos eventos informados."""
+        if not event_ids:
+            return 0
+        query = """
+            UPDATE task_outbox
+            SET delivered_at = NOW()
+            WHERE id = ANY(%s) AND delivered_at IS NULL;
+        """
+        return self._execute_with_cursor(query, (list(event_ids),), commit=True)(lambda cursor: cursor.rowcount)
+
+    def mark_failed(self, event_id: int, error: str, max_attempts: int) -> bool:
+        """
+        Registra uma falha de entrega. Ao atingir max_attempts o evento é descartado
+        (delivered_at preenchido, last_error mantido para análise).
+
+        Returns:
+            True se o evento foi descartado
+        """
+        query = """
+            UPDATE task_outbox
+            SET attempts = attempts + 1,
+                last_error = %s,
+                delivered_at = CASE WHEN attempts + 1 >= %s THEN NOW() END
+            WHERE id = %s
+            RETURNING delivered_at IS NOT NULL;
+        """
+        def process_result(cursor):
+            row = cursor.fetchone()
+            return bool(row and row[0])
+        return self._execute_with_cursor(query, (error[:1000], max_attempts, event_id), commit=True)(process_result)
+
+    def purge_delivered(self, older_than_seconds: float) -> int:
+        """Remove os eventos entregues há mais de older_than_seconds."""
+        query = """
+            DELETE FROM task_outbox
+            WHERE delivered_at IS NOT NULL
+              AND delivered_at < NOW() - make_interval(secs => %s);
+        """
+        return self._execute_with_cursor(query, (older_than_seconds,), commit=True)(lambda cursor: cursor.rowcount)
+
+    def stats(self) -> Dict[str, Any]:
+        """Eventos pendentes e idade do mais antigo (segundos)."""
+        query = """
+            SELECT COUNT(*), EXTRACT(EPOCH FROM NOW() - MIN(created_at))
+            FROM task_outbox
+            WHERE delivered_at IS NULL;
+        """
+        def process_result(cursor):
+            pending, oldest = cursor.fetchone()
+            return {'pending': pending, 'oldest_pending_seconds': round(float(oldest), 3) if oldest is not None else None}
+        return self._execute_with_cursor(query)(process_result)
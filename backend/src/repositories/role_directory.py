@@ -0,0 +1,109 @@
+"""
+Diretório de papéis - cache dos ids de usuários por role
+Usado para resolver os destinatários das notificações de revisão (admin e
+gerencial) sem listar a tabela de usuários a cada tarefa que entra em revisão.
+
+- Cada role é carregado uma vez com uma consulta indexada (idx_usuarios_role) e
+  guardado como frozenset; members() só une os conjuntos pedidos.
+- UserRepository.create/update/delete invalidam o diretório. Com um PgEventBus
+  associado, a invalidação é repassada aos demais workers.
+- Um número de geração descarta cargas iniciadas antes de uma invalidação,
+  para que uma consulta lenta não grave um conjunto já desatualizado.
+- ttl_seconds limita a idade de cada entrada caso um evento de invalidação se perca.
+"""
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+class RoleDirectory:
+    """Cache de membros por role, invalidado nas escritas de usuários."""
+
+    INVALIDATED = 'role_directory.invalidated'
+
+    def __init__(self, user_repository=None, ttl_seconds: float = 300.0):
+        """
+        Args:
+            user_repository: Repositório usado para carregar os membros (padrão: UserRepository)
+            ttl_seconds: Idade máxima de uma entrada em cache
+        """
+        self._user_repository = user_repository
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # role -> (ids, instante da carga)
+        self._members: Dict[str, Tuple[FrozenSet[int], float]] = {}
+        self._generation = 0
+        self._event_bus = None
+        self._metrics = {'hits': 0, 'loads': 0, 'invalidations': 0}
+
+    @property
+    def user_repository(self):
+        if self._user_repository is None:
+            # Import tardio: o UserRepository importa este módulo para invalidar o cache
+            from src.repositories.user_repository import UserRepository
+            self._user_repository = UserRepository()
+        return self._user_repository
+
+    def attach_event_bus(self, event_bus) -> None:
+        """Repassa as invalidações aos demais workers e aplica as recebidas deles."""
+        self._event_bus = event_bus
+        event_bus.subscribe(self.INVALIDATED, lambda data: self._drop(data.get('roles')))
+        # Invalidações enviadas enquanto o LISTEN estava desconectado foram perdidas
+        event_bus.subscribe(event_bus.RECONNECTED, lambda data: self._drop(None))
+
+    def members(self, roles: Iterable[str]) -> List[int]:
+        """
+        Retorna os ids (ordenados) dos usuários com qualquer um dos roles informados.
+        Apenas os roles ausentes do cache (ou expirados) são consultados no banco.
+        """
+        roles = list(roles)
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            cached = {
+                role: entry[0] for role, entry in ((role, self._members.get(role)) for role in roles)
+                if entry is not None and now - entry[1] < self.ttl_seconds
+            }
+        missing = [role for role in roles if role not in cached]
+        if missing:
+            loaded = self.user_repository.find_ids_by_roles(missing)
+            with self._lock:
+                self._metrics['loads'] += 1
+                for role in missing:
+                    ids = frozenset(loaded.get(role, ()))
+                    cached[role] = ids
+                    if generation == self._generation:
+                        self._members[role] = (ids, now)
+        else:
+            self._metrics['hits'] += 1
+        return sorted(set().union(*cached.values()))
+
+    def invalidate(self, roles: Optional[Iterable[str]] = None) -> None:
+        """
+        Descarta os roles informados (ou todos) neste processo e nos demais.
+
+        Args:
+            roles: Roles afetados pela escrita; None quando não se sabe quais
+        """
+        roles = list(roles) if roles is not None else None
+        self._drop(roles)
+        if self._event_bus is not None:
+            self._event_bus.publish(self.INVALIDATED, {'roles': roles})
+
+    def _drop(self, roles: Optional[List[str]]) -> None:
+        with self._lock:
+            self._generation += 1
+            self._metrics['invalidations'] += 1
+            if roles is None:
+                self._members.clear()
+            else:
+                for role in roles:
+                    self._members.pop(role, None)
+
+    def metrics(self) -> Dict[str, int]:
+        """Acertos, cargas do banco e invalidações."""
+        return {'cached_roles': len(self._members), **self._metrics}
+
+
+# Instância do processo, invalidada pelo UserRepository
+role_directory = RoleDirectory()
@@ -1,22 +1,67 @@
 """
 Repositório de Tarefas - Repository Pattern
 Responsável por todas as operações de acesso a dados relacionadas a tarefas.
+Mudanças de status podem ser registradas no outbox (task_outbox) no mesmo comando
+do UPDATE, para que o evento nunca se perca entre o commit e a entrega.
+A ordem dos cartões em cada coluna do quadro é a de tarefas.position (índices
+fracionários, ver src/core/fractional_index.py): mover um cartão grava só ele.
 """
-from typing import Optional, List, Dict, Any
+import json
+from typing import Optional, Iterable, List, Dict, Any, Tuple
 from datetime import datetime
+from src.config.settings import get_section
+from src.core.fractional_index import APPEND_POSITION_SQL, key_between, keys_after, keys_for
 from src.repositories.base_repository import BaseRepository
 
+settings = get_section('tasks', {'position_max_length': 32})
+
+# Evento 'task.status_changed' gravado no task_outbox no mesmo comando do UPDATE
+# (CTE "updated" com old_status; parâmetro %(updated_by)s)
+_STATUS_EVENT_CTE = """,
+            outbox AS (
+                INSERT INTO task_outbox (event_type, task_id, payload)
+                SELECT 'task.status_changed', u.id, jsonb_build_object(
+                    'task', jsonb_build_object(
+                        'id', u.id, 'titulo', u.titulo, 'descricao', u.descricao,
+                        'status', u.status, 'owner_id', u.owner_id, 'created_at', u.created_at,
+                        'owner_username', (SELECT username FROM usuarios WHERE id = u.owner_id)
+                    ),
+                    'old_status', u.old_status,
+                    'new_status', u.status,
+                    'updated_by', %(updated_by)s::jsonb
+                )
+                FROM updated u
+                WHERE u.status IS DISTINCT FROM u.old_status
+                RETURNING id
+            )"""
+
 
 class TaskRepository(BaseRepository):
     """Repositório para operações CRUD de tarefas."""
     
-    def find_all(self) -> List[Dict[str, Any]]:
-        """Retorna todas as tarefas com informações do responsável."""
-        query = """
-            SELECT t.id, t.titulo, t.descricao, t.status, t.owner_id, t.created_at,
-                   u.username as owner_username
+    # Campos selecionáveis em find_all(fields=...) e a expressão SQL de cada um
+    _FIELD_COLUMNS = {
+        'id': 't.id',
+        'titulo': 't.titulo',
+        'descricao': 't.descricao',
+        'status': 't.status',
+        'owner_id': 't.owner_id',
+        'created_at': 't.created_at',
+        'owner_username': 'u.username as owner_username',
+    }
+    
+    def find_all(self, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna todas as tarefas com informações do responsável.
+        
+        Args:
+            fields: Campos retornados (padrão: todos). O JOIN com usuarios só é
+                feito quando owner_username é pedido.
+        """
+        query = f"""
+            SELECT {self._select_list(fields)}
             FROM tarefas t
-            LEFT JOIN usuarios u ON t.owner_id = u.id
+            {'LEFT JOIN usuarios u ON t.owner_id = u.id' if fields is None or 'owner_username' in fields else ''}
             ORDER BY t.id;
         """
         def process_result(cursor):
@@ -25,6 +70,107 @@ class TaskRepository(BaseRepository):
             return [self._serialize_task(task) for task in tasks]
         return self._execute_with_cursor(query)(process_result)
     
+    def copy_export(
+        self,
+        file: Any,
+        export_format: str,
+        owner_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> None:
+        """
+        Exporta as tarefas com COPY (SELECT ...) TO STDOUT: o PostgreSQL gera o CSV
+        (com cabeçalho) ou o NDJSON (um objeto JSON por linha) e a saída é escrita
+        em file à medida que chega, sem criar tuplas ou dicionários por linha.
+
+        Args:
+            file: Destino da saída (objeto com write())
+            export_format: "csv" ou "ndjson"
+            owner_id: Apenas as tarefas deste responsável (None: todas)
+            status: Apenas as tarefas neste status (None: todos)
+        """
+        select = """
+            SELECT t.id, t.titulo, t.descricao, t.status, t.owner_id,
+                   u.username AS owner_username, t.created_at
+            FROM tarefas t
+            LEFT JOIN usuarios u ON t.owner_id = u.id
+            WHERE (%(owner_id)s::int IS NULL OR t.owner_id = %(owner_id)s)
+              AND (%(status)s::task_status IS NULL OR t.status = %(status)s::task_status)
+            ORDER BY t.id
+        """
+        if export_format == 'csv':
+            query = f"COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+        else:
+            # CSV com aspas e separador que o JSON nunca contém (row_to_json escapa
+            # caracteres de controle): cada linha sai como o JSON puro, sem o
+            # escape de barras invertidas do formato texto do COPY
+            query = (
+                f"COPY (SELECT row_to_json(e) FROM ({select}) e) TO STDOUT "
+                "WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+            )
+        self._copy_to(query, file, {'owner_id': owner_id, 'status': status})
+    
+    def find_board(
+        self,
+        limit: int,
+        status: Optional[str] = None,
+        after: Optional[Tuple[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Quadro Kanban em uma única consulta: para cada valor de task_status (na
+        ordem do ENUM), o total de tarefas e as primeiras `limit` + 1 tarefas na
+        ordem do quadro (position, id); a linha extra indica que a coluna tem mais.
+
+        Args:
+            limit: Tarefas por coluna
+            status: Apenas esta coluna ("carregar mais")
+            after: (position, id) da última tarefa já carregada (cursor da coluna)
+
+        Returns:
+            Uma linha por tarefa com 'column_status' e 'column_total'; colunas sem
+            tarefas na página aparecem em uma linha com id None
+        """
+        query = """
+            SELECT s.status::text AS column_status, c.total AS column_total,
+                   t.id, t.titulo, t.descricao, t.status, t.owner_id, t.created_at, t.owner_username,
+                   t.position
+            FROM unnest(enum_range(NULL::task_status)) WITH ORDINALITY AS s(status, ord)
+            CROSS JOIN LATERAL (
+                SELECT COUNT(*) AS total FROM tarefas WHERE status = s.status
+            ) c
+            LEFT JOIN LATERAL (
+                SELECT t.id, t.titulo, t.descricao, t.status, t.owner_id, t.created_at, t.position,
+                       u.username as owner_username
+                FROM tarefas t
+                LEFT JOIN usuarios u ON t.owner_id = u.id
+                WHERE t.status = s.status
+                  AND (%(after_id)s::int IS NULL OR (t.position, t.id) > (%(after_position)s, %(after_id)s))
+                ORDER BY t.position, t.id
+                LIMIT %(limit)s
+            ) t ON TRUE
+            WHERE %(status)s::task_status IS NULL OR s.status = %(status)s::task_status
+            ORDER BY s.ord, t.position, t.id;
+        """
+        after_position, after_id = after or (None, None)
+        params = {
+            'limit': limit + 1, 'status': status, 'after_position': after_position, 'after_id': after_id
+        }
+        def process_result(cursor):
+            rows = cursor.fetchall()
+            tasks = self._rows_to_dicts(cursor, rows)
+            return [self._serialize_task(task) for task in tasks]
+        return self._execute_with_cursor(query, params)(process_result)
+
+    @classmethod
+    def _select_list(cls, fields: Optional[Iterable[str]]) -> str:
+        """Lista de colunas do SELECT para os campos pedidos (na ordem padrão)."""
+        if fields is None:
+            return ', '.join(cls._FIELD_COLUMNS.values())
+        fields = set(fields)
+        unknown = fields - cls._FIELD_COLUMNS.keys()
+        if unknown or not fields:
+            raise ValueError(f"Campos de tarefa inválidos: {sorted(unknown)}")
+        return ', '.join(column for name, column in cls._FIELD_COLUMNS.items() if name in fields)
+    
     def find_by_id(self, task_id: int) -> Optional[Dict[str, Any]]:
         """Busca uma tarefa pelo ID."""
         query = """
@@ -81,15 +227,17 @@ class TaskRepository(BaseRepository):
         status: str, 
         owner_id: int
     ) -> Dict[str, Any]:
-        """Cria uma nova tarefa."""
+        """Cria uma nova tarefa, no fim da coluna do seu status."""
         # Validar que o status é um valor válido
         valid_statuses = ['pendente', 'em_andamento', 'em_revisao', 'concluida']
         if status not in valid_statuses:
             raise ValueError(f"Status inválido: {status}. Valores válidos: {valid_statuses}")
         
+        # Criações simultâneas na mesma coluna podem repetir a chave: o id desempata
+        # e o primeiro movimento entre elas rebalanceia a coluna
         query = f"""
-            INSERT INTO tarefas (titulo, descricao, status, owner_id) 
-            VALUES (%s, %s, '{status}'::task_status, %s) 
+            INSERT INTO tarefas (titulo, descricao, status, owner_id, position) 
+            VALUES (%(titulo)s, %(descricao)s, %(status)s::task_status, %(owner_id)s, {APPEND_POSITION_SQL}) 
             RETURNING id;
         """
         def process_result(cursor):
@@ -110,56 +258,385 @@ class TaskRepository(BaseRepository):
                 "owner_id": owner_id,
                 "owner_username": owner_username
             }
-        return self._execute_with_cursor(query, (titulo, descricao, owner_id), commit=True)(process_result)
+        params = {'titulo': titulo, 'descricao': descricao, 'status': status, 'owner_id': owner_id}
+        return self._execute_with_cursor(query, params, commit=True)(process_result)
     
+    def bulk_create(self, tasks: List[Dict[str, Any]]) -> int:
+        """
+        Cria várias tarefas em uma transação: as linhas (titulo, descricao, status,
+        owner_id) são carregadas com COPY em uma tabela temporária e inseridas com
+        um único INSERT ... SELECT, na ordem recebida. As tarefas vão para o fim da
+        coluna do seu status (keys_after a partir da maior posição atual).
+        
+        Returns:
+            Número de tarefas criadas
+        """
+        query = """
+            CREATE TEMP TABLE import_tarefas (
+                ord INT NOT NULL,
+                titulo TEXT NOT NULL,
+                descricao TEXT,
+                status task_status NOT NULL,
+                owner_id INT NOT NULL,
+                position TEXT COLLATE "C" NOT NULL
+            ) ON COMMIT DROP;
+            SELECT status::text, MAX(position)
+            FROM tarefas
+            WHERE status = ANY(%s::task_status[])
+            GROUP BY status;
+        """
+        columns: Dict[str, List[int]] = {}
+        for index, task in enumerate(tasks):
+            columns.setdefault(task['status'], []).append(index)
+        def process_result(cursor):
+            last_positions = dict(cursor.fetchall())
+            positions: Dict[int, str] = {}
+            for column_status, indexes in columns.items():
+                positions.update(zip(indexes, keys_after(last_positions.get(column_status), len(indexes))))
+            self._copy_rows(
+                cursor,
+                "import_tarefas (ord, titulo, descricao, status, owner_id, position)",
+                (
+                    (index, task['titulo'], task.get('descricao'), task['status'], task['owner_id'], positions[index])
+                    for index, task in enumerate(tasks)
+                )
+            )
+            cursor.execute("""
+                INSERT INTO tarefas (titulo, descricao, status, owner_id, position)
+                SELECT titulo, descricao, status, owner_id, position
+                FROM import_tarefas
+                ORDER BY ord;
+            """)
+            return cursor.rowcount
+        return self._execute_with_cursor(query, (list(columns),), commit=True)(process_result)
+
+    def count_by_owner(self, owner_id: int, status: Optional[str] = None) -> int:
+        """Conta as tarefas de um usuário (opcionalmente, apenas de um status)."""
+        query = """
+            SELECT COUNT(*) FROM tarefas
+            WHERE owner_id = %s AND (%s::task_status IS NULL OR status = %s::task_status);
+        """
+        return self._execute_with_cursor(query, (owner_id, status, status))(lambda cursor: cursor.fetchone()[0])
+
+    def reassign_batch(self, from_owner_id: int, to_owner_id: int, status: Optional[str], limit: int) -> int:
+        """
+        Transfere até limit tarefas de from_owner_id para to_owner_id em uma
+        transação curta. Linhas bloqueadas por uma edição em andamento são
+        aguardadas (transações curtas); uma linha que mudou de responsável nesse
+        meio tempo sai do lote, que pode voltar menor (ou vazio) mesmo restando
+        tarefas - reassign_tasks confere o que falta com count_by_owner.
+
+        Returns:
+            Número de tarefas transferidas
+        """
+        query = """
+            WITH lote AS (
+                SELECT id FROM tarefas
+                WHERE owner_id = %(from_owner_id)s
+                  AND (%(status)s::task_status IS NULL OR status = %(status)s::task_status)
+                ORDER BY id
+                LIMIT %(limit)s
+                FOR UPDATE
+            )
+            UPDATE tarefas t
+            SET owner_id = %(to_owner_id)s
+            FROM lote
+            WHERE t.id = lote.id;
+        """
+        params = {'from_owner_id': from_owner_id, 'to_owner_id': to_owner_id, 'status': status, 'limit': limit}
+        return self._execute_with_cursor(query, params, commit=True)(lambda cursor: cursor.rowcount)
+
     def update(
         self,
         task_id: int,
         titulo: Optional[str] = None,
         descricao: Optional[str] = None,
         status: Optional[str] = None,
-        owner_id: Optional[int] = None
-    ) -> bool:
-        """Atualiza uma tarefa existente."""
-        updates = []
-        values = []
+        owner_id: Optional[int] = None,
+        record_status_event: bool = False,
+        updated_by: Optional[Dict[str, Any]] = None
+    ) -> Optional[List[str]]:
+        """
+        Atualiza uma tarefa existente (campos None não são alterados).
+        A linha é lida com FOR UPDATE e o UPDATE só acontece se algum campo for
+        diferente do atual (IS DISTINCT FROM): valores iguais não geram escrita.
         
+        Args:
+            record_status_event: Se o status mudar, grava o evento 'task.status_changed'
+                no task_outbox no mesmo comando do UPDATE
+            updated_by: Usuário que fez a atualização (vai no payload do evento)
+        
+        Returns:
+            Campos que mudaram ([] se nenhum), ou None se a tarefa não existe
+        """
+        params: Dict[str, Any] = {'task_id': task_id}
+        # Coluna -> expressão do novo valor
+        assignments: Dict[str, str] = {}
         if titulo is not None:
-            updates.append("titulo = %s")
-            values.append(titulo)
+            assignments['titulo'] = '%(titulo)s'
+            params['titulo'] = titulo
         if descricao is not None:
-            updates.append("descricao = %s")
-            values.append(descricao)
+            assignments['descricao'] = '%(descricao)s'
+            params['descricao'] = descricao
         if status is not None:
             # Validar que o status é um valor válido
             valid_statuses = ['pendente', 'em_andamento', 'em_revisao', 'concluida']
             if status not in valid_statuses:
                 raise ValueError(f"Status inválido: {status}. Valores válidos: {valid_statuses}")
-            # Usar função SQL para fazer o cast corretamente
-            # O psycopg2 escapa strings, então precisamos usar uma função SQL
-            updates.append(f"status = '{status}'::task_status")
-            # Não adicionar status aos values, pois já está na query
+            assignments['status'] = '%(status)s::task_status'
+            params['status'] = status
         if owner_id is not None:
-            updates.append("owner_id = %s")
-            values.append(owner_id)
+            assignments['owner_id'] = '%(owner_id)s'
+            params['owner_id'] = owner_id
         
-        if not updates:
-            return False
+        if not assignments:
+            return []
         
-        values.append(task_id)
-        # Construir a query com os placeholders corretos
+        outbox = ""
+        if record_status_event and status is not None:
+            outbox = _STATUS_EVENT_CTE
+            params['updated_by'] = json.dumps(updated_by, default=str) if updated_by else None
+        
+        distinct = {column: f"p.{column} IS DISTINCT FROM {value}" for column, value in assignments.items()}
+        set_list = ', '.join(f"{column} = {value}" for column, value in assignments.items())
+        if 'status' in assignments:
+            # Mudou de coluna: vai para o fim da nova coluna
+            set_list += f", position = CASE WHEN {distinct['status']} THEN {APPEND_POSITION_SQL} ELSE t.position END"
+        changed_list = ', '.join(f"CASE WHEN {guard} THEN '{column}' END" for column, guard in distinct.items())
         query = f"""
-            UPDATE tarefas 
-            SET {', '.join(updates)} 
-            WHERE id = %s 
-            RETURNING id;
+            WITH previous AS (
+                SELECT id, titulo, descricao, status, owner_id FROM tarefas WHERE id = %(task_id)s FOR UPDATE
+            ),
+            updated AS (
+                UPDATE tarefas t
+                SET {set_list}
+                FROM previous p
+                WHERE t.id = p.id AND ({' OR '.join(distinct.values())})
+                RETURNING t.id, t.titulo, t.descricao, t.status, t.owner_id, t.created_at,
+                          p.status AS old_status
+            ){outbox}
+            SELECT ARRAY_REMOVE(ARRAY[{changed_list}]::text[], NULL)
+            FROM previous p;
         """
         
         def process_result(cursor):
-            updated_id = cursor.fetchone()
-            return updated_id is not None
-        return self._execute_with_cursor(query, tuple(values), commit=True)(process_result)
+            row = cursor.fetchone()
+            return list(row[0]) if row else None
+        return self._execute_with_cursor(query, params, commit=True)(process_result)
     
+    def update_status(
+        self,
+        task_id: int,
+        status: str,
+        record_status_event: bool = False,
+        updated_by: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Muda apenas o status, em um único UPDATE condicional (WHERE status <> novo):
+        transições para o mesmo status não escrevem nada. A tarefa vai para o fim
+        da nova coluna (para escolher o lugar, use move()).
+        
+        Args:
+            record_status_event: Grava o evento 'task.status_changed' no task_outbox
+                no mesmo comando, apenas se o status mudou
+            updated_by: Usuário que fez a atualização (vai no payload do evento)
+        
+        Returns:
+            None se a tarefa não existe; senão id, status, old_status, changed e, se
+            mudou, os dados da tarefa usados no evento
+        """
+        valid_statuses = ['pendente', 'em_andamento', 'em_revisao', 'concluida']
+        if status not in valid_statuses:
+            raise ValueError(f"Status inválido: {status}. Valores válidos: {valid_statuses}")
+        outbox = _STATUS_EVENT_CTE if record_status_event else ""
+        query = f"""
+            WITH previous AS (
+                SELECT id, status FROM tarefas WHERE id = %(task_id)s FOR UPDATE
+            ),
+            updated AS (
+                UPDATE tarefas t
+                SET status = %(status)s::task_status, position = {APPEND_POSITION_SQL}
+                FROM previous p
+                WHERE t.id = p.id AND p.status <> %(status)s::task_status
+                RETURNING t.id, t.titulo, t.descricao, t.status, t.owner_id, t.created_at,
+                          p.status AS old_status
+            ){outbox}
+            SELECT p.id, COALESCE(u.status, p.status) AS status, p.status AS old_status,
+                   u.id IS NOT NULL AS changed, u.titulo, u.descricao, u.owner_id, u.created_at
+            FROM previous p
+            LEFT JOIN updated u ON u.id = p.id;
+        """
+        params = {'task_id': task_id, 'status': status}
+        if record_status_event:
+            params['updated_by'] = json.dumps(updated_by, default=str) if updated_by else None
+        
+        def process_result(cursor):
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return self._serialize_task(self._row_to_dict(cursor, row))
+        return self._execute_with_cursor(query, params, commit=True)(process_result)
+    
+    def move(
+        self,
+        task_id: int,
+        status: str,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        record_status_event: bool = False,
+        updated_by: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Move a tarefa para uma coluna (status) e um lugar dentro dela, gravando
+        apenas a tarefa movida: a nova position fica entre as chaves dos vizinhos.
+        A coluna só é rebalanceada (todas as chaves regravadas) quando a chave nova
+        passaria de tasks.position_max_length ou os vizinhos têm chaves repetidas.
+
+        Args:
+            after_id: Cartão logo acima do lugar de destino
+            before_id: Cartão logo abaixo (usado quando after_id não é informado);
+                sem nenhum dos dois, a tarefa vai para o fim da coluna
+            record_status_event: Se o status mudar, grava o evento no task_outbox
+                no mesmo comando do UPDATE
+            updated_by: Usuário que fez a atualização (vai no payload do evento)
+
+        Returns:
+            None se a tarefa não existe; senão id, status, old_status, changed,
+            position, rebalanced e os dados da tarefa usados no evento
+
+        Raises:
+            ValueError: Cartão de referência inexistente ou fora da coluna de destino
+        """
+        valid_statuses = ['pendente', 'em_andamento', 'em_revisao', 'concluida']
+        if status not in valid_statuses:
+            raise ValueError(f"Status inválido: {status}. Valores válidos: {valid_statuses}")
+        query = "SELECT id FROM tarefas WHERE id = %s FOR UPDATE;"
+
+        def process_result(cursor):
+            if not cursor.fetchone():
+                return None
+            lower, upper = self._neighbor_positions(cursor, task_id, status, after_id, before_id)
+            try:
+                position = key_between(lower, upper)
+            except ValueError:
+                position = None
+            rebalanced = position is None or len(position) > settings['position_max_length']
+            if rebalanced:
+                self._rebalance(cursor, status, exclude_id=task_id)
+                lower, upper = self._neighbor_positions(cursor, task_id, status, after_id, before_id)
+                position = key_between(lower, upper)
+
+            params = {'task_id': task_id, 'status': status, 'position': position}
+            outbox = ""
+            if record_status_event:
+                outbox = _STATUS_EVENT_CTE
+                params['updated_by'] = json.dumps(updated_by, default=str) if updated_by else None
+            cursor.execute(f"""
+                WITH previous AS (
+                    SELECT id, status FROM tarefas WHERE id = %(task_id)s
+                ),
+                updated AS (
+                    UPDATE tarefas t
+                    SET status = %(status)s::task_status, position = %(position)s
+                    FROM previous p
+                    WHERE t.id = p.id
+                    RETURNING t.id, t.titulo, t.descricao, t.status, t.owner_id, t.created_at, t.position,
+                              p.status AS old_status
+                ){outbox}
+                SELECT u.id, u.status, u.old_status, u.status <> u.old_status AS changed, u.position,
+                       u.titulo, u.descricao, u.owner_id, u.created_at
+                FROM updated u;
+            """, params)
+            task = self._serialize_task(self._row_to_dict(cursor, cursor.fetchone()))
+            task['rebalanced'] = rebalanced
+            return task
+        return self._execute_with_cursor(query, (task_id,), commit=True)(process_result)
+
+    @staticmethod
+    def _neighbor_positions(
+        cursor,
+        task_id: int,
+        status: str,
+        after_id: Optional[int],
+        before_id: Optional[int]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Chaves (anterior, seguinte) do lugar de destino, sem contar a própria tarefa."""
+        params = {'task_id': task_id, 'status': status, 'anchor_id': after_id or before_id}
+        if after_id is not None:
+            cursor.execute("""
+                SELECT a.position, (
+                    SELECT n.position FROM tarefas n
+                    WHERE n.status = a.status AND n.id <> %(task_id)s AND (n.position, n.id) > (a.position, a.id)
+                    ORDER BY n.position, n.id LIMIT 1
+                )
+                FROM tarefas a
+                WHERE a.id = %(anchor_id)s AND a.status = %(status)s::task_status AND a.id <> %(task_id)s;
+            """, params)
+        elif before_id is not None:
+            cursor.execute("""
+                SELECT (
+                    SELECT n.position FROM tarefas n
+                    WHERE n.status = a.status AND n.id <> %(task_id)s AND (n.position, n.id) < (a.position, a.id)
+                    ORDER BY n.position DESC, n.id DESC LIMIT 1
+                ), a.position
+                FROM tarefas a
+                WHERE a.id = %(anchor_id)s AND a.status = %(status)s::task_status AND a.id <> %(task_id)s;
+            """, params)
+        else:
+            cursor.execute("""
+                SELECT MAX(position), NULL FROM tarefas
+                WHERE status = %(status)s::task_status AND id <> %(task_id)s;
+            """, params)
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Tarefa de referência {params['anchor_id']} não está na coluna '{status}'")
+        return row[0], row[1]
+
+    def find_columns_to_rebalance(self, max_length: int) -> List[str]:
+        """Colunas com alguma chave maior que max_length ou com chaves repetidas."""
+        query = """
+            SELECT status::text FROM tarefas
+            GROUP BY status
+            HAVING MAX(length(position)) > %s OR COUNT(DISTINCT position) < COUNT(*)
+            ORDER BY status;
+        """
+        return self._execute_with_cursor(query, (max_length,))(lambda cursor: [row[0] for row in cursor.fetchall()])
+
+    def rebalance_column(self, status: str) -> int:
+        """
+        Regrava as chaves de uma coluna (mesma ordem) em uma transação própria.
+
+        Returns:
+            Número de tarefas regravadas
+        """
+        query = "SELECT %s::task_status;"
+        return self._execute_with_cursor(query, (status,), commit=True)(
+            lambda cursor: self._rebalance(cursor, status)
+        )
+
+    @staticmethod
+    def _rebalance(cursor, status: str, exclude_id: Optional[int] = None) -> int:
+        """
+        Regrava as chaves da coluna com keys_for() (curtas e igualmente espaçadas),
+        mantendo a ordem atual. Roda na transação do chamador.
+
+        Returns:
+            Número de tarefas regravadas
+        """
+        cursor.execute("""
+            SELECT id FROM tarefas
+            WHERE status = %(status)s::task_status AND id IS DISTINCT FROM %(exclude_id)s
+            ORDER BY position, id
+            FOR UPDATE;
+        """, {'status': status, 'exclude_id': exclude_id})
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("""
+            UPDATE tarefas t SET position = k.position
+            FROM unnest(%(ids)s::int[], %(keys)s::text[]) AS k(id, position)
+            WHERE t.id = k.id AND t.position IS DISTINCT FROM k.position;
+        """, {'ids': ids, 'keys': keys_for(len(ids))})
+        return cursor.rowcount
+
     def delete(self, task_id: int) -> bool:
         """Deleta uma tarefa."""
         query = "DELETE FROM tarefas WHERE id = %s RETURNING id;"
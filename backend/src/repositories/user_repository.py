@@ -1,11 +1,13 @@
 """
 Repositório de Usuários - Repository Pattern
 Responsável por todas as operações de acesso a dados relacionadas a usuários.
+As escritas invalidam o diretório de papéis (role_directory).
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Set, Tuple
 from datetime import datetime
 from src.repositories.base_repository import BaseRepository
-from src.core.security import get_password_hash
+from src.repositories.role_directory import role_directory
+from src.core.security import get_password_hash, verify_password
 
 
 class UserRepository(BaseRepository):
@@ -41,10 +43,18 @@ class UserRepository(BaseRepository):
             return None
         return self._execute_with_cursor(query, (user_id,))(process_result)
     
-    def find_all(self) -> List[Dict[str, Any]]:
-        """Retorna todos os usuários."""
-        query = """
-            SELECT id, username, email, role, created_at 
+    # Campos selecionáveis em find_all(fields=...), na ordem padrão
+    _FIELD_COLUMNS = ('id', 'username', 'email', 'role', 'created_at')
+    
+    def find_all(self, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna todos os usuários.
+        
+        Args:
+            fields: Campos retornados (padrão: todos)
+        """
+        query = f"""
+            SELECT {self._select_list(fields)} 
             FROM usuarios 
             ORDER BY id;
         """
@@ -54,10 +64,118 @@ class UserRepository(BaseRepository):
             return [self._serialize_user(user) for user in users]
         return self._execute_with_cursor(query)(process_result)
     
-    def find_by_max_role(self, max_role: str) -> List[Dict[str, Any]]:
+    @classmethod
+    def _select_list(cls, fields: Optional[Iterable[str]]) -> str:
+        """Lista de colunas do SELECT para os campos pedidos (na ordem padrão)."""
+        if fields is None:
+            return ', '.join(cls._FIELD_COLUMNS)
+        fields = set(fields)
+        unknown = fields.difference(cls._FIELD_COLUMNS)
+        if unknown or not fields:
+            raise ValueError(f"Campos de usuário inválidos: {sorted(unknown)}")
+        return ', '.join(column for column in cls._FIELD_COLUMNS if column in fields)
+    
+    def find_ids_by_roles(self, roles: Iterable[str]) -> Dict[str, List[int]]:
+        """
+        Retorna os ids dos usuários de cada role informado (usa idx_usuarios_role).
+        Roles sem usuários ficam fora do dicionário.
+        """
+        query = """
+            SELECT role, id
+            FROM usuarios
+            WHERE role = ANY(%s::user_role[]);
+        """
+        def process_result(cursor):
+            members: Dict[str, List[int]] = {}
+            for role, user_id in cursor.fetchall():
+                members.setdefault(role, []).append(user_id)
+            return members
+        return self._execute_with_cursor(query, (list(roles),))(process_result)
+    
+    def find_ids_by_usernames(self, usernames: Iterable[str]) -> Dict[str, int]:
+        """Retorna o id de cada username existente, em uma única consulta (importação em massa)."""
+        query = """
+            SELECT username, id
+            FROM usuarios
+            WHERE username = ANY(%s);
+        """
+        return self._execute_with_cursor(query, (list(usernames),))(lambda cursor: dict(cursor.fetchall()))
+    
+    def find_existing(self, usernames: Iterable[str], emails: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        Usernames e emails já cadastrados dentre os informados, em uma única consulta.
+        
+        Returns:
+            (usernames existentes, emails existentes)
+        """
+        usernames, emails = list(usernames), list(emails)
+        query = """
+            SELECT username, email
+            FROM usuarios
+            WHERE username = ANY(%s) OR email = ANY(%s);
+        """
+        def process_result(cursor):
+            requested_usernames, requested_emails = set(usernames), set(emails)
+            taken_usernames: Set[str] = set()
+            taken_emails: Set[str] = set()
+            for username, email in cursor.fetchall():
+                if username in requested_usernames:
+                    taken_usernames.add(username)
+                if email in requested_emails:
+                    taken_emails.add(email)
+            return taken_usernames, taken_emails
+        return self._execute_with_cursor(query, (usernames, emails))(process_result)
+    
+    def bulk_create(self, users: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Cria vários usuários em uma transação: as linhas (username, email,
+        hashed_password, role, com as senhas já convertidas em hash) são carregadas
+        com COPY em uma tabela temporária e inseridas com um único INSERT ... SELECT.
+        Usernames ou emails que já existirem no momento do INSERT são ignorados.
+        
+        Returns:
+            Usernames efetivamente criados
+        """
+        query = """
+            CREATE TEMP TABLE import_usuarios (
+                ord INT NOT NULL,
+                username TEXT NOT NULL,
+                email TEXT NOT NULL,
+                hashed_password TEXT NOT NULL,
+                role user_role NOT NULL
+            ) ON COMMIT DROP;
+        """
+        def process_result(cursor):
+            self._copy_rows(
+                cursor,
+                "import_usuarios (ord, username, email, hashed_password, role)",
+                (
+                    (index, user['username'], user['email'], user['hashed_password'], user['role'])
+                    for index, user in enumerate(users)
+                )
+            )
+            cursor.execute("""
+                INSERT INTO usuarios (username, email, hashed_password, role)
+                SELECT username, email, hashed_password, role
+                FROM import_usuarios
+                ORDER BY ord
+                ON CONFLICT DO NOTHING
+                RETURNING username;
+            """)
+            return {row[0] for row in cursor.fetchall()}
+        created = self._execute_with_cursor(query, commit=True)(process_result)
+        if created:
+            role_directory.invalidate({user['role'] for user in users if user['username'] in created})
+        return created
+    
+    def find_by_max_role(self, max_role: str, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """
         Retorna usuários até um nível máximo de role.
         Ordem de hierarquia: admin > gerencial > visualizacao
+        
+        Args:
+            max_role: Role de nível máximo
+            fields: Campos retornados (padrão: todos); role é lido de qualquer forma para o filtro
         """
         role_hierarchy = {
             'admin': 3,
@@ -66,7 +184,7 @@ class UserRepository(BaseRepository):
         }
         
         max_level = role_hierarchy.get(max_role, 1)
-        all_users = self.find_all()
+        all_users = self.find_all(None if fields is None else {*fields, 'role'})
         
         # Filtrar usuários baseado na hierarquia
         filtered_users = [
@@ -74,6 +192,9 @@ class UserRepository(BaseRepository):
             if role_hierarchy.get(user['role'], 0) <= max_level
         ]
         
+        if fields is not None and 'role' not in fields:
+            for user in filtered_users:
+                del user['role']
         return filtered_users
     
     def create(self, username: str, email: str, password: str, role: str) -> Dict[str, Any]:
@@ -92,7 +213,9 @@ class UserRepository(BaseRepository):
                 "email": email,
                 "role": role
             }
-        return self._execute_with_cursor(query, (username, email, hashed_password, role), commit=True)(process_result)
+        created = self._execute_with_cursor(query, (username, email, hashed_password, role), commit=True)(process_result)
+        role_directory.invalidate([role])
+        return created
     
     def update(
         self, 
@@ -102,33 +225,60 @@ class UserRepository(BaseRepository):
         role: Optional[str] = None,
         password: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
-        """Atualiza um usuário existente."""
-        updates = []
-        values = []
+        """
+        Atualiza um usuário existente (campos None não são alterados).
+        O UPDATE só acontece se algum campo for diferente do atual (IS DISTINCT FROM);
+        uma senha igual à atual não é gravada de novo.
         
+        Returns:
+            Usuário após a atualização, com 'changed_fields' (campos que mudaram),
+            ou None se o usuário não existe ou nenhum campo foi informado
+        """
+        params: Dict[str, Any] = {'user_id': user_id}
+        # Coluna -> expressão do novo valor
+        assignments: Dict[str, str] = {}
         if username is not None:
-            updates.append("username = %s")
-            values.append(username)
+            assignments['username'] = '%(username)s'
+            params['username'] = username
         if email is not None:
-            updates.append("email = %s")
-            values.append(email)
+            assignments['email'] = '%(email)s'
+            params['email'] = email
         if role is not None:
-            updates.append("role = %s")
-            values.append(role)
-        if password is not None:
-            hashed_password = get_password_hash(password)
-            updates.append("hashed_password = %s")
-            values.append(hashed_password)
+            assignments['role'] = '%(role)s::user_role'
+            params['role'] = role
         
-        if not updates:
+        if not assignments and password is None:
             return None
+        if password is not None and not self._password_matches(user_id, password):
+            # O hash tem salt aleatório: só é recalculado quando a senha muda
+            assignments['hashed_password'] = '%(hashed_password)s'
+            params['hashed_password'] = get_password_hash(password)
         
-        values.append(user_id)
+        distinct = {column: f"p.{column} IS DISTINCT FROM {value}" for column, value in assignments.items()}
+        changes = ' OR '.join(distinct.values()) or 'FALSE'
+        set_list = ', '.join(f"{column} = {value}" for column, value in assignments.items()) or 'id = u.id'
+        # A senha é reportada como 'password' (o hash não sai do repositório)
+        changed_list = ', '.join(
+            f"CASE WHEN {guard} THEN '{'password' if column == 'hashed_password' else column}' END"
+            for column, guard in distinct.items()
+        ) or 'NULL'
         query = f"""
-            UPDATE usuarios 
-            SET {', '.join(updates)} 
-            WHERE id = %s 
-            RETURNING id, username, email, role, created_at;
+            WITH previous AS (
+                SELECT id, username, email, role, hashed_password, created_at
+                FROM usuarios WHERE id = %(user_id)s FOR UPDATE
+            ),
+            updated AS (
+                UPDATE usuarios u
+                SET {set_list}
+                FROM previous p
+                WHERE u.id = p.id AND ({changes})
+                RETURNING u.id, u.username, u.email, u.role
+            )
+            SELECT p.id, COALESCE(n.username, p.username) AS username, COALESCE(n.email, p.email) AS email,
+                   COALESCE(n.role, p.role) AS role, p.created_at, p.role AS old_role,
+                   ARRAY_REMOVE(ARRAY[{changed_list}]::text[], NULL) AS changed_fields
+            FROM previous p
+            LEFT JOIN updated n ON n.id = p.id;
         """
         
         def process_result(cursor):
@@ -137,7 +287,22 @@ class UserRepository(BaseRepository):
                 user = self._row_to_dict(cursor, row)
                 return self._serialize_user(user)
             return None
-        return self._execute_with_cursor(query, tuple(values), commit=True)(process_result)
+        updated = self._execute_with_cursor(query, params, commit=True)(process_result)
+        if updated is None:
+            return None
+        old_role = updated.pop('old_role', None)
+        updated['changed_fields'] = list(updated.get('changed_fields') or [])
+        if 'role' in updated['changed_fields']:
+            role_directory.invalidate([old_role, updated['role']])
+        return updated
+    
+    def _password_matches(self, user_id: int, password: str) -> bool:
+        """Indica se a senha informada é a atual do usuário."""
+        query = "SELECT hashed_password FROM usuarios WHERE id = %s;"
+        def process_result(cursor):
+            row = cursor.fetchone()
+            return row is not None and verify_password(password, row[0])
+        return self._execute_with_cursor(query, (user_id,))(process_result)
     
     def delete(self, user_id: int) -> bool:
         """Deleta um usuário."""
@@ -145,7 +310,10 @@ class UserRepository(BaseRepository):
         def process_result(cursor):
             deleted_id = cursor.fetchone()
             return deleted_id is not None
-        return self._execute_with_cursor(query, (user_id,), commit=True)(process_result)
+        deleted = self._execute_with_cursor(query, (user_id,), commit=True)(process_result)
+        if deleted:
+            role_directory.invalidate()
+        return deleted
     
     def exists_by_username(self, username: str) -> bool:
         """Verifica se um username já existe."""
@@ -0,0 +1,171 @@
+"""
+Requisições em lote - POST /batch
+Integrações que fazem muitas chamadas pequenas (PUT /tasks/{id},
+PUT /notifications/{id}/read) pagavam em cada uma o HTTP e a autenticação
+completa (token decodificado e usuário consultado no banco). Aqui cada
+sub-requisição é despachada dentro do processo pela própria aplicação ASGI (mesmas
+rotas, validação, dependências e tratadores de erro), com o usuário já
+autenticado no scope.
+
+- As sub-requisições rodam em ordem, uma de cada vez (uma pode depender da anterior).
+- transaction=True: todas usam a mesma conexão (shared_transaction); a primeira
+  com status >= 400 desfaz a transação e as seguintes não são executadas (424).
+  Os eventos de status gravados no outbox seguem a transação, e o relay é
+  acordado depois do commit.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote
+from starlette.types import ASGIApp, Message, Scope
+from src.config import schemas
+from src.config.database import shared_transaction
+from src.core.serialization import JSON_MEDIA_TYPE, dumps, loads
+from src.models.auth import AUTHENTICATED_USER_SCOPE_KEY
+from src.services.outbox_relay import OutboxRelay
+
+# Rotas que não podem ser usadas dentro de um lote (recursão, login e stream sem fim)
+UNBATCHABLE_PATHS = frozenset({'/batch', '/token', '/notifications/stream'})
+# Cabeçalhos da requisição externa repassados às sub-requisições
+_FORWARDED_HEADERS = frozenset({b'authorization', b'user-agent'})
+# Cabeçalhos da resposta omitidos no resultado de cada item
+_OMITTED_RESPONSE_HEADERS = frozenset({'content-length', 'content-type', 'vary'})
+
+
+class _TransactionAborted(Exception):
+    """Sub-requisição com erro dentro da transação: sai do bloco para o rollback."""
+
+
+class BatchService:
+    """Executa as sub-requisições de um lote pela aplicação ASGI."""
+
+    def __init__(self, outbox_relay: Optional[OutboxRelay] = None):
+        """
+        Args:
+            outbox_relay: Acordado após o commit de um lote transacional
+        """
+        self.outbox_relay = outbox_relay
+
+    async def run(
+        self,
+        app: ASGIApp,
+        scope: Scope,
+        current_user: schemas.User,
+        operations: List[schemas.BatchOperation],
+        transaction: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Executa as sub-requisições em ordem.
+
+        Args:
+            app: Aplicação que recebe as sub-requisições
+            scope: Scope da requisição externa (servidor, cliente e cabeçalhos)
+            current_user: Usuário já autenticado pela requisição externa
+            operations: Sub-requisições (method, path e body)
+            transaction: Todas na mesma transação (tudo ou nada)
+
+        Returns:
+            results (status, headers e body de cada sub-requisição, na ordem) e
+            committed (se a transação foi confirmada; None sem transação)
+        """
+        if not transaction:
+            results = [await self._dispatch(app, scope, current_user, operation) for operation in operations]
+            return {'results': results, 'committed': None}
+
+        results: List[Dict[str, Any]] = []
+        try:
+            with shared_transaction():
+                for operation in operations:
+                    results.append(await self._dispatch(app, scope, current_user, operation))
+                    if results[-1]['status'] >= 400:
+                        raise _TransactionAborted(
+                            f"requisição {len(results) - 1} retornou {results[-1]['status']}"
+                        )
+        except _TransactionAborted:
+            detail = f"Não executada: a requisição {len(results) - 1} falhou e a transação foi desfeita"
+            results.extend(
+                {'status': 424, 'headers': {}, 'body': {'detail': detail}}
+                for _ in operations[len(results):]
+            )
+            return {'results': results, 'committed': False}
+        if self.outbox_relay is not None:
+            self.outbox_relay.wake()
+        return {'results': results, 'committed': True}
+
+    async def _dispatch(
+        self,
+        app: ASGIApp,
+        parent: Scope,
+        current_user: schemas.User,
+        operation: schemas.BatchOperation
+    ) -> Dict[str, Any]:
+        """Executa uma sub-requisição e coleta a resposta (sempre em JSON)."""
+        path, _, query = operation.path.partition('?')
+        if (path.rstrip('/') or '/') in UNBATCHABLE_PATHS:
+            return {'status': 400, 'headers': {}, 'body': {'detail': f"Rota não permitida em lote: {path}"}}
+
+        headers = [(name, value) for name, value in parent['headers'] if name in _FORWARDED_HEADERS]
+        headers.append((b'accept', JSON_MEDIA_TYPE.encode()))
+        body = b''
+        if operation.body is not None:
+            body = dumps(operation.body)
+            headers.append((b'content-type', JSON_MEDIA_TYPE.encode()))
+            headers.append((b'content-length', str(len(body)).encode()))
+        scope = {
+            'type': 'http',
+            'asgi': parent.get('asgi', {'version': '3.0'}),
+            'http_version': parent.get('http_version', '1.1'),
+            'method': operation.method,
+            'scheme': parent.get('scheme', 'http'),
+            'server': parent.get('server'),
+            'client': parent.get('client'),
+            'root_path': parent.get('root_path', ''),
+            'path': unquote(path),
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'headers': headers,
+            'state': dict(parent.get('state', {})),
+            AUTHENTICATED_USER_SCOPE_KEY: current_user,
+        }
+
+        pending = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+        async def receive() -> Message:
+            if pending:
+                return pending.pop()
+            # Corpo já entregue: a "conexão" só termina junto com a resposta
+            await asyncio.Event().wait()
+
+        status_code = 500
+        response_headers: Dict[str, str] = {}
+        chunks: List[bytes] = []
+
+        async def send(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                for name, value in message.get('headers', []):
+                    response_headers[name.decode('latin-1').lower()] = value.decode('latin-1')
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        try:
+            await app(scope, receive, send)
+        except Exception as e:
+            print(f"❌ Erro na sub-requisição {operation.method} {operation.path}: {e!r}")
+            return {'status': 500, 'headers': {}, 'body': {'detail': "Erro interno do servidor"}}
+
+        content = b''.join(chunks)
+        content_type = response_headers.get('content-type', '')
+        if not content:
+            response_body = None
+        elif content_type.startswith(JSON_MEDIA_TYPE):
+            response_body = loads(content)
+        else:
+            response_body = content.decode('utf-8', errors='replace')
+        return {
+            'status': status_code,
+            'headers': {
+                name: value for name, value in response_headers.items() if name not in _OMITTED_RESPONSE_HEADERS
+            },
+            'body': response_body,
+        }
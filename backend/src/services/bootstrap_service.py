@@ -0,0 +1,83 @@
+"""
+Serviço de inicialização do cliente - GET /bootstrap
+Depois do login o frontend precisava de cinco requisições em sequência
+(/users/me/, quadro de tarefas, /users/, /notifications/ e unread-count), cada
+uma autenticando o token com uma consulta própria. Aqui o usuário já autenticado
+é recebido uma vez e as consultas do seu perfil rodam em paralelo (uma thread e
+uma conexão cada), compondo uma única resposta.
+"""
+import asyncio
+from typing import Any, Dict, Optional
+from starlette.concurrency import run_in_threadpool
+from src.config import schemas
+from src.services.task_service import TaskService
+from src.services.user_service import UserService
+from src.services.notification_service import NotificationService
+from src.services.notification_hub import NotificationHub
+
+# Campos dos usuários usados nos seletores de responsável do frontend
+USER_SUMMARY_FIELDS = ('id', 'username', 'role')
+
+
+class BootstrapService:
+    """Reúne os dados iniciais do cliente para o perfil do usuário."""
+
+    def __init__(
+        self,
+        task_service: TaskService,
+        user_service: UserService,
+        notification_service: NotificationService,
+        hub: NotificationHub
+    ):
+        """Inicializa o serviço com os serviços de cada parte (Dependency Injection)."""
+        self.task_service = task_service
+        self.user_service = user_service
+        self.notification_service = notification_service
+        self.hub = hub
+
+    async def load(
+        self,
+        current_user: schemas.User,
+        board_limit: int,
+        notifications_limit: int
+    ) -> Dict[str, Any]:
+        """
+        Carrega em paralelo os dados iniciais do usuário autenticado.
+
+        Args:
+            current_user: Usuário já autenticado (o token não é validado de novo)
+            board_limit: Tarefas por coluna do quadro
+            notifications_limit: Tamanho da primeira página de notificações
+
+        Returns:
+            me, board, users (None para visualização), notifications,
+            notifications_next_before, unread_count e version
+        """
+        can_list_users = current_user.role in ("admin", "gerencial")
+        board, users, notifications, unread_count = await asyncio.gather(
+            run_in_threadpool(self.task_service.get_board, board_limit),
+            run_in_threadpool(self.user_service.get_all_users, current_user.role, USER_SUMMARY_FIELDS)
+            if can_list_users else _none(),
+            run_in_threadpool(
+                self.notification_service.get_user_notifications, current_user.id, limit=notifications_limit + 1
+            ),
+            run_in_threadpool(self.notification_service.get_unread_count, current_user.id),
+        )
+        next_before: Optional[int] = None
+        if len(notifications) > notifications_limit:
+            notifications = notifications[:notifications_limit]
+            next_before = notifications[-1]['id']
+        return {
+            'me': current_user.model_dump(),
+            'board': board,
+            'users': [{field: user.get(field) for field in USER_SUMMARY_FIELDS} for user in users]
+            if users is not None else None,
+            'notifications': notifications,
+            'notifications_next_before': next_before,
+            'unread_count': unread_count,
+            'version': self.hub.version(current_user.id),
+        }
+
+
+async def _none() -> None:
+    return None
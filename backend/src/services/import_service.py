@@ -0,0 +1,324 @@
+"""
+Importação em massa de tarefas e usuários (CSV ou NDJSON) - POST /admin/import/...
+Migrar dados chamando POST /tasks/ e POST /users/ linha a linha custava, em cada
+linha, uma requisição, uma conexão, a consulta exists_by_username e um hash bcrypt
+síncrono. Aqui o arquivo é lido aos pedaços, à medida que chega, e processado em
+lotes de chunk_size registros:
+1. Cada registro é validado com o schema (TaskImportRow / UserImportRow); erros de
+   formato ou de validação ficam no relatório, por registro, sem interromper o arquivo.
+2. Uma consulta por lote: ids dos responsáveis (owner_username das tarefas) ou
+   usernames/emails já cadastrados (usuários).
+3. Usuários: hashes bcrypt calculados em paralelo (hash_workers threads; o bcrypt
+   libera o GIL durante o cálculo).
+4. COPY do lote em uma tabela temporária e INSERT ... SELECT, uma transação por lote.
+"""
+import codecs
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Type
+from fastapi import Header, HTTPException, Query, status
+from pydantic import BaseModel, ValidationError
+from src.config import schemas
+from src.core.security import get_password_hash
+from src.core.serialization import loads
+from src.repositories.task_repository import TaskRepository
+from src.repositories.user_repository import UserRepository
+
+# Content-Type do corpo -> formato do arquivo
+IMPORT_MEDIA_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+# Registro do arquivo: (número, campos ou None, erro de formato ou None)
+_Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def import_format(
+    content_type: Optional[str] = Header(None),
+    fmt: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format")
+) -> str:
+    """
+    Dependência: formato do arquivo enviado, por ?format= ou pelo Content-Type.
+
+    Raises:
+        HTTPException 415: Formato não informado ou não suportado
+    """
+    if fmt is not None:
+        return fmt
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if media_type not in IMPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Envie o arquivo como text/csv ou application/x-ndjson (ou informe ?format=csv|ndjson)"
+        )
+    return IMPORT_MEDIA_TYPES[media_type]
+
+
+def import_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """openapi_extra documentando o corpo (arquivo CSV ou NDJSON com os campos do schema)."""
+    description = f"Um registro por linha com os campos de {model.__name__}"
+    return {'requestBody': {'required': True, 'content': {
+        'text/csv': {'schema': {'type': 'string', 'description': description}},
+        'application/x-ndjson': {'schema': {'type': 'string', 'description': description}},
+    }}}
+
+
+def _lines(pieces: Iterable[bytes]) -> Iterator[str]:
+    """Linhas completas (com o fim de linha) do texto UTF-8 recebido em pedaços arbitrários."""
+    pending = ''
+    for text in codecs.iterdecode(pieces, 'utf-8-sig'):
+        pending += text
+        if '\n' in pending:
+            *complete, pending = pending.split('\n')
+            for line in complete:
+                yield line + '\n'
+    if pending:
+        yield pending
+
+
+def _records(pieces: Iterable[bytes], file_format: str) -> Iterator[_Record]:
+    """Registros do arquivo, lidos sob demanda (campos vazios do CSV são omitidos)."""
+    lines = _lines(pieces)
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for number, record in enumerate(reader, start=1):
+            if None in record:
+                yield number, None, "Mais colunas do que o cabeçalho"
+            elif None in record.values():
+                yield number, None, "Menos colunas do que o cabeçalho"
+            else:
+                yield number, {key: value for key, value in record.items() if value != ''}, None
+        return
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = loads(line)
+        except ValueError as e:
+            yield number, None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield number, None, "Cada linha deve ser um objeto JSON"
+            continue
+        yield number, data, None
+
+
+def _error_messages(error: ValidationError) -> List[str]:
+    """Mensagens de validação no formato "campo: mensagem"."""
+    return [
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" if item['loc'] else item['msg']
+        for item in error.errors(include_url=False)
+    ]
+
+
+class _ImportReport:
+    """Contadores e erros por registro (limitados a max_errors) de uma importação."""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.total = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def fail(self, row: int, errors: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda error: error['row']),
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+class ImportService:
+    """Importação em massa de tarefas e usuários."""
+
+    def __init__(
+        self,
+        task_repository: Optional[TaskRepository] = None,
+        user_repository: Optional[UserRepository] = None,
+        chunk_size: int = 1000,
+        hash_workers: int = 4,
+        max_reported_errors: int = 1000
+    ):
+        """
+        Inicializa o serviço com os repositórios (Dependency Injection).
+
+        Args:
+            chunk_size: Registros validados e gravados por lote (uma transação cada)
+            hash_workers: Threads calculando os hashes das senhas
+            max_reported_errors: Erros listados no relatório (failed conta todos)
+        """
+        self.task_repository = task_repository or TaskRepository()
+        self.user_repository = user_repository or UserRepository()
+        self.chunk_size = chunk_size
+        self.hash_workers = hash_workers
+        self.max_reported_errors = max_reported_errors
+
+    def import_tasks(
+        self,
+        pieces: Iterable[bytes],
+        file_format: str,
+        current_user_id: int,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Importa tarefas (titulo, descricao, status, owner_username). Sem
+        owner_username, o responsável é o usuário que importa. As tarefas entram
+        no fim da coluna do seu status.
+
+        Args:
+            pieces: Conteúdo do arquivo, em pedaços (lido sob demanda)
+            file_format: "csv" ou "ndjson"
+            current_user_id: Responsável padrão
+            progress: Chamado após cada lote com os registros lidos (job em segundo plano)
+
+        Returns:
+            Relatório (ImportReport)
+        """
+        def write_chunk(chunk: List[Tuple[int, schemas.TaskImportRow]], report: _ImportReport) -> None:
+            usernames = {row.owner_username for _, row in chunk if row.owner_username}
+            owners = self.user_repository.find_ids_by_usernames(usernames) if usernames else {}
+            tasks, numbers = [], []
+            for number, row in chunk:
+                if row.owner_username and row.owner_username not in owners:
+                    report.fail(number, [f"owner_username: usuário '{row.owner_username}' não encontrado"])
+                    continue
+                tasks.append({
+                    'titulo': row.titulo,
+                    'descricao': row.descricao,
+                    'status': row.status,
+                    'owner_id': owners.get(row.owner_username, current_user_id),
+                })
+                numbers.append(number)
+            if tasks:
+                self._write(report, numbers, lambda: self.task_repository.bulk_create(tasks))
+
+        return self._run(pieces, file_format, schemas.TaskImportRow, write_chunk, progress)
+
+    def import_users(
+        self,
+        pieces: Iterable[bytes],
+        file_format: str,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Importa usuários (username, email, password, role). Usernames ou emails já
+        cadastrados, ou repetidos no arquivo, são reportados como erro da linha.
+
+        Args:
+            pieces: Conteúdo do arquivo, em pedaços (lido sob demanda)
+            file_format: "csv" ou "ndjson"
+            progress: Chamado após cada lote com os registros lidos (job em segundo plano)
+
+        Returns:
+            Relatório (ImportReport)
+        """
+        # Usernames e emails já aceitos nesta importação -> registro de origem
+        seen_usernames: Dict[str, int] = {}
+        seen_emails: Dict[str, int] = {}
+
+        with ThreadPoolExecutor(self.hash_workers, thread_name_prefix='import-hash') as executor:
+            def write_chunk(chunk: List[Tuple[int, schemas.UserImportRow]], report: _ImportReport) -> None:
+                taken_usernames, taken_emails = self.user_repository.find_existing(
+                    {row.username for _, row in chunk}, {row.email for _, row in chunk}
+                )
+                accepted: List[Tuple[int, schemas.UserImportRow]] = []
+                for number, row in chunk:
+                    errors = []
+                    if row.username in taken_usernames:
+                        errors.append("username: já registrado")
+                    elif row.username in seen_usernames:
+                        errors.append(f"username: repetido no arquivo (registro {seen_usernames[row.username]})")
+                    if row.email in taken_emails:
+                        errors.append("email: já registrado")
+                    elif row.email in seen_emails:
+                        errors.append(f"email: repetido no arquivo (registro {seen_emails[row.email]})")
+                    if errors:
+                        report.fail(number, errors)
+                        continue
+                    seen_usernames[row.username] = number
+                    seen_emails[row.email] = number
+                    accepted.append((number, row))
+                if not accepted:
+                    return
+                hashes = executor.map(get_password_hash, [row.password for _, row in accepted])
+                users = [
+                    {'username': row.username, 'email': row.email, 'hashed_password': hashed, 'role': row.role}
+                    for (_, row), hashed in zip(accepted, hashes)
+                ]
+
+                def insert() -> int:
+                    created = self.user_repository.bulk_create(users)
+                    # Cadastrados por outra requisição entre a consulta e o INSERT
+                    for number, row in accepted:
+                        if row.username not in created:
+                            report.fail(number, ["username ou email já registrado"])
+                    return len(created)
+
+                self._write(report, [number for number, _ in accepted], insert)
+
+            return self._run(pieces, file_format, schemas.UserImportRow, write_chunk, progress)
+
+    def _run(
+        self,
+        pieces: Iterable[bytes],
+        file_format: str,
+        model: Type[BaseModel],
+        write_chunk: Callable[[List[Tuple[int, Any]], _ImportReport], None],
+        progress: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Lê e valida os registros e grava os válidos em lotes de chunk_size.
+
+        Raises:
+            HTTPException 400: Arquivo fora de UTF-8 (os lotes anteriores já foram gravados)
+        """
+        report = _ImportReport(self.max_reported_errors)
+        chunk: List[Tuple[int, Any]] = []
+        try:
+            for number, data, error in _records(pieces, file_format):
+                report.total += 1
+                if error is not None:
+                    report.fail(number, [error])
+                    continue
+                try:
+                    chunk.append((number, model.model_validate(data)))
+                except ValidationError as e:
+                    report.fail(number, _error_messages(e))
+                    continue
+                if len(chunk) >= self.chunk_size:
+                    write_chunk(chunk, report)
+                    chunk = []
+                    if progress:
+                        progress(report.total)
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Arquivo fora de UTF-8 após o registro {report.total}; "
+                       f"{report.imported} registros já importados"
+            )
+        if chunk:
+            write_chunk(chunk, report)
+        if progress:
+            progress(report.total)
+        return report.as_dict()
+
+    @staticmethod
+    def _write(report: _ImportReport, numbers: List[int], insert: Callable[[], int]) -> None:
+        """Grava um lote; se a gravação falhar, todos os registros do lote são reportados."""
+        try:
+            report.imported += insert()
+        except Exception as e:
+            print(f"❌ Erro ao gravar lote da importação: {e}")
+            for number in numbers:
+                report.fail(number, [f"Erro ao gravar o lote: {e}"])
@@ -0,0 +1,304 @@
+"""
+Jobs em segundo plano - execução fora das requisições
+Operações longas (importações em massa, compactação de notificações, reatribuição
+de tarefas em lote) não ocupam os workers de requisição: a rota grava o job na
+tabela jobs e responde 202 com o id; o progresso é consultado em GET /jobs/{id}.
+
+O JobRunner (tarefa asyncio iniciada no lifespan) pega os jobs da fila e os
+executa em um pool de threads próprio (workers threads, separado do threadpool
+das rotas síncronas):
+- Limite por tipo (register(..., concurrency=N)): um tipo nunca ocupa mais que N
+  threads deste processo; os jobs excedentes esperam na fila.
+- Com vários workers do uvicorn, cada job é pego por um único processo
+  (JobRepository.claim_next, FOR UPDATE SKIP LOCKED). wake() antecipa a busca
+  neste processo; os demais consultam a fila a cada poll_interval_seconds.
+- O handler recebe um JobContext: progress() grava o progresso (no máximo a cada
+  progress_interval_seconds) e lança JobCancelled quando o cancelamento foi pedido.
+  O cancelamento é cooperativo: o job para na próxima chamada de progress().
+- O processo renova o heartbeat dos seus jobs; jobs 'running' sem heartbeat por
+  heartbeat_timeout_seconds (worker encerrado) são marcados como 'failed'.
+- Arquivos dos jobs (params['file_oid']) são removidos quando o job termina.
+"""
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from src.repositories.job_repository import JobRepository
+
+_DAY_SECONDS = 86400
+
+
+class JobCancelled(Exception):
+    """O cancelamento do job foi pedido (ou o processo está encerrando)."""
+
+
+class JobContext:
+    """Progresso e cancelamento de um job em execução (usado pelo handler, na thread do job)."""
+
+    def __init__(self, job_id: int, repository: JobRepository, progress_interval_seconds: float = 1.0):
+        self.job_id = job_id
+        self.done = 0
+        self.total: Optional[int] = None
+        self._repository = repository
+        self._progress_interval_seconds = progress_interval_seconds
+        self._last_report = 0.0
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica se o job deve parar."""
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Pede a interrupção do job (na próxima chamada de progress() ou check_cancelled())."""
+        self._cancelled.set()
+
+    def check_cancelled(self) -> None:
+        """
+        Raises:
+            JobCancelled: O job deve parar
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled(f"job {self.job_id} cancelado")
+
+    def progress(self, done: int, total: Optional[int] = None) -> None:
+        """
+        Registra o progresso (itens processados e, se conhecido, o total).
+
+        Raises:
+            JobCancelled: O cancelamento do job foi pedido
+        """
+        self.done = done
+        if total is not None:
+            self.total = total
+        now = time.monotonic()
+        if now - self._last_report >= self._progress_interval_seconds:
+            self._last_report = now
+            if self._repository.report_progress(self.job_id, done, total):
+                self._cancelled.set()
+        self.check_cancelled()
+
+
+# Handler de um tipo de job: (params, context) -> resultado (serializável em JSON)
+JobHandler = Callable[[Dict[str, Any], JobContext], Any]
+
+
+@dataclass
+class _JobType:
+    handler: JobHandler
+    concurrency: int
+
+
+class JobRunner:
+    """Executa os jobs da fila em threads próprias, com limite de concorrência por tipo."""
+
+    def __init__(
+        self,
+        repository: Optional[JobRepository] = None,
+        workers: int = 4,
+        poll_interval_seconds: float = 2,
+        progress_interval_seconds: float = 1,
+        heartbeat_timeout_seconds: float = 300,
+        retention_days: float = 7
+    ):
+        """
+        Args:
+            repository: Acesso à tabela jobs (padrão: JobRepository)
+            workers: Jobs executados ao mesmo tempo neste processo
+            poll_interval_seconds: Intervalo entre buscas na fila sem wake()
+            progress_interval_seconds: Intervalo mínimo entre gravações de progresso
+            heartbeat_timeout_seconds: Tempo sem heartbeat para um job 'running' ser dado como perdido
+            retention_days: Tempo que os jobs finalizados ficam na tabela
+        """
+        self.repository = repository or JobRepository()
+        self.workers = workers
+        self.poll_interval_seconds = poll_interval_seconds
+        self.progress_interval_seconds = progress_interval_seconds
+        self.heartbeat_timeout_seconds = heartbeat_timeout_seconds
+        self.retention_days = retention_days
+        self._types: Dict[str, _JobType] = {}
+        self._active: Dict[int, JobContext] = {}
+        self._active_by_type: Counter = Counter()
+        self._job_tasks: Dict[int, asyncio.Task] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._last_maintenance = 0.0
+        self._metrics: Dict[str, Any] = {
+            'started': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'stale_failed': 0,
+            'failed_runs': 0,
+            'last_finished_at': None,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Indica se o runner está ativo."""
+        return self._task is not None
+
+    def register(self, job_type: str, handler: JobHandler, concurrency: int = 1) -> None:
+        """
+        Registra o handler de um tipo de job.
+
+        Args:
+            job_type: Nome do tipo (ex.: 'import.tasks')
+            handler: Executa o job em uma thread do runner
+            concurrency: Jobs deste tipo executados ao mesmo tempo neste processo
+        """
+        self._types[job_type] = _JobType(handler, max(1, concurrency))
+
+    async def start(self) -> None:
+        """Inicia o runner no event loop atual (lifespan)."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='job')
+        self._task = asyncio.create_task(self._run_periodically(), name="job-runner")
+
+    async def stop(self, timeout: float = 10) -> None:
+        """
+        Interrompe o runner. Os jobs em execução são avisados (JobCancelled na próxima
+        chamada de progress()) e aguardados por até timeout segundos; eles terminam
+        como 'failed' e podem ser enviados de novo.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        for context in self._active.values():
+            context.cancel()
+        if self._job_tasks:
+            await asyncio.wait(list(self._job_tasks.values()), timeout=timeout)
+        # Jobs que não pararam a tempo continuam 'running' até o heartbeat expirar
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        self._loop = None
+
+    def wake(self) -> None:
+        """Antecipa a busca de jobs na fila. Seguro para chamar de qualquer thread."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _run_periodically(self) -> None:
+        # _stopping também encerra o laço: no Python 3.11, wait_for pode descartar o
+        # cancelamento que chega junto com o fim da espera
+        while not self._stopping:
+            try:
+                await self.run_once()
+            except Exception as e:
+                # Banco indisponível, por exemplo: tenta de novo no próximo ciclo
+                self._metrics['failed_runs'] += 1
+                print(f"❌ Erro no runner de jobs: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def run_once(self) -> int:
+        """
+        Renova os heartbeats (a cada heartbeat_timeout_seconds / 3) e inicia os jobs
+        da fila enquanto houver capacidade.
+
+        Returns:
+            Número de jobs iniciados
+        """
+        if time.monotonic() - self._last_maintenance >= self.heartbeat_timeout_seconds / 3:
+            await asyncio.to_thread(self._maintain)
+            self._last_maintenance = time.monotonic()
+        started = 0
+        while len(self._active) < self.workers:
+            available = [
+                job_type for job_type, spec in self._types.items()
+                if self._active_by_type[job_type] < spec.concurrency
+            ]
+            if not available:
+                break
+            job = await asyncio.to_thread(self.repository.claim_next, available)
+            if job is None:
+                break
+            self._start_job(job)
+            started += 1
+        return started
+
+    def _maintain(self) -> None:
+        """Heartbeat dos jobs deste processo, jobs perdidos por outros e limpeza dos antigos."""
+        if self._active:
+            for job_id in self.repository.heartbeat(list(self._active)):
+                context = self._active.get(job_id)
+                if context is not None:
+                    context.cancel()
+        for job in self.repository.fail_stale(self.heartbeat_timeout_seconds):
+            self._metrics['stale_failed'] += 1
+            print(f"⚠️ Job {job['id']} ({job['type']}) sem heartbeat: marcado como 'failed'")
+            self._delete_file(job)
+        self.repository.purge_finished(self.retention_days * _DAY_SECONDS)
+
+    def _start_job(self, job: Dict[str, Any]) -> None:
+        context = JobContext(job['id'], self.repository, self.progress_interval_seconds)
+        self._active[job['id']] = context
+        self._active_by_type[job['type']] += 1
+        self._metrics['started'] += 1
+        self._job_tasks[job['id']] = asyncio.create_task(self._execute(job, context), name=f"job-{job['id']}")
+
+    async def _execute(self, job: Dict[str, Any], context: JobContext) -> None:
+        handler = self._types[job['type']].handler
+        result, error = None, None
+        try:
+            result = await self._loop.run_in_executor(self._executor, handler, job['params'], context)
+            status = 'succeeded'
+        except JobCancelled:
+            if self._stopping:
+                status, error = 'failed', "Interrompido pelo encerramento do servidor"
+            else:
+                status = 'cancelled'
+        except Exception as e:
+            print(f"❌ Erro no job {job['id']} ({job['type']}): {e}")
+            status, error = 'failed', getattr(e, 'detail', None) or str(e) or type(e).__name__
+        try:
+            await asyncio.to_thread(self._finish, job, status, context.done, result, error)
+        except Exception as e:
+            # Sem o registro, o job é marcado como 'failed' quando o heartbeat expirar
+            print(f"❌ Erro ao registrar o fim do job {job['id']}: {e}")
+        finally:
+            self._metrics[status] += 1
+            self._metrics['last_finished_at'] = datetime.now().isoformat()
+            del self._active[job['id']]
+            self._active_by_type[job['type']] -= 1
+            self._job_tasks.pop(job['id'], None)
+            # Capacidade liberada: busca o próximo job da fila
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def _finish(self, job: Dict[str, Any], status: str, done: int, result: Any, error: Optional[str]) -> None:
+        self.repository.finish(job['id'], status, done, result=result, error=error)
+        self._delete_file(job)
+
+    def _delete_file(self, job: Dict[str, Any]) -> None:
+        file_oid = (job.get('params') or {}).get('file_oid')
+        if file_oid is not None:
+            self.repository.delete_file(file_oid)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Jobs em execução por tipo, limites e totais finalizados por este processo."""
+        return {
+            'running': self.running,
+            'workers': self.workers,
+            'active': {job_type: count for job_type, count in self._active_by_type.items() if count},
+            'concurrency': {job_type: spec.concurrency for job_type, spec in self._types.items()},
+            **self._metrics,
+        }
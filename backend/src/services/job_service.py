@@ -0,0 +1,154 @@
+"""
+Serviço de Jobs - envio, consulta e cancelamento de operações em segundo plano
+As rotas apenas gravam o job (status 'queued') e acordam o JobRunner; a execução
+acontece fora da requisição. Cada usuário vê e cancela os próprios jobs; o admin
+vê e cancela todos.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from src.config import schemas
+from src.repositories.job_repository import JobRepository
+from src.repositories.user_repository import UserRepository
+from src.services.job_runner import JobRunner
+
+
+class JobService:
+    """Serviço para os jobs em segundo plano."""
+
+    # Tipos aceitos em POST /jobs: schema dos parâmetros e papéis que podem enviar
+    # (as importações são enviadas por POST /admin/import/...?background=true)
+    SUBMITTABLE_TYPES: Dict[str, Tuple[Type[BaseModel], Tuple[str, ...]]] = {
+        'tasks.reassign': (schemas.TaskReassignParams, ('admin', 'gerencial')),
+        'notifications.compact': (schemas.NotificationCompactParams, ('admin',)),
+    }
+
+    def __init__(
+        self,
+        repository: Optional[JobRepository] = None,
+        user_repository: Optional[UserRepository] = None,
+        runner: Optional[JobRunner] = None
+    ):
+        """
+        Inicializa o serviço com os repositórios (Dependency Injection).
+        Com um JobRunner, ele é acordado a cada envio (senão o job é pego na
+        próxima leitura da fila de algum worker).
+        """
+        self.repository = repository or JobRepository()
+        self.user_repository = user_repository or UserRepository()
+        self.runner = runner
+
+    def submit(self, job: schemas.JobSubmit, current_user: schemas.User) -> Dict[str, Any]:
+        """
+        Valida os parâmetros e coloca o job na fila.
+
+        Raises:
+            HTTPException 400: Tipo de job desconhecido
+            HTTPException 403: Papel sem permissão para o tipo
+            HTTPException 422: Parâmetros inválidos (ou mesmo usuário origem e destino em tasks.reassign)
+            HTTPException 404: Usuário destino não encontrado (tasks.reassign)
+        """
+        if job.type not in self.SUBMITTABLE_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tipo de job desconhecido: {job.type}. Tipos válidos: {list(self.SUBMITTABLE_TYPES)}"
+            )
+        model, roles = self.SUBMITTABLE_TYPES[job.type]
+        if current_user.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Acesso negado. Requer um dos seguintes papéis: {', '.join(roles)}"
+            )
+        try:
+            params = model.model_validate(job.params).model_dump(exclude_none=True)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=e.errors(include_url=False, include_context=False)
+            )
+        if job.type == 'tasks.reassign' and params['from_owner_id'] == params['to_owner_id']:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="O usuário destino deve ser diferente do responsável atual"
+            )
+        if job.type == 'tasks.reassign' and not self.user_repository.find_by_id(params['to_owner_id']):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário destino não encontrado"
+            )
+        return self._enqueue(job.type, params, current_user.id)
+
+    def submit_import(
+        self,
+        entity: str,
+        pieces: Iterable[bytes],
+        file_format: str,
+        current_user: schemas.User
+    ) -> Dict[str, Any]:
+        """
+        Grava o arquivo enviado (sem mantê-lo em memória) e coloca a importação
+        na fila como job 'import.tasks' ou 'import.users'.
+
+        Args:
+            entity: "tasks" ou "users"
+            pieces: Conteúdo do arquivo, em pedaços
+            file_format: "csv" ou "ndjson"
+        """
+        file_oid = self.repository.store_file(pieces)
+        params = {'file_oid': file_oid, 'format': file_format, 'user_id': current_user.id}
+        try:
+            return self._enqueue(f'import.{entity}', params, current_user.id)
+        except Exception:
+            self.repository.delete_file(file_oid)
+            raise
+
+    def get_job(self, job_id: int, current_user: schemas.User) -> Dict[str, Any]:
+        """
+        Status e progresso de um job.
+
+        Raises:
+            HTTPException 404: Job não encontrado (ou de outro usuário)
+        """
+        job = self.repository.find_by_id(job_id)
+        if not job or not self._can_access(job, current_user):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job não encontrado"
+            )
+        return job
+
+    def list_jobs(self, current_user: schemas.User, limit: int = 50) -> List[Dict[str, Any]]:
+        """Jobs mais recentes: todos para o admin, os próprios para os demais."""
+        created_by = None if current_user.role == 'admin' else current_user.id
+        return self.repository.find_recent(created_by, limit)
+
+    def cancel_job(self, job_id: int, current_user: schemas.User) -> Dict[str, Any]:
+        """
+        Cancela um job: na fila, é cancelado na hora; em execução, para no
+        próximo registro de progresso (cancel_requested = true até lá).
+
+        Raises:
+            HTTPException 404: Job não encontrado (ou de outro usuário)
+            HTTPException 409: Job já finalizado
+        """
+        job = self.get_job(job_id, current_user)
+        cancelled = self.repository.request_cancel(job_id)
+        if not cancelled:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job já finalizado (status: {job['status']})"
+            )
+        if cancelled['status'] == 'cancelled' and 'file_oid' in cancelled['params']:
+            # Nunca executado: o runner não chega a remover o arquivo
+            self.repository.delete_file(cancelled['params']['file_oid'])
+        return cancelled
+
+    def _enqueue(self, job_type: str, params: Dict[str, Any], created_by: int) -> Dict[str, Any]:
+        job = self.repository.create(job_type, params, created_by)
+        if self.runner is not None:
+            self.runner.wake()
+        return job
+
+    @staticmethod
+    def _can_access(job: Dict[str, Any], current_user: schemas.User) -> bool:
+        return current_user.role == 'admin' or job['created_by'] == current_user.id
@@ -0,0 +1,225 @@
+"""
+Agendador de manutenção - tarefas periódicas executadas por um único worker
+Tarefas recorrentes (compactação de notificações, rebalanceamento das chaves do
+quadro, ...) são registradas com register() e executadas em uma tarefa asyncio
+por tarefa, iniciadas no lifespan; o trabalho em si roda em uma thread.
+
+- Jitter: a primeira execução e cada intervalo recebem um atraso aleatório de até
+  jitter_seconds, para que os workers não acordem todos ao mesmo tempo.
+- Um worker por vez: antes de executar, o worker tenta o advisory lock da tarefa
+  (pg_try_advisory_lock(MAINTENANCE_LOCK_CLASS, chave da tarefa), em uma conexão
+  dedicada mantida durante a execução). Sem o lock, outro worker está executando
+  a tarefa e a vez é pulada.
+- Uma execução por intervalo na frota: com o lock, a tarefa só roda se não
+  terminou (em nenhum worker) há menos de metade do intervalo (maintenance_runs).
+- Status e duração da última execução ficam em maintenance_runs (visíveis de
+  qualquer worker, GET /admin/maintenance) e nas métricas do processo.
+
+Tarefas registradas com exclusive=False (estado do próprio processo, como as
+notificações em memória) rodam em todos os workers, sem lock.
+"""
+import asyncio
+import os
+import random
+import socket
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import psycopg2
+from src.config.database import get_db_config
+from src.repositories.maintenance_repository import MaintenanceRepository
+
+# Classe dos advisory locks das tarefas (forma de duas chaves: não colide com o
+# lock de chave única do OutboxRelay)
+MAINTENANCE_LOCK_CLASS = 4_270_102
+
+
+@dataclass
+class _MaintenanceJob:
+    name: str
+    run: Callable[[], Any]
+    interval_seconds: float
+    jitter_seconds: float
+    exclusive: bool
+    lock_key: int
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+
+class MaintenanceScheduler:
+    """Executa as tarefas de manutenção registradas, uma por vez na frota."""
+
+    def __init__(
+        self,
+        repository: Optional[MaintenanceRepository] = None,
+        jitter_seconds: float = 60,
+        connection_factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Args:
+            repository: Acesso a maintenance_runs (padrão: MaintenanceRepository)
+            jitter_seconds: Atraso aleatório máximo padrão das tarefas
+            connection_factory: Cria a conexão dos advisory locks (padrão: config.yaml)
+        """
+        self.repository = repository or MaintenanceRepository()
+        self.jitter_seconds = jitter_seconds
+        self._connect = connection_factory or (lambda: psycopg2.connect(**get_db_config()))
+        self._worker = f"{socket.gethostname()}:{os.getpid()}"
+        self._jobs: Dict[str, _MaintenanceJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        """Indica se o agendador está ativo."""
+        return bool(self._tasks)
+
+    def register(
+        self,
+        name: str,
+        run: Callable[[], Any],
+        interval_seconds: float,
+        jitter_seconds: Optional[float] = None,
+        exclusive: bool = True
+    ) -> None:
+        """
+        Registra uma tarefa periódica.
+
+        Args:
+            name: Nome da tarefa (chave em maintenance_runs e do advisory lock)
+            run: Executa a tarefa (em uma thread); o retorno fica em last_result
+            interval_seconds: Intervalo entre execuções
+            jitter_seconds: Atraso aleatório máximo (padrão: o do agendador)
+            exclusive: False executa em todos os workers (estado do processo)
+        """
+        self._jobs[name] = _MaintenanceJob(
+            name=name,
+            run=run,
+            interval_seconds=interval_seconds,
+            jitter_seconds=self.jitter_seconds if jitter_seconds is None else jitter_seconds,
+            exclusive=exclusive,
+            lock_key=zlib.crc32(name.encode()) & 0x7FFFFFFF,
+            metrics={
+                'runs': 0,
+                'skipped': 0,
+                'failed_runs': 0,
+                'last_status': None,
+                'last_run_at': None,
+                'last_run_seconds': 0.0,
+                'last_error': None,
+                'next_run_at': None,
+            }
+        )
+
+    async def start(self) -> None:
+        """Inicia uma tarefa asyncio por tarefa registrada (lifespan)."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run_periodically(job), name=f"maintenance-{job.name}")
+            for job in self._jobs.values()
+        ]
+
+    async def stop(self) -> None:
+        """Interrompe o agendador (uma execução em andamento termina na sua thread)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run_periodically(self, job: _MaintenanceJob) -> None:
+        delay = random.uniform(0, job.jitter_seconds)
+        while True:
+            job.metrics['next_run_at'] = (datetime.now() + timedelta(seconds=delay)).isoformat()
+            await asyncio.sleep(delay)
+            try:
+                await asyncio.to_thread(self.run_once, job.name)
+            except Exception as e:
+                # Banco indisponível, por exemplo: tenta no próximo intervalo
+                job.metrics['failed_runs'] += 1
+                job.metrics['last_status'] = 'failed'
+                job.metrics['last_error'] = str(e)
+                print(f"❌ Erro na manutenção '{job.name}': {e}")
+            delay = job.interval_seconds + random.uniform(0, job.jitter_seconds)
+
+    def run_once(self, name: str) -> str:
+        """
+        Executa a tarefa, se for a vez deste worker.
+
+        Returns:
+            'succeeded', 'failed', 'skipped' (outro worker executando ou já
+            executada neste intervalo)
+        """
+        job = self._jobs[name]
+        if not job.exclusive:
+            return self._execute(job)
+        conn = self._connect()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_lock(%s, %s);", (MAINTENANCE_LOCK_CLASS, job.lock_key))
+                locked = cursor.fetchone()[0]
+            if not locked or self.repository.ran_within(name, job.interval_seconds / 2):
+                job.metrics['skipped'] += 1
+                job.metrics['last_status'] = 'skipped'
+                return 'skipped'
+            return self._execute(job)
+        finally:
+            # Fechar a conexão libera o advisory lock
+            conn.close()
+
+    def _execute(self, job: _MaintenanceJob) -> str:
+        started = time.perf_counter()
+        result, error = None, None
+        try:
+            result = job.run()
+            status = 'succeeded'
+        except Exception as e:
+            print(f"❌ Erro na manutenção '{job.name}': {e}")
+            status, error = 'failed', str(e)
+        duration = round(time.perf_counter() - started, 4)
+        job.metrics['runs'] += 1
+        if status == 'failed':
+            job.metrics['failed_runs'] += 1
+        job.metrics['last_status'] = status
+        job.metrics['last_run_at'] = datetime.now().isoformat()
+        job.metrics['last_run_seconds'] = duration
+        job.metrics['last_error'] = error
+        if job.exclusive:
+            self.repository.record_run(job.name, status, duration, self._worker, result=result, error=error)
+        return status
+
+    def runs(self) -> List[Dict[str, Any]]:
+        """
+        Última execução de cada tarefa registrada: na frota (maintenance_runs)
+        para as exclusivas, neste processo para as demais.
+        """
+        recorded = {run['name']: run for run in self.repository.find_all()}
+        runs = []
+        for job in self._jobs.values():
+            run = {
+                'name': job.name,
+                'interval_seconds': job.interval_seconds,
+                'exclusive': job.exclusive,
+                'next_run_at': job.metrics['next_run_at'],
+            }
+            if job.exclusive:
+                run.update({key: value for key, value in recorded.get(job.name, {}).items() if key != 'name'})
+            else:
+                run.update({
+                    'last_status': job.metrics['last_status'],
+                    'last_finished_at': job.metrics['last_run_at'],
+                    'last_duration_seconds': job.metrics['last_run_seconds'],
+                    'last_error': job.metrics['last_error'],
+                    'last_worker': self._worker,
+                })
+            runs.append(run)
+        return runs
+
+    def metrics(self) -> Dict[str, Any]:
+        """Execuções, vezes puladas e última execução de cada tarefa neste processo."""
+        return {
+            'running': self.running,
+            'worker': self._worker,
+            'jobs': {job.name: {'interval_seconds': job.interval_seconds, **job.metrics} for job in self._jobs.values()},
+        }
@@ -0,0 +1,82 @@
+"""
+Resumo periódico de notificações (modo digest)
+Com notifications.digest.enabled, o NotificationService acumula as notificações
+por destinatário; esta tarefa (iniciada no lifespan) chama flush_digest() a cada
+interval_seconds, gravando um único resumo por destinatário. No shutdown o que
+estiver acumulado é gravado antes de encerrar.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from src.services.notification_service import NotificationService
+
+
+class NotificationDigest:
+    """Envio periódico dos resumos de notificações."""
+
+    def __init__(self, notification_service: NotificationService, interval_seconds: float = 600):
+        """
+        Args:
+            notification_service: Serviço (com digest=True) que acumula as notificações
+            interval_seconds: Intervalo entre os resumos
+        """
+        self.notification_service = notification_service
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._metrics: Dict[str, Any] = {
+            'flushes': 0,
+            'failed_flushes': 0,
+            'notifications_sent': 0,
+            'last_flush_seconds': 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Indica se o envio periódico está ativo."""
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Inicia o envio periódico no event loop atual (lifespan)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_periodically(), name="notification-digest")
+
+    async def stop(self) -> None:
+        """Interrompe o envio periódico e grava os resumos pendentes."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await asyncio.to_thread(self.run_once)
+
+    async def _run_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                self._metrics['failed_flushes'] += 1
+                print(f"❌ Erro ao gravar o resumo de notificações: {e}")
+
+    def run_once(self) -> int:
+        """
+        Grava os resumos acumulados.
+
+        Returns:
+            Número de notificações gravadas
+        """
+        started = time.perf_counter()
+        sent = len(self.notification_service.flush_digest())
+        self._metrics['flushes'] += 1
+        self._metrics['notifications_sent'] += sent
+        self._metrics['last_flush_seconds'] = round(time.perf_counter() - started, 4)
+        return sent
+
+    def metrics(self) -> Dict[str, Any]:
+        """Resumos gravados e destinatários aguardando o próximo envio."""
+        return {
+            'running': self.running,
+            'interval_seconds': self.interval_seconds,
+            'pending_recipients': self.notification_service.digest_pending,
+            **self._metrics,
+        }
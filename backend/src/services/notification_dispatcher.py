@@ -0,0 +1,221 @@
+"""
+Despacho assíncrono de notificações - fila em segundo plano
+Tira a criação de notificações do caminho da requisição: o dispatcher é um
+observer do DomainEventBus e apenas enfileira os eventos TaskStatusChanged que
+geram notificações; workers (tarefas asyncio iniciadas no lifespan) resolvem os
+destinatários via TaskNotificationObserver e gravam as notificações do lote
+inteiro em uma única escrita.
+
+- Fila limitada (queue_size). Com a fila cheia, a thread da requisição espera até
+  enqueue_timeout_seconds por espaço (backpressure); se ainda assim não couber,
+  submit() retorna False e update() processa o evento de forma síncrona.
+- stop() deixa de aceitar eventos e drena a fila antes do shutdown.
+- Com o outbox (events.outbox.enabled), o OutboxRelay entrega os eventos em lotes a
+  deliver(), que grava de forma síncrona: a entrega só é confirmada após a gravação.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from src.patterns import Observer, Subject, TaskSubject, TaskNotificationObserver
+from src.services.notification_service import NotificationService
+
+
+class NotificationDispatcher(Observer):
+    """Fila de eventos de tarefa processada por workers em segundo plano."""
+
+    def __init__(
+        self,
+        notification_service: NotificationService,
+        queue_size: int = 1000,
+        workers: int = 2,
+        batch_size: int = 50,
+        enqueue_timeout_seconds: float = 0.5
+    ):
+        """
+        Args:
+            notification_service: Serviço usado pelo observer para criar as notificações
+            queue_size: Capacidade máxima da fila
+            workers: Número de workers consumindo a fila
+            batch_size: Máximo de eventos gravados por lote
+            enqueue_timeout_seconds: Espera máxima por espaço na fila em submit()
+        """
+        self.notification_service = notification_service
+        self.observer = TaskNotificationObserver(notification_service)
+        self.queue_size = queue_size
+        self.worker_count = workers
+        self.batch_size = batch_size
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._accepting = False
+        self._metrics = {
+            'enqueued': 0,
+            'rejected': 0,
+            'processed': 0,
+            'failed': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'high_water_mark': 0,
+            'last_batch_seconds': 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Indica se o dispatcher está aceitando eventos."""
+        return self._accepting
+
+    async def start(self) -> None:
+        """Cria a fila e inicia os workers no event loop atual (lifespan)."""
+        if self._accepting:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"notification-dispatcher-{i}")
+            for i in range(self.worker_count)
+        ]
+        self._accepting = True
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """
+        Para de aceitar eventos, aguarda a fila esvaziar (até drain_timeout) e
+        encerra os workers.
+        """
+        if self._queue is None:
+            return
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️  Dispatcher encerrado com {self._queue.qsize()} eventos de notificação pendentes")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._loop = None
+
+    def update(self, subject: Subject, event_data: Dict[str, Any]) -> None:
+        """
+        Observer do barramento de domínio: enfileira as mudanças de status que geram
+        notificações. Sem espaço na fila (ou com o dispatcher parado), processa agora.
+        """
+        if not TaskNotificationObserver.is_relevant(event_data):
+            return
+        if not self.submit(event_data):
+            self.process_batch([event_data])
+
+    def deliver(self, events: List[Any]) -> None:
+        """
+        Consumidor do OutboxRelay (handler em lote do DomainEventBus): grava as
+        notificações do lote antes de retornar. Se algum evento falhar, levanta
+        exceção para que o relay repita a entrega; as notificações já gravadas
+        são ignoradas na repetição (source_event_id).
+        """
+        batch = [event.to_event_data() for event in events]
+        failed = self.process_batch([
+            event_data for event_data in batch if TaskNotificationObserver.is_relevant(event_data)
+        ])
+        if failed:
+            raise RuntimeError(f"{failed} eventos de notificação falharam")
+
+    def submit(self, event_data: Dict[str, Any]) -> bool:
+        """
+        Enfileira um evento de mudança de status (de qualquer thread).
+
+        Returns:
+            True se o evento foi enfileirado; False se o dispatcher não está rodando
+            ou a fila continuou cheia após enqueue_timeout_seconds.
+        """
+        loop = self._loop
+        if not self._accepting or loop is None or loop.is_closed():
+            return False
+        try:
+            in_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            # Chamado de dentro do event loop: não é possível bloquear esperando espaço
+            try:
+                self._queue.put_nowait(event_data)
+            except asyncio.QueueFull:
+                self._metrics['rejected'] += 1
+                return False
+            self._record_enqueued()
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._put(event_data), loop)
+        try:
+            accepted = future.result(self.enqueue_timeout_seconds + 1)
+        except Exception:
+            future.cancel()
+            accepted = False
+        if not accepted:
+            self._metrics['rejected'] += 1
+        return accepted
+
+    async def _put(self, event_data: Dict[str, Any]) -> bool:
+        """Coloca o evento na fila, esperando por espaço até enqueue_timeout_seconds."""
+        try:
+            await asyncio.wait_for(self._queue.put(event_data), self.enqueue_timeout_seconds)
+        except asyncio.TimeoutError:
+            return False
+        self._record_enqueued()
+        return True
+
+    def _record_enqueued(self) -> None:
+        self._metrics['enqueued'] += 1
+        self._metrics['high_water_mark'] = max(self._metrics['high_water_mark'], self._queue.qsize())
+
+    async def _worker(self) -> None:
+        """Consome a fila em lotes de até batch_size eventos."""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(self.process_batch, batch)
+            except Exception as e:
+                # Falha na gravação do lote: o worker continua atendendo a fila
+                self._metrics['failed_batches'] += 1
+                print(f"❌ Erro ao gravar lote de {len(batch)} eventos de notificação: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def process_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """
+        Executa o observer para cada evento do lote e grava todas as notificações
+        resultantes de uma vez. Uma falha em um evento não afeta os demais.
+
+        Returns:
+            Número de eventos que falharam
+        """
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        failed = 0
+        with self.notification_service.batched():
+            for event_data in batch:
+                try:
+                    self.observer.update(TaskSubject(event_data.get('task')), event_data)
+                    self._metrics['processed'] += 1
+                except Exception as e:
+                    failed += 1
+                    self._metrics['failed'] += 1
+                    print(f"❌ Erro ao processar evento de notificação da tarefa "
+                          f"{(event_data.get('task') or {}).get('id')}: {e}")
+        self._metrics['batches'] += 1
+        self._metrics['last_batch_seconds'] = round(time.perf_counter() - started, 4)
+        return failed
+
+    def metrics(self) -> Dict[str, Any]:
+        """Métricas de fila e backpressure."""
+        return {
+            'running': self._accepting,
+            'queue_size': self._queue.qsize() if self._queue is not None else 0,
+            'queue_capacity': self.queue_size,
+            'workers': len(self._workers),
+            **self._metrics,
+        }
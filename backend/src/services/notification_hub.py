@@ -0,0 +1,330 @@
+"""
+Hub de notificações em tempo real - fan-out assíncrono (asyncio)
+Distribui eventos de notificação para as conexões SSE abertas de cada usuário
+(GET /notifications/stream).
+
+- publish() pode ser chamado de qualquer thread (os endpoints síncronos rodam no
+  threadpool); a entrega é agendada no event loop com call_soon_threadsafe.
+- Cada evento recebe um id crescente e fica em um histórico curto por usuário,
+  permitindo retomar a conexão a partir do cabeçalho Last-Event-ID.
+- O estado por usuário (histórico, versão) é descartado quando ele fica sem
+  conexões e sem eventos por mais de reconnect_window_seconds, para que a memória
+  acompanhe os usuários ativos e não todos os já vistos pelo processo. Quem
+  reconectar depois disso com um Last-Event-ID antigo recebe 'resync'.
+- Cada assinante tem uma fila limitada; se ela encher (cliente lento), a assinatura
+  é encerrada e o cliente reconecta usando Last-Event-ID.
+- broadcast() envia um evento a todos os usuários conectados (ex.: 'task_status').
+- Para clientes sem SSE, cada usuário tem uma "versão" das suas notificações
+  (timestamp em ms da última mudança); GET /notifications/unread-count?since_version=
+  aguarda (long-poll) até a versão passar da informada pelo cliente.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+# (id do evento, nome do evento, dados)
+HubEvent = Tuple[int, str, Dict[str, Any]]
+
+
+class Subscription:
+    """Conexão de um usuário ao hub."""
+
+    __slots__ = ('user_id', 'queue', 'backlog', 'resync')
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.backlog: List[HubEvent] = []
+        self.resync = False
+
+
+class NotificationHub:
+    """Fan-out de eventos de notificação por usuário."""
+
+    def __init__(self, history_size: int = 100, queue_size: int = 100, reconnect_window_seconds: float = 600):
+        """
+        Args:
+            history_size: Eventos mantidos por usuário para retomada via Last-Event-ID
+            queue_size: Tamanho máximo da fila de cada assinante
+            reconnect_window_seconds: Tempo sem conexões e sem eventos após o qual o
+                estado do usuário é descartado
+        """
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.reconnect_window_seconds = reconnect_window_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_ids = itertools.count(1)
+        self._last_event_id = 0
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._history: Dict[int, Deque[HubEvent]] = {}
+        # Maior id de evento já descartado do histórico de cada usuário
+        self._evicted: Dict[int, int] = {}
+        # Long-poll: versão por usuário e futures aguardando mudança
+        self._versions: Dict[int, int] = {}
+        self._waiters: Dict[int, List[asyncio.Future]] = {}
+        self._waiter_count = 0
+        # Último evento ou mudança de versão de cada usuário (time.monotonic)
+        self._last_activity: Dict[int, float] = {}
+        self._last_prune = time.monotonic()
+        # Maior id de evento descartado junto com o estado de um usuário inativo
+        self._pruned_event_id = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Associa o hub ao event loop da aplicação (chamado no lifespan)."""
+        self._loop = loop
+
+    def unbind(self) -> None:
+        """Desassocia o hub do event loop (shutdown)."""
+        self._loop = None
+
+    @property
+    def subscriber_count(self) -> int:
+        """Número de conexões abertas."""
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    @property
+    def waiter_count(self) -> int:
+        """Número de requisições de long-poll aguardando."""
+        return self._waiter_count
+
+    def is_connected(self, user_id: int) -> bool:
+        """Indica se o usuário tem alguma conexão aberta."""
+        return bool(self._subscribers.get(user_id))
+
+    def _call_in_loop(self, callback, *args) -> None:
+        """Executa callback no event loop do hub, a partir de qualquer thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+
+    def publish(self, user_id: int, event: str, data: Dict[str, Any]) -> None:
+        """
+        Publica um evento para um usuário. Seguro para chamar de qualquer thread.
+        Sem event loop associado (scripts, testes de serviço) o evento é descartado.
+        """
+        self._call_in_loop(self._deliver, user_id, event, data)
+
+    def broadcast(self, event: str, data: Dict[str, Any]) -> None:
+        """
+        Publica um evento para todos os usuários conectados a este processo
+        (ex.: mudança de status de tarefa). Seguro para chamar de qualquer thread.
+        """
+        self._call_in_loop(self._deliver_all, event, data)
+
+    def _deliver_all(self, event: str, data: Dict[str, Any]) -> None:
+        for user_id in list(self._subscribers):
+            self._deliver(user_id, event, data)
+
+    def notify_changed(self, user_id: int, version: Optional[int] = None) -> None:
+        """
+        Registra que as notificações do usuário mudaram e acorda os long-polls dele.
+        Seguro para chamar de qualquer thread.
+
+        Args:
+            user_id: ID do usuário
+            version: Versão da mudança (ms); por padrão, o instante atual
+        """
+        self._call_in_loop(self._bump_version, user_id, version or time.time_ns() // 1_000_000)
+
+    def _bump_version(self, user_id: int, version: int) -> None:
+        """Avança a versão do usuário (sempre crescente) e resolve os waiters (no event loop)."""
+        current = self._versions.get(user_id, 0)
+        new_version = max(version, current + 1)
+        self._versions[user_id] = new_version
+        self._touch(user_id)
+        for future in self._waiters.pop(user_id, []):
+            if not future.done():
+                future.set_result(new_version)
+
+    def version(self, user_id: int) -> int:
+        """Versão atual das notificações do usuário neste processo (0 se desconhecida)."""
+        return self._versions.get(user_id, 0)
+
+    async def wait_for_change(self, user_id: int, since_version: int, timeout: float) -> int:
+        """
+        Aguarda até a versão do usuário ficar maior que since_version ou o timeout expirar.
+        Uma versão do cliente maior que a local (vista em outro worker) passa a ser a
+        referência local, evitando respostas imediatas em sequência.
+
+        Returns:
+            Versão atual do usuário
+        """
+        current = self._versions.get(user_id, 0)
+        if current > since_version:
+            return current
+        if since_version > current:
+            self._versions[user_id] = since_version
+        if timeout <= 0:
+            return self._versions[user_id]
+
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(user_id, [])
+        waiters.append(future)
+        self._waiter_count += 1
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return self._versions.get(user_id, 0)
+        finally:
+            self._waiter_count -= 1
+            remaining = self._waiters.get(user_id)
+            if remaining and future in remaining:
+                remaining.remove(future)
+                if not remaining:
+                    del self._waiters[user_id]
+
+    def suggested_poll_interval(self, base_seconds: float, max_seconds: float, load_step: int) -> float:
+        """
+        Intervalo sugerido para o próximo poll: cresce linearmente com o número de
+        conexões (SSE + long-poll) atendidas por este processo.
+
+        Args:
+            base_seconds: Intervalo sem carga
+            max_seconds: Limite superior
+            load_step: Conexões que somam mais um base_seconds ao intervalo
+        """
+        load = self.subscriber_count + self._waiter_count
+        return round(min(max_seconds, base_seconds * (1 + load / max(load_step, 1))), 2)
+
+    def _deliver(self, user_id: int, event: str, data: Dict[str, Any]) -> None:
+        """Registra o evento no histórico e entrega aos assinantes (roda no event loop)."""
+        item = (next(self._event_ids), event, data)
+        self._last_event_id = item[0]
+        history = self._history.get(user_id)
+        if history is None:
+            history = self._history[user_id] = deque(maxlen=self.history_size)
+        if len(history) == history.maxlen:
+            self._evicted[user_id] = history[0][0]
+        history.append(item)
+        self._touch(user_id)
+
+        for subscription in list(self._subscribers.get(user_id, ())):
+            try:
+                subscription.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Cliente lento: encerra a assinatura; ele retoma via Last-Event-ID
+                self.unsubscribe(subscription)
+                subscription.queue.get_nowait()
+                subscription.queue.put_nowait(None)
+
+    def _touch(self, user_id: int) -> None:
+        """Registra atividade do usuário e, uma vez por janela, descarta os inativos."""
+        now = time.monotonic()
+        self._last_activity[user_id] = now
+        if now - self._last_prune >= self.reconnect_window_seconds:
+            self.prune(now)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Descarta histórico, versão e atividade dos usuários sem conexões, sem
+        long-polls e sem eventos há mais de reconnect_window_seconds.
+
+        Returns:
+            Número de usuários descartados
+        """
+        now = time.monotonic() if now is None else now
+        self._last_prune = now
+        cutoff = now - self.reconnect_window_seconds
+        idle = [
+            user_id for user_id, last in self._last_activity.items()
+            if last < cutoff and user_id not in self._subscribers and user_id not in self._waiters
+        ]
+        for user_id in idle:
+            history = self._history.pop(user_id, None)
+            if history:
+                self._pruned_event_id = max(self._pruned_event_id, history[-1][0])
+            self._evicted.pop(user_id, None)
+            self._versions.pop(user_id, None)
+            del self._last_activity[user_id]
+        return len(idle)
+
+    def subscribe(self, user_id: int, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Abre uma assinatura para o usuário (deve ser chamado no event loop).
+
+        Args:
+            user_id: ID do usuário
+            last_event_id: Último evento recebido pelo cliente; os eventos posteriores
+                ainda presentes no histórico são devolvidos em subscription.backlog.
+                Se o histórico não cobre mais esse ponto (eventos descartados ou id de
+                outro processo), subscription.resync = True e o cliente deve recarregar.
+        """
+        subscription = Subscription(user_id, self.queue_size)
+        if last_event_id is not None:
+            # Sem histórico, os eventos do usuário podem ter sido descartados por inatividade
+            evicted = self._evicted.get(user_id, 0) if user_id in self._history else self._pruned_event_id
+            if last_event_id > self._last_event_id or evicted > last_event_id:
+                subscription.resync = True
+            else:
+                history = self._history.get(user_id, ())
+                subscription.backlog = [item for item in history if item[0] > last_event_id]
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Encerra uma assinatura."""
+        subscriptions = self._subscribers.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[subscription.user_id]
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Formata um evento no protocolo Server-Sent Events."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_events(
+    hub: NotificationHub,
+    subscription: Subscription,
+    unread_count: int,
+    heartbeat_seconds: float = 15.0
+) -> AsyncIterator[str]:
+    """
+    Gera o corpo do stream SSE de uma assinatura.
+    Envia o contador atual, os eventos perdidos desde o Last-Event-ID (ou 'resync'),
+    depois os eventos ao vivo, com um comentário de heartbeat quando ocioso.
+    """
+    try:
+        yield "retry: 3000\n\n"
+        if subscription.resync:
+            yield format_sse('resync', {})
+        for event_id, event, data in subscription.backlog:
+            yield format_sse(event, data, event_id)
+        yield format_sse('unread_count', {'unread_count': unread_count})
+
+        while True:
+            try:
+                item = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if item is None:
+                # Assinatura encerrada pelo hub (fila cheia): o cliente reconecta
+                break
+            event_id, event, data = item
+            yield format_sse(event, data, event_id)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+# Instância do processo, associada ao event loop no lifespan da aplicação
+notification_hub = NotificationHub()
@@ -0,0 +1,77 @@
+"""
+Retenção de notificações - compactação periódica
+Remove as notificações fora da política configurada em notifications.retention
+(idade máxima, quantidade máxima por usuário e expiração das já lidas), para que
+o armazenamento (tabela ou memória do processo) não cresça sem limite.
+
+run_once() é a tarefa 'notifications.compact' do MaintenanceScheduler, que define
+o intervalo, escolhe o worker e registra status e falhas de cada execução. O
+trabalho em si (DELETE no PostgreSQL ou varredura das partições em memória) roda
+na thread do agendador. Após cada execução o tamanho do armazenamento é
+registrado nas métricas.
+"""
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from src.services.notification_service import NotificationService
+
+_DAY_SECONDS = 86400
+
+
+class NotificationRetention:
+    """Compactação do armazenamento de notificações pela política de retenção."""
+
+    def __init__(
+        self,
+        notification_service: NotificationService,
+        max_age_days: Optional[float] = 90,
+        max_per_user: Optional[int] = 200,
+        read_expiry_days: Optional[float] = 30
+    ):
+        """
+        Args:
+            notification_service: Serviço cujo repositório será compactado
+            max_age_days: Idade máxima de qualquer notificação (None desativa)
+            max_per_user: Notificações mantidas por usuário, as mais recentes (None desativa)
+            read_expiry_days: Idade máxima das notificações lidas (None desativa)
+        """
+        self.notification_service = notification_service
+        self.max_age_days = max_age_days
+        self.max_per_user = max_per_user
+        self.read_expiry_days = read_expiry_days
+        self._metrics: Dict[str, Any] = {
+            'runs': 0,
+            'removed_total': 0,
+            'last_removed': 0,
+            'last_run_at': None,
+            'last_run_seconds': 0.0,
+            'store': None,
+        }
+
+    def run_once(self) -> int:
+        """
+        Executa uma compactação e atualiza as métricas de tamanho do armazenamento.
+
+        Returns:
+            Número de notificações removidas
+        """
+        started = time.perf_counter()
+        repository = self.notification_service.repository
+        removed = repository.compact(
+            max_age_seconds=self.max_age_days * _DAY_SECONDS if self.max_age_days else None,
+            max_per_user=self.max_per_user,
+            read_expiry_seconds=self.read_expiry_days * _DAY_SECONDS if self.read_expiry_days else None
+        )
+        self._metrics['runs'] += 1
+        self._metrics['removed_total'] += removed
+        self._metrics['last_removed'] = removed
+        self._metrics['last_run_at'] = datetime.now().isoformat()
+        self._metrics['last_run_seconds'] = round(time.perf_counter() - started, 4)
+        self._metrics['store'] = repository.stats()
+        if removed:
+            print(f"🧹 {removed} notificações removidas pela política de retenção")
+        return removed
+
+    def metrics(self) -> Dict[str, Any]:
+        """Execuções, notificações removidas e tamanho do armazenamento na última execução."""
+        return dict(self._metrics)
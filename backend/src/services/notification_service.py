@@ -1,186 +1,441 @@
 """
 Serviço de Notificações - Service Layer Pattern
 Gerencia notificações do sistema usando o padrão Observer.
-Usa padrão Singleton para garantir que todas as instâncias compartilhem as mesmas notificações.
+As notificações são persistidas na tabela 'notificacoes' (NotificationRepository),
+portanto sobrevivem a reinícios e são compartilhadas entre os workers do uvicorn.
+Novas notificações e mudanças no contador de não lidas são enviadas ao
+NotificationHub, que as entrega às conexões SSE abertas, e replicadas aos demais
+workers pelo PgEventBus (eventos 'notification.created' e 'notification.changed').
+
+Eventos repetidos da mesma tarefa para o mesmo usuário dentro de coalesce_seconds
+atualizam a notificação existente (event_count) em vez de criar outra. No modo
+digest, as notificações ficam acumuladas por destinatário e flush_digest() grava
+um único resumo para cada um (NotificationDigest chama periodicamente).
 """
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
-from datetime import datetime
 from src.repositories.user_repository import UserRepository
+from src.repositories.notification_repository import NotificationRepository
+from src.repositories.role_directory import RoleDirectory, role_directory as default_role_directory
+from src.services.notification_hub import NotificationHub
+from src.services.pg_event_bus import PgEventBus
 
 
 class NotificationService:
-    """
-    Serviço singleton para gerenciar notificações.
-    Todas as instâncias compartilham o mesmo armazenamento de notificações.
-    """
-    _instance = None
-    _notifications: List[Dict[str, Any]] = []
-    
-    def __new__(cls, user_repository: Optional[UserRepository] = None):
-        """
-        Implementa padrão Singleton para garantir que todas as instâncias
-        compartilhem o mesmo armazenamento de notificações.
-        """
-        if cls._instance is None:
-            cls._instance = super(NotificationService, cls).__new__(cls)
-            cls._instance._notifications = []
-        return cls._instance
-    
-    def __init__(self, user_repository: Optional[UserRepository] = None):
+    """Serviço para gerenciar notificações."""
+
+    def __init__(
+        self,
+        user_repository: Optional[UserRepository] = None,
+        repository: Optional[NotificationRepository] = None,
+        hub: Optional[NotificationHub] = None,
+        event_bus: Optional[PgEventBus] = None,
+        role_directory: Optional[RoleDirectory] = None,
+        coalesce_seconds: Optional[float] = None,
+        digest: bool = False
+    ):
         """
         Inicializa o serviço de notificações.
-        
+
         Args:
             user_repository: Repositório de usuários para buscar admins e gerenciais
+            repository: Repositório onde as notificações são armazenadas
+            hub: Hub de tempo real (opcional); sem ele nada é enviado por SSE
+            event_bus: Barramento entre workers (opcional); sem ele as mudanças
+                chegam apenas às conexões deste processo
+            role_directory: Cache de ids por role usado para achar admins e gerenciais
+            coalesce_seconds: Janela de agrupamento de eventos da mesma tarefa (None desativa)
+            digest: Acumula as notificações e grava um resumo por destinatário em flush_digest()
         """
-        # Se já foi inicializado (singleton), não reinicializar
-        if hasattr(self, '_initialized'):
-            return
-        
         self.user_repository = user_repository or UserRepository()
-        # Usar a lista compartilhada da classe (singleton)
-        if not hasattr(self, '_notifications'):
-            self._notifications = NotificationService._notifications
-        self._initialized = True
-    
-    def create_review_notification(self, task: Dict[str, Any], updated_by: Optional[Dict[str, Any]] = None) -> None:
+        self.repository = repository or NotificationRepository()
+        self.hub = hub
+        self.event_bus = event_bus
+        self.role_directory = role_directory or default_role_directory
+        self.coalesce_seconds = coalesce_seconds
+        self.digest = digest
+        self._digest_lock = threading.Lock()
+        self._digest_pending: Dict[int, List[Dict[str, Any]]] = {}
+        # Buffer de escrita por thread, ativo dentro de batched()
+        self._batch = threading.local()
+        if event_bus is not None:
+            event_bus.subscribe('notification.created', self._on_remote_created)
+            event_bus.subscribe('notification.changed', self._on_remote_changed)
+
+    @contextmanager
+    def batched(self):
+        """
+        Agrupa as notificações criadas dentro do bloco em uma única escrita no final.
+        Usado pelo NotificationDispatcher para gravar um lote de eventos de uma vez.
+        Dentro do bloco, create_* retornam as notificações ainda sem id.
+        """
+        pending: List[Dict[str, Any]] = []
+        self._batch.pending = pending
+        try:
+            yield
+        finally:
+            self._batch.pending = None
+            self._save(pending)
+
+    def _store(self, notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Grava as notificações (ou acumula no resumo, no modo digest, ou no lote da
+        thread, se houver um ativo).
+        """
+        if self.digest:
+            with self._digest_lock:
+                for notification in notifications:
+                    pending = self._digest_pending.setdefault(notification['user_id'], [])
+                    # Entrega repetida do outbox ainda no resumo: não conta duas vezes
+                    if notification.get('source_event_id') is not None and any(
+                        self._event_key(buffered) == self._event_key(notification) for buffered in pending
+                    ):
+                        continue
+                    pending.append(notification)
+            return notifications
+        pending = getattr(self._batch, 'pending', None)
+        if pending is not None:
+            pending.extend(notifications)
+            return notifications
+        return self._save(notifications)
+
+    def _save(self, notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Grava as notificações em uma única escrita e as publica no hub."""
+        if not notifications:
+            return []
+        if self.coalesce_seconds:
+            notifications = self._collapse(notifications)
+        created = self.repository.create_many(notifications, coalesce_seconds=self.coalesce_seconds)
+        self._publish_created(created)
+        return created
+
+    @staticmethod
+    def _event_key(notification: Dict[str, Any]) -> tuple:
+        return (
+            notification['user_id'], notification.get('task_id'), notification['type'],
+            notification.get('source_event_id')
+        )
+
+    @staticmethod
+    def _collapse(notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Une as notificações de mesma (user_id, task_id, type) de um lote: fica a mais
+        recente, com event_count somado. Notificações sem tarefa não são unidas.
+        """
+        collapsed: Dict[Any, Dict[str, Any]] = {}
+        for index, notification in enumerate(notifications):
+            if notification.get('task_id') is None:
+                collapsed[index] = notification
+                continue
+            key = (notification['user_id'], notification['task_id'], notification['type'])
+            previous = collapsed.pop(key, None)
+            event_count = notification.get('event_count') or 1
+            if previous is not None:
+                event_count += previous.get('event_count') or 1
+            collapsed[key] = {**notification, 'event_count': event_count}
+        return list(collapsed.values())
+
+    def flush_digest(self) -> List[Dict[str, Any]]:
+        """
+        Grava as notificações acumuladas no modo digest: um resumo por destinatário
+        (ou a própria notificação, se ele tiver apenas uma).
+
+        Returns:
+            Notificações gravadas
+        """
+        with self._digest_lock:
+            pending, self._digest_pending = self._digest_pending, {}
+        summaries = []
+        for user_id, notifications in pending.items():
+            notifications = self._collapse(notifications)
+            if len(notifications) == 1:
+                summaries.append(notifications[0])
+            else:
+                summaries.append(self._digest_summary(user_id, notifications))
+        return self._save(summaries)
+
+    @property
+    def digest_pending(self) -> int:
+        """Destinatários com notificações aguardando o próximo resumo."""
+        return len(self._digest_pending)
+
+    @staticmethod
+    def _digest_summary(user_id: int, notifications: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Monta a notificação de resumo de vários eventos de tarefas. O resumo guarda o
+        maior source_event_id resumido: reentregues após o flush, os mesmos eventos
+        geram um resumo que o repositório ignora (já aplicado).
+        """
+        labels = {
+            'task_review': ('tarefa em revisão', 'tarefas em revisão'),
+            'task_completed': ('tarefa concluída', 'tarefas concluídas'),
+        }
+        counts = Counter(notification['type'] for notification in notifications)
+        parts = [
+            f"{count} {labels.get(kind, (kind, kind))[0 if count == 1 else 1]}"
+            for kind, count in counts.items()
+        ]
+        titles = [notification['task_title'] for notification in notifications if notification.get('task_title')]
+        event_ids = [
+            notification['source_event_id'] for notification in notifications
+            if notification.get('source_event_id') is not None
+        ]
+        message = f"Resumo: {', '.join(parts)}."
+        if titles:
+            extra = f" e mais {len(titles) - 3}" if len(titles) > 3 else ""
+            message += f" Tarefas: {', '.join(titles[:3])}{extra}."
+        return {
+            'user_id': user_id,
+            'type': 'task_digest',
+            'title': 'Resumo de tarefas',
+            'message': message,
+            'task_id': None,
+            'task_title': None,
+            'updated_by': None,
+            'event_count': sum(notification.get('event_count') or 1 for notification in notifications),
+            'source_event_id': max(event_ids) if event_ids else None
+        }
+
+    def _publish_created(self, created: List[Dict[str, Any]]) -> None:
+        """Entrega as notificações criadas neste processo e as replica aos demais workers."""
+        by_user: Dict[int, List[Dict[str, Any]]] = {}
+        for notification in created:
+            by_user.setdefault(notification['user_id'], []).append(notification)
+        for user_id, notifications in by_user.items():
+            version = self._new_version()
+            self._deliver_created(user_id, notifications, version)
+            self._broadcast('notification.created', {
+                'user_id': user_id, 'version': version, 'notifications': notifications
+            })
+
+    def _publish_change(self, user_id: int, read_ids: Optional[List[int]] = None) -> None:
+        """
+        Sinaliza que as notificações do usuário foram lidas, neste processo e nos demais.
+
+        Args:
+            user_id: ID do usuário
+            read_ids: Notificações marcadas como lidas (None = todas)
+        """
+        version = self._new_version()
+        self._deliver_change(user_id, version)
+        self._broadcast('notification.changed', {
+            'user_id': user_id, 'version': version, 'read_ids': read_ids
+        })
+
+    @staticmethod
+    def _new_version() -> int:
+        """Versão (ms) de uma mudança; a mesma é usada por todos os workers."""
+        return time.time_ns() // 1_000_000
+
+    def _broadcast(self, event: str, data: Dict[str, Any]) -> None:
+        if self.event_bus is not None:
+            self.event_bus.publish(event, data)
+
+    def _deliver_created(self, user_id: int, notifications: List[Dict[str, Any]], version: int) -> None:
+        """Envia as notificações às conexões SSE do usuário neste processo."""
+        if self.hub is None:
+            return
+        for notification in notifications:
+            self.hub.publish(user_id, 'notification', notification)
+        self._deliver_change(user_id, version)
+
+    def _deliver_change(self, user_id: int, version: int) -> None:
+        """
+        Avança a versão do usuário (long-poll) e, se ele tiver conexão SSE aberta
+        neste processo, envia o contador atual.
+        """
+        if self.hub is None:
+            return
+        self.hub.notify_changed(user_id, version)
+        if self.hub.is_connected(user_id):
+            self.hub.publish(user_id, 'unread_count', {'unread_count': self.repository.count_unread(user_id)})
+
+    def _on_remote_created(self, data: Dict[str, Any]) -> None:
+        """Notificações criadas em outro worker (thread do PgEventBus)."""
+        notifications = data.get('notifications') or []
+        if not getattr(self.repository, 'is_shared', True):
+            self.repository.replicate(notifications)
+        self._deliver_created(data['user_id'], notifications, data['version'])
+
+    def _on_remote_changed(self, data: Dict[str, Any]) -> None:
+        """Notificações lidas em outro worker (thread do PgEventBus)."""
+        user_id = data['user_id']
+        if not getattr(self.repository, 'is_shared', True):
+            if data.get('read_ids') is None:
+                self.repository.mark_all_as_read(user_id)
+            else:
+                self.repository.mark_many_as_read(data['read_ids'], user_id)
+        self._deliver_change(user_id, data['version'])
+
+    @staticmethod
+    def _updated_by_username(updated_by: Optional[Any]) -> Optional[str]:
+        """Extrai o username de quem fez a atualização (dict ou schema)."""
+        if updated_by and isinstance(updated_by, dict):
+            return updated_by.get('username')
+        return updated_by.username if hasattr(updated_by, 'username') else None
+
+    def create_review_notification(
+        self,
+        task: Dict[str, Any],
+        updated_by: Optional[Dict[str, Any]] = None,
+        event_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Cria notificações para admin e gerencial quando uma tarefa vai para revisão.
-        
+
         Args:
             task: Dados da tarefa que foi movida para revisão
             updated_by: Usuário que fez a atualização (opcional)
+            event_id: Evento do outbox que originou a notificação; o repositório
+                ignora eventos já aplicados (entrega repetida)
+
+        Returns:
+            Notificações criadas
         """
-        # Buscar todos os usuários admin e gerencial
-        all_users = self.user_repository.find_all()
-        target_users = [
-            user for user in all_users 
-            if user.get('role') in ['admin', 'gerencial']
-        ]
-        
-        # Criar notificação para cada usuário alvo
-        print(f"📢 Criando notificações para {len(target_users)} usuários (admin/gerencial)")
-        for user in target_users:
-            # Usar o ID baseado no tamanho atual da lista compartilhada
-            notification_id = len(NotificationService._notifications) + 1
-            notification = {
-                'id': notification_id,
-                'user_id': user.get('id'),
+        # Ids dos usuários admin e gerencial (diretório em cache, sem listar a tabela)
+        target_ids = self.role_directory.members(['admin', 'gerencial'])
+
+        # Criar uma notificação para cada usuário alvo, gravadas em uma única escrita
+        print(f"📢 Criando notificações para {len(target_ids)} usuários (admin/gerencial)")
+        username = self._updated_by_username(updated_by)
+        notifications = [
+            {
+                'user_id': user_id,
                 'type': 'task_review',
                 'title': 'Tarefa em Revisão',
                 'message': f"A tarefa '{task.get('titulo', 'Sem título')}' foi movida para revisão.",
                 'task_id': task.get('id'),
                 'task_title': task.get('titulo'),
-                'created_at': datetime.now().isoformat(),
-                'read': False,
-                'updated_by': updated_by.get('username') if updated_by and isinstance(updated_by, dict) else (updated_by.username if hasattr(updated_by, 'username') else None)
+                'updated_by': username,
+                'source_event_id': event_id
             }
-            NotificationService._notifications.append(notification)
-            print(f"✅ Notificação criada para usuário {user.get('id')} ({user.get('username')}): {notification['message']}")
-    
-    def create_completion_notification(self, task: Dict[str, Any], updated_by: Optional[Dict[str, Any]] = None) -> None:
+            for user_id in target_ids
+        ]
+        created = self._store(notifications)
+        print(f"✅ {len(created)} notificações de revisão criadas para a tarefa {task.get('id')}")
+        return created
+
+    def create_completion_notification(
+        self,
+        task: Dict[str, Any],
+        updated_by: Optional[Dict[str, Any]] = None,
+        event_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Cria notificação para o responsável pela tarefa quando ela é concluída.
-        
+
         Args:
             task: Dados da tarefa que foi concluída
             updated_by: Usuário que fez a atualização (opcional)
+            event_id: Evento do outbox que originou a notificação (ver create_review_notification)
+
+        Returns:
+            Notificações criadas (vazia se o responsável não foi encontrado)
         """
         owner_id = task.get('owner_id')
         if not owner_id:
             print(f"⚠️  Tarefa {task.get('id')} não tem owner_id, não é possível notificar")
-            return
-        
+            return []
+
         # Buscar o usuário responsável pela tarefa
         owner = self.user_repository.find_by_id(owner_id)
         if not owner:
             print(f"⚠️  Usuário {owner_id} não encontrado, não é possível notificar")
-            return
-        
+            return []
+
         # Criar notificação para o responsável
-        notification_id = len(NotificationService._notifications) + 1
-        notification = {
-            'id': notification_id,
+        created = self._store([{
             'user_id': owner_id,
             'type': 'task_completed',
             'title': 'Tarefa Concluída',
             'message': f"Sua tarefa '{task.get('titulo', 'Sem título')}' foi concluída.",
             'task_id': task.get('id'),
             'task_title': task.get('titulo'),
-            'created_at': datetime.now().isoformat(),
-            'read': False,
-            'updated_by': updated_by.get('username') if updated_by and isinstance(updated_by, dict) else (updated_by.username if hasattr(updated_by, 'username') else None)
-        }
-        NotificationService._notifications.append(notification)
-        print(f"✅ Notificação de conclusão criada para usuário {owner_id} ({owner.get('username')}): {notification['message']}")
-    
-    def get_user_notifications(self, user_id: int, unread_only: bool = False) -> List[Dict[str, Any]]:
+            'updated_by': self._updated_by_username(updated_by),
+            'source_event_id': event_id
+        }])
+        print(f"✅ Notificação de conclusão criada para usuário {owner_id} ({owner.get('username')})")
+        return created
+
+    def get_user_notifications(
+        self,
+        user_id: int,
+        unread_only: bool = False,
+        limit: Optional[int] = None,
+        before: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Busca notificações de um usuário específico.
-        
+
         Args:
             user_id: ID do usuário
             unread_only: Se True, retorna apenas notificações não lidas
-        
+            limit: Tamanho máximo da página (None = todas)
+            before: Id da última notificação da página anterior (cursor)
+
         Returns:
-            Lista de notificações do usuário
+            Lista de notificações do usuário (mais recentes primeiro)
         """
-        notifications = [
-            notif for notif in NotificationService._notifications 
-            if notif.get('user_id') == user_id
-        ]
-        
-        if unread_only:
-            notifications = [notif for notif in notifications if not notif.get('read')]
-        
-        # Ordenar por data de criação (mais recentes primeiro)
-        notifications.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        
-        return notifications
-    
+        return self.repository.find_by_user(user_id, unread_only=unread_only, limit=limit, before=before)
+
     def mark_as_read(self, notification_id: int, user_id: int) -> bool:
         """
         Marca uma notificação como lida.
-        
+
         Args:
             notification_id: ID da notificação
             user_id: ID do usuário (para segurança)
-        
+
         Returns:
             True se a notificação foi marcada como lida, False caso contrário
         """
-        for notification in NotificationService._notifications:
-            if notification.get('id') == notification_id and notification.get('user_id') == user_id:
-                notification['read'] = True
-                return True
-        return False
-    
+        success = self.repository.mark_as_read(notification_id, user_id)
+        if success:
+            self._publish_change(user_id, [notification_id])
+        return success
+
+    def mark_many_as_read(self, notification_ids: List[int], user_id: int) -> List[int]:
+        """
+        Marca várias notificações do usuário como lidas em uma única operação.
+
+        Args:
+            notification_ids: IDs das notificações
+            user_id: ID do usuário (ids de outros usuários são ignorados)
+
+        Returns:
+            Ids que estavam não lidas e foram marcadas
+        """
+        marked = self.repository.mark_many_as_read(notification_ids, user_id)
+        if marked:
+            self._publish_change(user_id, marked)
+        return marked
+
     def mark_all_as_read(self, user_id: int) -> int:
         """
         Marca todas as notificações de um usuário como lidas.
-        
+
         Args:
             user_id: ID do usuário
-        
+
         Returns:
             Número de notificações marcadas como lidas
         """
-        count = 0
-        for notification in NotificationService._notifications:
-            if notification.get('user_id') == user_id and not notification.get('read'):
-                notification['read'] = True
-                count += 1
+        count = self.repository.mark_all_as_read(user_id)
+        if count:
+            self._publish_change(user_id)
         return count
-    
+
     def get_unread_count(self, user_id: int) -> int:
         """
         Retorna o número de notificações não lidas de um usuário.
-        
+
         Args:
             user_id: ID do usuário
-        
+
         Returns:
             Número de notificações não lidas
         """
-        return len(self.get_user_notifications(user_id, unread_only=True))
-
+        return self.repository.count_unread(user_id)
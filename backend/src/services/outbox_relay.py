@@ -0,0 +1,226 @@
+"""
+Relay do outbox de tarefas - entrega "pelo menos uma vez", em ordem
+O TaskRepository grava os eventos de mudança de status em task_outbox na mesma
+transação do UPDATE em 'tarefas'; se o processo cair depois do commit, o evento
+continua lá. Este relay (tarefa asyncio iniciada no lifespan) lê os pendentes em
+ordem de id, entrega cada lote ao DomainEventBus (notificações e demais
+consumidores) e só então confirma a entrega.
+
+- Com vários workers, apenas o que detém o advisory lock OUTBOX_LOCK_KEY (em uma
+  conexão dedicada) entrega; se ele cair, a conexão fecha, o lock é liberado e
+  outro worker assume. Assim a ordem dos eventos é preservada.
+- Falha em um lote: o lote não é confirmado e é entregue de novo, um evento por
+  vez, até isolar o que falha. Depois de max_attempts o evento é descartado
+  (delivered_at preenchido, last_error mantido).
+- Entregas repetidas são possíveis: os consumidores são idempotentes (as
+  notificações guardam o source_event_id do evento aplicado).
+- wake() antecipa a próxima leitura (chamado pelo TaskService após o commit);
+  nos demais workers o evento é lido no próximo poll_interval_seconds.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+import psycopg2
+from src.config.database import get_db_config
+from src.patterns import DomainEventBus, TaskStatusChanged
+from src.repositories.outbox_repository import OutboxRepository
+
+# Chave do advisory lock que elege o worker responsável pela entrega
+OUTBOX_LOCK_KEY = 4_270_101
+
+
+class OutboxRelay:
+    """Entrega os eventos do task_outbox ao barramento de domínio."""
+
+    def __init__(
+        self,
+        domain_events: DomainEventBus,
+        repository: Optional[OutboxRepository] = None,
+        batch_size: int = 100,
+        poll_interval_seconds: float = 0.5,
+        max_attempts: int = 10,
+        retention_hours: float = 24,
+        connection_factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Args:
+            domain_events: Barramento cujos handlers consomem os eventos
+            repository: Acesso ao task_outbox (padrão: OutboxRepository)
+            batch_size: Máximo de eventos entregues por lote
+            poll_interval_seconds: Intervalo entre leituras quando não há eventos
+            max_attempts: Falhas de entrega antes de descartar um evento
+            retention_hours: Tempo que os eventos entregues ficam na tabela
+            connection_factory: Cria a conexão do advisory lock (padrão: config.yaml)
+        """
+        self.domain_events = domain_events
+        self.repository = repository or OutboxRepository()
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_attempts = max_attempts
+        self.retention_hours = retention_hours
+        self._connect = connection_factory or (lambda: psycopg2.connect(**get_db_config()))
+        self._lock_conn = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # Após uma falha, entrega um evento por vez até isolar o que falha
+        self._isolating = False
+        self._last_purge = 0.0
+        self._metrics: Dict[str, Any] = {
+            'delivered': 0,
+            'batches': 0,
+            'failed_deliveries': 0,
+            'dead_lettered': 0,
+            'failed_runs': 0,
+            'last_event_id': None,
+            'last_batch_seconds': 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Indica se o relay está ativo."""
+        return self._task is not None
+
+    @property
+    def leader(self) -> bool:
+        """Indica se este processo detém o advisory lock de entrega."""
+        return self._lock_conn is not None
+
+    async def start(self) -> None:
+        """Inicia o relay no event loop atual (lifespan)."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run_periodically(), name="outbox-relay")
+
+    async def stop(self) -> None:
+        """Interrompe o relay e libera o advisory lock (outro worker assume a entrega)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await asyncio.to_thread(self._release_leadership)
+        self._loop = None
+
+    def wake(self) -> None:
+        """Antecipa a próxima leitura do outbox. Seguro para chamar de qualquer thread."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _run_periodically(self) -> None:
+        while True:
+            try:
+                delivered = await self.run_once()
+            except Exception as e:
+                # Banco indisponível, por exemplo: tenta de novo no próximo ciclo
+                self._metrics['failed_runs'] += 1
+                print(f"❌ Erro no relay do outbox: {e}")
+                delivered = 0
+            if delivered >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def run_once(self) -> int:
+        """
+        Entrega um lote de eventos pendentes (se este processo for o responsável).
+
+        Returns:
+            Número de eventos entregues e confirmados
+        """
+        if not await asyncio.to_thread(self._ensure_leadership):
+            return 0
+        rows = await asyncio.to_thread(self.repository.fetch_pending, 1 if self._isolating else self.batch_size)
+        if not rows:
+            await asyncio.to_thread(self._purge_if_due)
+            return 0
+
+        started = time.perf_counter()
+        events = [self._to_event(row) for row in rows]
+        if await self.domain_events.deliver([event for event in events if event is not None]):
+            ids = [row['id'] for row in rows]
+            await asyncio.to_thread(self.repository.mark_delivered, ids)
+            self._isolating = False
+            self._metrics['delivered'] += len(ids)
+            self._metrics['batches'] += 1
+            self._metrics['last_event_id'] = ids[-1]
+            self._metrics['last_batch_seconds'] = round(time.perf_counter() - started, 4)
+            return len(ids)
+
+        self._metrics['failed_deliveries'] += 1
+        if len(rows) == 1:
+            dropped = await asyncio.to_thread(
+                self.repository.mark_failed, rows[0]['id'], "falha em um ou mais handlers", self.max_attempts
+            )
+            if dropped:
+                self._metrics['dead_lettered'] += 1
+                print(f"⚠️  Evento {rows[0]['id']} do outbox descartado após {self.max_attempts} tentativas")
+        self._isolating = True
+        return 0
+
+    @staticmethod
+    def _to_event(row: Dict[str, Any]) -> Optional[TaskStatusChanged]:
+        """Converte uma linha do outbox no evento de domínio correspondente."""
+        if row.get('event_type') != TaskStatusChanged.name:
+            print(f"⚠️  Tipo de evento desconhecido no outbox: {row.get('event_type')}")
+            return None
+        payload = row['payload'] if isinstance(row['payload'], dict) else json.loads(row['payload'])
+        return TaskStatusChanged(
+            payload.get('task') or {},
+            payload.get('old_status'),
+            payload.get('new_status'),
+            payload.get('updated_by'),
+            event_id=row['id']
+        )
+
+    def _ensure_leadership(self) -> bool:
+        """Mantém (ou tenta obter) o advisory lock de entrega na conexão dedicada."""
+        try:
+            if self._lock_conn is not None:
+                with self._lock_conn.cursor() as cursor:
+                    cursor.execute("SELECT 1;")
+                return True
+            conn = self._connect()
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_lock(%s);", (OUTBOX_LOCK_KEY,))
+                acquired = cursor.fetchone()[0]
+            if not acquired:
+                conn.close()
+                return False
+            self._lock_conn = conn
+            print("✅ Relay do outbox responsável pela entrega neste processo")
+            return True
+        except psycopg2.Error:
+            # Conexão perdida: o lock foi liberado junto com ela
+            self._release_leadership()
+            raise
+
+    def _release_leadership(self) -> None:
+        conn, self._lock_conn = self._lock_conn, None
+        if conn is not None and not conn.closed:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+
+    def _purge_if_due(self) -> None:
+        """Remove os eventos já entregues, no máximo uma vez por hora."""
+        now = time.monotonic()
+        if now - self._last_purge < 3600:
+            return
+        self._last_purge = now
+        removed = self.repository.purge_delivered(self.retention_hours * 3600)
+        if removed:
+            print(f"🧹 {removed} eventos entregues removidos do outbox")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Eventos entregues, falhas e liderança deste processo."""
+        return {'running': self.running, 'leader': self.leader, 'isolating': self._isolating, **self._metrics}
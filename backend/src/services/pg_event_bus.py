@@ -0,0 +1,256 @@
+"""
+Barramento de eventos entre workers - PostgreSQL LISTEN/NOTIFY
+Com vários workers do uvicorn, cada processo tem o seu NotificationHub (conexões
+SSE e long-polls) e, no modo memory, o seu armazenamento de notificações. Este
+barramento replica os eventos entre os processos usando o próprio PostgreSQL,
+sem depender de um broker externo.
+
+- publish() envia o evento com pg_notify() em uma conexão de publicação dedicada
+  (segura para chamar de qualquer thread).
+- Uma conexão em autocommit faz LISTEN no canal configurado; o event loop é
+  avisado quando há dados no socket (loop.add_reader) e lê as notificações com
+  conn.poll(), sem uma thread bloqueada esperando.
+- Cada processo tem um 'origin' próprio; eventos publicados por ele mesmo são
+  ignorados na recepção (a entrega local é feita por quem publicou).
+- Os handlers rodam em uma única thread auxiliar, na ordem de chegada, e podem
+  acessar o banco sem bloquear o event loop. Erro em um handler não afeta os demais.
+- Se a conexão de LISTEN cair, o barramento reconecta a cada reconnect_seconds e
+  emite o evento local RECONNECTED (eventos enviados no intervalo foram perdidos).
+"""
+import asyncio
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import psycopg2
+from psycopg2 import sql
+from src.config.database import get_db_config
+
+# Limite do payload do NOTIFY no PostgreSQL é 8000 bytes
+MAX_PAYLOAD_BYTES = 7900
+
+EventHandler = Callable[[Dict[str, Any]], None]
+
+
+class PgEventBus:
+    """Publica e recebe eventos da aplicação entre processos via LISTEN/NOTIFY."""
+
+    # Evento local emitido após reconectar o LISTEN
+    RECONNECTED = 'bus.reconnected'
+
+    def __init__(
+        self,
+        channel: str = 'app_events',
+        reconnect_seconds: float = 2.0,
+        connection_factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Args:
+            channel: Canal do LISTEN/NOTIFY compartilhado pelos workers
+            reconnect_seconds: Intervalo entre tentativas de reconexão do LISTEN
+            connection_factory: Cria conexões psycopg2 (padrão: parâmetros do config.yaml)
+        """
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self.origin = uuid.uuid4().hex
+        self._connect = connection_factory or (lambda: psycopg2.connect(**get_db_config()))
+        self._handlers: Dict[str, List[EventHandler]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._listen_conn = None
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._running = False
+        self._metrics = {
+            'published': 0,
+            'publish_errors': 0,
+            'oversized': 0,
+            'received': 0,
+            'handled': 0,
+            'handler_errors': 0,
+            'reconnects': 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Indica se o barramento foi iniciado (publish envia eventos)."""
+        return self._running
+
+    @property
+    def listening(self) -> bool:
+        """Indica se a conexão de LISTEN está ativa."""
+        return self._listen_conn is not None
+
+    def subscribe(self, event: str, handler: EventHandler) -> None:
+        """Registra um handler para eventos de outros processos com o nome informado."""
+        self._handlers.setdefault(event, []).append(handler)
+
+    async def start(self) -> None:
+        """Inicia o LISTEN no event loop atual (lifespan). Falhas viram reconexão em segundo plano."""
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='event-bus')
+        self._running = True
+        try:
+            await self._listen()
+        except psycopg2.Error as e:
+            print(f"⚠️  Barramento de eventos sem conexão ({e}); tentando novamente em segundo plano")
+            self._schedule_reconnect()
+
+    async def stop(self) -> None:
+        """Encerra o LISTEN, a conexão de publicação e a thread dos handlers."""
+        if not self._running:
+            return
+        self._running = False
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            await asyncio.gather(self._reconnect_task, return_exceptions=True)
+            self._reconnect_task = None
+        self._close_listener()
+        with self._publish_lock:
+            self._close(self._publish_conn)
+            self._publish_conn = None
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown, True)
+        self._loop = None
+
+    async def _listen(self) -> None:
+        """Abre a conexão de LISTEN (fora do event loop) e passa a observar o socket."""
+        conn = await self._loop.run_in_executor(None, self._open_listener)
+        self._listen_conn = conn
+        self._loop.add_reader(conn.fileno(), self._on_readable)
+
+    def _open_listener(self):
+        conn = self._connect()
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+        return conn
+
+    def _on_readable(self) -> None:
+        """Lê as notificações disponíveis na conexão de LISTEN (roda no event loop)."""
+        conn = self._listen_conn
+        if conn is None:
+            return
+        try:
+            conn.poll()
+        except psycopg2.Error as e:
+            print(f"⚠️  Conexão do barramento de eventos perdida: {e}")
+            self._close_listener()
+            self._schedule_reconnect()
+            return
+        while conn.notifies:
+            self._receive(conn.notifies.pop(0).payload)
+
+    def _receive(self, payload: str) -> None:
+        """Decodifica uma mensagem do canal e despacha se veio de outro processo."""
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            print(f"⚠️  Mensagem inválida no canal {self.channel} ignorada")
+            return
+        if message.get('origin') == self.origin:
+            return
+        self._metrics['received'] += 1
+        self._dispatch(message.get('event'), message.get('data') or {})
+
+    def _dispatch(self, event: str, data: Dict[str, Any]) -> None:
+        """Executa os handlers do evento na thread auxiliar (ou direto, se não iniciado)."""
+        for handler in self._handlers.get(event, ()):
+            if self._executor is None:
+                self._run_handler(handler, event, data)
+            else:
+                self._executor.submit(self._run_handler, handler, event, data)
+
+    def _run_handler(self, handler: EventHandler, event: str, data: Dict[str, Any]) -> None:
+        try:
+            handler(data)
+            self._metrics['handled'] += 1
+        except Exception as e:
+            self._metrics['handler_errors'] += 1
+            print(f"❌ Erro no handler do evento '{event}': {e}")
+
+    def _close_listener(self) -> None:
+        conn, self._listen_conn = self._listen_conn, None
+        if conn is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            try:
+                self._loop.remove_reader(conn.fileno())
+            except (ValueError, psycopg2.Error):
+                pass
+        self._close(conn)
+
+    @staticmethod
+    def _close(conn) -> None:
+        if conn is not None and not conn.closed:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+
+    def _schedule_reconnect(self) -> None:
+        if self._running and (self._reconnect_task is None or self._reconnect_task.done()):
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """Tenta reabrir o LISTEN até conseguir; depois emite RECONNECTED localmente."""
+        while self._running:
+            await asyncio.sleep(self.reconnect_seconds)
+            try:
+                await self._listen()
+            except psycopg2.Error:
+                continue
+            self._metrics['reconnects'] += 1
+            print("✅ Barramento de eventos reconectado")
+            self._dispatch(self.RECONNECTED, {})
+            return
+
+    def publish(self, event: str, data: Dict[str, Any], deliver_locally: bool = False) -> bool:
+        """
+        Publica um evento para os demais processos. Seguro para chamar de qualquer thread.
+
+        Args:
+            event: Nome do evento (ex.: 'notification.created')
+            data: Dados serializáveis em JSON
+            deliver_locally: Também executa os handlers deste processo
+
+        Returns:
+            True se o evento foi enviado ao PostgreSQL
+        """
+        if deliver_locally:
+            self._dispatch(event, data)
+        if not self._running:
+            return False
+        payload = json.dumps({'origin': self.origin, 'event': event, 'data': data}, default=str)
+        if len(payload.encode('utf-8')) > MAX_PAYLOAD_BYTES:
+            self._metrics['oversized'] += 1
+            print(f"⚠️  Evento '{event}' excede o limite do NOTIFY e não foi replicado")
+            return False
+        with self._publish_lock:
+            try:
+                if self._publish_conn is None or self._publish_conn.closed:
+                    self._publish_conn = self._connect()
+                    self._publish_conn.autocommit = True
+                with self._publish_conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s);", (self.channel, payload))
+            except psycopg2.Error as e:
+                self._close(self._publish_conn)
+                self._publish_conn = None
+                self._metrics['publish_errors'] += 1
+                print(f"❌ Erro ao publicar o evento '{event}': {e}")
+                return False
+        self._metrics['published'] += 1
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Métricas de publicação, recepção e reconexão."""
+        return {
+            'running': self._running,
+            'listening': self.listening,
+            'channel': self.channel,
+            **self._metrics,
+        }
@@ -1,15 +1,25 @@
 """
 Serviço de Tarefas - Service Layer Pattern
 Contém a lógica de negócio relacionada a tarefas.
-Usa o padrão Observer para notificar quando tarefas vão para revisão.
+Mudanças de status são publicadas como TaskStatusChanged no DomainEventBus; os
+handlers registrados na inicialização (notificações via padrão Observer e o
+evento 'task.status_changed' para os demais workers) rodam fora da requisição.
+Com um OutboxRelay, o evento é gravado no task_outbox na mesma transação do
+UPDATE e o relay faz a entrega (nada se perde se o processo cair após o commit).
 """
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, Iterable, List, Dict, Any, Union, AsyncIterator, Callable
 from fastapi import HTTPException, status
 from src.repositories.task_repository import TaskRepository
 from src.repositories.user_repository import UserRepository
 from src.config import schemas
-from src.patterns import TaskSubject, TaskNotificationObserver
+from src.core.streaming import stream_from_thread
+from src.patterns import DomainEventBus, TaskNotificationObserver, TaskStatusChanged
 from src.services.notification_service import NotificationService
+from src.services.outbox_relay import OutboxRelay
+
+# Lotes vazios seguidos, com tarefas restantes, até reassign_tasks desistir
+_REASSIGN_MAX_EMPTY_BATCHES = 5
 
 
 class TaskService:
@@ -19,24 +29,106 @@ class TaskService:
         self, 
         task_repository: Optional[TaskRepository] = None,
         user_repository: Optional[UserRepository] = None,
-        notification_service: Optional[NotificationService] = None
+        notification_service: Optional[NotificationService] = None,
+        domain_events: Optional[DomainEventBus] = None,
+        outbox_relay: Optional[OutboxRelay] = None
     ):
         """
         Inicializa o serviço com repositórios (Dependency Injection).
-        Configura o padrão Observer para notificações.
+        Sem um DomainEventBus da aplicação, cria um barramento local com o
+        observer de notificações (handlers executados de forma síncrona).
+        Com um OutboxRelay, os eventos de status passam pelo task_outbox.
         """
         self.task_repository = task_repository or TaskRepository()
         self.user_repository = user_repository or UserRepository()
         self.notification_service = notification_service or NotificationService(self.user_repository)
         
-        # Configurar Observer Pattern
-        # Criar observador de notificações
-        self.notification_observer = TaskNotificationObserver(self.notification_service)
+        if domain_events is None:
+            domain_events = DomainEventBus()
+            domain_events.attach(TaskNotificationObserver(self.notification_service), TaskStatusChanged)
+        self.domain_events = domain_events
+        self.outbox_relay = outbox_relay
     
-    def get_all_tasks(self) -> List[Dict[str, Any]]:
-        """Retorna todas as tarefas."""
-        return self.task_repository.find_all()
+    def get_all_tasks(self, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna todas as tarefas.
+        
+        Args:
+            fields: Campos retornados (padrão: todos)
+        """
+        return self.task_repository.find_all(fields)
     
+    def get_board(
+        self,
+        limit: int,
+        status_filter: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Monta o quadro Kanban: as primeiras `limit` tarefas de cada status (na ordem
+        do quadro), o total de cada coluna e o cursor para carregar mais (None
+        quando não há mais).
+
+        Args:
+            limit: Tarefas por coluna
+            status_filter: Apenas esta coluna ("carregar mais")
+            after: Cursor recebido em next_cursor da coluna ("<position>.<id>")
+
+        Raises:
+            HTTPException 400: Cursor inválido
+        """
+        cursor = None
+        if after is not None:
+            position, _, task_id = after.rpartition('.')
+            if not position or not task_id.isdigit():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor inválido em 'after'"
+                )
+            cursor = (position, int(task_id))
+        columns: Dict[str, Dict[str, Any]] = {}
+        for row in self.task_repository.find_board(limit, status_filter, cursor):
+            column_status = row.pop('column_status')
+            total = row.pop('column_total')
+            position = row.pop('position')
+            column = columns.get(column_status)
+            if column is None:
+                column = columns[column_status] = {
+                    'status': column_status, 'total': total, 'tasks': [], 'next_cursor': None
+                }
+            if row['id'] is None:
+                continue
+            if len(column['tasks']) == limit:
+                # Linha extra: a coluna tem mais tarefas depois da última retornada
+                column['next_cursor'] = f"{last_position}.{column['tasks'][-1]['id']}"
+                continue
+            column['tasks'].append(row)
+            last_position = position
+        return {'columns': list(columns.values())}
+
+    def export_tasks(
+        self,
+        export_format: str,
+        current_user_role: str,
+        current_user_id: int,
+        status_filter: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Exportação para relatórios: CSV ou NDJSON gerado pelo próprio PostgreSQL
+        (COPY ... TO STDOUT) e repassado em blocos, sem carregar as tarefas.
+        Admin e gerencial exportam todas as tarefas; visualização, apenas as suas
+        (filtro aplicado no SQL).
+
+        Returns:
+            Iterador assíncrono dos blocos; o COPY começa na primeira leitura (uma
+            resposta abandonada antes disso não ocupa conexão) e suas falhas são
+            lançadas pelo iterador
+        """
+        owner_id = current_user_id if current_user_role == "visualizacao" else None
+        return stream_from_thread(
+            lambda file: self.task_repository.copy_export(file, export_format, owner_id, status_filter)
+        )
+
     def get_task_by_id(self, task_id: int) -> Dict[str, Any]:
         """Busca uma tarefa pelo ID. Lança exceção se não encontrada."""
         task = self.task_repository.find_by_id(task_id)
@@ -78,13 +170,15 @@ class TaskService:
     def update_task(
         self,
         task_id: int,
-        task_data: schemas.TaskCreate,
+        task_data: Union[schemas.TaskCreate, schemas.TaskUpdate],
         current_user_role: str,
         current_user: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Atualiza uma tarefa existente.
         Aplica regras de negócio baseadas no perfil do usuário.
+        Apenas os campos informados e diferentes dos atuais são gravados; se nada
+        mudou não há escrita, e o evento de status só é publicado se o status mudou.
         """
         # Verificar se a tarefa existe
         current_task = self.task_repository.find_by_id(task_id)
@@ -96,64 +190,46 @@ class TaskService:
         
         # Guardar status anterior para o Observer
         old_status = current_task.get('status')
+        requested = task_data.model_dump(exclude_none=True)
         
         # Restrições para usuário com role "visualizacao"
         if current_user_role == "visualizacao":
-            # Visualização não pode alterar título, descrição ou owner_id
-            if task_data.status and task_data.status == "concluida":
+            if requested.get('status') == "concluida":
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Usuários com perfil visualização não podem concluir tarefas"
                 )
-            # Apenas atualizar status, ignorar outros campos
-            # Se status não foi fornecido, não atualizar nada
-            if task_data.status:
-                success = self.task_repository.update(
-                    task_id=task_id,
-                    titulo=None,
-                    descricao=None,
-                    status=task_data.status,
-                    owner_id=None
-                )
-                if not success:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Tarefa não encontrada"
-                    )
-                # Buscar tarefa atualizada
-                updated_task = self.task_repository.find_by_id(task_id)
-                # Usar Observer Pattern para notificar se mudou para em_revisao
-                self._notify_if_review(updated_task, old_status, current_user)
-                return updated_task
-            else:
-                # Se não há status para atualizar, retornar tarefa atual
-                return current_task
-        else:
-            # Admin e gerencial podem alterar tudo
-            # Se owner_id foi fornecido, verificar se o usuário destino existe
-            owner_id = None
-            if task_data.owner_id is not None:
-                target_user = self.user_repository.find_by_id(task_data.owner_id)
-                if not target_user:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Usuário destino não encontrado"
-                    )
-                owner_id = task_data.owner_id
-            
-            success = self.task_repository.update(
-                task_id=task_id,
-                titulo=task_data.titulo,
-                descricao=task_data.descricao,
-                status=task_data.status,
-                owner_id=owner_id
-            )
-            if not success:
+            # Visualização não pode alterar título, descrição ou owner_id: apenas o status
+            requested = {key: value for key, value in requested.items() if key == 'status'}
+        
+        changes = {key: value for key, value in requested.items() if current_task.get(key) != value}
+        if not changes:
+            return current_task
+        
+        # Admin e gerencial: se o responsável muda, verificar se o usuário destino existe
+        if 'owner_id' in changes:
+            target_user = self.user_repository.find_by_id(changes['owner_id'])
+            if not target_user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Tarefa não encontrada"
+                    detail="Usuário destino não encontrado"
                 )
         
+        changed_fields = self.task_repository.update(
+            task_id=task_id,
+            titulo=changes.get('titulo'),
+            descricao=changes.get('descricao'),
+            status=changes.get('status'),
+            owner_id=changes.get('owner_id'),
+            record_status_event=self.outbox_relay is not None,
+            updated_by=current_user
+        )
+        if changed_fields is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tarefa não encontrada"
+            )
+        
         # Retornar a tarefa atualizada
         updated_task = self.task_repository.find_by_id(task_id)
         if not updated_task:
@@ -162,47 +238,176 @@ class TaskService:
                 detail="Erro ao buscar tarefa atualizada"
             )
         
-        # Usar Observer Pattern para notificar se mudou para em_revisao
-        self._notify_if_review(updated_task, old_status, current_user)
+        if 'status' in changed_fields:
+            self._publish_status_change(updated_task, old_status, current_user)
         
         return updated_task
     
-    def _notify_if_review(self, task: Dict[str, Any], old_status: str, updated_by: Optional[Dict[str, Any]]) -> None:
+    def change_status(
+        self,
+        task_id: int,
+        new_status: str,
+        current_user_role: str,
+        current_user: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
-        Usa o padrão Observer para notificar quando uma tarefa muda de status.
-        - Notifica admin/gerencial quando vai para "em_revisao"
-        - Notifica o responsável quando vai para "concluida"
+        Transição de status (arrastar no quadro): um único UPDATE condicional, sem
+        reler a tarefa nem validar o responsável. Se o status já era o pedido, nada
+        é escrito e nenhum evento é publicado.
+        
+        Returns:
+            id, status e changed (se houve transição)
+        """
+        if current_user_role == "visualizacao" and new_status == "concluida":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuários com perfil visualização não podem concluir tarefas"
+            )
+        result = self.task_repository.update_status(
+            task_id,
+            new_status,
+            record_status_event=self.outbox_relay is not None,
+            updated_by=current_user
+        )
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tarefa não encontrada"
+            )
+        if result['changed']:
+            task = {key: result[key] for key in ('id', 'titulo', 'descricao', 'status', 'owner_id', 'created_at')}
+            self._publish_status_change(task, result['old_status'], current_user)
+        return {'id': result['id'], 'status': result['status'], 'changed': result['changed']}
+    
+    def move_task(
+        self,
+        task_id: int,
+        move: schemas.TaskMove,
+        current_user_role: str,
+        current_user: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Move um cartão no quadro: coluna (status) e lugar dentro dela. Apenas a
+        tarefa movida é gravada; o evento de status só é publicado se a coluna mudou.
+        
+        Returns:
+            id, status, position, changed (se o status mudou) e rebalanced
+        """
+        if current_user_role == "visualizacao" and move.status == "concluida":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuários com perfil visualização não podem concluir tarefas"
+            )
+        try:
+            result = self.task_repository.move(
+                task_id,
+                move.status,
+                after_id=move.after_id,
+                before_id=move.before_id,
+                record_status_event=self.outbox_relay is not None,
+                updated_by=current_user
+            )
+        except ValueError as e:
+            # Quadro desatualizado no cliente: o vizinho mudou de coluna ou foi removido
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tarefa não encontrada"
+            )
+        if result['changed']:
+            task = {key: result[key] for key in ('id', 'titulo', 'descricao', 'status', 'owner_id', 'created_at')}
+            self._publish_status_change(task, result['old_status'], current_user)
+        return {key: result[key] for key in ('id', 'status', 'position', 'changed', 'rebalanced')}
+    
+    def _publish_status_change(self, task: Optional[Dict[str, Any]], old_status: str, updated_by: Optional[Dict[str, Any]]) -> None:
+        """
+        Publica TaskStatusChanged quando o status mudou. Os handlers (notificações
+        para em_revisao/concluida, quadro dos demais workers) rodam fora da requisição.
+        Com o outbox, o evento já foi gravado junto com o UPDATE: apenas acorda o relay.
         
         Args:
             task: Tarefa atualizada
             old_status: Status anterior
             updated_by: Usuário que fez a atualização
         """
-        new_status = task.get('status')
-        
-        # Debug: imprimir informações
-        print(f"🔍 Verificando notificação: old_status={old_status}, new_status={new_status}")
-        
-        # Se mudou para em_revisao ou concluida, usar Observer Pattern
-        if (new_status == 'em_revisao' and old_status != 'em_revisao') or \
-           (new_status == 'concluida' and old_status != 'concluida'):
-            status_msg = 'em_revisao' if new_status == 'em_revisao' else 'concluida'
-            print(f"✅ Status mudou para '{status_msg}'! Disparando notificações...")
-            # Criar Subject (tarefa)
-            task_subject = TaskSubject(task)
-            
-            # Anexar observador de notificações
-            task_subject.attach(self.notification_observer)
-            
-            # Notificar observadores
-            task_subject.update_task(task, old_status, updated_by)
-            
-            # Desanexar observador (opcional, pode manter anexado)
-            task_subject.detach(self.notification_observer)
-            print(f"✅ Notificações disparadas via Observer Pattern")
-        else:
-            print(f"ℹ️  Não precisa notificar: old_status={old_status}, new_status={new_status}")
+        if not task or task.get('status') == old_status:
+            return
+        if self.outbox_relay is not None:
+            self.outbox_relay.wake()
+            return
+        self.domain_events.publish(TaskStatusChanged(task, old_status, task.get('status'), updated_by))
     
+    def reassign_tasks(
+        self,
+        from_owner_id: int,
+        to_owner_id: int,
+        status_filter: Optional[str] = None,
+        batch_size: int = 500,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Transfere as tarefas de um usuário para outro em lotes (job 'tasks.reassign').
+        Cada lote é uma transação curta, então o quadro continua utilizável durante
+        a operação; um cancelamento (lançado por progress) mantém os lotes já gravados.
+
+        Args:
+            from_owner_id: Responsável atual
+            to_owner_id: Novo responsável
+            status_filter: Apenas as tarefas deste status (padrão: todas)
+            batch_size: Tarefas por lote
+            progress: Chamado após cada lote (inclusive vazio) com (transferidas, total)
+
+        Returns:
+            {'reassigned': número de tarefas transferidas}
+
+        Raises:
+            RuntimeError: Ainda restam tarefas após _REASSIGN_MAX_EMPTY_BATCHES lotes vazios seguidos
+        """
+        if from_owner_id == to_owner_id:
+            # Nada a transferir (cada lote regravaria as mesmas linhas indefinidamente)
+            return {'reassigned': 0}
+        total = self.task_repository.count_by_owner(from_owner_id, status_filter)
+        reassigned = 0
+        empty_batches = 0
+        if progress:
+            progress(reassigned, total)
+        while True:
+            count = self.task_repository.reassign_batch(from_owner_id, to_owner_id, status_filter, batch_size)
+            reassigned += count
+            if progress:
+                # Também nos lotes vazios: é onde o job verifica o cancelamento
+                progress(reassigned, max(total, reassigned))
+            if count:
+                empty_batches = 0
+                continue
+            # Lote vazio não garante que acabou (linhas que mudaram durante a
+            # espera do lock saem do lote): termina só quando não resta nenhuma
+            remaining = self.task_repository.count_by_owner(from_owner_id, status_filter)
+            if not remaining:
+                break
+            empty_batches += 1
+            if empty_batches >= _REASSIGN_MAX_EMPTY_BATCHES:
+                raise RuntimeError(
+                    f"{remaining} tarefas não puderam ser transferidas após {empty_batches} lotes vazios"
+                )
+            time.sleep(0.1 * empty_batches)
+        return {'reassigned': reassigned}
+
+    def rebalance_board(self, max_length: int) -> Dict[str, int]:
+        """
+        Manutenção do quadro: regrava as chaves das colunas que passaram de
+        max_length caracteres ou têm chaves repetidas (criações simultâneas), para
+        que os movimentos não precisem rebalancear a coluna durante a requisição.
+
+        Returns:
+            Tarefas regravadas por coluna
+        """
+        return {
+            column: self.task_repository.rebalance_column(column)
+            for column in self.task_repository.find_columns_to_rebalance(max_length)
+        }
+
     def delete_task(self, task_id: int) -> bool:
         """Deleta uma tarefa."""
         success = self.task_repository.delete(task_id)
@@ -2,7 +2,7 @@
 Serviço de Usuários - Service Layer Pattern
 Contém a lógica de negócio relacionada a usuários.
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, Iterable, List, Dict, Any
 from fastapi import HTTPException, status
 from src.repositories.user_repository import UserRepository
 from src.config import schemas
@@ -29,16 +29,17 @@ class UserService:
             )
         return user
     
-    def get_all_users(self, current_user_role: str) -> List[Dict[str, Any]]:
+    def get_all_users(self, current_user_role: str, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
         """
         Retorna todos os usuários com base no perfil do usuário atual.
         - Admin: vê todos os usuários
         - Gerencial: vê apenas usuários até o nível gerencial
+        - fields: campos retornados (padrão: todos)
         """
         if current_user_role == "admin":
-            return self.repository.find_all()
+            return self.repository.find_all(fields)
         else:
-            return self.repository.find_by_max_role("gerencial")
+            return self.repository.find_by_max_role("gerencial", fields)
     
     def create_user(self, user_data: schemas.UserCreate) -> Dict[str, Any]:
         """
@@ -66,8 +67,9 @@ class UserService:
         current_user_role: str
     ) -> Dict[str, Any]:
         """
-        Atualiza um usuário existente.
+        Atualiza um usuário existente (semântica de PATCH: apenas os campos informados).
         Aplica regras de negócio baseadas no perfil do usuário atual.
+        Campos iguais aos atuais não são gravados.
         """
         # Verificar se o usuário existe
         db_user = self.repository.find_by_id(user_id)
@@ -99,19 +101,34 @@ class UserService:
                     detail="Username já está em uso"
                 )
         
+        requested = user_data.model_dump(exclude_none=True)
+        if not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Nenhum campo foi atualizado"
+            )
+        
+        # Apenas campos diferentes dos atuais (a senha é comparada pelo repositório)
+        changes = {
+            key: value for key, value in requested.items()
+            if key == 'password' or db_user.get(key) != value
+        }
+        if not changes:
+            return db_user
+        
         # Atualizar usuário
         updated_user = self.repository.update(
             user_id=user_id,
-            username=user_data.username,
-            email=user_data.email,
-            role=user_data.role,
-            password=user_data.password
+            username=changes.get('username'),
+            email=changes.get('email'),
+            role=changes.get('role'),
+            password=changes.get('password')
         )
         
         if not updated_user:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Nenhum campo foi atualizado"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário não encontrado"
             )
         
         return updated_user
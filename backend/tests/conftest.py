@@ -8,8 +8,9 @@ from typing import Dict, Any
 # Importações condicionais para evitar erros se dependências não estiverem instaladas
 try:
     from fastapi.testclient import TestClient
-    from src.repositories import UserRepository, TaskRepository
+    from src.repositories import UserRepository, TaskRepository, NotificationRepository
     from src.services import UserService, TaskService, AuthService
+    from src.services.notification_service import NotificationService
     # Importar app e schemas de forma lazy para evitar erros de dependências
     _app = None
     _schemas = None
@@ -32,9 +33,11 @@ except ImportError as e:
     TestClient = None
     UserRepository = None
     TaskRepository = None
+    NotificationRepository = None
     UserService = None
     TaskService = None
     AuthService = None
+    NotificationService = None
     _app = None
     _schemas = None
     
@@ -157,6 +160,14 @@ def mock_task_repository():
     return Mock(spec=TaskRepository)
 
 
+@pytest.fixture
+def mock_notification_repository():
+    """Repositório de notificações mockado."""
+    if NotificationRepository is None:
+        return Mock()
+    return Mock(spec=NotificationRepository)
+
+
 # ============================================================================
 # Fixtures de Serviços
 # ============================================================================
@@ -180,6 +191,19 @@ def task_service(mock_task_repository, mock_user_repository):
     )
 
 
+@pytest.fixture
+def notification_service(mock_user_repository, mock_notification_repository):
+    """Serviço de notificações com repositórios mockados."""
+    if NotificationService is None:
+        pytest.skip("Dependências não instaladas. Execute: pip install -r requirements.txt")
+    from src.repositories.role_directory import RoleDirectory
+    return NotificationService(
+        user_repository=mock_user_repository,
+        repository=mock_notification_repository,
+        role_directory=RoleDirectory(mock_user_repository)
+    )
+
+
 @pytest.fixture
 def auth_service(mock_user_repository):
     """Serviço de autenticação com repositório mockado."""
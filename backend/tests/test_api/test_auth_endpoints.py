@@ -76,3 +76,38 @@ class TestAuthEndpoints:
         # Assert
         assert response.status_code == 422  # Unprocessable Entity
 
+    
+    def test_bootstrap_single_response(self, client):
+        """Testa GET /bootstrap: o usuário autenticado e os limites chegam ao serviço em uma requisição."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_bootstrap_service
+        from tests.helpers import override_auth_dependency, clear_overrides
+        
+        async def load(current_user, board_limit, notifications_limit):
+            return {
+                "me": {"id": current_user.id, "username": current_user.username, "role": current_user.role},
+                "board": {"columns": []}, "users": None, "notifications": [],
+                "notifications_next_before": None, "unread_count": 0, "version": 0,
+                "limits": [board_limit, notifications_limit]
+            }
+        mock_service = MagicMock()
+        mock_service.load.side_effect = load
+        
+        override_auth_dependency(app, user_role="visualizacao", username="usuario")
+        app.dependency_overrides[get_bootstrap_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.get(
+                "/bootstrap?board_limit=30&notifications_limit=10", headers={"Authorization": "Bearer mock_token"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            data = response.json()
+            assert data["me"]["username"] == "usuario"
+            assert data["limits"] == [30, 10]
+            assert "Accept" in response.headers["vary"]
+        finally:
+            clear_overrides(app)
@@ -0,0 +1,152 @@
+"""
+Testes para endpoints de notificações.
+"""
+import pytest
+from unittest.mock import MagicMock
+from tests.helpers import override_auth_dependency, clear_overrides
+
+
+@pytest.mark.api
+class TestNotificationEndpoints:
+    """Testes para endpoints de notificações."""
+    
+    def test_unread_count_without_since_version(self, client):
+        """Testa o contador sem long-poll: resposta imediata com versão e intervalo sugerido."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_notification_service, get_notification_hub
+        from src.services.notification_hub import NotificationHub
+        
+        mock_service = MagicMock()
+        mock_service.get_unread_count.return_value = 2
+        hub = NotificationHub()
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_notification_service] = lambda: mock_service
+        app.dependency_overrides[get_notification_hub] = lambda: hub
+        
+        try:
+            # Act
+            response = client.get(
+                "/notifications/unread-count",
+                headers={"Authorization": "Bearer mock_token"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            data = response.json()
+            assert data["unread_count"] == 2
+            assert data["version"] == 0
+            assert data["poll_interval"] > 0
+        finally:
+            clear_overrides(app)
+    
+    def test_unread_count_long_poll_timeout(self, client):
+        """Testa o long-poll que expira sem mudanças."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_notification_service, get_notification_hub
+        from src.services.notification_hub import NotificationHub
+        
+        mock_service = MagicMock()
+        mock_service.get_unread_count.return_value = 0
+        hub = NotificationHub()
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_notification_service] = lambda: mock_service
+        app.dependency_overrides[get_notification_hub] = lambda: hub
+        
+        try:
+            # Act
+            response = client.get(
+                "/notifications/unread-count?since_version=42&timeout=0.05",
+                headers={"Authorization": "Bearer mock_token"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            assert response.json()["version"] == 42
+        finally:
+            clear_overrides(app)
+    
+    def test_list_notifications_returns_next_cursor(self, client):
+        """Testa que uma página cheia traz o cursor da próxima no cabeçalho X-Next-Before."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_notification_service
+        
+        mock_service = MagicMock()
+        mock_service.get_user_notifications.return_value = [{"id": 9}, {"id": 8}, {"id": 7}]
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_notification_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.get(
+                "/notifications/?limit=2&before=10",
+                headers={"Authorization": "Bearer mock_token"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            assert response.json() == [{"id": 9}, {"id": 8}]
+            assert response.headers["X-Next-Before"] == "8"
+            mock_service.get_user_notifications.assert_called_once_with(1, unread_only=False, limit=3, before=10)
+        finally:
+            clear_overrides(app)
+    
+    def test_mark_many_as_read(self, client):
+        """Testa a marcação em lote por lista de ids."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_notification_service
+        
+        mock_service = MagicMock()
+        mock_service.mark_many_as_read.return_value = [3, 4]
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_notification_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.put(
+                "/notifications/read",
+                json={"ids": [3, 4, 5]},
+                headers={"Authorization": "Bearer mock_token"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            assert response.json()["ids"] == [3, 4]
+            mock_service.mark_many_as_read.assert_called_once_with([3, 4, 5], 1)
+        finally:
+            clear_overrides(app)
+    
+    def test_mark_many_as_read_msgpack_body(self, client):
+        """Testa a marcação em lote com corpo MessagePack e a validação do corpo."""
+        # Arrange
+        msgpack = pytest.importorskip("msgpack")
+        from src.main import app
+        from src.dependencies import get_notification_service
+        
+        mock_service = MagicMock()
+        mock_service.mark_many_as_read.return_value = [3]
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_notification_service] = lambda: mock_service
+        headers = {"Authorization": "Bearer mock_token", "Content-Type": "application/msgpack"}
+        
+        try:
+            # Act
+            response = client.put("/notifications/read", content=msgpack.packb({"ids": [3]}), headers=headers)
+            invalid = client.put("/notifications/read", content=msgpack.packb({"ids": []}), headers=headers)
+            
+            # Assert
+            assert response.status_code == 200
+            assert response.json()["ids"] == [3]
+            mock_service.mark_many_as_read.assert_called_once_with([3], 1)
+            assert invalid.status_code == 422
+            assert invalid.json()["detail"][0]["loc"] == ["body", "ids"]
+        finally:
+            clear_overrides(app)
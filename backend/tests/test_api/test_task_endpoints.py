@@ -187,3 +187,320 @@ class TestTaskEndpoints:
         finally:
             clear_overrides(app)
 
+    
+    def test_get_tasks_fast_path_keeps_contract(self, client):
+        """Testa que o caminho rápido (orjson, sem revalidação) devolve o mesmo JSON do caminho padrão."""
+        # Arrange
+        from unittest.mock import patch
+        from src.main import app
+        from src.dependencies import get_task_service
+        from src.core import serialization
+        
+        mock_tasks = [
+            {"id": 1, "titulo": "Tarefa 1", "status": "pendente", "owner_id": 1},
+            {
+                "id": 2, "titulo": "Tarefa 2 ✓", "descricao": "Descrição", "status": "concluida",
+                "owner_id": 3, "owner_username": "user3", "created_at": "2025-01-01T10:00:00"
+            }
+        ]
+        
+        mock_service = MagicMock()
+        mock_service.get_all_tasks.return_value = mock_tasks
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_task_service] = lambda: mock_service
+        
+        try:
+            # Act
+            fast = client.get("/tasks/", headers={"Authorization": "Bearer mock_token"})
+            with patch.dict(serialization.settings, {"fast_responses": False}):
+                standard = client.get("/tasks/", headers={"Authorization": "Bearer mock_token"})
+            
+            # Assert
+            assert fast.status_code == standard.status_code == 200
+            assert fast.headers["content-type"] == standard.headers["content-type"]
+            assert fast.json() == standard.json()
+            assert list(fast.json()[0]) == [
+                "titulo", "descricao", "status", "id", "owner_id", "owner_username", "created_at"
+            ]
+            assert fast.json()[0]["descricao"] is None
+        finally:
+            clear_overrides(app)
+    
+    def test_get_tasks_msgpack(self, client):
+        """Testa a listagem em MessagePack (Accept: application/msgpack) com o mesmo conteúdo do JSON."""
+        # Arrange
+        msgpack = pytest.importorskip("msgpack")
+        from src.main import app
+        from src.dependencies import get_task_service
+        
+        mock_service = MagicMock()
+        mock_service.get_all_tasks.return_value = [
+            {"id": 1, "titulo": "Tarefa 1", "status": "pendente", "owner_id": 1, "extra": "x"}
+        ]
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_task_service] = lambda: mock_service
+        
+        try:
+            # Act
+            packed = client.get(
+                "/tasks/",
+                headers={"Authorization": "Bearer mock_token", "Accept": "application/msgpack, application/json;q=0.5"}
+            )
+            plain = client.get("/tasks/", headers={"Authorization": "Bearer mock_token"})
+            
+            # Assert
+            assert packed.status_code == 200
+            assert packed.headers["content-type"] == "application/msgpack"
+            assert "Accept" in packed.headers["vary"]
+            assert msgpack.unpackb(packed.content) == plain.json()
+            assert "extra" not in plain.json()[0]
+        finally:
+            clear_overrides(app)
+    
+    def test_get_tasks_sparse_fields(self, client):
+        """Testa ?fields=: a consulta e a resposta trazem apenas os campos pedidos."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_task_service
+        
+        mock_service = MagicMock()
+        mock_service.get_all_tasks.return_value = [
+            {"id": 1, "titulo": "Tarefa 1", "status": "pendente", "owner_id": 1}
+        ]
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_task_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.get(
+                "/tasks/?fields=status, id,titulo,owner_id",
+                headers={"Authorization": "Bearer mock_token"}
+            )
+            invalid = client.get("/tasks/?fields=id,senha", headers={"Authorization": "Bearer mock_token"})
+            
+            # Assert
+            assert response.status_code == 200
+            assert response.json() == [{"titulo": "Tarefa 1", "status": "pendente", "id": 1, "owner_id": 1}]
+            mock_service.get_all_tasks.assert_called_once_with(("titulo", "status", "id", "owner_id"))
+            assert invalid.status_code == 400
+        finally:
+            clear_overrides(app)
+    
+    def test_change_task_status(self, client):
+        """Testa PATCH /tasks/{id}/status: resposta mínima e validação do status."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_task_service
+        
+        mock_service = MagicMock()
+        mock_service.change_status.return_value = {"id": 1, "status": "em_revisao", "changed": True}
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_task_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.patch(
+                "/tasks/1/status", json={"status": "em_revisao"}, headers={"Authorization": "Bearer mock_token"}
+            )
+            invalid = client.patch(
+                "/tasks/1/status", json={"status": "arquivada"}, headers={"Authorization": "Bearer mock_token"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            assert response.json() == {"id": 1, "status": "em_revisao", "changed": True}
+            assert mock_service.change_status.call_args[0][:3] == (1, "em_revisao", "visualizacao")
+            assert invalid.status_code == 422
+        finally:
+            clear_overrides(app)
+    
+    def test_patch_task_partial_body(self, client):
+        """Testa PATCH /tasks/{id}: o corpo parcial chega ao serviço sem valores padrão."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_task_service
+        
+        mock_service = MagicMock()
+        mock_service.update_task.return_value = {"id": 1, "titulo": "Tarefa", "status": "em_andamento", "owner_id": 1}
+        
+        override_auth_dependency(app, user_role="gerencial")
+        app.dependency_overrides[get_task_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.patch(
+                "/tasks/1", json={"status": "em_andamento"}, headers={"Authorization": "Bearer mock_token"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            task_data = mock_service.update_task.call_args[0][1]
+            assert task_data.model_dump(exclude_none=True) == {"status": "em_andamento"}
+        finally:
+            clear_overrides(app)
+    
+    def test_get_task_board(self, client):
+        """Testa GET /tasks/board: parâmetros de paginação por coluna e formato da resposta."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_task_service
+        
+        mock_service = MagicMock()
+        mock_service.get_board.return_value = {"columns": [{
+            "status": "pendente", "total": 5,
+            "tasks": [{"id": 7, "titulo": "Tarefa 7", "descricao": None, "status": "pendente", "owner_id": 1,
+                       "owner_username": "user1", "created_at": None}],
+            "next_cursor": "V.7"
+        }]}
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_task_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.get(
+                "/tasks/board?limit=1&status=pendente&after=F.3", headers={"Authorization": "Bearer mock_token"}
+            )
+            invalid = client.get("/tasks/board?limit=0", headers={"Authorization": "Bearer mock_token"})
+            
+            # Assert
+            assert response.status_code == 200
+            column = response.json()["columns"][0]
+            assert (column["total"], column["next_cursor"], column["tasks"][0]["id"]) == (5, "V.7", 7)
+            mock_service.get_board.assert_called_once_with(1, "pendente", "F.3")
+            assert invalid.status_code == 422
+        finally:
+            clear_overrides(app)
+    
+    def test_move_task(self, client):
+        """Testa PATCH /tasks/{id}/position: corpo com vizinho e resposta mínima."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_task_service
+        
+        mock_service = MagicMock()
+        mock_service.move_task.return_value = {
+            "id": 1, "status": "em_andamento", "position": "VV", "changed": True, "rebalanced": False
+        }
+        
+        override_auth_dependency(app, user_role="visualizacao")
+        app.dependency_overrides[get_task_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.patch(
+                "/tasks/1/position", json={"status": "em_andamento", "before_id": 4},
+                headers={"Authorization": "Bearer mock_token"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            assert response.json()["position"] == "VV"
+            move = mock_service.move_task.call_args[0][1]
+            assert (move.status, move.after_id, move.before_id) == ("em_andamento", None, 4)
+        finally:
+            clear_overrides(app)
+    
+    def test_batch_task_updates(self, client):
+        """Testa POST /batch: várias atualizações de tarefas com resultado por item."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_task_service
+        
+        mock_service = MagicMock()
+        mock_service.change_status.side_effect = [
+            {"id": 1, "status": "em_andamento", "changed": True},
+            HTTPException(status_code=404, detail="Tarefa não encontrada"),
+        ]
+        
+        override_auth_dependency(app, user_role="gerencial")
+        app.dependency_overrides[get_task_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.post(
+                "/batch",
+                json={"requests": [
+                    {"method": "PATCH", "path": "/tasks/1/status", "body": {"status": "em_andamento"}},
+                    {"method": "PATCH", "path": "/tasks/99/status", "body": {"status": "concluida"}},
+                ]},
+                headers={"Authorization": "Bearer mock_token"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            data = response.json()
+            assert data["committed"] is None
+            assert [item["status"] for item in data["results"]] == [200, 404]
+            assert data["results"][0]["body"]["changed"] is True
+            assert mock_service.change_status.call_count == 2
+        finally:
+            clear_overrides(app)
+    
+    def test_export_tasks_streams_csv(self, client):
+        """Testa GET /tasks/export: resposta em streaming com o formato pedido."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_task_service
+        
+        async def chunks():
+            yield b"id,titulo\n"
+            yield b"1,Tarefa 1\n"
+        
+        mock_service = MagicMock()
+        mock_service.export_tasks.side_effect = lambda export_format, role, user_id, status_filter: chunks()
+        
+        override_auth_dependency(app, user_role="visualizacao", user_id=5)
+        app.dependency_overrides[get_task_service] = lambda: mock_service
+        
+        try:
+            # Act
+            response = client.get("/tasks/export?format=csv", headers={"Authorization": "Bearer mock_token"})
+            
+            # Assert
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/csv")
+            assert response.text == "id,titulo\n1,Tarefa 1\n"
+            mock_service.export_tasks.assert_called_once_with("csv", "visualizacao", 5, None)
+        finally:
+            clear_overrides(app)
+    
+    def test_submit_and_read_job(self, client):
+        """Testa POST /jobs (202 com o job na fila) e GET /jobs/{id}."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_job_service
+        
+        job = {
+            "id": 1, "type": "tasks.reassign", "status": "queued",
+            "params": {"from_owner_id": 2, "to_owner_id": 3}, "progress_done": 0, "progress_total": None,
+            "result": None, "error": None, "cancel_requested": False, "created_by": 1,
+            "created_at": "2024-01-01T00:00:00", "started_at": None, "finished_at": None
+        }
+        mock_service = MagicMock()
+        mock_service.submit.return_value = job
+        mock_service.get_job.return_value = {**job, "status": "running", "progress_done": 40, "progress_total": 100}
+        
+        override_auth_dependency(app, user_role="gerencial")
+        app.dependency_overrides[get_job_service] = lambda: mock_service
+        
+        try:
+            # Act
+            submitted = client.post(
+                "/jobs", json={"type": "tasks.reassign", "params": {"from_owner_id": 2, "to_owner_id": 3}},
+                headers={"Authorization": "Bearer mock_token"}
+            )
+            status_response = client.get("/jobs/1", headers={"Authorization": "Bearer mock_token"})
+            
+            # Assert
+            assert submitted.status_code == 202
+            assert submitted.json()["status"] == "queued"
+            assert mock_service.submit.call_args[0][0].type == "tasks.reassign"
+            assert status_response.status_code == 200
+            assert status_response.json()["progress_done"] == 40
+        finally:
+            clear_overrides(app)
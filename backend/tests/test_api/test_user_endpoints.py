@@ -174,3 +174,73 @@ class TestUserEndpoints:
         finally:
             clear_overrides(app)
 
+    
+    def test_get_users_does_not_expose_extra_fields(self, client):
+        """Testa que a listagem rápida de usuários mantém apenas os campos do schema."""
+        # Arrange
+        from unittest.mock import patch
+        from src.main import app
+        from src.dependencies import get_user_service
+        from src.core import serialization
+        
+        mock_service = MagicMock()
+        mock_service.get_all_users.return_value = [
+            {"id": 1, "username": "admin", "email": "admin@example.com", "role": "admin",
+             "hashed_password": "hash", "created_at": None}
+        ]
+        
+        override_auth_dependency(app, user_role="admin")
+        app.dependency_overrides[get_user_service] = lambda: mock_service
+        
+        try:
+            # Act
+            fast = client.get("/users/", headers={"Authorization": "Bearer admin_token"})
+            with patch.dict(serialization.settings, {"validate_responses": True}):
+                validated = client.get("/users/", headers={"Authorization": "Bearer admin_token"})
+            
+            # Assert
+            assert fast.status_code == 200
+            assert fast.json() == validated.json() == [
+                {"username": "admin", "email": "admin@example.com", "id": 1, "role": "admin", "created_at": None}
+            ]
+        finally:
+            clear_overrides(app)
+    
+    def test_import_users_streams_body_to_service(self, client):
+        """Testa POST /admin/import/users: formato pelo Content-Type e relatório do serviço."""
+        # Arrange
+        from src.main import app
+        from src.dependencies import get_import_service
+        
+        received = {}
+        
+        def import_users(pieces, file_format):
+            received["body"] = b"".join(pieces)
+            received["format"] = file_format
+            return {"total": 1, "imported": 1, "failed": 0, "errors": [], "errors_truncated": False}
+        
+        mock_service = MagicMock()
+        mock_service.import_users.side_effect = import_users
+        
+        override_auth_dependency(app, user_role="admin")
+        app.dependency_overrides[get_import_service] = lambda: mock_service
+        
+        try:
+            # Act
+            body = b"username,email,password\nana,ana@example.com,s1\n"
+            response = client.post(
+                "/admin/import/users", content=body,
+                headers={"Authorization": "Bearer mock_token", "Content-Type": "text/csv"}
+            )
+            unsupported = client.post(
+                "/admin/import/users", content=body,
+                headers={"Authorization": "Bearer mock_token", "Content-Type": "text/plain"}
+            )
+            
+            # Assert
+            assert response.status_code == 200
+            assert response.json()["imported"] == 1
+            assert received == {"body": body, "format": "csv"}
+            assert unsupported.status_code == 415
+        finally:
+            clear_overrides(app)
@@ -0,0 +1,99 @@
+"""
+Testes para fractional_index - chaves de posição dos cartões do quadro.
+"""
+import re
+import pytest
+from src.core.fractional_index import (
+    APPEND_POSITION_SQL, DIGITS, MIDDLE, key_after, key_between, keys_after, keys_for
+)
+
+
+def _sql_append(max_position):
+    """Avalia o CASE de APPEND_POSITION_SQL (constantes extraídas do próprio SQL) para MAX(position)."""
+    middle = re.search(r"IS NULL THEN '([^']*)'", APPEND_POSITION_SQL).group(1)
+    last_digit = re.search(r"RIGHT\(MAX\(position\), 1\) = '([^']*)'", APPEND_POSITION_SQL).group(1)
+    source, target = re.search(r"TRANSLATE\(.*, '(\w+)', '(\w+)'\)", APPEND_POSITION_SQL).groups()
+    if max_position is None:
+        return middle
+    if max_position[-1] == last_digit:
+        return max_position + middle
+    return max_position[:-1] + max_position[-1].translate(str.maketrans(source, target))
+
+
+@pytest.mark.unit
+class TestFractionalIndex:
+    """Testes para as chaves de posição fracionárias."""
+
+    def test_key_between_neighbours(self):
+        """Testa chaves entre vizinhos, em coluna vazia e entre chaves adjacentes."""
+        # Arrange
+        cases = [(None, None), (None, "V"), ("V", None), ("A", "B"), ("A", "A1"), ("Az", "B"), ("V", "V01")]
+
+        # Act & Assert
+        assert key_between(None, None) == MIDDLE
+        for lower, upper in cases:
+            key = key_between(lower, upper)
+            assert not key.endswith("0")
+            assert lower is None or lower < key
+            assert upper is None or key < upper
+
+    def test_key_between_rejects_invalid_keys(self):
+        """Testa que chaves repetidas, fora de ordem ou terminadas em 0 são rejeitadas."""
+        # Act & Assert
+        for lower, upper in [("B", "B"), ("C", "B"), ("A0", "B"), (None, "")]:
+            with pytest.raises(ValueError):
+                key_between(lower, upper)
+
+    def test_repeated_inserts_at_head_and_tail(self):
+        """Testa que inserções repetidas no início e no fim mantêm a ordem e crescem devagar."""
+        # Arrange
+        head, tail = [MIDDLE], [MIDDLE]
+
+        # Act
+        for _ in range(200):
+            head.insert(0, key_between(None, head[0]))
+            tail.append(key_between(tail[-1], None))
+
+        # Assert
+        assert head == sorted(head) and len(set(head)) == len(head)
+        assert tail == sorted(tail) and len(set(tail)) == len(tail)
+        assert max(len(key) for key in head) <= 200 // 5 + 1
+        assert max(len(key) for key in tail) <= 200 // 5 + 1
+
+    def test_repeated_inserts_between_same_neighbours(self):
+        """Testa inserções repetidas logo após a mesma chave (meio da coluna)."""
+        # Arrange
+        lower, upper = "A", "B"
+        keys = []
+
+        # Act
+        for _ in range(100):
+            upper = key_between(lower, upper)
+            keys.append(upper)
+
+        # Assert
+        assert keys == sorted(keys, reverse=True)
+        assert all(lower < key for key in keys)
+
+    def test_keys_for_and_keys_after_are_monotonic(self):
+        """Testa que as chaves geradas em lote são crescentes, únicas e válidas."""
+        # Act & Assert
+        assert keys_for(0) == []
+        for count in (1, 2, 61, 62, 1000, 5000):
+            keys = keys_for(count)
+            assert len(keys) == count
+            assert all(a < b for a, b in zip(keys, keys[1:]))
+            assert all(key and not key.endswith("0") for key in keys)
+            for previous in (None, "V", "z", "Vz"):
+                appended = keys_after(previous, count)
+                assert all(a < b for a, b in zip(appended, appended[1:]))
+                assert previous is None or previous < appended[0]
+
+    def test_append_position_sql_matches_key_after(self):
+        """Testa que a expressão SQL de fim de coluna gera a mesma chave que key_after()."""
+        # Arrange
+        maxima = [None, "z", "Vz", "zz"] + [f"V{digit}" for digit in DIGITS[1:]] + list(DIGITS[1:])
+
+        # Act & Assert
+        for max_position in maxima:
+            assert _sql_append(max_position) == key_after(max_position)
@@ -0,0 +1,53 @@
+"""
+Testes para streaming - saída produzida em uma thread e lida pelo event loop.
+"""
+import asyncio
+import threading
+import pytest
+from src.core.streaming import StreamCancelled, stream_from_thread
+
+
+@pytest.mark.unit
+class TestStreamFromThread:
+    """Testes para stream_from_thread."""
+
+    async def test_producer_stops_when_stream_is_closed(self):
+        """Testa que fechar o iterador interrompe um produtor que espera por espaço na fila."""
+        # Arrange
+        finished = threading.Event()
+        outcome = []
+
+        def produce(file):
+            try:
+                while True:
+                    file.write(b"x" * 16)
+            except StreamCancelled:
+                outcome.append("cancelado")
+                raise
+            finally:
+                finished.set()
+
+        stream = stream_from_thread(produce, chunk_size=16, max_chunks=1)
+
+        # Act
+        first = await stream.__anext__()
+        await stream.aclose()
+        stopped = await asyncio.to_thread(finished.wait, 2)
+
+        # Assert
+        assert first == b"x" * 16
+        assert stopped is True
+        assert outcome == ["cancelado"]
+
+    async def test_unread_stream_never_starts_producer(self):
+        """Testa que uma resposta abandonada antes da primeira leitura não inicia a produção."""
+        # Arrange
+        started = threading.Event()
+
+        # Act
+        stream = stream_from_thread(lambda file: started.set())
+        await asyncio.sleep(0.05)
+        await stream.aclose()
+
+        # Assert
+        assert started.is_set() is False
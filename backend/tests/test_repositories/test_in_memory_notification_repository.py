@@ -0,0 +1,243 @@
+"""
+Testes para InMemoryNotificationRepository - Repository Pattern
+Testa o armazenamento de notificações em memória (buckets por usuário e contadores).
+"""
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from src.repositories.in_memory_notification_repository import InMemoryNotificationRepository
+
+
+def _notification(user_id, task_id=10):
+    return {
+        "user_id": user_id,
+        "type": "task_review",
+        "title": "Tarefa em Revisão",
+        "message": "msg",
+        "task_id": task_id,
+        "task_title": "Tarefa",
+        "updated_by": "admin"
+    }
+
+
+@pytest.mark.repository
+class TestInMemoryNotificationRepository:
+    """Testes para InMemoryNotificationRepository."""
+    
+    def test_find_by_user_newest_first(self):
+        """Testa que cada usuário vê apenas suas notificações, mais recentes primeiro."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        repository.create_many([_notification(1, 10), _notification(2, 10), _notification(1, 11)])
+        
+        # Act
+        result = repository.find_by_user(1)
+        
+        # Assert
+        assert [n["task_id"] for n in result] == [11, 10]
+        assert all(n["user_id"] == 1 for n in result)
+    
+    def test_unread_counter_follows_mark_as_read(self):
+        """Testa que o contador de não lidas é mantido nas escritas."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        created = repository.create_many([_notification(1), _notification(1)])
+        
+        # Act
+        assert repository.count_unread(1) == 2
+        assert repository.mark_as_read(created[0]["id"], 1) is True
+        assert repository.mark_as_read(created[0]["id"], 1) is True
+        
+        # Assert
+        assert repository.count_unread(1) == 1
+        assert len(repository.find_by_user(1, unread_only=True)) == 1
+    
+    def test_mark_as_read_other_user(self):
+        """Testa que um usuário não marca notificações de outro."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        created = repository.create_many([_notification(1)])
+        
+        # Act
+        result = repository.mark_as_read(created[0]["id"], 2)
+        
+        # Assert
+        assert result is False
+        assert repository.count_unread(1) == 1
+    
+    def test_mark_all_as_read(self):
+        """Testa marcar todas como lidas."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        repository.create_many([_notification(1), _notification(1), _notification(2)])
+        
+        # Act
+        count = repository.mark_all_as_read(1)
+        
+        # Assert
+        assert count == 2
+        assert repository.count_unread(1) == 0
+        assert repository.count_unread(2) == 1
+    
+    def test_concurrent_creates_have_unique_ids(self):
+        """Testa que criações concorrentes não geram ids repetidos."""
+        # Arrange
+        repository = InMemoryNotificationRepository(shard_count=4)
+        
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            batches = list(executor.map(
+                lambda user_id: repository.create_many([_notification(user_id)] * 50),
+                range(16)
+            ))
+        
+        # Assert
+        ids = [n["id"] for batch in batches for n in batch]
+        assert len(ids) == len(set(ids)) == 800
+        assert sum(repository.count_unread(user_id) for user_id in range(16)) == 800
+    
+    def test_replicate_ignores_known_ids(self):
+        """Testa que a réplica de outro worker preserva o id e não duplica registros."""
+        # Arrange
+        origin = InMemoryNotificationRepository(worker_tag=1)
+        replica = InMemoryNotificationRepository(worker_tag=2)
+        created = origin.create_many([_notification(1)])
+        
+        # Act
+        first = replica.replicate(created)
+        second = replica.replicate(created)
+        
+        # Assert
+        assert (first, second) == (1, 0)
+        assert replica.find_by_user(1) == created
+        assert replica.create_many([_notification(1)])[0]["id"] != created[0]["id"]
+    
+    def test_default_worker_tag_is_random(self):
+        """Testa que o tag do processo nos ids é sorteado, não derivado do PID."""
+        # Arrange
+        with patch('src.repositories.in_memory_notification_repository.secrets.randbits', return_value=5) as randbits:
+            repository = InMemoryNotificationRepository()
+        
+        # Act
+        created = repository.create_many([_notification(1)])
+        
+        # Assert
+        randbits.assert_called_once_with(10)
+        assert created[0]["id"] & 0x3FF == 5
+    
+    def test_replicate_keeps_bucket_in_created_at_order(self):
+        """Testa que uma réplica atrasada (mais antiga) não esconde a recente do agrupamento."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        now = datetime.now()
+        recent = {**_notification(1, 10), "id": 1, "created_at": (now - timedelta(seconds=10)).isoformat()}
+        late = {**_notification(1, 11), "id": 2, "created_at": (now - timedelta(seconds=100)).isoformat()}
+        repository.replicate([recent])
+        repository.replicate([late])
+        
+        # Act
+        coalesced = repository.create_many([_notification(1, 10)], coalesce_seconds=60)
+        
+        # Assert
+        assert (coalesced[0]["id"], coalesced[0]["event_count"]) == (1, 2)
+        assert [n["id"] for n in repository.find_by_user(1)] == [1, 2]
+    
+    def test_compact_applies_retention_policy(self):
+        """Testa idade máxima, limite por usuário e expiração de lidas, mantendo os contadores."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        old = {**_notification(1, 1), "created_at": "2000-01-01T00:00:00"}
+        repository.replicate([{**old, "id": 1}])
+        created = repository.create_many([_notification(1, task_id) for task_id in range(2, 6)])
+        repository.mark_as_read(created[0]["id"], 1)
+        repository.create_many([_notification(2, 9)])
+        
+        # Act
+        removed = repository.compact(max_age_seconds=86400, max_per_user=2, read_expiry_seconds=None)
+        
+        # Assert
+        assert removed == 3
+        assert [n["task_id"] for n in repository.find_by_user(1)] == [5, 4]
+        assert repository.count_unread(1) == 2
+        assert repository.stats() == {"notifications": 3, "users": 2, "unread": 3}
+    
+    def test_compact_expires_read_notifications(self):
+        """Testa que notificações lidas antigas são removidas e as não lidas permanecem."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        repository.replicate([
+            {**_notification(1, 1), "id": 1, "created_at": "2000-01-01T00:00:00", "read": True},
+            {**_notification(1, 2), "id": 2, "created_at": "2000-01-01T00:00:00"},
+        ])
+        
+        # Act
+        removed = repository.compact(read_expiry_seconds=60)
+        
+        # Assert
+        assert removed == 1
+        assert [n["id"] for n in repository.find_by_user(1)] == [2]
+    
+    def test_create_many_coalesces_within_window(self):
+        """Testa que um evento repetido da mesma tarefa atualiza a notificação existente."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        first = repository.create_many([_notification(1, 10)], coalesce_seconds=60)[0]
+        repository.create_many([_notification(1, 11)], coalesce_seconds=60)
+        repository.mark_as_read(first["id"], 1)
+        
+        # Act
+        second = repository.create_many([{**_notification(1, 10), "message": "de novo"}], coalesce_seconds=60)[0]
+        
+        # Assert
+        assert second["id"] == first["id"]
+        assert second["event_count"] == 2
+        assert second["read"] is False
+        assert [n["task_id"] for n in repository.find_by_user(1)] == [10, 11]
+        assert repository.count_unread(1) == 2
+    
+    def test_find_by_user_pages_with_cursor(self):
+        """Testa a paginação por cursor (id da última notificação da página anterior)."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        repository.create_many([_notification(1, task_id) for task_id in range(1, 6)])
+        first_page = repository.find_by_user(1, limit=2)
+        
+        # Act
+        second_page = repository.find_by_user(1, limit=2, before=first_page[-1]["id"])
+        
+        # Assert
+        assert [n["task_id"] for n in first_page] == [5, 4]
+        assert [n["task_id"] for n in second_page] == [3, 2]
+        assert repository.find_by_user(2, before=first_page[-1]["id"]) == []
+    
+    def test_mark_many_as_read_ignores_other_users(self):
+        """Testa que apenas ids não lidos do próprio usuário são marcados."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        mine = repository.create_many([_notification(1, 10), _notification(1, 11)])
+        other = repository.create_many([_notification(2, 10)])
+        
+        # Act
+        marked = repository.mark_many_as_read([mine[0]["id"], other[0]["id"], mine[0]["id"]], 1)
+        
+        # Assert
+        assert marked == [mine[0]["id"]]
+        assert repository.count_unread(1) == 1
+        assert repository.count_unread(2) == 1
+    
+    def test_create_many_ignores_redelivered_outbox_events(self):
+        """Testa que um evento do outbox entregue de novo não duplica a notificação."""
+        # Arrange
+        repository = InMemoryNotificationRepository()
+        repository.create_many([dict(_notification(1), source_event_id=5)], coalesce_seconds=300)
+        
+        # Act
+        repeated = repository.create_many([dict(_notification(1), source_event_id=5)], coalesce_seconds=300)
+        newer = repository.create_many([dict(_notification(1), source_event_id=6)], coalesce_seconds=300)
+        
+        # Assert
+        assert repeated == []
+        assert newer[0]["event_count"] == 2
+        assert "source_event_id" not in newer[0]
+        assert len(repository.find_by_user(1)) == 1
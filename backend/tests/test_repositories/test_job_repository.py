@@ -0,0 +1,82 @@
+"""
+Testes para JobRepository - Repository Pattern
+Testa a fila, o progresso e o cancelamento dos jobs em segundo plano.
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+from src.repositories.job_repository import JobRepository
+
+JOB_DESCRIPTION = [
+    ("id",), ("type",), ("status",), ("params",), ("progress_done",), ("progress_total",), ("result",),
+    ("error",), ("cancel_requested",), ("created_by",), ("created_at",), ("started_at",), ("finished_at",)
+]
+
+
+def _job_row(job_id=1, job_type="tasks.reassign", status="running"):
+    return (
+        job_id, job_type, status, {}, 0, None, None, None, False, 1,
+        datetime(2024, 1, 1, 12, 0), datetime(2024, 1, 1, 12, 1), None
+    )
+
+
+@pytest.mark.repository
+class TestJobRepository:
+    """Testes para JobRepository."""
+
+    def test_claim_next_skips_locked_jobs(self):
+        """Testa que o job mais antigo dos tipos informados é pego com SKIP LOCKED e as datas viram ISO."""
+        # Arrange
+        repository = JobRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = JOB_DESCRIPTION
+        mock_cursor.fetchone.return_value = _job_row()
+
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            job = repository.claim_next(("tasks.reassign", "import.tasks"))
+
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert "FOR UPDATE SKIP LOCKED" in query
+        assert "status = 'queued' AND type = ANY(%s)" in query
+        assert params == (["tasks.reassign", "import.tasks"],)
+        assert mock_exec.call_args[1] == {'commit': True}
+        assert job["status"] == "running"
+        assert job["created_at"] == "2024-01-01T12:00:00"
+
+    def test_report_progress_returns_cancel_flag(self):
+        """Testa que o registro de progresso informa se o cancelamento foi pedido."""
+        # Arrange
+        repository = JobRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (True,)
+
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            cancelled = repository.report_progress(7, 50, 200)
+
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert "heartbeat_at = NOW()" in query
+        assert params == (50, 200, 7)
+        assert cancelled is True
+
+    def test_request_cancel_finished_job(self):
+        """Testa que o cancelamento de um job já finalizado retorna None."""
+        # Arrange
+        repository = JobRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None
+
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.request_cancel(3)
+
+        # Assert
+        query = mock_exec.call_args[0][0]
+        assert "status IN ('queued', 'running')" in query
+        assert result is None
@@ -0,0 +1,47 @@
+"""
+Testes para MaintenanceRepository - Repository Pattern
+Testa o registro da última execução das tarefas de manutenção.
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+from src.repositories.maintenance_repository import MaintenanceRepository
+
+
+@pytest.mark.repository
+class TestMaintenanceRepository:
+    """Testes para MaintenanceRepository."""
+
+    def test_record_run_upserts_and_counts_failures(self):
+        """Testa que a execução sobrescreve a última e acumula execuções e falhas."""
+        # Arrange
+        repository = MaintenanceRepository()
+
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(MagicMock())
+            repository.record_run("notifications.compact", "failed", 0.5, "host:1", error="falha")
+
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert "ON CONFLICT (name) DO UPDATE" in query
+        assert "failures = maintenance_runs.failures + EXCLUDED.failures" in query
+        assert params["status"] == "failed"
+        assert params["result"] is None
+        assert params["error"] == "falha"
+        assert mock_exec.call_args[1] == {'commit': True}
+
+    def test_ran_within_without_previous_run(self):
+        """Testa que uma tarefa que nunca rodou não conta como executada no intervalo."""
+        # Arrange
+        repository = MaintenanceRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None
+
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            ran = repository.ran_within("tasks.rebalance_board", 1800)
+
+        # Assert
+        assert ran is False
+        assert mock_exec.call_args[0][1] == (1800, "tasks.rebalance_board")
@@ -0,0 +1,223 @@
+"""
+Testes para NotificationRepository - Repository Pattern
+Testa as operações de acesso a dados de notificações.
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+from src.repositories.notification_repository import NotificationRepository
+
+
+NOTIFICATION_COLUMNS = [
+    ("id",), ("user_id",), ("type",), ("title",), ("message",), ("task_id",),
+    ("task_title",), ("created_at",), ("read",), ("updated_by",)
+]
+
+
+@pytest.mark.repository
+class TestNotificationRepository:
+    """Testes para NotificationRepository."""
+    
+    def test_create_many_single_insert(self):
+        """Testa que várias notificações são gravadas em um único INSERT."""
+        # Arrange
+        repository = NotificationRepository()
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+        mock_cursor = MagicMock()
+        mock_cursor.description = NOTIFICATION_COLUMNS
+        mock_cursor.fetchall.return_value = [
+            (1, 1, "task_review", "Tarefa em Revisão", "msg", 10, "T", created_at, False, "admin"),
+            (2, 2, "task_review", "Tarefa em Revisão", "msg", 10, "T", created_at, False, "admin")
+        ]
+        notifications = [
+            {"user_id": 1, "type": "task_review", "title": "Tarefa em Revisão", "message": "msg",
+             "task_id": 10, "task_title": "T", "updated_by": "admin"},
+            {"user_id": 2, "type": "task_review", "title": "Tarefa em Revisão", "message": "msg",
+             "task_id": 10, "task_title": "T", "updated_by": "admin"}
+        ]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.create_many(notifications)
+        
+        # Assert
+        mock_exec.assert_called_once()
+        query, params = mock_exec.call_args[0][:2]
+        assert "INSERT INTO notificacoes" in query
+        assert len(params) == 18
+        assert "n.source_event_id >= i.source_event_id" in query
+        assert mock_exec.call_args[1]["commit"] is True
+        assert len(result) == 2
+        assert result[0]["created_at"] == created_at.isoformat()
+    
+    def test_create_many_coalesced_updates_then_inserts(self):
+        """Testa que o agrupamento usa um único comando com UPDATE e INSERT."""
+        # Arrange
+        repository = NotificationRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = NOTIFICATION_COLUMNS
+        mock_cursor.fetchall.return_value = []
+        notifications = [{"user_id": 1, "type": "task_review", "title": "T", "message": "msg",
+                          "task_id": 10, "task_title": "T", "updated_by": "admin"}]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            repository.create_many(notifications, coalesce_seconds=300)
+        
+        # Assert
+        mock_exec.assert_called_once()
+        query, params = mock_exec.call_args[0][:2]
+        assert "UPDATE notificacoes n" in query
+        assert "INSERT INTO notificacoes" in query
+        assert params[-3:] == (1, None, 300)
+    
+    def test_create_many_empty(self):
+        """Testa que nenhuma query é executada sem notificações."""
+        # Arrange
+        repository = NotificationRepository()
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            result = repository.create_many([])
+        
+        # Assert
+        assert result == []
+        mock_exec.assert_not_called()
+    
+    def test_find_by_user_unread_only(self):
+        """Testa listagem apenas de não lidas (filtro no SQL)."""
+        # Arrange
+        repository = NotificationRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = NOTIFICATION_COLUMNS
+        mock_cursor.fetchall.return_value = [
+            (3, 1, "task_completed", "Tarefa Concluída", "msg", 10, "T", None, False, None)
+        ]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.find_by_user(1, unread_only=True)
+        
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert "NOT read" in query
+        assert params == (1,)
+        assert result[0]["id"] == 3
+    
+    def test_find_by_user_with_cursor(self):
+        """Testa a página seguinte ao cursor, limitada no SQL."""
+        # Arrange
+        repository = NotificationRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = NOTIFICATION_COLUMNS
+        mock_cursor.fetchall.return_value = []
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            repository.find_by_user(1, limit=20, before=55)
+        
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert "(created_at, id) <" in query
+        assert "LIMIT %s" in query
+        assert params == (1, 55, 1, 20)
+    
+    def test_mark_many_as_read(self):
+        """Testa que várias notificações são marcadas em um único UPDATE."""
+        # Arrange
+        repository = NotificationRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(4,), (6,)]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.mark_many_as_read([4, 5, 6], 1)
+        
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert "id = ANY(%s)" in query
+        assert params == (1, [4, 5, 6])
+        assert result == [4, 6]
+    
+    def test_count_unread(self):
+        """Testa contagem de notificações não lidas."""
+        # Arrange
+        repository = NotificationRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (4,)
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.count_unread(1)
+        
+        # Assert
+        assert result == 4
+    
+    def test_mark_as_read_not_found(self):
+        """Testa marcar como lida uma notificação de outro usuário/inexistente."""
+        # Arrange
+        repository = NotificationRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.mark_as_read(99, 1)
+        
+        # Assert
+        assert result is False
+    
+    def test_mark_all_as_read(self):
+        """Testa marcar todas como lidas retornando o número de linhas afetadas."""
+        # Arrange
+        repository = NotificationRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 3
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.mark_all_as_read(1)
+        
+        # Assert
+        assert result == 3
+    
+    def test_compact_builds_single_delete(self):
+        """Testa que os critérios de retenção ativos viram um único DELETE."""
+        # Arrange
+        repository = NotificationRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 7
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.compact(max_age_seconds=3600, max_per_user=50)
+        
+        # Assert
+        query, params = mock_exec.call_args[0]
+        assert result == 7
+        assert query.startswith("DELETE FROM notificacoes")
+        assert "PARTITION BY user_id" in query
+        assert "read AND" not in query
+        assert params == (3600, 50)
+    
+    def test_compact_without_criteria_does_nothing(self):
+        """Testa que sem critérios nenhum comando é executado."""
+        # Arrange
+        repository = NotificationRepository()
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            result = repository.compact()
+        
+        # Assert
+        assert result == 0
+        mock_exec.assert_not_called()
@@ -0,0 +1,63 @@
+"""
+Testes para OutboxRepository - Repository Pattern
+Testa a leitura e a confirmação dos eventos do task_outbox.
+"""
+import pytest
+from unittest.mock import patch, MagicMock
+from src.repositories.outbox_repository import OutboxRepository
+
+
+@pytest.mark.repository
+class TestOutboxRepository:
+    """Testes para OutboxRepository."""
+    
+    def test_fetch_pending_in_order(self):
+        """Testa que os pendentes são lidos em ordem de id, limitados ao lote."""
+        # Arrange
+        repository = OutboxRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = [("id",), ("event_type",), ("task_id",), ("payload",), ("created_at",), ("attempts",)]
+        mock_cursor.fetchall.return_value = [(1, "task.status_changed", 10, {}, None, 0)]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.fetch_pending(limit=50)
+        
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert "WHERE delivered_at IS NULL" in query
+        assert "ORDER BY id" in query
+        assert params == (50,)
+        assert result[0]["task_id"] == 10
+    
+    def test_mark_delivered_empty(self):
+        """Testa que nenhuma query é executada sem eventos."""
+        # Arrange
+        repository = OutboxRepository()
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            result = repository.mark_delivered([])
+        
+        # Assert
+        assert result == 0
+        mock_exec.assert_not_called()
+    
+    def test_mark_failed_reports_dead_letter(self):
+        """Testa que o evento é descartado ao atingir o máximo de tentativas."""
+        # Arrange
+        repository = OutboxRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (True,)
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.mark_failed(7, "falha", max_attempts=3)
+        
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert result is True
+        assert "attempts = attempts + 1" in query
+        assert params == ("falha", 3, 7)
@@ -0,0 +1,74 @@
+"""
+Testes para RoleDirectory - cache de ids de usuários por role.
+"""
+import pytest
+from unittest.mock import Mock
+from src.repositories.role_directory import RoleDirectory
+
+
+@pytest.mark.repository
+class TestRoleDirectory:
+    """Testes para RoleDirectory."""
+    
+    def test_members_loads_once_and_unions_roles(self):
+        """Testa que a segunda consulta vem do cache."""
+        # Arrange
+        user_repository = Mock()
+        user_repository.find_ids_by_roles.return_value = {"admin": [1], "gerencial": [4, 2]}
+        directory = RoleDirectory(user_repository)
+        
+        # Act
+        first = directory.members(["admin", "gerencial"])
+        second = directory.members(["admin", "gerencial"])
+        
+        # Assert
+        assert first == second == [1, 2, 4]
+        user_repository.find_ids_by_roles.assert_called_once_with(["admin", "gerencial"])
+        assert directory.metrics()["hits"] == 1
+    
+    def test_invalidate_reloads_only_dropped_role(self):
+        """Testa que apenas o role invalidado volta a ser consultado."""
+        # Arrange
+        user_repository = Mock()
+        user_repository.find_ids_by_roles.return_value = {"admin": [1], "gerencial": [2]}
+        directory = RoleDirectory(user_repository)
+        directory.members(["admin", "gerencial"])
+        user_repository.find_ids_by_roles.return_value = {"gerencial": [2, 3]}
+        
+        # Act
+        directory.invalidate(["gerencial"])
+        result = directory.members(["admin", "gerencial"])
+        
+        # Assert
+        assert result == [1, 2, 3]
+        user_repository.find_ids_by_roles.assert_called_with(["gerencial"])
+    
+    def test_load_started_before_invalidation_is_not_cached(self):
+        """Testa que uma carga concorrente com uma invalidação não grava dados antigos."""
+        # Arrange
+        user_repository = Mock()
+        directory = RoleDirectory(user_repository)
+        def load_then_invalidate(roles):
+            directory.invalidate()
+            return {"admin": [1]}
+        user_repository.find_ids_by_roles.side_effect = load_then_invalidate
+        
+        # Act
+        result = directory.members(["admin"])
+        
+        # Assert
+        assert result == [1]
+        assert directory.metrics()["cached_roles"] == 0
+    
+    def test_invalidate_is_published_to_other_workers(self):
+        """Testa que a invalidação é repassada pelo barramento de eventos."""
+        # Arrange
+        event_bus = Mock()
+        directory = RoleDirectory(Mock())
+        directory.attach_event_bus(event_bus)
+        
+        # Act
+        directory.invalidate(["admin"])
+        
+        # Assert
+        event_bus.publish.assert_called_once_with(RoleDirectory.INVALIDATED, {"roles": ["admin"]})
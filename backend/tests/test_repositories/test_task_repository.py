@@ -35,6 +35,55 @@ class TestTaskRepository:
         assert result[0]["titulo"] == "Tarefa 1"
         assert result[1]["titulo"] == "Tarefa 2"
     
+    def test_find_all_sparse_fields_skips_join(self):
+        """Testa que find_all(fields=...) seleciona só os campos pedidos e dispensa o JOIN com usuarios."""
+        # Arrange
+        repository = TaskRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = [("id",), ("titulo",), ("status",), ("owner_id",)]
+        mock_cursor.fetchall.return_value = [(1, "Tarefa 1", "pendente", 1)]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.find_all(("id", "titulo", "status", "owner_id"))
+        
+        # Assert
+        query = mock_exec.call_args[0][0]
+        assert "SELECT t.id, t.titulo, t.status, t.owner_id" in query
+        assert "JOIN" not in query
+        assert result == [{"id": 1, "titulo": "Tarefa 1", "status": "pendente", "owner_id": 1}]
+    
+    def test_find_all_sparse_fields_rejects_unknown(self):
+        """Testa que campos desconhecidos não chegam ao SQL."""
+        # Arrange
+        repository = TaskRepository()
+        
+        # Act & Assert
+        with pytest.raises(ValueError):
+            repository.find_all(("id", "1; DROP TABLE tarefas"))
+    
+    def test_update_status_conditional_update(self):
+        """Testa que update_status usa um único UPDATE condicional (WHERE status <> novo) com o outbox."""
+        # Arrange
+        repository = TaskRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = [("id",), ("status",), ("old_status",), ("changed",)]
+        mock_cursor.fetchone.return_value = (1, "em_revisao", "em_revisao", False)
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.update_status(1, "em_revisao", record_status_event=True, updated_by={"id": 1})
+        
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert "p.status <> %(status)s::task_status" in query
+        assert "position = (" in query
+        assert "INSERT INTO task_outbox" in query
+        assert params == {"task_id": 1, "status": "em_revisao", "updated_by": '{"id": 1}'}
+        assert result["changed"] is False
+    
     def test_find_by_id_success(self):
         """Testa busca de tarefa por ID com sucesso."""
         # Arrange
@@ -158,7 +207,7 @@ class TestTaskRepository:
         # Arrange
         repository = TaskRepository()
         mock_cursor = MagicMock()
-        mock_cursor.fetchone.return_value = (1,)  # ID atualizado
+        mock_cursor.fetchone.return_value = (["titulo"],)  # Campos alterados
         
         # Act
         with patch.object(repository, '_execute_with_cursor') as mock_exec:
@@ -170,7 +219,26 @@ class TestTaskRepository:
             )
         
         # Assert
-        assert result is True
+        query, params = mock_exec.call_args[0][:2]
+        assert result == ["titulo"]
+        assert "p.titulo IS DISTINCT FROM %(titulo)s OR p.status IS DISTINCT FROM %(status)s::task_status" in query
+        assert "descricao =" not in query
+        assert params == {"task_id": 1, "titulo": "Tarefa Atualizada", "status": "em_andamento"}
+    
+    def test_update_task_not_found(self):
+        """Testa atualização de tarefa inexistente."""
+        # Arrange
+        repository = TaskRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.update(task_id=999, titulo="Tarefa")
+        
+        # Assert
+        assert result is None
     
     def test_update_task_no_changes(self):
         """Testa atualização de tarefa sem alterações."""
@@ -181,7 +249,7 @@ class TestTaskRepository:
         result = repository.update(task_id=1)
         
         # Assert
-        assert result is False
+        assert result == []
     
     def test_delete_task(self):
         """Testa deleção de tarefa."""
@@ -247,3 +315,173 @@ class TestTaskRepository:
         # Assert
         assert result is False
 
+    
+    def test_update_task_records_status_event_in_same_statement(self):
+        """Testa que o evento de status vai para o outbox no mesmo comando do UPDATE."""
+        # Arrange
+        repository = TaskRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (["status"],)
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.update(
+                task_id=1,
+                status="em_revisao",
+                record_status_event=True,
+                updated_by={"id": 2, "username": "gerencial"}
+            )
+        
+        # Assert
+        query, params = mock_exec.call_args[0][:2]
+        assert result == ["status"]
+        assert "FOR UPDATE" in query
+        assert "INSERT INTO task_outbox" in query
+        assert "u.status IS DISTINCT FROM u.old_status" in query
+        assert params == {
+            "task_id": 1, "status": "em_revisao", "updated_by": '{"id": 2, "username": "gerencial"}'
+        }
+        assert mock_exec.call_args[1]["commit"] is True
+    
+    def test_find_board_single_query_per_column_limit(self):
+        """Testa que find_board busca limit + 1 tarefas por coluna e os totais em uma consulta."""
+        # Arrange
+        repository = TaskRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = [
+            ("column_status",), ("column_total",), ("id",), ("titulo",), ("descricao",),
+            ("status",), ("owner_id",), ("created_at",), ("owner_username",), ("position",)
+        ]
+        mock_cursor.fetchall.return_value = [
+            ("pendente", 3, 4, "Tarefa 4", None, "pendente", 1, None, "user1", "k"),
+            ("concluida", 0, None, None, None, None, None, None, None, None),
+        ]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.find_board(2, "pendente", ("V", 3))
+        
+        # Assert
+        query, params = mock_exec.call_args[0]
+        assert "enum_range(NULL::task_status)" in query
+        assert "ORDER BY t.position, t.id" in query
+        assert "LIMIT %(limit)s" in query
+        assert params == {"limit": 3, "status": "pendente", "after_position": "V", "after_id": 3}
+        assert result[0]["column_total"] == 3 and result[0]["id"] == 4
+        assert result[1]["id"] is None
+    
+    def test_move_writes_only_moved_task(self):
+        """Testa que move grava só a tarefa movida, com chave entre as dos vizinhos."""
+        # Arrange
+        repository = TaskRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = [
+            ("id",), ("status",), ("old_status",), ("changed",), ("position",),
+            ("titulo",), ("descricao",), ("owner_id",), ("created_at",)
+        ]
+        mock_cursor.fetchone.side_effect = [
+            (5,),           # tarefa movida (FOR UPDATE)
+            ("V", "W"),     # vizinhos: after_id e o seguinte
+            (5, "em_revisao", "pendente", True, "VV", "Tarefa", None, 2, None),
+        ]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.move(5, "em_revisao", after_id=3)
+        
+        # Assert
+        update_sql, update_params = mock_cursor.execute.call_args[0]
+        assert "UPDATE tarefas t" in update_sql and "task_outbox" not in update_sql
+        assert update_params == {"task_id": 5, "status": "em_revisao", "position": "VV"}
+        assert mock_cursor.execute.call_count == 2
+        assert result["changed"] is True and result["rebalanced"] is False
+    
+    def test_move_rebalances_on_repeated_keys(self):
+        """Testa que vizinhos com chaves repetidas levam ao rebalanceamento da coluna."""
+        # Arrange
+        repository = TaskRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = [("id",), ("status",), ("old_status",), ("changed",), ("position",)]
+        mock_cursor.fetchone.side_effect = [
+            (5,),
+            ("V", "V"),     # chaves repetidas (criações simultâneas)
+            ("F", "V"),     # vizinhos depois do rebalanceamento
+            (5, "pendente", "pendente", False, "N"),
+        ]
+        mock_cursor.fetchall.return_value = [(3,), (4,), (6,)]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.move(5, "pendente", after_id=3)
+        
+        # Assert
+        rebalance_params = mock_cursor.execute.call_args_list[2][0][1]
+        assert rebalance_params == {"ids": [3, 4, 6], "keys": ["F", "V", "k"]}
+        assert result["rebalanced"] is True and result["position"] == "N"
+    
+    def test_move_rejects_anchor_outside_column(self):
+        """Testa que um cartão de referência fora da coluna de destino gera ValueError."""
+        # Arrange
+        repository = TaskRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.side_effect = [(5,), None]
+        
+        # Act & Assert
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            with pytest.raises(ValueError):
+                repository.move(5, "pendente", before_id=99)
+    
+    def test_copy_export_streams_copy_output(self):
+        """Testa que copy_export usa COPY ... TO STDOUT com os filtros como parâmetros."""
+        # Arrange
+        repository = TaskRepository()
+        file = MagicMock()
+        
+        # Act
+        with patch.object(repository, '_copy_to') as mock_copy:
+            repository.copy_export(file, "csv", owner_id=3)
+            repository.copy_export(file, "ndjson", status="concluida")
+        
+        # Assert
+        csv_query, csv_file, csv_params = mock_copy.call_args_list[0][0]
+        ndjson_query, _, ndjson_params = mock_copy.call_args_list[1][0]
+        assert "TO STDOUT WITH (FORMAT csv, HEADER true)" in csv_query
+        assert csv_file is file
+        assert csv_params == {"owner_id": 3, "status": None}
+        assert "row_to_json" in ndjson_query
+        assert ndjson_params == {"owner_id": None, "status": "concluida"}
+    
+    def test_bulk_create_copies_into_staging_and_appends_to_columns(self):
+        """Testa que bulk_create carrega as tarefas com COPY e as coloca no fim da coluna do status."""
+        # Arrange
+        repository = TaskRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [("pendente", "V")]
+        mock_cursor.rowcount = 3
+        copied = {}
+        mock_cursor.copy_expert.side_effect = lambda query, buffer: copied.update(query=query, data=buffer.read())
+        tasks = [
+            {"titulo": "A", "descricao": None, "status": "pendente", "owner_id": 1},
+            {"titulo": "B", "descricao": "d", "status": "concluida", "owner_id": 2},
+            {"titulo": "C", "descricao": None, "status": "pendente", "owner_id": 1},
+        ]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.bulk_create(tasks)
+        
+        # Assert
+        assert result == 3
+        assert mock_exec.call_args[0][1] == (["pendente", "concluida"],)
+        assert copied["query"].startswith("COPY import_tarefas")
+        rows = [line.split(",") for line in copied["data"].splitlines()]
+        assert [row[1] for row in rows] == ["A", "B", "C"]
+        pendente = [row[5] for row in rows if row[3] == "pendente"]
+        assert "V" < pendente[0] < pendente[1]
+        assert "INSERT INTO tarefas" in mock_cursor.execute.call_args[0][0]
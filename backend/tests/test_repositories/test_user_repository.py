@@ -134,6 +134,23 @@ class TestUserRepository:
         assert len(result) == 2
         assert all(user["role"] != "admin" for user in result)
     
+    def test_find_by_max_role_sparse_fields(self):
+        """Testa que o filtro por role funciona mesmo quando role não está entre os campos pedidos."""
+        # Arrange
+        repository = UserRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = [("id",), ("username",), ("role",)]
+        mock_cursor.fetchall.return_value = [(1, "admin", "admin"), (2, "gerencial", "gerencial")]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.find_by_max_role("gerencial", ("id", "username"))
+        
+        # Assert
+        assert "SELECT id, username, role" in mock_exec.call_args[0][0]
+        assert result == [{"id": 2, "username": "gerencial"}]
+    
     def test_create_user(self):
         """Testa criação de novo usuário."""
         # Arrange
@@ -158,6 +175,39 @@ class TestUserRepository:
         assert result["email"] == "newuser@example.com"
         assert result["role"] == "visualizacao"
     
+    def test_create_user_invalidates_role_directory(self):
+        """Testa que criar um usuário descarta o cache do role dele."""
+        # Arrange
+        repository = UserRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (5,)
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec, \
+             patch('src.repositories.user_repository.role_directory') as mock_directory:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            with patch('src.repositories.user_repository.get_password_hash', return_value='hashed_password'):
+                repository.create("novo", "novo@example.com", "password123", "gerencial")
+        
+        # Assert
+        mock_directory.invalidate.assert_called_once_with(["gerencial"])
+    
+    def test_find_ids_by_roles(self):
+        """Testa o agrupamento dos ids por role."""
+        # Arrange
+        repository = UserRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [("admin", 1), ("gerencial", 2), ("gerencial", 7)]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.find_ids_by_roles(["admin", "gerencial"])
+        
+        # Assert
+        assert result == {"admin": [1], "gerencial": [2, 7]}
+        assert mock_exec.call_args[0][1] == (["admin", "gerencial"],)
+    
     def test_update_user(self):
         """Testa atualização de usuário."""
         # Arrange
@@ -183,6 +233,29 @@ class TestUserRepository:
         assert result["username"] == "updateduser"
         assert result["email"] == "updated@example.com"
     
+    def test_update_user_same_password_is_not_rehashed(self):
+        """Testa que a senha igual à atual não é recalculada nem gravada."""
+        # Arrange
+        repository = UserRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.description = [
+            ("id",), ("username",), ("email",), ("role",), ("created_at",), ("old_role",), ("changed_fields",)
+        ]
+        mock_cursor.fetchone.return_value = (1, "user", "user@example.com", "gerencial", None, "gerencial", [])
+        
+        # Act
+        with patch.object(repository, '_password_matches', return_value=True), \
+             patch('src.repositories.user_repository.get_password_hash') as mock_hash, \
+             patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.update(user_id=1, password="mesma")
+        
+        # Assert
+        mock_hash.assert_not_called()
+        assert "WHERE u.id = p.id AND (FALSE)" in mock_exec.call_args[0][0]
+        assert result["changed_fields"] == []
+        assert "old_role" not in result
+    
     def test_update_user_no_changes(self):
         """Testa atualização de usuário sem alterações."""
         # Arrange
@@ -256,3 +329,45 @@ class TestUserRepository:
         # Assert
         assert result is False
 
+    
+    def test_bulk_create_returns_created_usernames(self):
+        """Testa que bulk_create carrega os usuários com COPY e retorna os usernames inseridos."""
+        # Arrange
+        repository = UserRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [("ana",)]
+        users = [
+            {"username": "ana", "email": "ana@example.com", "hashed_password": "h1", "role": "gerencial"},
+            {"username": "bia", "email": "bia@example.com", "hashed_password": "h2", "role": "visualizacao"},
+        ]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec, \
+                patch('src.repositories.user_repository.role_directory') as mock_directory:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            result = repository.bulk_create(users)
+        
+        # Assert
+        assert result == {"ana"}
+        assert mock_cursor.copy_expert.call_args[0][0].startswith("COPY import_usuarios")
+        assert "ON CONFLICT DO NOTHING" in mock_cursor.execute.call_args[0][0]
+        mock_directory.invalidate.assert_called_once_with({"gerencial"})
+    
+    def test_find_existing_splits_taken_usernames_and_emails(self):
+        """Testa que uma única consulta separa os usernames e os emails já cadastrados."""
+        # Arrange
+        repository = UserRepository()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [("ana", "outra@example.com"), ("carla", "bia@example.com")]
+        
+        # Act
+        with patch.object(repository, '_execute_with_cursor') as mock_exec:
+            mock_exec.return_value = lambda processor: processor(mock_cursor)
+            taken_usernames, taken_emails = repository.find_existing(
+                iter(["ana", "bia"]), iter(["ana@example.com", "bia@example.com"])
+            )
+        
+        # Assert
+        assert taken_usernames == {"ana"}
+        assert taken_emails == {"bia@example.com"}
+        assert mock_exec.call_args[0][1] == (["ana", "bia"], ["ana@example.com", "bia@example.com"])
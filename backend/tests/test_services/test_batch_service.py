@@ -0,0 +1,139 @@
+"""
+Testes para BatchService - requisições em lote (POST /batch).
+"""
+import pytest
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+from fastapi import Depends, FastAPI, HTTPException
+from src.config import schemas
+from src.config import database
+from src.models import auth
+from src.services.batch_service import BatchService
+
+
+USER = schemas.User(id=1, username="admin", email="admin@example.com", role="admin")
+PARENT_SCOPE = {
+    'type': 'http',
+    'headers': [(b'authorization', b'Bearer token'), (b'accept', b'application/msgpack')],
+}
+
+
+def _app():
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(current_user: schemas.User = Depends(auth.get_current_user)):
+        return {"username": current_user.username}
+
+    @app.put("/items/{item_id}")
+    def put_item(item_id: int, payload: dict, current_user: schemas.User = Depends(auth.get_current_user)):
+        if item_id == 404:
+            raise HTTPException(status_code=404, detail="Item não encontrado")
+        return {"id": item_id, **payload}
+
+    return app
+
+
+def _operation(method, path, body=None):
+    return schemas.BatchOperation(method=method, path=path, body=body)
+
+
+@pytest.mark.service
+class TestBatchService:
+    """Testes para BatchService."""
+
+    async def test_run_dispatches_through_app_with_user_resolved_once(self):
+        """Testa que as sub-requisições passam pelas rotas sem revalidar o token."""
+        # Arrange
+        service = BatchService()
+        operations = [
+            _operation("GET", "/me"),
+            _operation("PUT", "/items/7?x=1", {"titulo": "A"}),
+            _operation("PUT", "/items/404", {}),
+            _operation("PUT", "/items/abc", {}),
+            _operation("GET", "/batch"),
+        ]
+
+        # Act
+        with patch.object(auth, "_get_user_from_token") as decode:
+            data = await service.run(_app(), PARENT_SCOPE, USER, operations)
+
+        # Assert
+        decode.assert_not_called()
+        assert data["committed"] is None
+        assert [result["status"] for result in data["results"]] == [200, 200, 404, 422, 400]
+        assert data["results"][0]["body"] == {"username": "admin"}
+        assert data["results"][1]["body"] == {"id": 7, "titulo": "A"}
+        assert data["results"][2]["body"] == {"detail": "Item não encontrado"}
+
+    async def test_run_transaction_rolls_back_on_first_error(self):
+        """Testa que, na transação, a primeira falha desfaz tudo e as seguintes retornam 424."""
+        # Arrange
+        relay = MagicMock()
+        service = BatchService(outbox_relay=relay)
+        outcome = {}
+
+        @contextmanager
+        def fake_transaction():
+            try:
+                yield MagicMock()
+                outcome["committed"] = True
+            except Exception:
+                outcome["committed"] = False
+                raise
+
+        operations = [
+            _operation("PUT", "/items/1", {}),
+            _operation("PUT", "/items/404", {}),
+            _operation("PUT", "/items/2", {}),
+        ]
+
+        # Act
+        with patch("src.services.batch_service.shared_transaction", fake_transaction):
+            data = await service.run(_app(), PARENT_SCOPE, USER, operations, transaction=True)
+
+        # Assert
+        assert outcome == {"committed": False}
+        assert data["committed"] is False
+        assert [result["status"] for result in data["results"]] == [200, 404, 424]
+        relay.wake.assert_not_called()
+
+    async def test_run_transaction_commits_and_wakes_relay(self):
+        """Testa que o lote sem erros é confirmado e o relay do outbox é acordado."""
+        # Arrange
+        relay = MagicMock()
+        service = BatchService(outbox_relay=relay)
+        transaction = MagicMock()
+
+        # Act
+        with patch("src.services.batch_service.shared_transaction", transaction):
+            data = await service.run(
+                _app(), PARENT_SCOPE, USER, [_operation("PUT", "/items/1", {})], transaction=True
+            )
+
+        # Assert
+        transaction.return_value.__exit__.assert_called_once_with(None, None, None)
+        assert data["committed"] is True
+        relay.wake.assert_called_once()
+
+    def test_get_db_cursor_reuses_shared_transaction(self):
+        """Testa que, dentro de shared_transaction, get_db_cursor usa a mesma conexão sem commit próprio."""
+        # Arrange
+        conn = MagicMock()
+
+        @contextmanager
+        def fake_connection():
+            yield conn
+
+        # Act
+        with patch.object(database, "get_db_connection", fake_connection):
+            with database.shared_transaction() as shared:
+                with database.get_db_cursor(commit=True) as first:
+                    pass
+                with database.get_db_cursor(commit=True) as second:
+                    pass
+
+        # Assert
+        assert first is shared and second is shared
+        conn.commit.assert_called_once()
+        conn.rollback.assert_not_called()
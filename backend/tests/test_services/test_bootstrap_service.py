@@ -0,0 +1,63 @@
+"""
+Testes para BootstrapService - dados iniciais do cliente (GET /bootstrap).
+"""
+import threading
+import pytest
+from unittest.mock import MagicMock
+from src.config import schemas
+from src.services.bootstrap_service import BootstrapService
+
+
+def _service():
+    task_service = MagicMock()
+    user_service = MagicMock()
+    notification_service = MagicMock()
+    hub = MagicMock()
+    task_service.get_board.return_value = {"columns": []}
+    user_service.get_all_users.return_value = [{"id": 1, "username": "admin", "role": "admin"}]
+    notification_service.get_user_notifications.return_value = [{"id": 9}, {"id": 8}, {"id": 7}]
+    notification_service.get_unread_count.return_value = 3
+    hub.version.return_value = 5
+    return BootstrapService(task_service, user_service, notification_service, hub)
+
+
+@pytest.mark.service
+class TestBootstrapService:
+    """Testes para BootstrapService."""
+
+    async def test_load_gathers_role_data(self):
+        """Testa que o gerencial recebe quadro, usuários, notificações e contagem em uma resposta."""
+        # Arrange
+        service = _service()
+        user = schemas.User(id=2, username="gerente", email="g@example.com", role="gerencial")
+
+        # Act
+        data = await service.load(user, board_limit=10, notifications_limit=2)
+
+        # Assert
+        service.task_service.get_board.assert_called_once_with(10)
+        service.user_service.get_all_users.assert_called_once_with("gerencial", ("id", "username", "role"))
+        service.notification_service.get_user_notifications.assert_called_once_with(2, limit=3)
+        assert data["me"]["username"] == "gerente"
+        assert data["users"] == [{"id": 1, "username": "admin", "role": "admin"}]
+        assert [n["id"] for n in data["notifications"]] == [9, 8]
+        assert data["notifications_next_before"] == 8
+        assert (data["unread_count"], data["version"]) == (3, 5)
+
+    async def test_load_visualizacao_skips_users_and_runs_concurrently(self):
+        """Testa que visualização não consulta usuários e que as consultas rodam em paralelo."""
+        # Arrange
+        service = _service()
+        user = schemas.User(id=3, username="usuario", email="u@example.com", role="visualizacao")
+        # As duas consultas só terminam se estiverem rodando ao mesmo tempo
+        barrier = threading.Barrier(2, timeout=5)
+        service.task_service.get_board.side_effect = lambda limit: (barrier.wait(), {"columns": []})[1]
+        service.notification_service.get_unread_count.side_effect = lambda user_id: (barrier.wait(), 0)[1]
+
+        # Act
+        data = await service.load(user, board_limit=10, notifications_limit=20)
+
+        # Assert
+        service.user_service.get_all_users.assert_not_called()
+        assert data["users"] is None
+        assert data["notifications_next_before"] is None
@@ -0,0 +1,96 @@
+"""
+Testes para DomainEventBus - eventos de domínio com handlers registrados na inicialização.
+"""
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from src.patterns import DomainEventBus, TaskNotificationObserver, TaskStatusChanged
+
+
+def _status_changed(task_id, new_status='em_revisao'):
+    return TaskStatusChanged({'id': task_id, 'status': new_status}, 'em_andamento', new_status, {'username': 'admin'})
+
+
+@pytest.mark.service
+class TestDomainEventBus:
+    """Testes para DomainEventBus."""
+    
+    def test_publish_without_start_runs_observer_inline(self):
+        """Testa que, sem o lifespan, o observer anexado é executado de forma síncrona."""
+        # Arrange
+        notification_service = MagicMock()
+        bus = DomainEventBus()
+        bus.attach(TaskNotificationObserver(notification_service), TaskStatusChanged)
+        
+        # Act
+        bus.publish(_status_changed(1))
+        
+        # Assert
+        notification_service.create_review_notification.assert_called_once_with(
+            {'id': 1, 'status': 'em_revisao'}, {'username': 'admin'}, event_id=None
+        )
+        assert bus.metrics()['published_inline'] == 1
+        assert bus.metrics()['handlers']['TaskNotificationObserver']['calls'] == 1
+    
+    def test_events_are_slotted(self):
+        """Testa que os eventos não aceitam atributos fora dos __slots__."""
+        # Arrange
+        event = _status_changed(1)
+        
+        # Act & Assert
+        with pytest.raises(AttributeError):
+            event.extra = True
+        assert event.to_event_data()['new_status'] == 'em_revisao'
+    
+    async def test_handler_error_is_isolated_and_measured(self):
+        """Testa que o erro de um handler não afeta os demais e aparece nas métricas."""
+        # Arrange
+        bus = DomainEventBus()
+        received = []
+        
+        async def failing(event):
+            raise RuntimeError("falha")
+        
+        bus.subscribe(TaskStatusChanged, failing, name='failing')
+        bus.subscribe(TaskStatusChanged, lambda event: received.append(event.task['id']), name='sync')
+        await bus.start()
+        
+        # Act
+        await asyncio.to_thread(bus.publish, _status_changed(1))
+        await asyncio.sleep(0.05)
+        await bus.stop(drain_timeout=1)
+        
+        # Assert
+        assert received == [1]
+        handlers = bus.metrics()['handlers']
+        assert handlers['failing']['errors'] == 1
+        assert handlers['sync'] == {**handlers['sync'], 'calls': 1, 'errors': 0}
+        assert handlers['sync']['max_ms'] >= 0
+    
+    async def test_concurrency_limit_per_handler(self):
+        """Testa que cada handler respeita o seu próprio limite de execuções simultâneas."""
+        # Arrange
+        bus = DomainEventBus()
+        active = {'serial': 0, 'parallel': 0}
+        peak = {'serial': 0, 'parallel': 0}
+        
+        def tracked(key):
+            async def handler(event):
+                active[key] += 1
+                peak[key] = max(peak[key], active[key])
+                await asyncio.sleep(0.02)
+                active[key] -= 1
+            return handler
+        
+        bus.subscribe(TaskStatusChanged, tracked('serial'), concurrency=1, name='serial')
+        bus.subscribe(TaskStatusChanged, tracked('parallel'), concurrency=3, name='parallel')
+        await bus.start()
+        
+        # Act
+        for task_id in range(3):
+            bus.publish(_status_changed(task_id))
+        await bus.stop(drain_timeout=2)
+        
+        # Assert
+        assert peak == {'serial': 1, 'parallel': 3}
+        assert bus.metrics()['handlers']['serial']['calls'] == 3
@@ -0,0 +1,109 @@
+"""
+Testes para ImportService - importação em massa de tarefas e usuários.
+"""
+import json
+import pytest
+from unittest.mock import Mock, patch
+from src.repositories import TaskRepository, UserRepository
+from src.services.import_service import ImportService
+
+
+def _service(chunk_size=2):
+    task_repository = Mock(spec=TaskRepository)
+    user_repository = Mock(spec=UserRepository)
+    return ImportService(task_repository, user_repository, chunk_size=chunk_size, hash_workers=2)
+
+
+def _pieces(text, size=5):
+    """Conteúdo em pedaços pequenos, cortando linhas e caracteres multibyte."""
+    data = text.encode()
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+@pytest.mark.service
+class TestImportService:
+    """Testes para ImportService."""
+
+    def test_import_tasks_csv_in_chunks(self):
+        """Testa que o CSV é lido aos pedaços, com uma consulta de responsáveis e um COPY por lote."""
+        # Arrange
+        service = _service(chunk_size=2)
+        service.user_repository.find_ids_by_usernames.return_value = {"usuario": 3}
+        service.task_repository.bulk_create.side_effect = lambda tasks: len(tasks)
+        text = (
+            "titulo,descricao,status,owner_username\n"
+            "Migração,\"linha 1\nlinha 2\",pendente,usuario\n"
+            "Sem dono,,concluida,\n"
+            ",,pendente,\n"
+            "Fantasma,,pendente,ghost\n"
+        )
+
+        # Act
+        report = service.import_tasks(_pieces(text), "csv", current_user_id=1)
+
+        # Assert
+        assert (report["total"], report["imported"], report["failed"]) == (4, 2, 2)
+        assert [error["row"] for error in report["errors"]] == [3, 4]
+        assert service.user_repository.find_ids_by_usernames.call_count == 2
+        first_chunk = service.task_repository.bulk_create.call_args_list[0][0][0]
+        assert first_chunk[0] == {
+            "titulo": "Migração", "descricao": "linha 1\nlinha 2", "status": "pendente", "owner_id": 3
+        }
+        assert first_chunk[1]["owner_id"] == 1
+
+    def test_import_tasks_ndjson_reports_invalid_lines(self):
+        """Testa que linhas inválidas do NDJSON são reportadas sem interromper a importação."""
+        # Arrange
+        service = _service(chunk_size=100)
+        service.task_repository.bulk_create.side_effect = lambda tasks: len(tasks)
+        text = "\n".join([json.dumps({"titulo": "A"}), "{quebrado", "[1]", "", json.dumps({"titulo": "B"})])
+
+        # Act
+        report = service.import_tasks(_pieces(text), "ndjson", current_user_id=1)
+
+        # Assert
+        assert (report["total"], report["imported"], report["failed"]) == (4, 2, 2)
+        assert [error["row"] for error in report["errors"]] == [2, 3]
+        service.task_repository.bulk_create.assert_called_once()
+
+    def test_import_users_checks_duplicates_and_hashes(self):
+        """Testa que usernames/emails já cadastrados ou repetidos no arquivo são rejeitados e as senhas viram hash."""
+        # Arrange
+        service = _service(chunk_size=100)
+        service.user_repository.find_existing.return_value = ({"admin"}, set())
+        service.user_repository.bulk_create.side_effect = lambda users: {user["username"] for user in users}
+        text = (
+            "username,email,password,role\n"
+            "ana,ana@example.com,s1,gerencial\n"
+            "admin,novo@example.com,s2,\n"
+            "bia,ana@example.com,s3,\n"
+            "caio,caio@example.com,s4,chefe\n"
+        )
+
+        # Act
+        with patch("src.services.import_service.get_password_hash", side_effect=lambda password: f"hash-{password}"):
+            report = service.import_users(_pieces(text), "csv")
+
+        # Assert
+        assert (report["total"], report["imported"], report["failed"]) == (4, 1, 3)
+        assert report["errors"][0] == {"row": 2, "errors": ["username: já registrado"]}
+        assert report["errors"][1] == {"row": 3, "errors": ["email: repetido no arquivo (registro 1)"]}
+        service.user_repository.find_existing.assert_called_once()
+        users = service.user_repository.bulk_create.call_args[0][0]
+        assert users == [
+            {"username": "ana", "email": "ana@example.com", "hashed_password": "hash-s1", "role": "gerencial"}
+        ]
+
+    def test_import_reports_failed_chunk(self):
+        """Testa que uma falha ao gravar um lote é reportada nos registros do lote."""
+        # Arrange
+        service = _service(chunk_size=1)
+        service.task_repository.bulk_create.side_effect = [RuntimeError("falha"), 1]
+        text = "\n".join([json.dumps({"titulo": "A"}), json.dumps({"titulo": "B"})])
+
+        # Act
+        report = service.import_tasks(_pieces(text), "ndjson", current_user_id=1)
+
+        # Assert
+        assert (report["imported"], report["failed"]) == (1, 1)
+        assert report["errors"][0]["row"] == 1
@@ -0,0 +1,133 @@
+"""
+Testes para JobRunner - execução dos jobs em segundo plano.
+"""
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock
+from src.repositories.job_repository import JobRepository
+from src.services.job_runner import JobCancelled, JobContext, JobRunner
+
+
+def _repository(queued):
+    """Repositório falso: claim_next entrega os jobs da lista respeitando os tipos pedidos."""
+    repository = MagicMock(spec=JobRepository)
+
+    def claim_next(job_types):
+        for job in queued:
+            if job['type'] in job_types:
+                queued.remove(job)
+                return job
+        return None
+
+    repository.claim_next.side_effect = claim_next
+    repository.report_progress.return_value = False
+    repository.heartbeat.return_value = set()
+    repository.fail_stale.return_value = []
+    return repository
+
+
+async def _wait_until(condition, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condição não atingida")
+
+
+@pytest.mark.service
+class TestJobRunner:
+    """Testes para JobRunner."""
+
+    async def test_concurrency_limit_per_type(self):
+        """Testa que um tipo não passa do seu limite e os demais tipos continuam sendo executados."""
+        # Arrange
+        release = threading.Event()
+        queued = [
+            {'id': 1, 'type': 'slow', 'params': {}},
+            {'id': 2, 'type': 'slow', 'params': {}},
+            {'id': 3, 'type': 'fast', 'params': {'file_oid': 99}},
+        ]
+        repository = _repository(queued)
+        runner = JobRunner(repository, workers=4, poll_interval_seconds=0.01)
+        runner.register('slow', lambda params, context: release.wait(2), concurrency=1)
+        runner.register('fast', lambda params, context: {'ok': True}, concurrency=1)
+
+        # Act
+        await runner.start()
+        try:
+            await _wait_until(lambda: runner.metrics()['succeeded'] == 1)
+            active = runner.metrics()['active']
+            release.set()
+            await _wait_until(lambda: runner.metrics()['succeeded'] == 3)
+        finally:
+            release.set()
+            await runner.stop()
+
+        # Assert
+        assert active == {'slow': 1}
+        repository.finish.assert_any_call(3, 'succeeded', 0, result={'ok': True}, error=None)
+        repository.delete_file.assert_called_once_with(99)
+        assert queued == []
+
+    async def test_cancel_requested_stops_job(self):
+        """Testa que o job para na próxima chamada de progress() após o pedido de cancelamento."""
+        # Arrange
+        repository = _repository([{'id': 5, 'type': 'loop', 'params': {}}])
+        repository.report_progress.side_effect = lambda job_id, done, total: done >= 3
+        runner = JobRunner(repository, poll_interval_seconds=0.01, progress_interval_seconds=0)
+        steps = []
+
+        def handler(params, context):
+            for step in range(1, 100):
+                steps.append(step)
+                context.progress(step, 99)
+
+        runner.register('loop', handler)
+
+        # Act
+        await runner.start()
+        try:
+            await _wait_until(lambda: runner.metrics()['cancelled'] == 1)
+        finally:
+            await runner.stop()
+
+        # Assert
+        assert steps == [1, 2, 3]
+        repository.finish.assert_called_once_with(5, 'cancelled', 3, result=None, error=None)
+
+    async def test_failed_job_records_error(self):
+        """Testa que a exceção do handler vira o erro do job sem derrubar o runner."""
+        # Arrange
+        repository = _repository([{'id': 8, 'type': 'broken', 'params': {}}])
+        runner = JobRunner(repository, poll_interval_seconds=0.01)
+        runner.register('broken', lambda params, context: 1 / 0)
+
+        # Act
+        await runner.start()
+        try:
+            await _wait_until(lambda: runner.metrics()['failed'] == 1)
+        finally:
+            await runner.stop()
+
+        # Assert
+        repository.finish.assert_called_once_with(8, 'failed', 0, result=None, error='division by zero')
+        assert runner.metrics()['running'] is False
+
+    def test_progress_is_throttled(self):
+        """Testa que o progresso é gravado no máximo uma vez por intervalo."""
+        # Arrange
+        repository = MagicMock(spec=JobRepository)
+        repository.report_progress.return_value = False
+        context = JobContext(1, repository, progress_interval_seconds=60)
+
+        # Act
+        for done in range(1, 6):
+            context.progress(done, 5)
+        context.cancel()
+
+        # Assert
+        repository.report_progress.assert_called_once_with(1, 1, 5)
+        assert (context.done, context.total) == (5, 5)
+        with pytest.raises(JobCancelled):
+            context.check_cancelled()
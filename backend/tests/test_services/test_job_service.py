@@ -0,0 +1,101 @@
+"""
+Testes para JobService - envio, consulta e cancelamento de jobs.
+"""
+import pytest
+from unittest.mock import MagicMock, Mock
+from fastapi import HTTPException
+from src.config import schemas
+from src.repositories.job_repository import JobRepository
+from src.repositories.user_repository import UserRepository
+from src.services.job_service import JobService
+
+
+def _user(role="admin", user_id=1):
+    return schemas.User(id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com", role=role)
+
+
+def _service():
+    repository = Mock(spec=JobRepository)
+    user_repository = Mock(spec=UserRepository)
+    runner = MagicMock()
+    return JobService(repository, user_repository, runner)
+
+
+@pytest.mark.service
+class TestJobService:
+    """Testes para JobService."""
+
+    def test_submit_validates_and_wakes_runner(self):
+        """Testa que os parâmetros validados vão para a fila e o runner é acordado."""
+        # Arrange
+        service = _service()
+        service.user_repository.find_by_id.return_value = {"id": 2}
+        service.repository.create.return_value = {"id": 10, "status": "queued"}
+        job = schemas.JobSubmit(type="tasks.reassign", params={"from_owner_id": 3, "to_owner_id": 2})
+
+        # Act
+        result = service.submit(job, _user(role="gerencial"))
+
+        # Assert
+        assert result == {"id": 10, "status": "queued"}
+        service.repository.create.assert_called_once_with(
+            "tasks.reassign", {"from_owner_id": 3, "to_owner_id": 2}, 1
+        )
+        service.runner.wake.assert_called_once()
+
+    def test_submit_rejects_invalid_jobs(self):
+        """Testa tipo desconhecido (400), papel sem permissão (403) e parâmetros inválidos ou mesmo usuário (422)."""
+        # Arrange
+        service = _service()
+        cases = [
+            ("nope", {}, "admin", 400),
+            ("notifications.compact", {}, "gerencial", 403),
+            ("tasks.reassign", {"from_owner_id": 3}, "admin", 422),
+            ("tasks.reassign", {"from_owner_id": 3, "to_owner_id": 3}, "admin", 422),
+        ]
+
+        # Act & Assert
+        for job_type, params, role, status_code in cases:
+            with pytest.raises(HTTPException) as exc_info:
+                service.submit(schemas.JobSubmit(type=job_type, params=params), _user(role=role))
+            assert exc_info.value.status_code == status_code
+        service.repository.create.assert_not_called()
+
+    def test_cancel_queued_import_deletes_file(self):
+        """Testa que cancelar uma importação ainda na fila remove o arquivo enviado."""
+        # Arrange
+        service = _service()
+        service.repository.find_by_id.return_value = {"id": 4, "status": "queued", "created_by": 1}
+        service.repository.request_cancel.return_value = {
+            "id": 4, "status": "cancelled", "params": {"file_oid": 77}
+        }
+
+        # Act
+        result = service.cancel_job(4, _user())
+
+        # Assert
+        assert result["status"] == "cancelled"
+        service.repository.delete_file.assert_called_once_with(77)
+
+    def test_cancel_finished_job_conflict(self):
+        """Testa que cancelar um job já finalizado retorna 409."""
+        # Arrange
+        service = _service()
+        service.repository.find_by_id.return_value = {"id": 4, "status": "succeeded", "created_by": 1}
+        service.repository.request_cancel.return_value = None
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            service.cancel_job(4, _user())
+        assert exc_info.value.status_code == 409
+
+    def test_get_job_of_another_user_not_found(self):
+        """Testa que um usuário não admin não vê jobs de outros usuários."""
+        # Arrange
+        service = _service()
+        service.repository.find_by_id.return_value = {"id": 4, "status": "running", "created_by": 1}
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            service.get_job(4, _user(role="visualizacao", user_id=2))
+        assert exc_info.value.status_code == 404
@@ -0,0 +1,98 @@
+"""
+Testes para MaintenanceScheduler - tarefas periódicas executadas por um único worker.
+"""
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from src.repositories.maintenance_repository import MaintenanceRepository
+from src.services.maintenance_scheduler import MAINTENANCE_LOCK_CLASS, MaintenanceScheduler
+
+
+def _scheduler(locked=True, ran_recently=False):
+    repository = MagicMock(spec=MaintenanceRepository)
+    repository.ran_within.return_value = ran_recently
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchone.return_value = (locked,)
+    scheduler = MaintenanceScheduler(repository, jitter_seconds=0, connection_factory=lambda: conn)
+    return scheduler, repository, conn, cursor
+
+
+@pytest.mark.service
+class TestMaintenanceScheduler:
+    """Testes para MaintenanceScheduler."""
+
+    def test_run_once_with_lock_records_run(self):
+        """Testa que, com o advisory lock, a tarefa roda e a execução é registrada na frota."""
+        # Arrange
+        scheduler, repository, conn, cursor = _scheduler()
+        job = MagicMock(return_value={'removed': 3})
+        scheduler.register('notifications.compact', job, interval_seconds=600)
+
+        # Act
+        status = scheduler.run_once('notifications.compact')
+
+        # Assert
+        assert status == 'succeeded'
+        job.assert_called_once()
+        lock_params = cursor.execute.call_args[0][1]
+        assert lock_params[0] == MAINTENANCE_LOCK_CLASS
+        repository.ran_within.assert_called_once_with('notifications.compact', 300)
+        name, recorded_status = repository.record_run.call_args[0][:2]
+        assert (name, recorded_status) == ('notifications.compact', 'succeeded')
+        assert repository.record_run.call_args[1] == {'result': {'removed': 3}, 'error': None}
+        conn.close.assert_called_once()
+
+    def test_run_once_skips_when_locked_or_recent(self):
+        """Testa que a vez é pulada com o lock em outro worker ou execução recente na frota."""
+        # Arrange
+        locked_elsewhere, _, conn, _ = _scheduler(locked=False)
+        ran_recently, repository, _, _ = _scheduler(ran_recently=True)
+        job = MagicMock()
+        for scheduler in (locked_elsewhere, ran_recently):
+            scheduler.register('tasks.rebalance_board', job, interval_seconds=60)
+
+        # Act
+        results = [scheduler.run_once('tasks.rebalance_board') for scheduler in (locked_elsewhere, ran_recently)]
+
+        # Assert
+        assert results == ['skipped', 'skipped']
+        job.assert_not_called()
+        repository.record_run.assert_not_called()
+        conn.close.assert_called_once()
+        assert locked_elsewhere.metrics()['jobs']['tasks.rebalance_board']['skipped'] == 1
+
+    def test_failed_job_is_recorded(self):
+        """Testa que a falha da tarefa fica registrada com o erro e a duração."""
+        # Arrange
+        scheduler, repository, _, _ = _scheduler()
+        scheduler.register('broken', MagicMock(side_effect=RuntimeError("falha")), interval_seconds=60)
+
+        # Act
+        status = scheduler.run_once('broken')
+
+        # Assert
+        assert status == 'failed'
+        assert repository.record_run.call_args[1] == {'result': None, 'error': 'falha'}
+        metrics = scheduler.metrics()['jobs']['broken']
+        assert (metrics['runs'], metrics['failed_runs'], metrics['last_status']) == (1, 1, 'failed')
+
+    async def test_non_exclusive_job_runs_periodically_without_lock(self):
+        """Testa que uma tarefa não exclusiva roda em cada worker, sem lock nem registro na frota."""
+        # Arrange
+        connect = MagicMock()
+        repository = MagicMock(spec=MaintenanceRepository)
+        scheduler = MaintenanceScheduler(repository, jitter_seconds=0, connection_factory=connect)
+        job = MagicMock(return_value=None)
+        scheduler.register('local', job, interval_seconds=0.01, exclusive=False)
+
+        # Act
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+        # Assert
+        assert job.call_count >= 2
+        connect.assert_not_called()
+        repository.record_run.assert_not_called()
+        assert scheduler.running is False
@@ -0,0 +1,29 @@
+"""
+Testes para NotificationDigest - envio periódico dos resumos de notificações.
+"""
+import pytest
+from unittest.mock import MagicMock
+from src.services.notification_digest import NotificationDigest
+
+
+@pytest.mark.service
+class TestNotificationDigest:
+    """Testes para NotificationDigest."""
+    
+    async def test_stop_flushes_pending_summaries(self):
+        """Testa que o shutdown grava o que estava acumulado."""
+        # Arrange
+        service = MagicMock()
+        service.flush_digest.return_value = [{"id": 1}, {"id": 2}]
+        service.digest_pending = 0
+        digest = NotificationDigest(service, interval_seconds=3600)
+        await digest.start()
+        
+        # Act
+        await digest.stop()
+        
+        # Assert
+        service.flush_digest.assert_called_once()
+        metrics = digest.metrics()
+        assert metrics['notifications_sent'] == 2
+        assert metrics['running'] is False
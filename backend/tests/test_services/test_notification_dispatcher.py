@@ -0,0 +1,117 @@
+"""
+Testes para NotificationDispatcher - despacho de notificações em segundo plano.
+"""
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from src.services.notification_dispatcher import NotificationDispatcher
+
+
+def _review_event(task_id):
+    return {
+        'task': {'id': task_id, 'titulo': f'Tarefa {task_id}', 'owner_id': 1},
+        'old_status': 'em_andamento',
+        'new_status': 'em_revisao',
+        'updated_by': {'username': 'usuario'}
+    }
+
+
+@pytest.mark.service
+class TestNotificationDispatcher:
+    """Testes para NotificationDispatcher."""
+    
+    def test_submit_without_start_is_rejected(self):
+        """Testa que sem o lifespan o chamador processa o evento de forma síncrona."""
+        # Arrange
+        dispatcher = NotificationDispatcher(MagicMock())
+        
+        # Act
+        result = dispatcher.submit(_review_event(1))
+        
+        # Assert
+        assert result is False
+    
+    async def test_events_from_threads_are_processed_and_drained(self):
+        """Testa que eventos enfileirados pelo threadpool são processados e drenados no stop."""
+        # Arrange
+        service = MagicMock()
+        dispatcher = NotificationDispatcher(service, workers=1)
+        await dispatcher.start()
+        
+        # Act
+        results = await asyncio.gather(*[
+            asyncio.to_thread(dispatcher.submit, _review_event(task_id)) for task_id in range(3)
+        ])
+        await dispatcher.stop(drain_timeout=2)
+        
+        # Assert
+        assert results == [True, True, True]
+        assert service.create_review_notification.call_count == 3
+        metrics = dispatcher.metrics()
+        assert metrics['processed'] == 3
+        assert metrics['queue_size'] == 0
+        assert metrics['running'] is False
+    
+    async def test_full_queue_rejects_after_timeout(self):
+        """Testa o backpressure: com a fila cheia, submit desiste após o timeout."""
+        # Arrange
+        dispatcher = NotificationDispatcher(MagicMock(), queue_size=1, workers=0, enqueue_timeout_seconds=0.01)
+        await dispatcher.start()
+        
+        # Act
+        first = await asyncio.to_thread(dispatcher.submit, _review_event(1))
+        second = await asyncio.to_thread(dispatcher.submit, _review_event(2))
+        
+        # Assert
+        assert first is True
+        assert second is False
+        assert dispatcher.metrics()['rejected'] == 1
+        await dispatcher.stop(drain_timeout=0.01)
+    
+    def test_process_batch_writes_once_and_isolates_failures(self):
+        """Testa que o lote é gravado em uma escrita e que um evento com erro não afeta os demais."""
+        # Arrange
+        service = MagicMock()
+        service.create_review_notification.side_effect = [RuntimeError("falha"), None]
+        dispatcher = NotificationDispatcher(service)
+        
+        # Act
+        dispatcher.process_batch([_review_event(1), _review_event(2)])
+        
+        # Assert
+        service.batched.assert_called_once()
+        assert service.create_review_notification.call_count == 2
+        assert dispatcher.metrics()['failed'] == 1
+        assert dispatcher.metrics()['processed'] == 1
+    
+    def test_update_ignores_irrelevant_events_and_falls_back_when_stopped(self):
+        """Testa o dispatcher como observer: só eventos de revisão/conclusão, síncronos sem o lifespan."""
+        # Arrange
+        service = MagicMock()
+        dispatcher = NotificationDispatcher(service)
+        irrelevant = dict(_review_event(1), new_status='em_andamento', old_status='pendente')
+        
+        # Act
+        dispatcher.update(None, irrelevant)
+        dispatcher.update(None, _review_event(2))
+        
+        # Assert
+        service.create_review_notification.assert_called_once()
+        assert dispatcher.metrics()['processed'] == 1
+    
+    def test_deliver_raises_when_an_event_fails(self):
+        """Testa que o consumidor do outbox falha para que o relay repita a entrega."""
+        # Arrange
+        from src.patterns import TaskStatusChanged
+        service = MagicMock()
+        service.create_review_notification.side_effect = [None, RuntimeError("falha")]
+        dispatcher = NotificationDispatcher(service)
+        events = [
+            TaskStatusChanged({'id': task_id}, 'em_andamento', 'em_revisao', event_id=task_id)
+            for task_id in (1, 2)
+        ]
+        
+        # Act & Assert
+        with pytest.raises(RuntimeError):
+            dispatcher.deliver(events)
+        assert service.create_review_notification.call_args_list[0][1] == {'event_id': 1}
@@ -0,0 +1,177 @@
+"""
+Testes para NotificationHub - fan-out de notificações em tempo real (SSE).
+"""
+import asyncio
+import threading
+import time
+import pytest
+from src.services.notification_hub import NotificationHub, stream_events, format_sse
+
+
+@pytest.mark.service
+class TestNotificationHub:
+    """Testes para NotificationHub."""
+    
+    async def test_publish_from_thread_reaches_subscriber(self):
+        """Testa que publicações do threadpool chegam à fila do assinante."""
+        # Arrange
+        hub = NotificationHub()
+        hub.bind(asyncio.get_running_loop())
+        subscription = hub.subscribe(1)
+        
+        # Act
+        thread = threading.Thread(target=hub.publish, args=(1, 'notification', {'id': 5}))
+        thread.start()
+        thread.join()
+        event_id, event, data = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+        
+        # Assert
+        assert event == 'notification'
+        assert data == {'id': 5}
+        assert event_id == 1
+    
+    async def test_subscribe_resumes_from_last_event_id(self):
+        """Testa que a reconexão recebe apenas os eventos após o Last-Event-ID."""
+        # Arrange
+        hub = NotificationHub()
+        hub.bind(asyncio.get_running_loop())
+        for i in range(3):
+            hub.publish(1, 'notification', {'id': i})
+        hub.publish(2, 'notification', {'id': 99})
+        
+        # Act
+        subscription = hub.subscribe(1, last_event_id=1)
+        
+        # Assert
+        assert [item[0] for item in subscription.backlog] == [2, 3]
+        assert subscription.resync is False
+    
+    async def test_subscribe_requests_resync_when_history_evicted(self):
+        """Testa que o cliente recarrega se os eventos perdidos saíram do histórico."""
+        # Arrange
+        hub = NotificationHub(history_size=2)
+        hub.bind(asyncio.get_running_loop())
+        for i in range(5):
+            hub.publish(1, 'notification', {'id': i})
+        
+        # Act
+        subscription = hub.subscribe(1, last_event_id=1)
+        
+        # Assert
+        assert subscription.resync is True
+        assert subscription.backlog == []
+    
+    async def test_prune_drops_idle_users_only(self):
+        """Testa que o estado de usuários sem conexão e inativos é descartado e a reconexão pede resync."""
+        # Arrange
+        hub = NotificationHub(reconnect_window_seconds=60)
+        hub.bind(asyncio.get_running_loop())
+        connected = hub.subscribe(2)
+        for i in range(2):
+            hub.publish(1, 'notification', {'id': i})
+        hub.publish(2, 'notification', {'id': 2})
+        hub.notify_changed(3, version=10)
+        
+        # Act
+        pruned = hub.prune(time.monotonic() + 61)
+        subscription = hub.subscribe(1, last_event_id=1)
+        
+        # Assert
+        assert pruned == 2
+        assert hub.version(3) == 0
+        assert hub.is_connected(2) and connected.queue.qsize() == 1
+        assert subscription.resync is True
+        assert hub.prune(time.monotonic()) == 0
+    
+    async def test_slow_subscriber_is_disconnected(self):
+        """Testa que um assinante com a fila cheia é encerrado."""
+        # Arrange
+        hub = NotificationHub(queue_size=1)
+        hub.bind(asyncio.get_running_loop())
+        subscription = hub.subscribe(1)
+        
+        # Act
+        hub.publish(1, 'notification', {'id': 1})
+        hub.publish(1, 'notification', {'id': 2})
+        
+        # Assert
+        assert hub.is_connected(1) is False
+        assert subscription.queue.get_nowait() is None
+    
+    async def test_stream_events_sends_snapshot_and_heartbeat(self):
+        """Testa o início do stream SSE e o heartbeat em conexão ociosa."""
+        # Arrange
+        hub = NotificationHub()
+        hub.bind(asyncio.get_running_loop())
+        subscription = hub.subscribe(1)
+        stream = stream_events(hub, subscription, unread_count=3, heartbeat_seconds=0.01)
+        
+        # Act
+        chunks = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+        
+        # Assert
+        assert chunks[0].startswith("retry:")
+        assert chunks[1] == format_sse('unread_count', {'unread_count': 3})
+        assert chunks[2] == ": heartbeat\n\n"
+        assert hub.is_connected(1) is False
+    
+    async def test_wait_for_change_wakes_on_notify(self):
+        """Testa que o long-poll retorna assim que a versão do usuário muda."""
+        # Arrange
+        hub = NotificationHub()
+        hub.bind(asyncio.get_running_loop())
+        waiter = asyncio.ensure_future(hub.wait_for_change(1, since_version=0, timeout=5))
+        await asyncio.sleep(0)
+        
+        # Act
+        threading.Thread(target=hub.notify_changed, args=(1,)).start()
+        version = await asyncio.wait_for(waiter, timeout=1)
+        
+        # Assert
+        assert version > 0
+        assert version == hub.version(1)
+        assert hub.waiter_count == 0
+    
+    async def test_wait_for_change_timeout_keeps_version(self):
+        """Testa que o long-poll sem mudanças expira com a mesma versão."""
+        # Arrange
+        hub = NotificationHub()
+        hub.bind(asyncio.get_running_loop())
+        hub.notify_changed(1, version=100)
+        
+        # Act
+        version = await hub.wait_for_change(1, since_version=100, timeout=0.01)
+        
+        # Assert
+        assert version == 100
+    
+    async def test_wait_for_change_adopts_newer_client_version(self):
+        """Testa que uma versão vista em outro worker não gera resposta imediata."""
+        # Arrange
+        hub = NotificationHub()
+        hub.bind(asyncio.get_running_loop())
+        
+        # Act
+        version = await hub.wait_for_change(1, since_version=500, timeout=0.01)
+        
+        # Assert
+        assert version == 500
+        assert hub.version(1) == 500
+    
+    async def test_suggested_poll_interval_grows_with_load(self):
+        """Testa que o intervalo sugerido cresce com as conexões abertas e respeita o limite."""
+        # Arrange
+        hub = NotificationHub()
+        idle = hub.suggested_poll_interval(1, 30, 10)
+        for user_id in range(20):
+            hub.subscribe(user_id)
+        
+        # Act
+        loaded = hub.suggested_poll_interval(1, 30, 10)
+        capped = hub.suggested_poll_interval(1, 2, 10)
+        
+        # Assert
+        assert idle == 1
+        assert loaded == 3
+        assert capped == 2
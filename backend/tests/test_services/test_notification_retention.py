@@ -0,0 +1,32 @@
+"""
+Testes para NotificationRetention - compactação das notificações pela política de retenção.
+"""
+import pytest
+from unittest.mock import MagicMock
+from src.services.notification_retention import NotificationRetention
+
+
+@pytest.mark.service
+class TestNotificationRetention:
+    """Testes para NotificationRetention."""
+    
+    def test_run_once_converts_days_and_records_store_size(self):
+        """Testa a conversão da política para segundos e as métricas de tamanho."""
+        # Arrange
+        service = MagicMock()
+        service.repository.compact.return_value = 4
+        service.repository.stats.return_value = {'notifications': 10, 'users': 2, 'unread': 3}
+        retention = NotificationRetention(service, max_age_days=2, max_per_user=100, read_expiry_days=None)
+        
+        # Act
+        removed = retention.run_once()
+        
+        # Assert
+        assert removed == 4
+        service.repository.compact.assert_called_once_with(
+            max_age_seconds=172800, max_per_user=100, read_expiry_seconds=None
+        )
+        metrics = retention.metrics()
+        assert metrics['runs'] == 1
+        assert metrics['removed_total'] == 4
+        assert metrics['store'] == {'notifications': 10, 'users': 2, 'unread': 3}
@@ -0,0 +1,206 @@
+"""
+Testes para NotificationService - Service Layer Pattern
+Testa a lógica de negócio relacionada a notificações.
+"""
+import pytest
+
+
+@pytest.mark.service
+class TestNotificationService:
+    """Testes para NotificationService."""
+    
+    def test_create_review_notification_targets_admin_and_gerencial(
+        self, notification_service, mock_user_repository, mock_notification_repository
+    ):
+        """Testa que apenas admin e gerencial recebem notificação de revisão."""
+        # Arrange
+        mock_user_repository.find_ids_by_roles.return_value = {"admin": [1], "gerencial": [2]}
+        mock_notification_repository.create_many.side_effect = lambda notifications, **kwargs: notifications
+        task = {"id": 10, "titulo": "Tarefa", "owner_id": 3}
+        
+        # Act
+        result = notification_service.create_review_notification(task, {"username": "usuario"})
+        
+        # Assert
+        mock_notification_repository.create_many.assert_called_once()
+        mock_user_repository.find_all.assert_not_called()
+        assert [n["user_id"] for n in result] == [1, 2]
+        assert all(n["type"] == "task_review" for n in result)
+        assert all(n["updated_by"] == "usuario" for n in result)
+    
+    def test_create_completion_notification_owner_not_found(
+        self, notification_service, mock_user_repository, mock_notification_repository
+    ):
+        """Testa que nada é gravado quando o responsável não existe."""
+        # Arrange
+        mock_user_repository.find_by_id.return_value = None
+        
+        # Act
+        result = notification_service.create_completion_notification({"id": 10, "owner_id": 99})
+        
+        # Assert
+        assert result == []
+        mock_notification_repository.create_many.assert_not_called()
+    
+    def test_get_unread_count_uses_repository_count(self, notification_service, mock_notification_repository):
+        """Testa que o contador não materializa a lista de notificações."""
+        # Arrange
+        mock_notification_repository.count_unread.return_value = 5
+        
+        # Act
+        result = notification_service.get_unread_count(1)
+        
+        # Assert
+        assert result == 5
+        mock_notification_repository.find_by_user.assert_not_called()
+    
+    def test_mark_as_read(self, notification_service, mock_notification_repository):
+        """Testa marcar notificação como lida."""
+        # Arrange
+        mock_notification_repository.mark_as_read.return_value = True
+        
+        # Act
+        result = notification_service.mark_as_read(7, 1)
+        
+        # Assert
+        assert result is True
+        mock_notification_repository.mark_as_read.assert_called_once_with(7, 1)
+    
+    def test_created_notifications_are_published_to_hub(
+        self, mock_user_repository, mock_notification_repository
+    ):
+        """Testa que novas notificações e o contador são enviados ao hub."""
+        # Arrange
+        from unittest.mock import Mock
+        from src.services.notification_service import NotificationService
+        hub = Mock()
+        hub.is_connected.return_value = True
+        service = NotificationService(mock_user_repository, mock_notification_repository, hub=hub)
+        mock_user_repository.find_by_id.return_value = {"id": 3, "username": "usuario"}
+        mock_notification_repository.create_many.return_value = [{"id": 1, "user_id": 3}]
+        mock_notification_repository.count_unread.return_value = 1
+        
+        # Act
+        service.create_completion_notification({"id": 10, "titulo": "T", "owner_id": 3})
+        
+        # Assert
+        hub.publish.assert_any_call(3, 'notification', {"id": 1, "user_id": 3})
+        hub.publish.assert_any_call(3, 'unread_count', {'unread_count': 1})
+    
+    def test_created_notifications_are_replicated_through_event_bus(
+        self, mock_user_repository, mock_notification_repository
+    ):
+        """Testa que novas notificações são publicadas para os demais workers."""
+        # Arrange
+        from unittest.mock import Mock
+        from src.services.notification_service import NotificationService
+        event_bus = Mock()
+        service = NotificationService(mock_user_repository, mock_notification_repository, event_bus=event_bus)
+        mock_user_repository.find_by_id.return_value = {"id": 3, "username": "usuario"}
+        mock_notification_repository.create_many.return_value = [{"id": 1, "user_id": 3}]
+        
+        # Act
+        service.create_completion_notification({"id": 10, "titulo": "T", "owner_id": 3})
+        
+        # Assert
+        event, data = event_bus.publish.call_args[0]
+        assert event == 'notification.created'
+        assert data["user_id"] == 3
+        assert data["notifications"] == [{"id": 1, "user_id": 3}]
+    
+    def test_remote_events_update_in_memory_replica(self, mock_user_repository):
+        """Testa que eventos de outro worker são aplicados ao armazenamento em memória e ao hub."""
+        # Arrange
+        from unittest.mock import Mock
+        from src.services.notification_service import NotificationService
+        from src.repositories.in_memory_notification_repository import InMemoryNotificationRepository
+        hub = Mock()
+        hub.is_connected.return_value = False
+        repository = InMemoryNotificationRepository()
+        service = NotificationService(mock_user_repository, repository, hub=hub)
+        notification = {"id": 4097, "user_id": 3, "type": "task_completed", "read": False,
+                        "created_at": "2025-01-01T00:00:00"}
+        
+        # Act
+        service._on_remote_created({"user_id": 3, "version": 100, "notifications": [notification]})
+        count_after_create = service.get_unread_count(3)
+        service._on_remote_changed({"user_id": 3, "version": 101, "read_ids": [4097]})
+        
+        # Assert
+        assert count_after_create == 1
+        assert service.get_unread_count(3) == 0
+        assert repository.find_by_user(3)[0]["created_at"] == "2025-01-01T00:00:00"
+        hub.publish.assert_called_once_with(3, 'notification', notification)
+        hub.notify_changed.assert_called_with(3, 101)
+    
+    def test_repeated_events_in_batch_are_coalesced(self, mock_user_repository, mock_notification_repository):
+        """Testa que eventos repetidos da mesma tarefa no lote viram uma notificação com event_count."""
+        # Arrange
+        from src.services.notification_service import NotificationService
+        service = NotificationService(mock_user_repository, mock_notification_repository, coalesce_seconds=60)
+        mock_user_repository.find_by_id.return_value = {"id": 3, "username": "usuario"}
+        mock_notification_repository.create_many.side_effect = lambda notifications, **kwargs: notifications
+        
+        # Act
+        with service.batched():
+            service.create_completion_notification({"id": 10, "titulo": "T", "owner_id": 3})
+            service.create_completion_notification({"id": 10, "titulo": "T2", "owner_id": 3})
+            service.create_completion_notification({"id": 11, "titulo": "U", "owner_id": 3})
+        
+        # Assert
+        saved, = mock_notification_repository.create_many.call_args[0]
+        assert mock_notification_repository.create_many.call_args[1] == {"coalesce_seconds": 60}
+        assert [(n["task_id"], n["event_count"]) for n in saved] == [(10, 2), (11, 1)]
+        assert saved[0]["task_title"] == "T2"
+    
+    def test_digest_mode_saves_one_summary_per_recipient(self, mock_user_repository, mock_notification_repository):
+        """Testa que no modo digest as notificações só são gravadas no flush, uma por destinatário."""
+        # Arrange
+        from unittest.mock import Mock
+        from src.services.notification_service import NotificationService
+        directory = Mock()
+        directory.members.return_value = [1, 2]
+        service = NotificationService(
+            mock_user_repository, mock_notification_repository, role_directory=directory, digest=True
+        )
+        mock_user_repository.find_by_id.return_value = {"id": 1, "username": "admin"}
+        mock_notification_repository.create_many.side_effect = lambda notifications, **kwargs: notifications
+        
+        # Act
+        service.create_review_notification({"id": 10, "titulo": "A"})
+        service.create_review_notification({"id": 11, "titulo": "B"})
+        service.create_completion_notification({"id": 12, "titulo": "C", "owner_id": 1})
+        mock_notification_repository.create_many.assert_not_called()
+        result = service.flush_digest()
+        
+        # Assert
+        by_user = {n["user_id"]: n for n in result}
+        assert by_user[1]["type"] == "task_digest"
+        assert by_user[1]["event_count"] == 3
+        assert by_user[1]["message"] == "Resumo: 2 tarefas em revisão, 1 tarefa concluída. Tarefas: A, B, C."
+        assert by_user[2]["event_count"] == 2
+        assert service.digest_pending == 0
+    
+    def test_digest_mode_ignores_redelivered_events(self, mock_user_repository, mock_notification_repository):
+        """Testa que a reentrega de um lote do outbox não é contada duas vezes no resumo."""
+        # Arrange
+        from unittest.mock import Mock
+        from src.services.notification_service import NotificationService
+        directory = Mock()
+        directory.members.return_value = [1]
+        service = NotificationService(
+            mock_user_repository, mock_notification_repository, role_directory=directory, digest=True
+        )
+        mock_notification_repository.create_many.side_effect = lambda notifications, **kwargs: notifications
+        
+        # Act
+        for _ in range(2):
+            service.create_review_notification({"id": 10, "titulo": "A"}, event_id=5)
+            service.create_review_notification({"id": 11, "titulo": "B"}, event_id=6)
+        result = service.flush_digest()
+        
+        # Assert
+        summary, = result
+        assert summary["event_count"] == 2
+        assert summary["message"] == "Resumo: 2 tarefas em revisão. Tarefas: A, B."
+        assert summary["source_event_id"] == 6
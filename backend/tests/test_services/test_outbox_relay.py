@@ -0,0 +1,119 @@
+"""
+Testes para OutboxRelay - entrega dos eventos do task_outbox.
+O teste de integração usa o PostgreSQL local do config.yaml e é ignorado
+quando ele não está disponível.
+"""
+import psycopg2
+import pytest
+from unittest.mock import MagicMock, patch
+from src.config.database import get_db_config
+from src.patterns import DomainEventBus, TaskStatusChanged
+from src.services.outbox_relay import OutboxRelay
+
+
+def _postgres_available() -> bool:
+    try:
+        psycopg2.connect(connect_timeout=1, **get_db_config()).close()
+        return True
+    except Exception:
+        return False
+
+
+def _row(event_id, new_status='em_revisao'):
+    return {
+        'id': event_id,
+        'event_type': 'task.status_changed',
+        'task_id': 10,
+        'payload': {
+            'task': {'id': 10, 'titulo': 'Tarefa', 'status': new_status},
+            'old_status': 'em_andamento',
+            'new_status': new_status,
+            'updated_by': {'username': 'admin'}
+        },
+        'attempts': 0
+    }
+
+
+@pytest.mark.service
+class TestOutboxRelay:
+    """Testes unitários do OutboxRelay (repositório simulado)."""
+    
+    async def test_delivers_batch_in_order_and_confirms(self):
+        """Testa que o lote é entregue em ordem e só então confirmado."""
+        # Arrange
+        repository = MagicMock()
+        repository.fetch_pending.return_value = [_row(1), _row(2, 'concluida')]
+        bus = DomainEventBus()
+        received = []
+        bus.subscribe(TaskStatusChanged, lambda events: received.extend(events), batch=True)
+        relay = OutboxRelay(bus, repository=repository)
+        
+        # Act
+        with patch.object(relay, '_ensure_leadership', return_value=True):
+            delivered = await relay.run_once()
+        
+        # Assert
+        assert delivered == 2
+        assert [(event.event_id, event.new_status) for event in received] == [(1, 'em_revisao'), (2, 'concluida')]
+        repository.mark_delivered.assert_called_once_with([1, 2])
+        assert relay.metrics()['last_event_id'] == 2
+    
+    async def test_failure_is_not_confirmed_and_isolated(self):
+        """Testa que um lote com falha não é confirmado e é repetido um evento por vez."""
+        # Arrange
+        repository = MagicMock()
+        repository.fetch_pending.side_effect = lambda limit: [_row(1), _row(2)][:limit]
+        repository.mark_failed.return_value = False
+        bus = DomainEventBus()
+        bus.subscribe(TaskStatusChanged, MagicMock(side_effect=RuntimeError("falha")), batch=True, name='failing')
+        relay = OutboxRelay(bus, repository=repository, batch_size=10, max_attempts=3)
+        
+        # Act
+        with patch.object(relay, '_ensure_leadership', return_value=True):
+            first = await relay.run_once()
+            second = await relay.run_once()
+        
+        # Assert
+        assert (first, second) == (0, 0)
+        repository.mark_delivered.assert_not_called()
+        assert repository.fetch_pending.call_args_list[1][0] == (1,)
+        repository.mark_failed.assert_called_once_with(1, "falha em um ou mais handlers", 3)
+        assert relay.metrics()['isolating'] is True
+    
+    async def test_only_leader_delivers(self):
+        """Testa que sem o advisory lock o relay não lê o outbox."""
+        # Arrange
+        repository = MagicMock()
+        relay = OutboxRelay(DomainEventBus(), repository=repository)
+        
+        # Act
+        with patch.object(relay, '_ensure_leadership', return_value=False):
+            delivered = await relay.run_once()
+        
+        # Assert
+        assert delivered == 0
+        repository.fetch_pending.assert_not_called()
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not _postgres_available(), reason="PostgreSQL local indisponível")
+class TestOutboxRelayIntegration:
+    """Eleição do responsável pela entrega no PostgreSQL local."""
+    
+    def test_single_leader_and_failover(self):
+        """Testa que apenas um relay obtém o advisory lock e que outro assume ao liberar."""
+        # Arrange
+        worker_a, worker_b = OutboxRelay(DomainEventBus()), OutboxRelay(DomainEventBus())
+        
+        try:
+            # Act
+            leaders = (worker_a._ensure_leadership(), worker_b._ensure_leadership())
+            worker_a._release_leadership()
+            takeover = worker_b._ensure_leadership()
+        finally:
+            worker_a._release_leadership()
+            worker_b._release_leadership()
+        
+        # Assert
+        assert leaders in [(True, False), (False, True)]
+        assert takeover is True
@@ -0,0 +1,141 @@
+"""
+Testes para PgEventBus - barramento de eventos entre workers (LISTEN/NOTIFY).
+Os testes de integração usam o PostgreSQL local do config.yaml e são ignorados
+quando ele não está disponível.
+"""
+import asyncio
+import json
+import uuid
+import psycopg2
+import pytest
+from src.config.database import get_db_config
+from src.services.pg_event_bus import PgEventBus
+
+
+def _postgres_available() -> bool:
+    try:
+        psycopg2.connect(connect_timeout=1, **get_db_config()).close()
+        return True
+    except Exception:
+        return False
+
+
+@pytest.mark.service
+class TestPgEventBus:
+    """Testes unitários do PgEventBus (sem banco)."""
+
+    def test_receive_ignores_own_events(self):
+        """Testa que o processo não reprocessa os eventos que ele mesmo publicou."""
+        # Arrange
+        bus = PgEventBus()
+        received = []
+        bus.subscribe('notification.created', received.append)
+
+        # Act
+        bus._receive(json.dumps({'origin': bus.origin, 'event': 'notification.created', 'data': {'user_id': 1}}))
+        bus._receive(json.dumps({'origin': 'outro', 'event': 'notification.created', 'data': {'user_id': 2}}))
+
+        # Assert
+        assert received == [{'user_id': 2}]
+        assert bus.metrics()['received'] == 1
+
+    def test_handler_error_does_not_affect_other_handlers(self):
+        """Testa o isolamento de erros entre handlers do mesmo evento."""
+        # Arrange
+        bus = PgEventBus()
+        received = []
+        bus.subscribe('task.status_changed', lambda data: 1 / 0)
+        bus.subscribe('task.status_changed', received.append)
+
+        # Act
+        bus.publish('task.status_changed', {'task_id': 1}, deliver_locally=True)
+
+        # Assert
+        assert received == [{'task_id': 1}]
+        assert bus.metrics()['handler_errors'] == 1
+
+    def test_publish_without_start_does_not_connect(self):
+        """Testa que, sem start(), publish não abre conexão com o banco."""
+        # Arrange
+        def fail_connect():
+            raise AssertionError("não deveria conectar")
+        bus = PgEventBus(connection_factory=fail_connect)
+
+        # Act
+        result = bus.publish('notification.changed', {'user_id': 1})
+
+        # Assert
+        assert result is False
+        assert bus.metrics()['published'] == 0
+
+    def test_publish_rejects_oversized_payload(self):
+        """Testa que eventos acima do limite do NOTIFY não são enviados."""
+        # Arrange
+        bus = PgEventBus(connection_factory=lambda: pytest.fail("não deveria conectar"))
+        bus._running = True
+
+        # Act
+        result = bus.publish('notification.created', {'message': 'x' * 9000})
+
+        # Assert
+        assert result is False
+        assert bus.metrics()['oversized'] == 1
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not _postgres_available(), reason="PostgreSQL local indisponível")
+class TestPgEventBusIntegration:
+    """Testes com dois barramentos (dois 'workers') no PostgreSQL local."""
+
+    async def test_event_reaches_other_worker_only(self):
+        """Testa que o evento publicado em um worker chega ao outro e não volta ao primeiro."""
+        # Arrange
+        channel = f"test_events_{uuid.uuid4().hex[:8]}"
+        worker_a, worker_b = PgEventBus(channel=channel), PgEventBus(channel=channel)
+        received_a, received_b = [], []
+        arrived = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        worker_a.subscribe('notification.created', received_a.append)
+        worker_b.subscribe('notification.created', lambda data: (
+            received_b.append(data), loop.call_soon_threadsafe(arrived.set)
+        ))
+        await worker_a.start()
+        await worker_b.start()
+
+        try:
+            # Act
+            published = await asyncio.to_thread(
+                worker_a.publish, 'notification.created', {'user_id': 1, 'version': 10}
+            )
+            await asyncio.wait_for(arrived.wait(), timeout=5)
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+
+        # Assert
+        assert published is True
+        assert received_b == [{'user_id': 1, 'version': 10}]
+        assert received_a == []
+
+    async def test_reconnects_after_listener_connection_is_lost(self):
+        """Testa que o LISTEN é reaberto e o evento RECONNECTED é emitido."""
+        # Arrange
+        bus = PgEventBus(channel=f"test_events_{uuid.uuid4().hex[:8]}", reconnect_seconds=0.05)
+        reconnected = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        bus.subscribe(PgEventBus.RECONNECTED, lambda data: loop.call_soon_threadsafe(reconnected.set))
+        await bus.start()
+
+        try:
+            # Act
+            conn = psycopg2.connect(**get_db_config())
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_terminate_backend(%s);", (bus._listen_conn.get_backend_pid(),))
+            conn.close()
+            await asyncio.wait_for(reconnected.wait(), timeout=5)
+        finally:
+            await bus.stop()
+
+        # Assert
+        assert bus.metrics()['reconnects'] == 1
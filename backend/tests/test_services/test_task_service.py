@@ -2,7 +2,9 @@
 Testes para TaskService - Service Layer Pattern
 Testa a lógica de negócio relacionada a tarefas.
 """
+import asyncio
 import pytest
+from unittest.mock import MagicMock, patch
 from fastapi import HTTPException
 from src.services.task_service import TaskService
 from src.config import schemas
@@ -125,7 +127,7 @@ class TestTaskService:
         )
         
         mock_task_repository.find_by_id.side_effect = [existing_task, updated_task]
-        mock_task_repository.update.return_value = True
+        mock_task_repository.update.return_value = ["titulo", "descricao", "status"]
         
         # Act
         result = task_service.update_task(1, task_update, "admin")
@@ -157,7 +159,7 @@ class TestTaskService:
         task_update = schemas.TaskCreate(titulo="Tarefa", status="em_andamento")
         
         mock_task_repository.find_by_id.side_effect = [existing_task, updated_task]
-        mock_task_repository.update.return_value = True
+        mock_task_repository.update.return_value = ["status"]
         
         # Act
         result = task_service.update_task(1, task_update, "visualizacao")
@@ -205,4 +207,322 @@ class TestTaskService:
         
         assert exc_info.value.status_code == 404
         assert "Tarefa não encontrada" in str(exc_info.value.detail)
-
+    
+    def test_update_task_publishes_status_changed_event(self, mock_task_repository, mock_user_repository):
+        """Testa que a atualização apenas publica TaskStatusChanged no barramento de domínio."""
+        # Arrange
+        from unittest.mock import MagicMock
+        from src.patterns import TaskStatusChanged
+        domain_events = MagicMock()
+        notification_service = MagicMock()
+        service = TaskService(
+            task_repository=mock_task_repository,
+            user_repository=mock_user_repository,
+            notification_service=notification_service,
+            domain_events=domain_events
+        )
+        existing_task = {"id": 1, "titulo": "Tarefa", "status": "em_andamento", "owner_id": 1}
+        updated_task = {"id": 1, "titulo": "Tarefa", "status": "em_revisao", "owner_id": 1}
+        mock_task_repository.find_by_id.side_effect = [existing_task, updated_task]
+        mock_task_repository.update.return_value = ["status"]
+        
+        # Act
+        service.update_task(1, schemas.TaskCreate(titulo="Tarefa", status="em_revisao"), "visualizacao", {"username": "user"})
+        
+        # Assert
+        event = domain_events.publish.call_args[0][0]
+        assert isinstance(event, TaskStatusChanged)
+        assert (event.old_status, event.new_status) == ("em_andamento", "em_revisao")
+        assert event.updated_by == {"username": "user"}
+        notification_service.create_review_notification.assert_not_called()
+    
+    def test_update_task_without_status_change_publishes_nothing(self, mock_task_repository, mock_user_repository):
+        """Testa que nenhum evento é publicado quando o status não muda."""
+        # Arrange
+        from unittest.mock import MagicMock
+        domain_events = MagicMock()
+        service = TaskService(
+            task_repository=mock_task_repository,
+            user_repository=mock_user_repository,
+            notification_service=MagicMock(),
+            domain_events=domain_events
+        )
+        task = {"id": 1, "titulo": "Tarefa", "status": "pendente", "owner_id": 1}
+        mock_task_repository.find_by_id.side_effect = [task, task]
+        mock_task_repository.update.return_value = ["titulo"]
+        
+        # Act
+        service.update_task(1, schemas.TaskCreate(titulo="Novo", status="pendente"), "admin", {"username": "admin"})
+        
+        # Assert
+        domain_events.publish.assert_not_called()
+    
+    def test_update_task_with_outbox_records_event_and_wakes_relay(self, mock_task_repository, mock_user_repository):
+        """Testa que, com o outbox, o evento é gravado pelo repositório e o relay é acordado."""
+        # Arrange
+        from unittest.mock import MagicMock
+        domain_events = MagicMock()
+        outbox_relay = MagicMock()
+        service = TaskService(
+            task_repository=mock_task_repository,
+            user_repository=mock_user_repository,
+            notification_service=MagicMock(),
+            domain_events=domain_events,
+            outbox_relay=outbox_relay
+        )
+        existing_task = {"id": 1, "titulo": "Tarefa", "status": "em_andamento", "owner_id": 1}
+        updated_task = {"id": 1, "titulo": "Tarefa", "status": "concluida", "owner_id": 1}
+        mock_task_repository.find_by_id.side_effect = [existing_task, updated_task]
+        mock_task_repository.update.return_value = ["status"]
+        
+        # Act
+        service.update_task(1, schemas.TaskCreate(titulo="Tarefa", status="concluida"), "admin", {"username": "admin"})
+        
+        # Assert
+        kwargs = mock_task_repository.update.call_args[1]
+        assert kwargs["record_status_event"] is True
+        assert kwargs["updated_by"] == {"username": "admin"}
+        outbox_relay.wake.assert_called_once()
+        domain_events.publish.assert_not_called()
+    
+    def test_change_status_publishes_only_on_transition(self, mock_task_repository, mock_user_repository):
+        """Testa que change_status publica o evento na transição e nada em transições para o mesmo status."""
+        # Arrange
+        from unittest.mock import MagicMock
+        domain_events = MagicMock()
+        service = TaskService(
+            task_repository=mock_task_repository,
+            user_repository=mock_user_repository,
+            notification_service=MagicMock(),
+            domain_events=domain_events
+        )
+        changed = {
+            "id": 1, "status": "em_revisao", "old_status": "em_andamento", "changed": True,
+            "titulo": "Tarefa", "descricao": None, "owner_id": 2, "created_at": None
+        }
+        unchanged = {**changed, "old_status": "em_revisao", "changed": False}
+        mock_task_repository.update_status.side_effect = [changed, unchanged]
+        
+        # Act
+        first = service.change_status(1, "em_revisao", "visualizacao", {"username": "user"})
+        second = service.change_status(1, "em_revisao", "visualizacao", {"username": "user"})
+        
+        # Assert
+        assert first == {"id": 1, "status": "em_revisao", "changed": True}
+        assert second["changed"] is False
+        domain_events.publish.assert_called_once()
+        event = domain_events.publish.call_args[0][0]
+        assert (event.old_status, event.new_status, event.task["owner_id"]) == ("em_andamento", "em_revisao", 2)
+        mock_task_repository.find_by_id.assert_not_called()
+        mock_user_repository.find_by_id.assert_not_called()
+    
+    def test_change_status_errors(self, task_service, mock_task_repository):
+        """Testa 403 para visualização concluindo e 404 para tarefa inexistente."""
+        # Arrange
+        mock_task_repository.update_status.return_value = None
+        
+        # Act & Assert
+        with pytest.raises(HTTPException) as forbidden:
+            task_service.change_status(1, "concluida", "visualizacao")
+        with pytest.raises(HTTPException) as not_found:
+            task_service.change_status(999, "pendente", "admin")
+        assert forbidden.value.status_code == 403
+        assert not_found.value.status_code == 404
+    
+    def test_update_task_without_changes_skips_write(self, task_service, mock_task_repository, mock_user_repository):
+        """Testa que valores iguais aos atuais não geram UPDATE nem validação do responsável."""
+        # Arrange
+        current = {"id": 1, "titulo": "Tarefa", "descricao": None, "status": "pendente", "owner_id": 2}
+        mock_task_repository.find_by_id.return_value = current
+        
+        # Act
+        result = task_service.update_task(
+            1, schemas.TaskCreate(titulo="Tarefa", status="pendente", owner_id=2), "admin"
+        )
+        
+        # Assert
+        assert result == current
+        mock_task_repository.update.assert_not_called()
+        mock_user_repository.find_by_id.assert_not_called()
+    
+    def test_patch_task_sends_only_changed_fields(self, task_service, mock_task_repository):
+        """Testa que o PATCH (TaskUpdate) grava apenas os campos informados e diferentes dos atuais."""
+        # Arrange
+        current = {"id": 1, "titulo": "Tarefa", "descricao": "Desc", "status": "pendente", "owner_id": 2}
+        mock_task_repository.find_by_id.side_effect = [current, {**current, "descricao": "Nova"}]
+        mock_task_repository.update.return_value = ["descricao"]
+        
+        # Act
+        task_service.update_task(1, schemas.TaskUpdate(titulo="Tarefa", descricao="Nova"), "gerencial")
+        
+        # Assert
+        kwargs = mock_task_repository.update.call_args[1]
+        assert (kwargs["titulo"], kwargs["descricao"], kwargs["status"], kwargs["owner_id"]) == (None, "Nova", None, None)
+    
+    def test_get_board_groups_columns_and_sets_cursor(self, task_service, mock_task_repository):
+        """Testa que get_board agrupa por coluna, descarta a linha extra e define next_cursor."""
+        # Arrange
+        def row(column, total, task_id):
+            return {
+                "column_status": column, "column_total": total, "id": task_id, "titulo": f"Tarefa {task_id}",
+                "descricao": None, "status": column if task_id else None, "owner_id": 1,
+                "created_at": None, "owner_username": "user1", "position": f"V{task_id}" if task_id else None
+            }
+        mock_task_repository.find_board.return_value = [
+            row("pendente", 3, 1), row("pendente", 3, 2), row("pendente", 3, 5),
+            row("em_andamento", 1, 3),
+            row("em_revisao", 0, None),
+        ]
+        
+        # Act
+        board = task_service.get_board(2)
+        
+        # Assert
+        mock_task_repository.find_board.assert_called_once_with(2, None, None)
+        pendente, em_andamento, em_revisao = board["columns"]
+        assert [task["id"] for task in pendente["tasks"]] == [1, 2]
+        assert (pendente["total"], pendente["next_cursor"]) == (3, "V2.2")
+        assert "column_status" not in pendente["tasks"][0] and "position" not in pendente["tasks"][0]
+        assert (em_andamento["total"], em_andamento["next_cursor"]) == (1, None)
+        assert em_revisao == {"status": "em_revisao", "total": 0, "tasks": [], "next_cursor": None}
+    
+    def test_get_board_parses_cursor(self, task_service, mock_task_repository):
+        """Testa que o cursor "<position>.<id>" chega ao repositório e cursores malformados geram 400."""
+        # Arrange
+        mock_task_repository.find_board.return_value = []
+        
+        # Act
+        task_service.get_board(10, "pendente", "Vk.12")
+        with pytest.raises(HTTPException) as invalid:
+            task_service.get_board(10, "pendente", "12")
+        
+        # Assert
+        mock_task_repository.find_board.assert_called_once_with(10, "pendente", ("Vk", 12))
+        assert invalid.value.status_code == 400
+    
+    def test_move_task_publishes_only_when_column_changes(self, mock_task_repository, mock_user_repository):
+        """Testa que mover dentro da coluna não publica evento e mudar de coluna publica."""
+        # Arrange
+        from unittest.mock import MagicMock
+        domain_events = MagicMock()
+        service = TaskService(
+            task_repository=mock_task_repository,
+            user_repository=mock_user_repository,
+            notification_service=MagicMock(),
+            domain_events=domain_events
+        )
+        reordered = {
+            "id": 1, "status": "pendente", "old_status": "pendente", "changed": False, "position": "VV",
+            "rebalanced": False, "titulo": "Tarefa", "descricao": None, "owner_id": 2, "created_at": None
+        }
+        moved = {**reordered, "status": "em_revisao", "changed": True}
+        mock_task_repository.move.side_effect = [reordered, moved]
+        
+        # Act
+        first = service.move_task(1, schemas.TaskMove(status="pendente", after_id=3), "gerencial")
+        second = service.move_task(1, schemas.TaskMove(status="em_revisao"), "gerencial")
+        
+        # Assert
+        assert first == {"id": 1, "status": "pendente", "position": "VV", "changed": False, "rebalanced": False}
+        assert second["changed"] is True
+        domain_events.publish.assert_called_once()
+        assert mock_task_repository.move.call_args_list[0][1]["after_id"] == 3
+    
+    def test_move_task_errors(self, task_service, mock_task_repository):
+        """Testa 403 (visualização concluindo), 409 (vizinho fora da coluna) e 404."""
+        # Arrange
+        mock_task_repository.move.side_effect = [ValueError("fora da coluna"), None]
+        
+        # Act & Assert
+        with pytest.raises(HTTPException) as forbidden:
+            task_service.move_task(1, schemas.TaskMove(status="concluida"), "visualizacao")
+        with pytest.raises(HTTPException) as conflict:
+            task_service.move_task(1, schemas.TaskMove(status="pendente", after_id=9), "admin")
+        with pytest.raises(HTTPException) as not_found:
+            task_service.move_task(999, schemas.TaskMove(status="pendente"), "admin")
+        assert (forbidden.value.status_code, conflict.value.status_code, not_found.value.status_code) == (403, 409, 404)
+    
+    async def test_export_tasks_streams_in_chunks_and_filters_by_role(self, task_service, mock_task_repository):
+        """Testa que a exportação repassa a saída do COPY em blocos e restringe visualização às suas tarefas."""
+        # Arrange
+        def copy_export(file, export_format, owner_id, status):
+            for index in range(3):
+                file.write(f"{index},Tarefa\n".encode())
+        mock_task_repository.copy_export.side_effect = copy_export
+        
+        # Act
+        stream = task_service.export_tasks("csv", "visualizacao", 7)
+        content = b"".join([chunk async for chunk in stream])
+        
+        # Assert
+        assert content == b"0,Tarefa\n1,Tarefa\n2,Tarefa\n"
+        _, export_format, owner_id, status = mock_task_repository.copy_export.call_args[0]
+        assert (export_format, owner_id, status) == ("csv", 7, None)
+    
+    async def test_export_tasks_starts_copy_on_first_read(self, task_service, mock_task_repository):
+        """Testa que o COPY só começa na primeira leitura e que suas falhas são lançadas pelo iterador."""
+        # Arrange
+        mock_task_repository.copy_export.side_effect = RuntimeError("banco indisponível")
+        
+        # Act
+        stream = task_service.export_tasks("ndjson", "admin", 1)
+        await asyncio.sleep(0.05)
+        
+        # Assert
+        mock_task_repository.copy_export.assert_not_called()
+        with pytest.raises(RuntimeError):
+            await stream.__anext__()
+    
+    def test_rebalance_board_only_long_columns(self, task_service, mock_task_repository):
+        """Testa que apenas as colunas com chaves longas ou repetidas são regravadas."""
+        # Arrange
+        mock_task_repository.find_columns_to_rebalance.return_value = ["pendente", "concluida"]
+        mock_task_repository.rebalance_column.side_effect = [12, 3]
+        
+        # Act
+        result = task_service.rebalance_board(16)
+        
+        # Assert
+        assert result == {"pendente": 12, "concluida": 3}
+        mock_task_repository.find_columns_to_rebalance.assert_called_once_with(16)
+    
+    def test_reassign_tasks_continues_while_tasks_remain(self, task_service, mock_task_repository):
+        """Testa que um lote vazio com tarefas restantes não encerra a transferência."""
+        # Arrange
+        mock_task_repository.count_by_owner.side_effect = [3, 1, 0]
+        mock_task_repository.reassign_batch.side_effect = [2, 0, 1, 0]
+        progress = MagicMock()
+        
+        # Act
+        result = task_service.reassign_tasks(5, 7, batch_size=2, progress=progress)
+        
+        # Assert
+        assert result == {"reassigned": 3}
+        assert mock_task_repository.reassign_batch.call_count == 4
+        assert mock_task_repository.count_by_owner.call_count == 3
+        progress.assert_called_with(3, 3)
+    
+    def test_reassign_tasks_same_owner_is_noop(self, task_service, mock_task_repository):
+        """Testa que transferir para o próprio responsável não regrava nenhuma tarefa."""
+        # Act
+        result = task_service.reassign_tasks(5, 5)
+        
+        # Assert
+        assert result == {"reassigned": 0}
+        mock_task_repository.reassign_batch.assert_not_called()
+    
+    def test_reassign_tasks_gives_up_after_empty_batches(self, task_service, mock_task_repository):
+        """Testa que lotes vazios seguidos reportam progresso e encerram com erro se ainda restam tarefas."""
+        # Arrange
+        mock_task_repository.count_by_owner.return_value = 2
+        mock_task_repository.reassign_batch.return_value = 0
+        progress = MagicMock()
+        
+        # Act
+        with patch('src.services.task_service.time.sleep') as mock_sleep, pytest.raises(RuntimeError):
+            task_service.reassign_tasks(5, 7, progress=progress)
+        
+        # Assert
+        assert mock_task_repository.reassign_batch.call_count == 5
+        assert progress.call_count == 6
+        assert mock_sleep.call_count == 4
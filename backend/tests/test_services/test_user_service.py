@@ -81,7 +81,7 @@ class TestUserService:
         
         # Assert
         assert len(result) == 2
-        mock_user_repository.find_by_max_role.assert_called_once_with("gerencial")
+        mock_user_repository.find_by_max_role.assert_called_once_with("gerencial", None)
     
     def test_create_user_success(self, user_service, mock_user_repository, sample_user_create):
         """Testa criação de usuário com sucesso."""
@@ -133,6 +133,22 @@ class TestUserService:
         mock_user_repository.find_by_id.assert_called_once_with(1)
         mock_user_repository.update.assert_called_once()
     
+    def test_update_user_without_changes_skips_write(self, user_service, mock_user_repository):
+        """Testa que valores iguais aos atuais não chegam ao repositório."""
+        # Arrange
+        existing_user = {"id": 1, "username": "user", "email": "user@example.com", "role": "visualizacao"}
+        mock_user_repository.find_by_id.return_value = existing_user
+        
+        # Act
+        result = user_service.update_user(
+            1, schemas.UserUpdate(username="user", email="user@example.com"), "admin"
+        )
+        
+        # Assert
+        assert result == existing_user
+        mock_user_repository.update.assert_not_called()
+        mock_user_repository.exists_by_username.assert_not_called()
+    
     def test_update_user_not_found(self, user_service, mock_user_repository):
         """Testa atualização de usuário inexistente."""
         # Arrange
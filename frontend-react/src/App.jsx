@@ -8,16 +8,20 @@ import TaskDetailsModal from './components/TaskDetailsModal';
 import NotificationBell from './components/NotificationBell';
 
 const API_URL = 'http://127.0.0.1:3000';
+// Tarefas carregadas por coluna do quadro (GET /tasks/board)
+const BOARD_PAGE_SIZE = 50;
 
 function App() {
   const [token, setToken] = useState(localStorage.getItem('token') || null);
   const [currentUser, setCurrentUser] = useState(null);
-  const [tasks, setTasks] = useState([]);
+  // Colunas do quadro: { status, total, tasks, next_cursor }
+  const [board, setBoard] = useState([]);
   const [users, setUsers] = useState([]);
   const [activeTab, setActiveTab] = useState('tasks');
   const [selectedTask, setSelectedTask] = useState(null);
+  // Primeira página de notificações e contagem, vindas de GET /bootstrap
+  const [initialNotifications, setInitialNotifications] = useState(null);
   const [isTaskModalOpen, setIsTaskModalOpen] = useState(false);
-  const [notificationRefreshTrigger, setNotificationRefreshTrigger] = useState(0);
 
   const getAuthHeaders = () => ({
     'Content-Type': 'application/json',
@@ -33,20 +37,23 @@ function App() {
   const handleLogout = () => {
     setToken(null);
     setCurrentUser(null);
+    setInitialNotifications(null);
     localStorage.removeItem('token');
   };
 
-  // Função para buscar as tarefas da API
+  const tasks = board.flatMap(column => column.tasks);
+
+  // Função para buscar as tarefas da API: primeira página de cada coluna e os totais
   const fetchTasks = async () => {
     if (!token) return;
     
     try {
-      const response = await fetch(`${API_URL}/tasks/`, {
+      const response = await fetch(`${API_URL}/tasks/board?limit=${BOARD_PAGE_SIZE}`, {
         headers: getAuthHeaders()
       });
       if (response.ok) {
         const data = await response.json();
-        setTasks(data);
+        setBoard(data.columns);
       } else if (response.status === 401) {
         handleLogout();
       }
@@ -55,51 +62,62 @@ function App() {
     }
   };
 
-  // Função para buscar usuários (apenas para admin e gerencial)
-  const fetchUsers = async () => {
-    if (!token) return;
-    
+  // "Carregar mais" de uma coluna: próxima página a partir do cursor da coluna
+  const loadMoreTasks = async (status) => {
+    const column = board.find(c => c.status === status);
+    if (!column || column.next_cursor == null) return;
+    try {
+      const response = await fetch(
+        `${API_URL}/tasks/board?status=${status}&after=${encodeURIComponent(column.next_cursor)}&limit=${BOARD_PAGE_SIZE}`,
+        { headers: getAuthHeaders() }
+      );
+      if (response.ok) {
+        const [page] = (await response.json()).columns;
+        setBoard(prev => prev.map(c => {
+          if (c.status !== status) return c;
+          const loaded = new Set(c.tasks.map(task => task.id));
+          return {
+            ...page,
+            tasks: [...c.tasks, ...page.tasks.filter(task => !loaded.has(task.id))]
+          };
+        }));
+      } else if (response.status === 401) {
+        handleLogout();
+      }
+    } catch (error) {
+      console.error("Erro ao carregar mais tarefas:", error);
+    }
+  };
+
+  // Dados iniciais em uma única requisição (GET /bootstrap): usuário, quadro,
+  // usuários (admin/gerencial) e notificações, com o token validado uma vez
+  const fetchBootstrap = async () => {
     try {
-      const response = await fetch(`${API_URL}/users/`, {
+      const response = await fetch(`${API_URL}/bootstrap?board_limit=${BOARD_PAGE_SIZE}`, {
         headers: getAuthHeaders()
       });
       if (response.ok) {
         const data = await response.json();
-        setUsers(data);
+        setCurrentUser(data.me);
+        setBoard(data.board.columns);
+        setUsers(data.users || []);
+        setInitialNotifications({
+          notifications: data.notifications,
+          nextBefore: data.notifications_next_before,
+          unreadCount: data.unread_count
+        });
       } else if (response.status === 401) {
         handleLogout();
-        alert('Sua sessão expirou. Por favor, faça login novamente.');
       }
     } catch (error) {
-      console.error("Erro ao buscar usuários:", error);
+      console.error('Erro ao carregar dados iniciais:', error);
     }
   };
 
-  // useEffect para buscar as tarefas quando o componente for montado
+  // useEffect para carregar os dados iniciais quando houver token
   useEffect(() => {
     if (token) {
-      fetchTasks();
-      // Buscar informações do usuário
-      fetch(`${API_URL}/users/me/`, {
-        headers: getAuthHeaders()
-      })
-        .then(res => {
-          if (res.ok) {
-            return res.json();
-          } else if (res.status === 401) {
-            handleLogout();
-            throw new Error('Não autenticado');
-          }
-          throw new Error('Erro ao buscar usuário');
-        })
-        .then(user => {
-          setCurrentUser(user || { username: 'Usuário', role: 'visualizacao' });
-          // Se for admin ou gerencial, buscar lista de usuários
-          if (user && ['admin', 'gerencial'].includes(user.role)) {
-            fetchUsers();
-          }
-        })
-        .catch(err => console.error('Erro ao buscar usuário:', err));
+      fetchBootstrap();
     }
   }, [token]);
 
@@ -120,6 +138,46 @@ function App() {
     }
   };
   
+  // Mover um cartão no quadro: coluna e lugar (vizinho acima ou abaixo).
+  // O servidor grava apenas a tarefa movida (PATCH /tasks/{id}/position)
+  const handleMoveTask = async (taskId, newStatus, { afterId = null, beforeId = null } = {}) => {
+    const previousBoard = board;
+    const moved = tasks.find(task => task.id === taskId);
+    if (!moved) return;
+    setBoard(prev => prev.map(column => {
+      let columnTasks = column.tasks;
+      let total = column.total;
+      if (column.status === moved.status) {
+        columnTasks = columnTasks.filter(task => task.id !== taskId);
+        total -= 1;
+      }
+      if (column.status === newStatus) {
+        const anchorIndex = columnTasks.findIndex(task => task.id === (afterId ?? beforeId));
+        const index = anchorIndex === -1 ? columnTasks.length : anchorIndex + (afterId != null ? 1 : 0);
+        columnTasks = [...columnTasks.slice(0, index), { ...moved, status: newStatus }, ...columnTasks.slice(index)];
+        total += 1;
+      }
+      return columnTasks === column.tasks ? column : { ...column, total, tasks: columnTasks };
+    }));
+    try {
+      const response = await fetch(`${API_URL}/tasks/${taskId}/position`, {
+        method: 'PATCH',
+        headers: getAuthHeaders(),
+        body: JSON.stringify({ status: newStatus, after_id: afterId, before_id: beforeId }),
+      });
+      if (!response.ok) {
+        setBoard(previousBoard);
+        const error = await response.json().catch(() => ({}));
+        alert(error.detail || 'Erro ao mover tarefa');
+        if (response.status === 409) fetchTasks(); // Quadro desatualizado
+      }
+    } catch (error) {
+      setBoard(previousBoard);
+      console.error("Erro ao mover tarefa:", error);
+      alert('Erro ao mover tarefa');
+    }
+  };
+
   // Função para atualizar uma tarefa (status, título, etc.)
   const handleUpdateTask = async (updatedTask) => {
     try {
@@ -130,9 +188,7 @@ function App() {
       });
       if (response.ok) {
         fetchTasks();
-        // Disparar atualização de notificações após atualizar tarefa
-        // Isso garante que notificações sejam atualizadas imediatamente
-        setNotificationRefreshTrigger(prev => prev + 1);
+        // As notificações geradas pela atualização chegam pelo stream SSE do NotificationBell
       }
     } catch (error) {
       console.error("Erro ao atualizar tarefa:", error);
@@ -180,7 +236,8 @@ function App() {
               <NotificationBell 
                 token={token} 
                 currentUser={currentUser}
-                refreshTrigger={notificationRefreshTrigger}
+                initialData={initialNotifications}
+                onTaskChange={fetchTasks}
                 onTaskClick={(taskId) => {
                   // Buscar a tarefa e abrir o modal
                   const task = tasks.find(t => t.id === taskId);
@@ -257,8 +314,10 @@ function App() {
               />
             )}
             <KanbanBoard
-              tasks={tasks}
+              columns={board}
+              onLoadMore={loadMoreTasks}
               onUpdateTask={handleUpdateTask}
+              onMoveTask={handleMoveTask}
               onDeleteTask={handleDeleteTask}
               onShowTaskDetails={(task) => {
                 setSelectedTask(task);
@@ -9,7 +9,7 @@ const STATUSES = [
   { id: 'concluida', label: 'Concluída', color: 'bg-green-200' }
 ];
 
-function KanbanBoard({ tasks, onUpdateTask, onDeleteTask, onShowTaskDetails, users = [], canAssignTasks = false, currentUserRole = 'visualizacao' }) {
+function KanbanBoard({ columns = [], onLoadMore, onUpdateTask, onMoveTask, onDeleteTask, onShowTaskDetails, users = [], canAssignTasks = false, currentUserRole = 'visualizacao' }) {
   const [draggedTask, setDraggedTask] = useState(null);
 
   const handleDragStart = (e, task) => {
@@ -22,27 +22,46 @@ function KanbanBoard({ tasks, onUpdateTask, onDeleteTask, onShowTaskDetails, use
     e.dataTransfer.dropEffect = 'move';
   };
 
+  // Lugar do drop: o primeiro cartão cuja metade fica abaixo do cursor é o vizinho
+  // de baixo (before_id); sem ele, o último cartão carregado é o de cima (after_id)
+  const getDropAnchor = (e, column) => {
+    const cards = [...e.currentTarget.querySelectorAll('[data-task-id]')];
+    const below = cards.find(card => {
+      const rect = card.getBoundingClientRect();
+      return e.clientY < rect.top + rect.height / 2;
+    });
+    if (below) return { beforeId: Number(below.dataset.taskId) };
+    const last = column.tasks[column.tasks.length - 1];
+    return last ? { afterId: last.id } : {};
+  };
+
   const handleDrop = (e, newStatus) => {
     e.preventDefault();
-    if (draggedTask && draggedTask.status !== newStatus) {
+    if (draggedTask) {
       // Verificar se visualizacao pode mover para esse status
       if (currentUserRole === 'visualizacao' && newStatus === 'concluida') {
         alert('Usuários com perfil visualização não podem concluir tarefas');
         setDraggedTask(null);
         return;
       }
-      onUpdateTask({ ...draggedTask, status: newStatus });
+      const anchor = getDropAnchor(e, getColumn(newStatus));
+      // Solto sobre ele mesmo: nada muda
+      if (anchor.beforeId !== draggedTask.id && anchor.afterId !== draggedTask.id) {
+        onMoveTask(draggedTask.id, newStatus, anchor);
+      }
     }
     setDraggedTask(null);
   };
 
-  const getTasksByStatus = (status) => {
-    return tasks.filter(task => task.status === status);
+  // Colunas vindas de GET /tasks/board: tarefas já carregadas, total e cursor
+  const getColumn = (status) => {
+    return columns.find(column => column.status === status) || { tasks: [], total: 0, next_cursor: null };
   };
 
   return (
     <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-4 mt-6">
       {STATUSES.map((status) => {
+        const column = getColumn(status.id);
         // Visualização não pode dropar na coluna "concluida"
         const canDropHere = !(currentUserRole === 'visualizacao' && status.id === 'concluida');
         return (
@@ -55,28 +74,37 @@ function KanbanBoard({ tasks, onUpdateTask, onDeleteTask, onShowTaskDetails, use
           <h2 className="text-lg font-bold text-gray-800 mb-4 text-center">
             {status.label}
             <span className="ml-2 text-sm font-normal bg-white px-2 py-1 rounded-full">
-              {getTasksByStatus(status.id).length}
+              {column.total}
             </span>
           </h2>
           <div className="space-y-3">
-            {getTasksByStatus(status.id).map((task) => (
-              <TaskCard
-                key={task.id}
-                task={task}
-                onDragStart={handleDragStart}
-                onUpdateTask={onUpdateTask}
-                onDeleteTask={onDeleteTask}
-                onShowDetails={onShowTaskDetails}
-                users={users}
-                canAssignTasks={canAssignTasks}
-                currentUserRole={currentUserRole}
-              />
+            {column.tasks.map((task) => (
+              <div key={task.id} data-task-id={task.id}>
+                <TaskCard
+                  task={task}
+                  onDragStart={handleDragStart}
+                  onUpdateTask={onUpdateTask}
+                  onDeleteTask={onDeleteTask}
+                  onShowDetails={onShowTaskDetails}
+                  users={users}
+                  canAssignTasks={canAssignTasks}
+                  currentUserRole={currentUserRole}
+                />
+              </div>
             ))}
-            {getTasksByStatus(status.id).length === 0 && (
+            {column.tasks.length === 0 && (
               <p className="text-gray-500 text-sm text-center py-4">
                 Nenhuma tarefa
               </p>
             )}
+            {column.next_cursor != null && (
+              <button
+                onClick={() => onLoadMore(status.id)}
+                className="w-full text-sm text-blue-700 bg-white/70 hover:bg-white rounded-md py-2"
+              >
+                Carregar mais ({column.total - column.tasks.length})
+              </button>
+            )}
           </div>
         </div>
         );
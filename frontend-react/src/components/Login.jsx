@@ -24,19 +24,8 @@ function Login({ onLogin }) {
 
       if (response.ok) {
         const data = await response.json();
-        // Buscar informações do usuário
-        const userResponse = await fetch(`${API_URL}/users/me/`, {
-          headers: {
-            'Authorization': `Bearer ${data.access_token}`
-          }
-        });
-        
-        if (userResponse.ok) {
-          const user = await userResponse.json();
-          onLogin(data.access_token, user);
-        } else {
-          onLogin(data.access_token, { username, role: 'visualizacao' });
-        }
+        // O usuário e os demais dados iniciais vêm do GET /bootstrap feito pelo App
+        onLogin(data.access_token, null);
       } else {
         if (response.status === 401) {
           setError('Usuário ou senha incorretos');
@@ -2,29 +2,34 @@
 import { useState, useEffect } from 'react';
 
 const API_URL = 'http://127.0.0.1:3000';
+const PAGE_SIZE = 20;
 
-function NotificationBell({ token, currentUser, refreshTrigger = 0, onTaskClick = null }) {
+function NotificationBell({ token, currentUser, initialData = null, onTaskClick = null, onTaskChange = null }) {
   const [notifications, setNotifications] = useState([]);
   const [unreadCount, setUnreadCount] = useState(0);
   const [isOpen, setIsOpen] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
+  // Cursor da próxima página (cabeçalho X-Next-Before); null quando não há mais
+  const [nextBefore, setNextBefore] = useState(null);
 
   const getAuthHeaders = () => ({
     'Content-Type': 'application/json',
     'Authorization': `Bearer ${token}`
   });
 
+  // Busca apenas a primeira página; as demais vêm sob demanda (fetchMoreNotifications)
   const fetchNotifications = async () => {
     if (!token) return; // Agora todos os usuários podem receber notificações
     
     setIsLoading(true);
     try {
-      const response = await fetch(`${API_URL}/notifications/`, {
+      const response = await fetch(`${API_URL}/notifications/?limit=${PAGE_SIZE}`, {
         headers: getAuthHeaders()
       });
       if (response.ok) {
         const data = await response.json();
         setNotifications(data);
+        setNextBefore(response.headers.get('X-Next-Before'));
       }
     } catch (error) {
       console.error('Erro ao buscar notificações:', error);
@@ -33,19 +38,23 @@ function NotificationBell({ token, currentUser, refreshTrigger = 0, onTaskClick
     }
   };
 
-  const fetchUnreadCount = async () => {
-    if (!token) return; // Agora todos os usuários podem receber notificações
+  const fetchMoreNotifications = async () => {
+    if (!token || !nextBefore) return;
     
     try {
-      const response = await fetch(`${API_URL}/notifications/unread-count`, {
+      const response = await fetch(`${API_URL}/notifications/?limit=${PAGE_SIZE}&before=${nextBefore}`, {
         headers: getAuthHeaders()
       });
       if (response.ok) {
         const data = await response.json();
-        setUnreadCount(data.unread_count || 0);
+        setNotifications(prev => [
+          ...prev,
+          ...data.filter(notification => !prev.some(notif => notif.id === notification.id))
+        ]);
+        setNextBefore(response.headers.get('X-Next-Before'));
       }
     } catch (error) {
-      console.error('Erro ao buscar contador de notificações:', error);
+      console.error('Erro ao buscar mais notificações:', error);
     }
   };
 
@@ -107,33 +116,52 @@ function NotificationBell({ token, currentUser, refreshTrigger = 0, onTaskClick
     }
   };
 
-  // Atualizar quando refreshTrigger mudar (quando tarefa é atualizada)
+  // Carga inicial: primeira página e contagem vêm do GET /bootstrap do App
   useEffect(() => {
-    if (token && refreshTrigger > 0) {
-      // Pequeno delay para garantir que o backend processou a notificação
-      const timeout = setTimeout(() => {
-        fetchNotifications();
-        fetchUnreadCount();
-      }, 1500);
-      
-      return () => clearTimeout(timeout);
+    if (initialData) {
+      setNotifications(initialData.notifications);
+      setNextBefore(initialData.nextBefore);
+      setUnreadCount(initialData.unreadCount);
     }
-  }, [refreshTrigger, token]);
-  
-  // Atualização periódica e inicial
+  }, [initialData]);
+
+  // Atualizações em tempo real via Server-Sent Events
   useEffect(() => {
     if (token) {
-      // Buscar imediatamente ao montar
-      fetchNotifications();
-      fetchUnreadCount();
+      // O EventSource não envia cabeçalhos: o token vai na query string.
+      // Na reconexão automática o navegador envia Last-Event-ID e o servidor
+      // reenvia apenas os eventos perdidos.
+      const source = new EventSource(
+        `${API_URL}/notifications/stream?access_token=${encodeURIComponent(token)}`
+      );
+      
+      // Eventos repetidos da mesma tarefa chegam com o mesmo id (event_count maior):
+      // a notificação é substituída e volta para o topo da lista
+      source.addEventListener('notification', (event) => {
+        const notification = JSON.parse(event.data);
+        setNotifications(prev => [
+          notification,
+          ...prev.filter(notif => notif.id !== notification.id)
+        ]);
+      });
       
-      // Atualizar a cada 5 segundos (mais frequente para notificações em tempo real)
-      const interval = setInterval(() => {
+      source.addEventListener('unread_count', (event) => {
+        const data = JSON.parse(event.data);
+        setUnreadCount(data.unread_count || 0);
+      });
+      
+      // Status de uma tarefa mudou (em qualquer worker): recarregar o quadro
+      source.addEventListener('task_status', () => {
+        if (onTaskChange) onTaskChange();
+      });
+      
+      // O servidor não tem mais os eventos perdidos: recarregar a lista e o quadro
+      source.addEventListener('resync', () => {
         fetchNotifications();
-        fetchUnreadCount();
-      }, 5000);
+        if (onTaskChange) onTaskChange();
+      });
       
-      return () => clearInterval(interval);
+      return () => source.close();
     }
   }, [token, currentUser]);
 
@@ -226,6 +254,11 @@ function NotificationBell({ token, currentUser, refreshTrigger = 0, onTaskClick
                         <div className="flex-1">
                           <p className="text-sm font-semibold text-gray-800">
                             {notification.title}
+                            {notification.event_count > 1 && (
+                              <span className="ml-2 text-xs font-normal text-gray-500">
+                                ({notification.event_count}x)
+                              </span>
+                            )}
                           </p>
                           <p className="text-xs text-gray-600 mt-1">
                             {notification.message}
@@ -250,6 +283,14 @@ function NotificationBell({ token, currentUser, refreshTrigger = 0, onTaskClick
                       </div>
                     </div>
                   ))}
+                  {nextBefore && (
+                    <button
+                      onClick={fetchMoreNotifications}
+                      className="w-full p-3 text-xs text-blue-600 hover:bg-gray-50"
+                    >
+                      Carregar mais
+                    </button>
+                  )}
                 </div>
               )}
             </div>